@@ -0,0 +1,113 @@
+"""Recall and latency of the IVF-PQ index against exact search.
+
+Builds a synthetic clustered corpus, writes it to a memory-mapped store,
+trains IVF-PQ on it and reports recall@k against brute force together with
+QPS and p50/p99 latency for each nprobe value.
+
+    uv run python -m benchmarks.ann_recall --chunks 1000000 --dimension 128 \\
+        --nlist 1024 --nprobe 4 8 16 32 --rerank 100
+"""
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from src.app.retrieval.ann import IVFPQIndex, build_ivfpq
+from src.app.retrieval.embeddings import normalize_rows
+from src.app.retrieval.index import SearchIndex, VectorIndex
+from src.app.retrieval.schemas import Chunk
+
+
+def synthetic_corpus(
+    rng: np.random.Generator, chunks: int, dimension: int, clusters: int, noise: float
+) -> np.ndarray:
+    """Gaussian blobs around random topic centres, like embedded documents."""
+    centers = rng.standard_normal((clusters, dimension), dtype=np.float32)
+    vectors = centers[rng.integers(0, clusters, chunks)]
+    vectors += noise * rng.standard_normal((chunks, dimension), dtype=np.float32)
+    return normalize_rows(vectors)
+
+
+def run_queries(
+    index: SearchIndex, queries: np.ndarray, top_k: int
+) -> tuple[list[set[int]], np.ndarray]:
+    results, latencies = [], []
+    for query in queries:
+        started = time.perf_counter()
+        hits = index.search(query, top_k)
+        latencies.append(time.perf_counter() - started)
+        results.append({chunk_id for chunk_id, _ in hits})
+    return results, np.array(latencies)
+
+
+def report(name: str, latencies: np.ndarray, recall: float) -> None:
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(
+        f"{name:>16} {recall:>9.3f} {1 / latencies.mean():>9.0f}"
+        f" {p50:>8.3f} {p99:>8.3f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--chunks", type=int, default=200_000)
+    parser.add_argument("--dimension", type=int, default=128)
+    parser.add_argument("--clusters", type=int, default=2000)
+    parser.add_argument("--noise", type=float, default=0.25)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=1024)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--m", type=int, default=32, help="PQ subquantizers")
+    parser.add_argument("--rerank", type=int, default=100)
+    parser.add_argument("--train-size", type=int, default=65536)
+    parser.add_argument("--iterations", type=int, default=15)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = synthetic_corpus(
+        rng, args.chunks, args.dimension, args.clusters, args.noise
+    )
+    exact = VectorIndex(vectors=vectors, chunks=[Chunk(text="")] * args.chunks)
+    queries = normalize_rows(
+        vectors[rng.choice(args.chunks, args.queries)]
+        + 0.1 * rng.standard_normal((args.queries, args.dimension), dtype=np.float32)
+    )
+
+    truth, exact_latencies = run_queries(exact, queries, args.top_k)
+
+    with tempfile.TemporaryDirectory() as directory:
+        exact.save(directory)
+        started = time.perf_counter()
+        build_ivfpq(
+            directory,
+            nlist=args.nlist,
+            m=args.m,
+            train_size=args.train_size,
+            iterations=args.iterations,
+        )
+        build_seconds = time.perf_counter() - started
+
+        print(
+            f"chunks={args.chunks} dimension={args.dimension} top_k={args.top_k}"
+            f" nlist={args.nlist} m={args.m} rerank={args.rerank}"
+            f" build={build_seconds:.1f}s"
+        )
+        print(f"{'index':>16} {'recall@k':>9} {'QPS':>9} {'p50 ms':>8} {'p99 ms':>8}")
+        report("brute-force", exact_latencies, 1.0)
+        for nprobe in args.nprobe:
+            ann = IVFPQIndex(directory, nprobe=nprobe, rerank=args.rerank)
+            found, latencies = run_queries(ann, queries, args.top_k)
+            recall = np.mean(
+                [len(f & t) / args.top_k for f, t in zip(found, truth, strict=True)]
+            )
+            report(f"ivfpq/{nprobe}", latencies, recall)
+            ann.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Measure how many /chat completions a single worker keeps in flight.
+
+Starts the stub OpenAI server and the chat app (one uvicorn worker each) in
+this process, then fires batches of concurrent /chat requests. With a
+non-blocking provider call, wall time per batch stays close to the stub
+latency regardless of concurrency.
+
+    uv run python -m benchmarks.chat_concurrency --latency 0.5 \\
+        --concurrency 1 10 100 200
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+import uvicorn
+
+from benchmarks.stub_openai import create_stub_app
+
+PAYLOAD = {
+    "model": "stub-model",
+    "messages": [{"role": "user", "content": "What is molasses?"}],
+}
+
+
+async def _serve(app, port: int) -> tuple[uvicorn.Server, asyncio.Task]:
+    server = uvicorn.Server(
+        uvicorn.Config(
+            app, host="127.0.0.1", port=port, log_level="warning", timeout_keep_alive=75
+        )
+    )
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    return server, task
+
+
+async def _run_batch(client: httpx.AsyncClient, concurrency: int) -> float:
+    started = time.perf_counter()
+    responses = await asyncio.gather(
+        *(client.post("/chat", json=PAYLOAD) for _ in range(concurrency))
+    )
+    elapsed = time.perf_counter() - started
+    failed = [r.status_code for r in responses if r.status_code != 200]
+    if failed:
+        raise RuntimeError(f"{len(failed)} requests failed: {failed[:5]}")
+    return elapsed
+
+
+async def run(*, latency: float, levels: list[int], stub_port: int, app_port: int):
+    os.environ["OPENAI_API_KEY"] = "stub-key"
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{stub_port}/v1"
+
+    from src.app.config import get_settings
+
+    get_settings.cache_clear()
+    from src.app.main import app
+
+    servers = [
+        await _serve(create_stub_app(latency=latency), stub_port),
+        await _serve(app, app_port),
+    ]
+
+    limits = httpx.Limits(max_connections=max(levels))
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{app_port}", limits=limits, timeout=60
+    ) as client:
+        await _run_batch(client, 1)  # warm-up
+        print(f"{'concurrency':>12} {'wall (s)':>10} {'req/s':>10} {'serial (s)':>11}")
+        for concurrency in levels:
+            elapsed = await _run_batch(client, concurrency)
+            print(
+                f"{concurrency:>12} {elapsed:>10.3f} {concurrency / elapsed:>10.1f}"
+                f" {concurrency * latency:>11.1f}"
+            )
+
+    for server, task in servers:
+        server.should_exit = True
+        await task
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100, 200])
+    parser.add_argument("--stub-port", type=int, default=9000)
+    parser.add_argument("--app-port", type=int, default=8001)
+    args = parser.parse_args()
+    asyncio.run(
+        run(
+            latency=args.latency,
+            levels=args.concurrency,
+            stub_port=args.stub_port,
+            app_port=args.app_port,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
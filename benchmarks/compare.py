@@ -0,0 +1,90 @@
+"""Compare two benchmark result files and flag regressions.
+
+Prints every comparable metric of ``baseline`` and ``candidate`` with the
+relative change, and exits with status 1 when any metric got worse by more
+than ``--threshold``.
+
+    uv run python -m benchmarks.micro --output before.json
+    git checkout my-branch
+    uv run python -m benchmarks.micro --output after.json
+    uv run python -m benchmarks.compare before.json after.json --threshold 0.1
+"""
+
+import argparse
+import json
+import sys
+from typing import Any
+
+from benchmarks.results import HIGHER_IS_BETTER, LOWER_IS_BETTER
+
+
+def flatten(results: dict[str, Any], prefix: str = "") -> dict[str, float]:
+    """Comparable metrics as ``dotted.name -> value``."""
+    metrics: dict[str, float] = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            metrics.update(flatten(value, f"{name}."))
+        elif isinstance(value, int | float) and key in (
+            *HIGHER_IS_BETTER,
+            *LOWER_IS_BETTER,
+        ):
+            metrics[name] = float(value)
+    return metrics
+
+
+def relative_change(baseline: float, candidate: float) -> float:
+    return (candidate - baseline) / baseline if baseline else 0.0
+
+
+def is_regression(name: str, change: float, threshold: float) -> bool:
+    if name.rsplit(".", 1)[-1] in HIGHER_IS_BETTER:
+        return change < -threshold
+    return change > threshold
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    if baseline["benchmark"] != candidate["benchmark"]:
+        sys.exit(
+            f"Cannot compare {baseline['benchmark']!r} with {candidate['benchmark']!r}"
+        )
+
+    before = flatten(baseline["results"])
+    after = flatten(candidate["results"])
+    print(
+        f"{baseline['environment']['commit'] or '?':.12} -> "
+        f"{candidate['environment']['commit'] or '?':.12}"
+    )
+    print(f"{'metric':<50} {'baseline':>14} {'candidate':>14} {'change':>8}")
+    regressions = []
+    for name in sorted(before.keys() & after.keys()):
+        change = relative_change(before[name], after[name])
+        flag = ""
+        if is_regression(name, change, args.threshold):
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(
+            f"{name:<50} {before[name]:>14.2f} {after[name]:>14.2f} "
+            f"{change:>+8.1%}{flag}"
+        )
+    if regressions:
+        print(
+            f"{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Tail latency of provider calls with and without request hedging.
+
+Simulates a provider whose latency is usually ``--latency`` but, with
+probability ``--tail-probability``, ``--tail-latency``. The same request
+stream is run once unhedged and once through ``Hedger``, and p50/p99/max
+latency is reported together with the share of requests that were hedged.
+
+    uv run python -m benchmarks.hedging --requests 2000 --concurrency 50 \\
+        --tail-probability 0.03 --max-ratio 0.05
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+import numpy as np
+
+from src.app.llm_providers.hedging import Hedger
+
+
+def make_provider(args: argparse.Namespace, seed: int):
+    rng = random.Random(seed)
+    calls = 0
+
+    async def call() -> None:
+        nonlocal calls
+        calls += 1
+        slow = rng.random() < args.tail_probability
+        jitter = rng.uniform(0.8, 1.2)
+        await asyncio.sleep((args.tail_latency if slow else args.latency) * jitter)
+
+    return call, lambda: calls
+
+
+async def run(args: argparse.Namespace, hedger: Hedger | None) -> tuple[list, int]:
+    call, count_calls = make_provider(args, seed=0)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: list[float] = []
+
+    async def request() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            if hedger is None:
+                await call()
+            else:
+                await hedger.run("model", call)
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(request() for _ in range(args.requests)))
+    return latencies, count_calls()
+
+
+def report(name: str, latencies: list[float], calls: int, requests: int) -> None:
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(
+        f"{name:<10} p50 {p50:7.1f} ms  p99 {p99:7.1f} ms  "
+        f"max {max(latencies) * 1000:7.1f} ms  provider calls {calls / requests:.3f}x"
+    )
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    latencies, calls = await run(args, None)
+    report("unhedged", latencies, calls, args.requests)
+
+    hedger = Hedger(
+        percentile=args.percentile,
+        initial_delay=args.latency * 2,
+        max_ratio=args.max_ratio,
+    )
+    latencies, calls = await run(args, hedger)
+    report("hedged", latencies, calls, args.requests)
+    stats = hedger.stats
+    print(
+        f"hedged {stats.hedged / stats.requests:.1%} of requests, "
+        f"{stats.hedge_wins} duplicate wins, {stats.budget_denied} denied by budget, "
+        f"final delay {hedger.delay('model') * 1000:.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--tail-latency", type=float, default=1.0)
+    parser.add_argument("--tail-probability", type=float, default=0.03)
+    parser.add_argument("--percentile", type=float, default=95.0)
+    parser.add_argument("--max-ratio", type=float, default=0.05)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Measure BM25 index size, build time and query latency.
+
+Builds the inverted index of ``src/app/retrieval/lexical.py`` over a
+synthetic corpus whose words follow a Zipf distribution, with a ticket key
+in every chunk, and reports its size against raw uint32 postings and the
+latency of queries for a ticket key, a few rare words and common words.
+
+    uv run python -m benchmarks.lexical_search --chunks 1000000
+"""
+
+import argparse
+import tempfile
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import numpy as np
+
+from src.app.retrieval.lexical import (
+    LENGTHS_FILE,
+    OFFSETS_FILE,
+    POSTINGS_FILE,
+    TERMS_FILE,
+    TFS_FILE,
+    BM25Index,
+    bm25_search,
+    write_bm25,
+)
+
+
+def corpus(chunks: int, *, words: int, vocabulary: int, seed: int = 0) -> Iterator[str]:
+    rng = np.random.default_rng(seed)
+    names = [f"w{i}" for i in range(vocabulary)]
+    for start in range(0, chunks, 10_000):
+        count = min(10_000, chunks - start)
+        ranks = np.minimum(rng.zipf(1.1, (count, words)), vocabulary) - 1
+        for i, row in enumerate(ranks):
+            yield " ".join(names[r] for r in row) + f" PROJ-{start + i}"
+
+
+def measure(index: BM25Index, queries: list[str], top_k: int) -> tuple[float, float]:
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        bm25_search([index], query, top_k)
+        latencies.append(time.perf_counter() - started)
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    return p50, p99
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=1_000_000)
+    parser.add_argument("--words", type=int, default=150, help="Words per chunk")
+    parser.add_argument("--vocabulary", type=int, default=200_000)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        stats = write_bm25(
+            directory,
+            corpus(args.chunks, words=args.words, vocabulary=args.vocabulary),
+        )
+        build_s = time.perf_counter() - started
+        sizes = {
+            name: (Path(directory) / name).stat().st_size
+            for name in (
+                TERMS_FILE,
+                OFFSETS_FILE,
+                POSTINGS_FILE,
+                TFS_FILE,
+                LENGTHS_FILE,
+            )
+        }
+        started = time.perf_counter()
+        index = BM25Index(directory, stats)
+        open_ms = (time.perf_counter() - started) * 1000
+
+        print(
+            f"chunks={stats['count']} terms={stats['terms']} "
+            f"postings={stats['postings']} build={build_s:.1f}s open={open_ms:.2f}ms"
+        )
+        total = sum(sizes.values())
+        for name, size in sizes.items():
+            print(f"{name:>18} {size / 1e6:>9.1f} MB")
+        print(
+            f"{'total':>18} {total / 1e6:>9.1f} MB; postings "
+            f"{sizes[POSTINGS_FILE] / stats['postings']:.2f} bytes/id vs 4 raw"
+            f" ({4 * stats['postings'] / 1e6:.1f} MB)"
+        )
+
+        def words(low: int, high: int, count: int) -> list[str]:
+            return [
+                " ".join(f"w{r}" for r in rng.integers(low, high, count))
+                for _ in range(args.queries)
+            ]
+
+        query_sets = {
+            "ticket key": [
+                f"what happened in PROJ-{i}"
+                for i in rng.integers(0, args.chunks, args.queries)
+            ],
+            "rare words": words(1000, args.vocabulary, 3),
+            "common words": words(0, 100, 3),
+        }
+        print(f"{'query':>18} {'p50 ms':>8} {'p99 ms':>8}  top_k={args.top_k}")
+        for name, queries in query_sets.items():
+            p50, p99 = measure(index, queries, args.top_k)
+            print(f"{name:>18} {p50:>8.3f} {p99:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
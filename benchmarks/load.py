@@ -0,0 +1,184 @@
+"""Closed-loop load test of /chat at several concurrency levels.
+
+For each level, ``concurrency`` workers send requests back to back for
+``--duration`` seconds. Reported per level: successful requests per second,
+latency percentiles of successful requests, errors by status and, with
+``--stream``, time to the first content delta of /chat/stream.
+
+By default the stub OpenAI server (see ``benchmarks.stub_openai``, whose
+options are accepted here) and the chat app are started in this process, so
+the numbers include the load generator's own CPU; pass ``--url`` to load an
+app running elsewhere instead.
+
+    uv run python -m benchmarks.load --concurrency 1 10 50 --duration 10 \\
+        --latency 0.2 --jitter 0.5 --rate-limit-rate 0.02 --output load.json
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+import httpx
+
+from benchmarks.chat_concurrency import PAYLOAD, _serve
+from benchmarks.results import write_results
+from benchmarks.stub_openai import add_stub_arguments, stub_app_from_args
+
+
+@dataclass
+class LevelStats:
+    latencies: list[float] = field(default_factory=list)
+    ttfts: list[float] = field(default_factory=list)
+    errors: Counter[str] = field(default_factory=Counter)
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    """Nearest-rank p50/p95/p99 of ``samples`` seconds, in milliseconds."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    return {
+        name: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1e3, 2)
+        for name, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99))
+    }
+
+
+async def _chat(client: httpx.AsyncClient, stats: LevelStats) -> None:
+    started = time.perf_counter()
+    response = await client.post("/chat", json=PAYLOAD)
+    if response.status_code != 200:
+        stats.errors[str(response.status_code)] += 1
+        return
+    stats.latencies.append(time.perf_counter() - started)
+
+
+async def _chat_stream(client: httpx.AsyncClient, stats: LevelStats) -> None:
+    started = time.perf_counter()
+    first_token = None
+    async with client.stream("POST", "/chat/stream", json=PAYLOAD) as response:
+        if response.status_code != 200:
+            await response.aread()
+            stats.errors[str(response.status_code)] += 1
+            return
+        async for line in response.aiter_lines():
+            if line == "event: delta" and first_token is None:
+                first_token = time.perf_counter()
+            elif line == "event: error":
+                stats.errors["stream_error"] += 1
+                return
+    stats.latencies.append(time.perf_counter() - started)
+    if first_token is not None:
+        stats.ttfts.append(first_token - started)
+
+
+async def run_level(
+    client: httpx.AsyncClient, *, concurrency: int, duration: float, stream: bool
+) -> dict:
+    stats = LevelStats()
+    send = _chat_stream if stream else _chat
+    deadline = time.perf_counter() + duration
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            try:
+                await send(client, stats)
+            except httpx.HTTPError as e:
+                stats.errors[type(e).__name__] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    result = {
+        "concurrency": concurrency,
+        "requests": len(stats.latencies) + stats.errors.total(),
+        "rps": round(len(stats.latencies) / elapsed, 2),
+        "latency_ms": percentiles(stats.latencies),
+        "errors": dict(stats.errors),
+    }
+    if stream:
+        result["ttft_ms"] = percentiles(stats.ttfts)
+    return result
+
+
+def _print_level(result: dict) -> None:
+    latency = result["latency_ms"]
+    ttft = result.get("ttft_ms", {})
+    print(
+        f"{result['concurrency']:>11} {result['requests']:>9} {result['rps']:>9.1f}"
+        f" {latency.get('p50', 0):>9.1f} {latency.get('p95', 0):>9.1f}"
+        f" {latency.get('p99', 0):>9.1f} {ttft.get('p50', 0):>10.1f}"
+        f"  {result['errors'] or ''}"
+    )
+
+
+async def run(args: argparse.Namespace) -> dict:
+    servers = []
+    url = args.url
+    if url is None:
+        os.environ["OPENAI_API_KEY"] = "stub-key"
+        os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.stub_port}/v1"
+
+        from src.app.config import get_settings
+
+        get_settings.cache_clear()
+        from src.app.main import app
+
+        servers = [
+            await _serve(stub_app_from_args(args), args.stub_port),
+            await _serve(app, args.app_port),
+        ]
+        url = f"http://127.0.0.1:{args.app_port}"
+
+    results = {}
+    limits = httpx.Limits(max_connections=max(args.concurrency))
+    try:
+        async with httpx.AsyncClient(
+            base_url=url, limits=limits, timeout=args.timeout
+        ) as client:
+            await run_level(client, concurrency=1, duration=0, stream=args.stream)
+            print(
+                f"{'concurrency':>11} {'requests':>9} {'req/s':>9} {'p50 ms':>9}"
+                f" {'p95 ms':>9} {'p99 ms':>9} {'ttft p50':>10}  errors"
+            )
+            for concurrency in args.concurrency:
+                result = await run_level(
+                    client,
+                    concurrency=concurrency,
+                    duration=args.duration,
+                    stream=args.stream,
+                )
+                results[f"concurrency_{concurrency}"] = result
+                _print_level(result)
+    finally:
+        for server, task in servers:
+            server.should_exit = True
+            await task
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--url", help="Load this app instead of an in-process one")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--stream", action="store_true", help="Load /chat/stream")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--stub-port", type=int, default=9000)
+    parser.add_argument("--app-port", type=int, default=8001)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.output:
+        write_results(args.output, "load", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
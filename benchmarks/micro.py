@@ -0,0 +1,111 @@
+"""Micro-benchmarks of the per-request CPU work in the chat pipeline.
+
+Times, in nanoseconds per operation, the steps every /chat request pays for
+before and after the provider call: request validation, history preparation
+under a token budget, prompt assembly and rendering, and response
+serialisation. Each case runs ``--repeat`` rounds of ``timeit`` autoranging
+and reports the fastest round, the one least disturbed by the machine.
+
+    uv run python -m benchmarks.micro --history 20 --output micro.json
+"""
+
+import argparse
+import json
+import timeit
+from collections.abc import Callable
+
+from openai import AsyncOpenAI
+
+from benchmarks.results import write_results
+from src.app.chat.prompts import get_system_prompt, render_system_prompt
+from src.app.chat.schemas import ChatResponse, CreateChatRequest
+from src.app.chat.service import ChatService
+
+PROMPT_ARGS = {
+    "project_name": "Confluence",
+    "project_description": "Internal documentation search",
+    "base_prompt": "You are a helpful assistant.",
+    "max_attempts": 5,
+}
+
+
+def _payload(history: int) -> dict:
+    messages = [
+        {
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": f"Turn {i}: " + "how do I configure the deploy pipeline? " * 8,
+        }
+        for i in range(history)
+    ]
+    messages.append({"role": "user", "content": "What is molasses?"})
+    return {"model": "gpt-4o", "messages": messages}
+
+
+def _service(token_budget: int | None) -> ChatService:
+    return ChatService(
+        openai_client=AsyncOpenAI(api_key="stub-key"),
+        project_name=PROMPT_ARGS["project_name"],
+        project_description=PROMPT_ARGS["project_description"],
+        base_system_prompt=PROMPT_ARGS["base_prompt"],
+        chat_history_limit=100,
+        max_iterations=PROMPT_ARGS["max_attempts"],
+        retrieval_top_k=10,
+        token_budget=token_budget,
+    )
+
+
+def cases(history: int) -> dict[str, Callable[[], object]]:
+    payload = _payload(history)
+    raw = json.dumps(payload).encode()
+    chat_input = CreateChatRequest.model_validate(payload)
+    unbudgeted = _service(token_budget=None)
+    # Tight enough that roughly half of the history is dropped.
+    budgeted = _service(token_budget=60 * history)
+    chat_history = unbudgeted._build_messages(chat_input)[1:-1]
+    response = ChatResponse(message="stub response " * 50)
+    return {
+        "validate_request_dict": lambda: CreateChatRequest.model_validate(payload),
+        "validate_request_json": lambda: CreateChatRequest.model_validate_json(raw),
+        "build_messages": lambda: unbudgeted._build_messages(chat_input),
+        "build_messages_token_budget": lambda: budgeted._build_messages(chat_input),
+        "create_chat_messages": lambda: unbudgeted._create_chat_messages(
+            unbudgeted.system_prompt.text, chat_history, "What is molasses?"
+        ),
+        "get_system_prompt": lambda: get_system_prompt(**PROMPT_ARGS),
+        "render_system_prompt": lambda: render_system_prompt("v1", **PROMPT_ARGS),
+        "serialize_response": lambda: response.model_dump_json(),
+    }
+
+
+def measure(func: Callable[[], object], repeat: int) -> float:
+    """Fastest of ``repeat`` rounds, in nanoseconds per call."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--history", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="+", help="Run only these cases")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'case':<30} {'ns/op':>12}")
+    for name, func in cases(args.history).items():
+        if args.only and name not in args.only:
+            continue
+        ns = measure(func, args.repeat)
+        results[name] = {"ns_per_op": round(ns, 1)}
+        print(f"{name:<30} {ns:>12,.0f}")
+
+    if args.output:
+        write_results(args.output, "micro", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
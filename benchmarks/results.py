@@ -0,0 +1,55 @@
+"""JSON result files shared by the benchmarks, for comparison across commits.
+
+Every file records the benchmark name, its arguments, the environment
+(commit, Python, platform) and a ``results`` mapping. Metrics whose name
+ends in ``rps`` are better when higher; ``ns_per_op``, ``p50``, ``p95`` and
+``p99`` are better when lower. ``benchmarks.compare`` relies on this.
+"""
+
+import json
+import platform
+import subprocess
+import sys
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+HIGHER_IS_BETTER = ("rps",)
+LOWER_IS_BETTER = ("ns_per_op", "p50", "p95", "p99")
+
+
+def _git(*args: str) -> str | None:
+    try:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict[str, Any]:
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+    }
+
+
+def write_results(
+    path: str | Path, benchmark: str, args: dict[str, Any], results: dict[str, Any]
+) -> None:
+    Path(path).write_text(
+        json.dumps(
+            {
+                "benchmark": benchmark,
+                "environment": environment(),
+                "args": args,
+                "results": results,
+            },
+            indent=2,
+        )
+        + "\n"
+    )
+    print(f"Results written to {path}")
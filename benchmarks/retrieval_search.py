@@ -0,0 +1,70 @@
+"""Measure exact top-k search latency of the retrieval index formats.
+
+Compares the in-memory float32 index with the memory-mapped store in each
+storage dtype, reporting on-disk size, open time and search latency.
+
+    uv run python -m benchmarks.retrieval_search --chunks 100000 --dimension 512
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.app.retrieval.index import SearchIndex, VectorIndex
+from src.app.retrieval.schemas import Chunk
+from src.app.retrieval.store import VECTORS_FILE, open_index
+
+
+def measure(index: SearchIndex, queries: np.ndarray, top_k: int) -> tuple[float, float]:
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query, top_k)
+        latencies.append(time.perf_counter() - started)
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    return p50, p99
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--dimension", type=int, default=512)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dtypes", nargs="+", default=["float32", "float16", "int8"])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.chunks, args.dimension), dtype=np.float32)
+    index = VectorIndex(vectors=vectors, chunks=[Chunk(text="")] * args.chunks)
+    queries = rng.standard_normal((args.queries, args.dimension), dtype=np.float32)
+
+    print(f"chunks={args.chunks} dimension={args.dimension} top_k={args.top_k}")
+    print(
+        f"{'format':>14} {'vectors MB':>11} {'open ms':>8} {'p50 ms':>8} {'p99 ms':>8}"
+    )
+    p50, p99 = measure(index, queries, args.top_k)
+    print(
+        f"{'memory/f32':>14} {index.vectors.nbytes / 1e6:>11.1f} {'-':>8}"
+        f" {p50:>8.3f} {p99:>8.3f}"
+    )
+    for dtype in args.dtypes:
+        with tempfile.TemporaryDirectory() as directory:
+            index.save(directory, dtype=dtype)
+            started = time.perf_counter()
+            stored = open_index(directory)
+            open_ms = (time.perf_counter() - started) * 1000
+            size_mb = (Path(directory) / VECTORS_FILE).stat().st_size / 1e6
+            p50, p99 = measure(stored, queries, args.top_k)
+            stored.close()
+        print(
+            f"{'mmap/' + dtype:>14} {size_mb:>11.1f} {open_ms:>8.2f}"
+            f" {p50:>8.3f} {p99:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
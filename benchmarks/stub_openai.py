@@ -0,0 +1,166 @@
+"""Minimal OpenAI-compatible stub server for local benchmarks.
+
+Answers ``/v1/chat/completions`` after ``latency`` seconds (spread by
+``jitter``), as a blocking completion or, for ``"stream": true``, as
+``stream_chunks`` server-sent chunks ``chunk_delay`` seconds apart. A share
+of requests can be failed with 500s (``error_rate``) or rejected with 429s
+carrying ``retry-after-ms`` (``rate_limit_rate``).
+
+Run standalone with:
+    uv run python -m benchmarks.stub_openai --port 9000 --latency 0.5 \\
+        --jitter 0.2 --error-rate 0.01 --rate-limit-rate 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+
+COMPLETION_TEXT = "stub response"
+
+
+def _error(status_code: int, message: str, type_: str, code: str, **headers: str):
+    return JSONResponse(
+        {"error": {"message": message, "type": type_, "param": None, "code": code}},
+        status_code=status_code,
+        headers=headers,
+    )
+
+
+def create_stub_app(
+    *,
+    latency: float,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    rate_limit_rate: float = 0.0,
+    retry_after: float = 1.0,
+    stream_chunks: int = 8,
+    chunk_delay: float = 0.0,
+    seed: int | None = None,
+) -> FastAPI:
+    stub = FastAPI()
+    rng = random.Random(seed)
+
+    def delay() -> float:
+        return latency * rng.uniform(1 - jitter, 1 + jitter)
+
+    async def stream_completion(body: dict, completion_id: str, created: int):
+        def chunk(delta: dict, finish_reason: str | None = None) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": body.get("model", "stub-model"),
+                "choices": [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        yield chunk({"role": "assistant", "content": ""})
+        for index in range(stream_chunks):
+            if chunk_delay:
+                await asyncio.sleep(chunk_delay)
+            yield chunk({"content": f"token{index} "})
+        yield chunk({}, finish_reason="stop")
+        if (body.get("stream_options") or {}).get("include_usage"):
+            usage = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": body.get("model", "stub-model"),
+                "choices": [],
+                "usage": {
+                    "prompt_tokens": 1,
+                    "completion_tokens": stream_chunks,
+                    "total_tokens": 1 + stream_chunks,
+                },
+            }
+            yield f"data: {json.dumps(usage)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    @stub.post("/v1/chat/completions")
+    async def chat_completions(body: dict):
+        if rate_limit_rate and rng.random() < rate_limit_rate:
+            return _error(
+                429,
+                "Rate limit reached for requests",
+                "requests",
+                "rate_limit_exceeded",
+                **{"retry-after-ms": str(int(retry_after * 1000))},
+            )
+        await asyncio.sleep(delay())
+        if error_rate and rng.random() < error_rate:
+            return _error(
+                500, "The server had an error", "server_error", "server_error"
+            )
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        if body.get("stream"):
+            return StreamingResponse(
+                stream_completion(body, completion_id, created),
+                media_type="text/event-stream",
+            )
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": body.get("model", "stub-model"),
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": COMPLETION_TEXT},
+                }
+            ],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 2, "total_tokens": 3},
+        }
+
+    return stub
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser) -> None:
+    """Options of ``create_stub_app``, shared with the load generator."""
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--stream-chunks", type=int, default=8)
+    parser.add_argument("--chunk-delay", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def stub_app_from_args(args: argparse.Namespace) -> FastAPI:
+    return create_stub_app(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        stream_chunks=args.stream_chunks,
+        chunk_delay=args.chunk_delay,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(stub_app_from_args(args), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Per-request overhead of tracing in the chat service.
+
+Runs ``ChatService.generate_response`` against an in-process provider that
+answers instantly, so the measured time is the service's own work, under
+three tracer configurations:
+
+- ``off``: no SDK tracer provider (the default, TRACING_ENABLED=false)
+- ``sampled-out``: SDK provider with TRACING_SAMPLE_RATIO=0
+- ``sampled``: SDK provider recording every span, exported in batches to a
+  discarding exporter
+
+    uv run python -m benchmarks.tracing --requests 20000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from openai.types import CompletionUsage
+from openai.types.chat import ChatCompletion, ChatCompletionMessage
+from openai.types.chat.chat_completion import Choice
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    SpanExporter,
+    SpanExportResult,
+)
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+from src.app.chat.schemas import ChatMessage, CreateChatRequest
+from src.app.chat.service import ChatService
+from src.app.observability import tracing
+
+COMPLETION = ChatCompletion(
+    id="bench",
+    choices=[
+        Choice(
+            finish_reason="stop",
+            index=0,
+            message=ChatCompletionMessage(content="An answer.", role="assistant"),
+        )
+    ],
+    created=0,
+    model="bench-model",
+    object="chat.completion",
+    usage=CompletionUsage(prompt_tokens=400, completion_tokens=3, total_tokens=403),
+)
+
+REQUEST = CreateChatRequest(
+    model="bench-model",
+    messages=[
+        ChatMessage(role="user", content="What is molasses?"),
+        ChatMessage(role="assistant", content="A thick syrup."),
+        ChatMessage(role="user", content="How is it made?"),
+    ],
+)
+
+
+class _Completions:
+    async def create(self, **kwargs):
+        return COMPLETION
+
+
+class _Client:
+    def __init__(self):
+        self.chat = type("Chat", (), {"completions": _Completions()})()
+
+
+class DiscardingExporter(SpanExporter):
+    def export(self, spans):
+        return SpanExportResult.SUCCESS
+
+
+def make_tracer(mode: str) -> tuple[trace.Tracer, TracerProvider | None]:
+    if mode == "off":
+        return trace.NoOpTracer(), None
+    ratio = 0.0 if mode == "sampled-out" else 1.0
+    provider = TracerProvider(sampler=ParentBased(TraceIdRatioBased(ratio)))
+    provider.add_span_processor(BatchSpanProcessor(DiscardingExporter()))
+    return provider.get_tracer("benchmark"), provider
+
+
+async def measure(service: ChatService, requests: int) -> float:
+    """Mean microseconds per request."""
+    for _ in range(200):
+        await service.generate_response(REQUEST, use_cache=False)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await service.generate_response(REQUEST, use_cache=False)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    service = ChatService(
+        openai_client=_Client(),
+        project_name="Bench",
+        project_description="Bench",
+        base_system_prompt="You are a benchmark assistant",
+        chat_history_limit=20,
+        max_iterations=5,
+        retrieval_top_k=10,
+    )
+    results: dict[str, list[float]] = {}
+    for _ in range(args.rounds):
+        for mode in ("off", "sampled-out", "sampled"):
+            tracing.tracer, provider = make_tracer(mode)
+            results.setdefault(mode, []).append(await measure(service, args.requests))
+            if provider is not None:
+                provider.shutdown()
+
+    baseline = statistics.median(results["off"])
+    for mode, samples in results.items():
+        median = statistics.median(samples)
+        print(
+            f"{mode:<12} {median:7.1f} us/request  "
+            f"overhead {median - baseline:+6.1f} us ({median / baseline - 1:+.1%})"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
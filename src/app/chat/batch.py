@@ -0,0 +1,58 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Sequence
+
+from src.app.chat.exceptions import ChatServiceError
+from src.app.chat.schemas import BatchItemError, BatchItemResult, CreateChatRequest
+from src.app.chat.service import ChatService
+
+logger = logging.getLogger(__name__)
+
+
+async def _run_one(
+    service: ChatService, index: int, request: CreateChatRequest, use_cache: bool
+) -> BatchItemResult:
+    try:
+        response = await service.generate_response(request, use_cache=use_cache)
+    except ChatServiceError as e:
+        error = BatchItemError(status_code=e.status_code, detail=e.message)
+    except ValueError as e:
+        # Configuration errors, mirroring the 503 of POST /chat
+        error = BatchItemError(status_code=503, detail=str(e))
+    except Exception:
+        logger.exception("Batch item %d failed", index)
+        error = BatchItemError(status_code=500, detail="Internal server error")
+    else:
+        return BatchItemResult(index=index, response=response)
+    return BatchItemResult(index=index, error=error)
+
+
+async def run_batch(
+    service: ChatService,
+    requests: Sequence[CreateChatRequest],
+    *,
+    concurrency: int,
+    use_cache: bool = True,
+) -> AsyncIterator[BatchItemResult]:
+    """Run ``requests`` with at most ``concurrency`` in flight.
+
+    Results are yielded as they complete, each tagged with the index of its
+    request. A failing request yields an error result instead of failing the
+    batch. Closing the iterator early cancels the outstanding requests.
+    """
+    results: asyncio.Queue[BatchItemResult] = asyncio.Queue()
+    pending = iter(enumerate(requests))
+
+    async def worker() -> None:
+        for index, request in pending:
+            results.put_nowait(await _run_one(service, index, request, use_cache))
+
+    workers = [
+        asyncio.create_task(worker()) for _ in range(min(concurrency, len(requests)))
+    ]
+    try:
+        for _ in range(len(requests)):
+            yield await results.get()
+    finally:
+        for task in workers:
+            task.cancel()
@@ -0,0 +1,208 @@
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Any, Literal, Protocol
+
+from src.app.chat.schemas import ChatResponse
+from src.app.config import Settings
+from src.app.observability.metrics import observe_response_cache
+
+logger = logging.getLogger(__name__)
+
+
+def request_cache_key(
+    model: str, messages: Sequence[Any], tools: Sequence[str] = ()
+) -> str:
+    """Canonical hash of everything that determines a completion.
+
+    ``messages`` is the final provider message list, so it already contains
+    the system prompt, the truncated history and the last user message.
+    """
+    payload = json.dumps(
+        {"model": model, "messages": messages, "tools": list(tools)},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+
+class LRUCache:
+    """In-process LRU cache with a TTL and a bound on total stored bytes.
+
+    ``observe``, if given, is called with ``"evictions"`` or
+    ``"expirations"`` for every entry dropped, e.g. to export them.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int,
+        ttl_seconds: float,
+        observe: Callable[[Literal["evictions", "expirations"]], None] | None = None,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.observe = observe
+        self.size_bytes = 0
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            if self.observe is not None:
+                self.observe("expirations")
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        entry_size = len(key) + len(value)
+        if entry_size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self.size_bytes += entry_size
+        while self.size_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats.evictions += 1
+            if self.observe is not None:
+                self.observe("evictions")
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size_bytes = 0
+
+    def _remove(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self.size_bytes -= len(key) + len(value)
+
+
+class SharedCacheBackend(Protocol):
+    """A cache shared between workers, e.g. Redis."""
+
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None: ...
+
+
+class RedisCacheBackend:
+    """Shared cache backend for any Redis-protocol server.
+
+    Requires the optional ``redis`` package.
+    """
+
+    def __init__(self, url: str, *, prefix: str = "chat-response:"):
+        try:
+            from redis.asyncio import Redis
+        except ImportError as e:
+            raise ValueError(
+                "RESPONSE_CACHE_REDIS_URL requires the 'redis' package"
+            ) from e
+        self.client = Redis.from_url(url)
+        self.prefix = prefix
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        await self.client.set(self.prefix + key, value, px=int(ttl_seconds * 1000))
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class ResponseCache:
+    """Exact-match cache of chat responses.
+
+    Lookups hit the in-process LRU first and fall back to the optional
+    shared backend; shared-backend failures are logged and treated as misses
+    so the cache never fails a request.
+    """
+
+    def __init__(self, *, local: LRUCache, shared: SharedCacheBackend | None = None):
+        self.local = local
+        self.shared = shared
+        self.stats = CacheStats()
+
+    async def get(self, key: str) -> ChatResponse | None:
+        value = self.local.get(key)
+        if value is None and self.shared is not None:
+            try:
+                value = await self.shared.get(key)
+            except Exception:
+                logger.warning("Shared response cache lookup failed", exc_info=True)
+            if value is not None:
+                self.local.set(key, value)
+        if value is None:
+            self.stats.misses += 1
+            observe_response_cache("misses")
+            return None
+        self.stats.hits += 1
+        observe_response_cache("hits")
+        return ChatResponse.model_validate_json(value)
+
+    async def set(self, key: str, response: ChatResponse) -> None:
+        value = response.model_dump_json().encode("utf-8")
+        self.local.set(key, value)
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, value, self.local.ttl_seconds)
+            except Exception:
+                logger.warning("Shared response cache write failed", exc_info=True)
+
+    async def close(self) -> None:
+        if isinstance(self.shared, RedisCacheBackend):
+            await self.shared.close()
+
+
+def create_response_cache(settings: Settings) -> ResponseCache | None:
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return None
+    shared = (
+        RedisCacheBackend(settings.RESPONSE_CACHE_REDIS_URL)
+        if settings.RESPONSE_CACHE_REDIS_URL
+        else None
+    )
+    return ResponseCache(
+        local=LRUCache(
+            max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+            ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+            observe=observe_response_cache,
+        ),
+        shared=shared,
+    )
+
+
+def bypasses_cache(cache_control: str | None) -> bool:
+    """True when the request's Cache-Control header asks to skip the cache."""
+    if not cache_control:
+        return False
+    directives = {d.strip().lower() for d in cache_control.split(",")}
+    return bool(directives & {"no-cache", "no-store"})
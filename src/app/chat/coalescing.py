@@ -0,0 +1,50 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+
+@dataclass
+class SingleFlightStats:
+    # Calls that started a new in-flight operation.
+    leaders: int = 0
+    # Calls that waited on an operation another caller had started.
+    coalesced: int = 0
+
+
+class SingleFlight[T]:
+    """Coalesces concurrent calls that share a key into one operation.
+
+    The first caller for a key starts the operation as a task; callers that
+    arrive while it runs await the same task and receive its result or its
+    exception. The task is shielded, so a cancelled caller (for example a
+    client that disconnected) does not cancel the operation for the others.
+    """
+
+    def __init__(self) -> None:
+        self.stats = SingleFlightStats()
+        self._calls: dict[str, asyncio.Task[T]] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def __contains__(self, key: str) -> bool:
+        """Whether a call for ``key`` is in flight."""
+        return key in self._calls
+
+    async def do(self, key: str, operation: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            self.stats.leaders += 1
+            task = asyncio.ensure_future(operation())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.stats.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task[T]) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved in case every caller was cancelled.
+        if not task.cancelled():
+            task.exception()
@@ -1,15 +1,32 @@
-from fastapi import Depends
-from openai import OpenAI
+from fastapi import Request
+from openai import AsyncOpenAI
 
+from src.app.chat.cache import ResponseCache
+from src.app.chat.coalescing import SingleFlight
+from src.app.chat.semantic_cache import SemanticCache
 from src.app.chat.service import ChatService
-from src.app.llm_providers.client import get_chat_openai_client
-from src.app.config import Settings, get_settings
+from src.app.chat.summary import ConversationSummarizer
+from src.app.chat.tokens import TokenCounter
+from src.app.config import Settings
+from src.app.llm_providers.hedging import create_hedger
+from src.app.llm_providers.rate_limit import ProviderScheduler
+from src.app.llm_providers.router import ProviderRouter
+from src.app.observability.tracing import start_span
+from src.app.retrieval.retriever import Retriever
 
 
-def get_chat_service(
-    settings: Settings = Depends(get_settings),
-    openai_client: OpenAI = Depends(get_chat_openai_client),
+def create_chat_service(
+    settings: Settings,
+    *,
+    openai_client: AsyncOpenAI,
+    retriever: Retriever | None = None,
+    response_cache: ResponseCache | None = None,
+    semantic_cache: SemanticCache | None = None,
+    summarizer: ConversationSummarizer | None = None,
+    scheduler: ProviderScheduler | None = None,
+    router: ProviderRouter | None = None,
 ) -> ChatService:
+    """Build the chat service shared by every request."""
     return ChatService(
         openai_client=openai_client,
         project_name=settings.PROJECT_NAME,
@@ -18,4 +35,28 @@ def get_chat_service(
         chat_history_limit=settings.CHAT_HISTORY_LIMIT,
         max_iterations=settings.MAX_CHAT_ITERATIONS,
         retrieval_top_k=settings.RETRIEVAL_TOP_K,
+        retriever=retriever,
+        response_cache=response_cache,
+        semantic_cache=semantic_cache,
+        singleflight=SingleFlight() if settings.REQUEST_COALESCING_ENABLED else None,
+        scheduler=scheduler,
+        router=router,
+        hedger=create_hedger(settings),
+        summarizer=summarizer,
+        summary_model=settings.SUMMARY_MODEL,
+        summary_max_tokens=settings.SUMMARY_MAX_TOKENS,
+        token_budget=settings.CHAT_TOKEN_BUDGET or None,
+        model_token_budgets=settings.CHAT_MODEL_TOKEN_BUDGETS,
+        token_counter=TokenCounter(),
+        system_prompt_version=settings.SYSTEM_PROMPT_VERSION,
+        send_prompt_cache_key=settings.OPENAI_PROMPT_CACHE_KEY,
     )
+
+
+async def get_chat_service(request: Request) -> ChatService:
+    """Return the service created in the app lifespan."""
+    with start_span("get_chat_service"):
+        service: ChatService | None = getattr(request.app.state, "chat_service", None)
+    if service is None:
+        raise ValueError("OPENAI_API_KEY is not set")
+    return service
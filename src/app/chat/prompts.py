@@ -1,3 +1,67 @@
+import hashlib
+from collections.abc import Callable
+from dataclasses import dataclass
+
+PromptTemplate = Callable[..., str]
+
+PROMPT_TEMPLATES: dict[str, PromptTemplate] = {}
+
+
+def register_prompt_template(
+    version: str,
+) -> Callable[[PromptTemplate], PromptTemplate]:
+    """Register a system prompt template under ``version``.
+
+    Templates take the keyword arguments of ``get_system_prompt``. Released
+    versions must not be edited: a changed prompt invalidates the provider's
+    prompt-prefix cache, so register a new version instead.
+    """
+
+    def decorator(template: PromptTemplate) -> PromptTemplate:
+        if version in PROMPT_TEMPLATES:
+            raise ValueError(f"Prompt template {version!r} is already registered")
+        PROMPT_TEMPLATES[version] = template
+        return template
+
+    return decorator
+
+
+@dataclass(frozen=True)
+class SystemPrompt:
+    """A rendered system prompt, shared by every request."""
+
+    version: str
+    text: str
+    # Stable identifier of the prompt prefix, used as the provider's
+    # ``prompt_cache_key`` so requests sharing it are routed to the same cache.
+    cache_key: str
+
+
+def render_system_prompt(
+    version: str,
+    *,
+    project_name: str,
+    project_description: str,
+    base_prompt: str,
+    max_attempts: int,
+) -> SystemPrompt:
+    template = PROMPT_TEMPLATES.get(version)
+    if template is None:
+        raise ValueError(
+            f"Unknown system prompt version {version!r}; "
+            f"available: {', '.join(sorted(PROMPT_TEMPLATES))}"
+        )
+    text = template(
+        project_name=project_name,
+        project_description=project_description,
+        base_prompt=base_prompt,
+        max_attempts=max_attempts,
+    )
+    digest = hashlib.sha256(f"{version}\0{text}".encode()).hexdigest()
+    return SystemPrompt(version=version, text=text, cache_key=f"system-{digest[:32]}")
+
+
+@register_prompt_template("v1")
 def get_system_prompt(
     *,
     project_name: str,
@@ -1,9 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
+import time
+from typing import Annotated
 
-from src.app.chat.schemas import CreateChatRequest
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+
+from src.app.chat.batch import run_batch
+from src.app.chat.cache import bypasses_cache
 from src.app.chat.dependencies import get_chat_service
-from src.app.chat.service import ChatService
 from src.app.chat.exceptions import ChatServiceError
+from src.app.chat.schemas import (
+    BatchChatRequest,
+    BatchChatResponse,
+    ChatResponse,
+    CreateChatRequest,
+)
+from src.app.chat.service import ChatService
+from src.app.chat.streaming import (
+    NDJSON_MEDIA_TYPE,
+    SSE_HEADERS,
+    SSE_MEDIA_TYPE,
+    stream_chat_events,
+    stream_ndjson,
+)
+from src.app.config import Settings, get_settings
+from src.app.observability.metrics import observe_stage, request_started
+from src.app.observability.tracing import start_span
 
 router = APIRouter(
     prefix="/chat",
@@ -13,14 +34,86 @@ router = APIRouter(
 )
 
 
-@router.post("")
+@router.post("", response_model=ChatResponse)
 async def chat(
-    chat_input: CreateChatRequest, service: ChatService = Depends(get_chat_service)
+    request: Request,
+    chat_input: CreateChatRequest,
+    service: Annotated[ChatService, Depends(get_chat_service)],
+    cache_control: Annotated[str | None, Header()] = None,
 ):
+    """Send ``Cache-Control: no-cache`` to skip the response cache."""
+    observe_stage("validation", request_started(request.scope))
+    with start_span("router.chat"):
+        try:
+            response = await service.generate_response(
+                chat_input, use_cache=not bypasses_cache(cache_control)
+            )
+        except ChatServiceError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.message) from e
+        except ValueError as e:
+            # Catches configuration errors like missing API key
+            raise HTTPException(status_code=503, detail=str(e)) from e
+
+        # Serialise directly rather than through FastAPI's response validation.
+        started = time.perf_counter()
+        body = response.model_dump_json()
+        observe_stage("serialization", started)
+    return Response(content=body, media_type="application/json")
+
+
+@router.post("/stream")
+async def chat_stream(
+    chat_input: CreateChatRequest,
+    service: Annotated[ChatService, Depends(get_chat_service)],
+):
+    """Stream the answer as server-sent events.
+
+    Errors raised before the first token keep the status codes of ``POST /chat``;
+    errors after that are sent as a final ``error`` event.
+    """
+    deltas = service.stream_response(chat_input)
     try:
-        return service.generate_response(chat_input)
+        first_delta = await anext(deltas, None)
     except ChatServiceError as e:
-        raise HTTPException(status_code=e.status_code, detail=e.message)
+        raise HTTPException(status_code=e.status_code, detail=e.message) from e
     except ValueError as e:
         # Catches configuration errors like missing API key
-        raise HTTPException(status_code=503, detail=str(e))
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    return StreamingResponse(
+        stream_chat_events(first_delta, deltas),
+        media_type=SSE_MEDIA_TYPE,
+        headers=SSE_HEADERS,
+    )
+
+
+@router.post("/batch", response_model=BatchChatResponse)
+async def chat_batch(
+    batch: BatchChatRequest,
+    service: Annotated[ChatService, Depends(get_chat_service)],
+    settings: Annotated[Settings, Depends(get_settings)],
+    accept: Annotated[str | None, Header()] = None,
+    cache_control: Annotated[str | None, Header()] = None,
+):
+    """Answer several chat requests, at most BATCH_CONCURRENCY at a time.
+
+    Every request gets a result with its ``index`` and either a ``response``
+    or an ``error`` carrying the status code ``POST /chat`` would have
+    returned. Results come back in request order, or with
+    ``Accept: application/x-ndjson`` are streamed one per line as they
+    complete.
+    """
+    results = run_batch(
+        service,
+        batch.requests,
+        concurrency=settings.BATCH_CONCURRENCY,
+        use_cache=not bypasses_cache(cache_control),
+    )
+    if accept is not None and NDJSON_MEDIA_TYPE in accept:
+        return StreamingResponse(
+            stream_ndjson(results),
+            media_type=NDJSON_MEDIA_TYPE,
+            headers=SSE_HEADERS,
+        )
+    ordered = sorted([result async for result in results], key=lambda r: r.index)
+    return BatchChatResponse(results=ordered)
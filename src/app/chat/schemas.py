@@ -1,4 +1,5 @@
 from typing import Annotated, Literal
+
 from pydantic import BaseModel, Field
 
 from src.app.config import get_settings
@@ -18,3 +19,27 @@ class CreateChatRequest(BaseModel):
 
 class ChatResponse(BaseModel):
     message: str | None
+
+
+class BatchChatRequest(BaseModel):
+    requests: Annotated[
+        list[CreateChatRequest],
+        Field(min_length=1, max_length=_settings.BATCH_MAX_REQUESTS),
+    ]
+
+
+class BatchItemError(BaseModel):
+    status_code: int
+    detail: str
+
+
+class BatchItemResult(BaseModel):
+    """Outcome of one request of a batch; exactly one of response and error is set."""
+
+    index: int
+    response: ChatResponse | None = None
+    error: BatchItemError | None = None
+
+
+class BatchChatResponse(BaseModel):
+    results: list[BatchItemResult]
@@ -0,0 +1,135 @@
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from openai import AsyncOpenAI
+
+from src.app.chat.schemas import ChatResponse
+from src.app.config import Settings
+from src.app.observability.metrics import observe_semantic_cache_lookup
+from src.app.retrieval.dependencies import create_embedder
+from src.app.retrieval.embeddings import Embedder
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SemanticCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    # Provider time the hits avoided, measured when the answers were generated.
+    latency_saved_seconds: float = 0.0
+    # Time spent embedding questions for lookups, hit or miss.
+    lookup_seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def _namespace_id(namespace: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(namespace.encode("utf-8"), digest_size=7).digest(), "little"
+    )
+
+
+class SemanticCache:
+    """Answers near-duplicate questions from previously generated responses.
+
+    Questions are embedded and stored in a fixed-size matrix, so memory is
+    bounded by ``max_entries`` regardless of traffic. Entries belong to a
+    namespace (the model plus everything before the question) and only match
+    within it. Expired slots are reused first; when every slot is live the
+    least recently used entry is evicted.
+    """
+
+    def __init__(
+        self,
+        *,
+        embedder: Embedder,
+        threshold: float,
+        ttl_seconds: float,
+        max_entries: int,
+    ):
+        self.embedder = embedder
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.stats = SemanticCacheStats()
+        self._vectors = np.zeros((max_entries, embedder.dimension), dtype=np.float32)
+        self._namespaces = np.zeros(max_entries, dtype=np.int64)
+        self._expires_at = np.zeros(max_entries, dtype=np.float64)
+        self._last_used = np.zeros(max_entries, dtype=np.float64)
+        self._latency = np.zeros(max_entries, dtype=np.float64)
+        self._responses: list[ChatResponse | None] = [None] * max_entries
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._expires_at > time.monotonic()))
+
+    async def embed(self, question: str) -> np.ndarray | None:
+        """Embed a question, or return None if the embedder fails."""
+        started = time.perf_counter()
+        try:
+            vectors = await self.embedder.embed([question])
+        except Exception:
+            logger.warning("Semantic cache embedding failed", exc_info=True)
+            return None
+        finally:
+            self.stats.lookup_seconds += time.perf_counter() - started
+        return vectors[0]
+
+    def get(self, namespace: str, vector: np.ndarray) -> ChatResponse | None:
+        now = time.monotonic()
+        live = (self._namespaces == _namespace_id(namespace)) & (self._expires_at > now)
+        if live.any():
+            scores = np.where(live, self._vectors @ vector, -np.inf)
+            slot = int(np.argmax(scores))
+            if scores[slot] >= self.threshold:
+                self._last_used[slot] = now
+                latency_saved = float(self._latency[slot])
+                self.stats.hits += 1
+                self.stats.latency_saved_seconds += latency_saved
+                observe_semantic_cache_lookup(True, latency_saved)
+                return self._responses[slot]
+        self.stats.misses += 1
+        observe_semantic_cache_lookup(False)
+        return None
+
+    def set(
+        self,
+        namespace: str,
+        vector: np.ndarray,
+        response: ChatResponse,
+        latency_seconds: float,
+    ) -> None:
+        now = time.monotonic()
+        slot = int(np.argmin(self._expires_at))
+        if self._expires_at[slot] > now:
+            slot = int(np.argmin(self._last_used))
+            self.stats.evictions += 1
+        elif self._responses[slot] is not None:
+            self.stats.expirations += 1
+        self._vectors[slot] = vector
+        self._namespaces[slot] = _namespace_id(namespace)
+        self._expires_at[slot] = now + self.ttl_seconds
+        self._last_used[slot] = now
+        self._latency[slot] = latency_seconds
+        self._responses[slot] = response
+
+
+def create_semantic_cache(
+    settings: Settings, openai_client: AsyncOpenAI | None
+) -> SemanticCache | None:
+    if not settings.SEMANTIC_CACHE_ENABLED:
+        return None
+    return SemanticCache(
+        embedder=create_embedder(settings, openai_client),
+        threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+        ttl_seconds=settings.SEMANTIC_CACHE_TTL_SECONDS,
+        max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+    )
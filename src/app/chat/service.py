@@ -1,39 +1,106 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator, Awaitable, Iterator, Mapping
+from contextlib import aclosing, contextmanager
+from functools import partial
+from typing import Any
+
 from openai import (
-    AuthenticationError,
-    RateLimitError,
     APIConnectionError,
+    AsyncOpenAI,
+    AuthenticationError,
     NotFoundError,
-    OpenAI,
+    RateLimitError,
 )
+from openai.types import CompletionUsage
 from openai.types.chat import (
-    ChatCompletionMessageParam,
-    ChatCompletionUserMessageParam,
     ChatCompletionAssistantMessageParam,
+    ChatCompletionMessage,
+    ChatCompletionMessageParam,
+    ChatCompletionMessageToolCallParam,
     ChatCompletionSystemMessageParam,
+    ChatCompletionToolMessageParam,
+    ChatCompletionUserMessageParam,
 )
+from opentelemetry import trace
+from opentelemetry.trace import SpanKind
 
+from src.app.chat.cache import ResponseCache, request_cache_key
+from src.app.chat.coalescing import SingleFlight
 from src.app.chat.exceptions import (
     AuthenticationFailedError,
-    RateLimitExceededError,
-    OpenAIConnectionError,
+    ChatServiceError,
     EmptyResponseError,
     ModelNotFoundError,
+    OpenAIConnectionError,
+    RateLimitExceededError,
+)
+from src.app.chat.prompts import render_system_prompt
+from src.app.chat.schemas import ChatMessage, ChatResponse, CreateChatRequest
+from src.app.chat.semantic_cache import SemanticCache
+from src.app.chat.summary import (
+    SUMMARY_INSTRUCTIONS,
+    SUMMARY_PREFIX,
+    ConversationRef,
+    ConversationSummarizer,
+    conversation_key,
+    render_fold_prompt,
+)
+from src.app.chat.tokens import TokenCounter, fit_history, get_token_budget
+from src.app.chat.tools import (
+    RETRIEVE_DOCUMENTS_TOOL,
+    RETRIEVE_DOCUMENTS_TOOL_NAME,
+    format_retrieved_chunks,
+    parse_retrieve_documents_arguments,
+)
+from src.app.llm_providers.hedging import Hedger
+from src.app.llm_providers.rate_limit import (
+    ProviderScheduler,
+    RateLimitDeadlineExceeded,
+)
+from src.app.llm_providers.router import NoHealthyBackendError, ProviderRouter
+from src.app.observability.metrics import (
+    model_metrics,
+    observe_stage,
+    observe_usage,
+    record_error,
+)
+from src.app.observability.tracing import (
+    GEN_AI_INPUT_TOKENS,
+    GEN_AI_OUTPUT_TOKENS,
+    GEN_AI_REQUEST_MODEL,
+    GEN_AI_SYSTEM,
+    start_span,
 )
-from src.app.chat.schemas import ChatResponse, CreateChatRequest
-from src.app.chat.prompts import get_system_prompt
+from src.app.retrieval.retriever import Retriever
 
 
 class ChatService:
     def __init__(
         self,
         *,
-        openai_client: OpenAI,
+        openai_client: AsyncOpenAI,
         project_name: str,
         project_description: str,
         base_system_prompt: str,
         chat_history_limit: int,
         max_iterations: int,
         retrieval_top_k: int,
+        retriever: Retriever | None = None,
+        response_cache: ResponseCache | None = None,
+        semantic_cache: SemanticCache | None = None,
+        singleflight: SingleFlight[ChatResponse] | None = None,
+        scheduler: ProviderScheduler | None = None,
+        router: ProviderRouter | None = None,
+        hedger: Hedger | None = None,
+        summarizer: ConversationSummarizer | None = None,
+        summary_model: str | None = None,
+        summary_max_tokens: int = 256,
+        token_budget: int | None = None,
+        model_token_budgets: Mapping[str, int] | None = None,
+        token_counter: TokenCounter | None = None,
+        system_prompt_version: str = "v1",
+        send_prompt_cache_key: bool = False,
     ):
         self.chat_client = openai_client
         self.project_name = project_name
@@ -42,6 +109,30 @@ class ChatService:
         self.chat_history_limit = chat_history_limit
         self.max_iterations = max_iterations
         self.retrieval_top_k = retrieval_top_k
+        self.retriever = retriever
+        self.response_cache = response_cache
+        self.semantic_cache = semantic_cache
+        self.singleflight = singleflight
+        self.scheduler = scheduler
+        self.router = router
+        self.hedger = hedger
+        self.summarizer = summarizer
+        self.summary_model = summary_model
+        self.summary_max_tokens = summary_max_tokens
+        self.token_budget = token_budget
+        self.model_token_budgets = model_token_budgets or {}
+        self.token_counter = token_counter or TokenCounter()
+        self.send_prompt_cache_key = send_prompt_cache_key
+        # Every input of the system prompt is fixed for the service's lifetime,
+        # so it is rendered once; its token count per model is memoised by the
+        # bounded token counter, as the model name comes from the client.
+        self.system_prompt = render_system_prompt(
+            system_prompt_version,
+            project_name=project_name,
+            project_description=project_description,
+            base_prompt=base_system_prompt,
+            max_attempts=max_iterations,
+        )
 
     def _create_chat_messages(
         self,
@@ -56,14 +147,44 @@ class ChatService:
             ChatCompletionUserMessageParam(role="user", content=user_message),
         ]
 
-    def generate_response(self, chat_input: CreateChatRequest) -> ChatResponse:
-        """Generate response based on chat input"""
-        system_prompt: str = get_system_prompt(
-            project_name=self.project_name,
-            project_description=self.project_description,
-            base_prompt=self.base_system_prompt,
-            max_attempts=self.max_iterations,
-        )
+    def _build_messages(
+        self,
+        chat_input: CreateChatRequest,
+        conversation: ConversationRef | None = None,
+        *,
+        summarize: bool = True,
+    ) -> list[ChatCompletionMessageParam]:
+        """Build the provider message list from the system prompt and history.
+
+        History is limited to ``chat_history_limit`` messages and, when a token
+        budget is configured, the oldest turns are dropped until the prompt
+        fits the model's budget. The system prompt and the final user message
+        are always kept. With a summarizer, the turns dropped are replaced by
+        their rolling summary, which reserves ``summary_max_tokens`` of the
+        budget; ``conversation`` identifies a server-side history.
+        """
+        started = time.perf_counter()
+        user_message = chat_input.messages[-1].content
+        history = (chat_input.messages or [])[-self.chat_history_limit : -1]
+
+        if self.token_budget is not None:
+            model = chat_input.model
+
+            def count(content: str) -> int:
+                return self.token_counter.count(model, content)
+
+            available = (
+                get_token_budget(model, self.token_budget, self.model_token_budgets)
+                - count(self.system_prompt.text)
+                - count(user_message)
+                - (self.summary_max_tokens if self.summarizer is not None else 0)
+            )
+            kept = fit_history([msg.content for msg in history], available, count)
+            if kept < len(history):
+                history = history[len(history) - kept :]
+                # Drop whole turns: an answer without its question is noise.
+                if history and history[0].role == "assistant":
+                    history = history[1:]
 
         # Prepare chat history
         chat_history: list[ChatCompletionMessageParam] = [
@@ -74,33 +195,460 @@ class ChatService:
                     role="assistant", content=msg.content
                 )
             )
-            for msg in (chat_input.messages or [])[-self.chat_history_limit : -1]
+            for msg in history
         ]
+        dropped = len(chat_input.messages) - 1 - len(history)
+        if self.summarizer is not None and summarize and dropped > 0:
+            summary = self.summarizer.summary_for(
+                conversation.key
+                if conversation is not None
+                else conversation_key(chat_input.model, chat_input.messages),
+                chat_input.messages[:dropped],
+                offset=conversation.offset if conversation is not None else 0,
+                fold=partial(self._fold_summary, chat_input.model),
+            )
+            if summary is not None:
+                chat_history.insert(
+                    0,
+                    ChatCompletionSystemMessageParam(
+                        role="system", content=SUMMARY_PREFIX + summary
+                    ),
+                )
+        history_built = observe_stage("history", started)
 
         messages = self._create_chat_messages(
-            system_prompt, chat_history, chat_input.messages[-1].content
+            self.system_prompt.text, chat_history, user_message
         )
+        observe_stage("prompt", history_built)
+        return messages
 
-        try:
-            response = self.chat_client.chat.completions.create(
-                model=chat_input.model,
-                messages=messages,
+    async def _fold_summary(
+        self, model: str, previous: str | None, messages: list[ChatMessage]
+    ) -> str:
+        """Ask the provider to fold ``messages`` into the previous summary."""
+        with start_span("ChatService.summarize"), _provider_errors():
+            response = await self._create(
+                self.summary_model or model,
+                [
+                    ChatCompletionSystemMessageParam(
+                        role="system", content=SUMMARY_INSTRUCTIONS
+                    ),
+                    ChatCompletionUserMessageParam(
+                        role="user", content=render_fold_prompt(previous, messages)
+                    ),
+                ],
+                max_completion_tokens=self.summary_max_tokens,
             )
-        except AuthenticationError as e:
-            raise AuthenticationFailedError(
-                message=f"OpenAI authentication failed: {e.message}"
+        if not response.choices or not response.choices[0].message.content:
+            raise EmptyResponseError(message="OpenAI returned an empty summary")
+        return response.choices[0].message.content
+
+    def batch_request_body(self, chat_input: CreateChatRequest) -> dict[str, Any]:
+        """Chat completion body for answering ``chat_input`` in a provider batch.
+
+        Batch requests are single-shot, so neither the retrieval tool nor a
+        history summary is used.
+        """
+        body: dict[str, Any] = {
+            "model": chat_input.model,
+            "messages": self._build_messages(chat_input, summarize=False),
+        }
+        if self.send_prompt_cache_key:
+            body["prompt_cache_key"] = self.system_prompt.cache_key
+        return body
+
+    def _completion_kwargs(self, *, final: bool) -> dict[str, Any]:
+        """Completion kwargs shared by the blocking and streaming paths.
+
+        When a retriever is configured the retrieval tool is registered. On
+        the final attempt the tool stays declared (earlier messages refer to
+        it) but the model is required to answer without calling it.
+        """
+        kwargs: dict[str, Any] = {}
+        if self.send_prompt_cache_key:
+            kwargs["prompt_cache_key"] = self.system_prompt.cache_key
+        if self.retriever is None:
+            return kwargs
+        kwargs["tools"] = [RETRIEVE_DOCUMENTS_TOOL]
+        if final:
+            kwargs["tool_choice"] = "none"
+        return kwargs
+
+    async def _run_tool_call(
+        self, tool_call: ChatCompletionMessageToolCallParam
+    ) -> ChatCompletionToolMessageParam:
+        function = tool_call["function"]
+        if function["name"] != RETRIEVE_DOCUMENTS_TOOL_NAME:
+            content = f"Unknown tool: {function['name']}"
+        elif (
+            query := parse_retrieve_documents_arguments(function["arguments"])
+        ) is None:
+            content = "Invalid arguments: expected a JSON object with a 'query' string."
+        else:
+            with start_span("retriever.retrieve") as span:
+                started = time.perf_counter()
+                with _provider_errors():
+                    chunks = await self.retriever.retrieve(query, self.retrieval_top_k)
+                observe_stage("retrieval", started)
+                span.set_attribute("retrieval.top_k", self.retrieval_top_k)
+                span.set_attribute("retrieval.results", len(chunks))
+            content = format_retrieved_chunks(chunks)
+        return ChatCompletionToolMessageParam(
+            role="tool", tool_call_id=tool_call["id"], content=content
+        )
+
+    async def _append_tool_results(
+        self,
+        messages: list[ChatCompletionMessageParam],
+        content: str | None,
+        tool_calls: list[ChatCompletionMessageToolCallParam],
+    ) -> None:
+        """Record the assistant's tool calls and the retrieval results."""
+        messages.append(
+            ChatCompletionAssistantMessageParam(
+                role="assistant", content=content, tool_calls=tool_calls
             )
-        except RateLimitError as e:
-            raise RateLimitExceededError(
-                message=f"OpenAI rate limit exceeded: {e.message}"
+        )
+        messages.extend(
+            await asyncio.gather(*(self._run_tool_call(call) for call in tool_calls))
+        )
+
+    def _prompt_tokens(
+        self, model: str, messages: list[ChatCompletionMessageParam]
+    ) -> int:
+        return sum(
+            self.token_counter.count(model, message["content"])
+            for message in messages
+            if isinstance(message.get("content"), str)
+        )
+
+    async def _create(
+        self, model: str, messages: list[ChatCompletionMessageParam], **kwargs: Any
+    ) -> Any:
+        """Send one completion request.
+
+        The request goes through the scheduler (rate limiting and retries)
+        and the provider router (backend choice and failover) when configured.
+        """
+
+        def send(client: AsyncOpenAI) -> Awaitable[Any]:
+            return client.chat.completions.create(
+                model=model, messages=messages, **kwargs
             )
-        except APIConnectionError:
-            raise OpenAIConnectionError(message="Failed to connect to OpenAI API")
-        except NotFoundError as e:
-            raise ModelNotFoundError(message=f"Model not found: {e.message}")
+
+        attempts = 0
+
+        async def call() -> Any:
+            nonlocal attempts
+            attempts += 1
+            with start_span("provider.chat.completions", kind=SpanKind.CLIENT) as span:
+                if span.is_recording():
+                    span.set_attributes(
+                        {
+                            GEN_AI_SYSTEM: "openai",
+                            GEN_AI_REQUEST_MODEL: model,
+                            "chat.provider.attempt": attempts,
+                            "chat.stream": kwargs.get("stream", False),
+                        }
+                    )
+                started = time.perf_counter()
+                if self.router is None:
+                    result = await send(self.chat_client)
+                else:
+                    result = await self.router.call(model, send)
+                metrics = model_metrics(model)
+                metrics.provider_seconds.observe(
+                    observe_stage("provider", started) - started
+                )
+                usage = getattr(result, "usage", None)
+                if isinstance(usage, CompletionUsage):
+                    observe_usage(model, usage)
+                    span.set_attribute(GEN_AI_INPUT_TOKENS, usage.prompt_tokens)
+                    span.set_attribute(GEN_AI_OUTPUT_TOKENS, usage.completion_tokens)
+                return result
+
+        if self.scheduler is None:
+            return await call()
+        # Providers reserve the completion budget against the token limit too.
+        completion_budget = (
+            kwargs.get("max_completion_tokens") or kwargs.get("max_tokens") or 0
+        )
+        return await self.scheduler.run(
+            call,
+            model=model,
+            tokens=self._prompt_tokens(model, messages) + completion_budget,
+        )
+
+    async def _complete(
+        self, model: str, messages: list[ChatCompletionMessageParam], **kwargs: Any
+    ) -> ChatCompletionMessage:
+        with _provider_errors():
+            if self.hedger is None:
+                response = await self._create(model, messages, **kwargs)
+            else:
+                response = await self.hedger.run(
+                    model, lambda: self._create(model, messages, **kwargs)
+                )
 
         if not response.choices:
             raise EmptyResponseError(message="OpenAI returned an empty response")
 
-        message = response.choices[0].message
+        return response.choices[0].message
+
+    async def _open_stream(
+        self, model: str, messages: list[ChatCompletionMessageParam], **kwargs: Any
+    ) -> tuple[Any, AsyncIterator[Any]]:
+        """Open a completion stream, returning it and an iterator of its chunks.
+
+        With hedging, a stream counts as answered once its first chunk
+        arrives, so a duplicate is sent when the time to first token is slow.
+        """
+        if self.hedger is None:
+            stream = await self._create(model, messages, stream=True, **kwargs)
+            return stream, aiter(stream)
+
+        async def open_once() -> tuple[Any, AsyncIterator[Any]]:
+            stream = await self._create(model, messages, stream=True, **kwargs)
+            chunks = aiter(stream)
+            try:
+                first = await anext(chunks, None)
+            except BaseException:
+                await stream.__aexit__(None, None, None)
+                raise
+            return stream, _prepend(first, chunks)
+
+        async def close(opened: tuple[Any, AsyncIterator[Any]]) -> None:
+            await opened[0].__aexit__(None, None, None)
+
+        return await self.hedger.run(model, open_once, discard=close)
+
+    def _cache_key(self, model: str, messages: list[ChatCompletionMessageParam]) -> str:
+        tools = [RETRIEVE_DOCUMENTS_TOOL_NAME] if self.retriever is not None else []
+        return request_cache_key(model, messages, tools)
+
+    async def generate_response(
+        self,
+        chat_input: CreateChatRequest,
+        *,
+        use_cache: bool = True,
+        conversation: ConversationRef | None = None,
+    ) -> ChatResponse:
+        """Generate response based on chat input
+
+        Identical requests are answered from the response cache and paraphrased
+        questions from the semantic cache, if configured, unless ``use_cache``
+        is False. Semantic matches are only considered between conversations
+        that are identical up to the final user message. Identical requests
+        that arrive while one is in flight share its result or error.
+        ``conversation`` identifies a history kept by the server.
+        """
+        with start_span("ChatService.generate_response") as span:
+            span.set_attribute(GEN_AI_REQUEST_MODEL, chat_input.model)
+            try:
+                return await self._respond(chat_input, use_cache, conversation)
+            except ChatServiceError as e:
+                record_error(e, chat_input.model)
+                raise
+
+    async def _respond(
+        self,
+        chat_input: CreateChatRequest,
+        use_cache: bool,
+        conversation: ConversationRef | None,
+    ) -> ChatResponse:
+        span = trace.get_current_span()
+        messages = self._build_messages(chat_input, conversation)
+        if not use_cache:
+            span.set_attribute("chat.cache", "bypass")
+            return await self._generate(chat_input.model, messages)
+
+        cache_key = self._cache_key(chat_input.model, messages)
+        if self.response_cache is not None:
+            cached = await self.response_cache.get(cache_key)
+            if cached is not None:
+                span.set_attribute("chat.cache", "exact")
+                return cached
+
+        span.set_attribute("chat.cache", "miss")
+        if self.singleflight is None:
+            return await self._generate_and_store(chat_input, messages, cache_key)
+        span.set_attribute("chat.coalesced", cache_key in self.singleflight)
+        return await self.singleflight.do(
+            cache_key,
+            lambda: self._generate_and_store(chat_input, messages, cache_key),
+        )
+
+    async def _generate_and_store(
+        self,
+        chat_input: CreateChatRequest,
+        messages: list[ChatCompletionMessageParam],
+        cache_key: str,
+    ) -> ChatResponse:
+        namespace = vector = None
+        if self.semantic_cache is not None:
+            namespace = self._cache_key(chat_input.model, messages[:-1])
+            vector = await self.semantic_cache.embed(chat_input.messages[-1].content)
+            if vector is not None:
+                cached = self.semantic_cache.get(namespace, vector)
+                if cached is not None:
+                    trace.get_current_span().set_attribute("chat.cache", "semantic")
+                    return cached
+
+        started = time.perf_counter()
+        response = await self._generate(chat_input.model, messages)
+
+        if vector is not None:
+            self.semantic_cache.set(
+                namespace, vector, response, time.perf_counter() - started
+            )
+        if self.response_cache is not None:
+            await self.response_cache.set(cache_key, response)
+        return response
+
+    async def _generate(
+        self, model: str, messages: list[ChatCompletionMessageParam]
+    ) -> ChatResponse:
+        """Run the completion, including the retrieval tool loop.
+
+        When a retriever is configured the model may call ``retrieve_documents``
+        up to ``max_iterations`` times before it has to answer.
+        """
+        for attempt in range(self.max_iterations + 1):
+            with start_span("ChatService.iteration") as span:
+                span.set_attribute("chat.iteration", attempt)
+                message = await self._complete(
+                    model,
+                    messages,
+                    **self._completion_kwargs(final=attempt == self.max_iterations),
+                )
+                if self.retriever is None or not message.tool_calls:
+                    break
+                await self._append_tool_results(
+                    messages,
+                    message.content,
+                    [
+                        ChatCompletionMessageToolCallParam(
+                            id=call.id,
+                            type="function",
+                            function={
+                                "name": call.function.name,
+                                "arguments": call.function.arguments,
+                            },
+                        )
+                        for call in message.tool_calls
+                    ],
+                )
+
         return ChatResponse(message=message.content)
+
+    async def stream_response(
+        self, chat_input: CreateChatRequest
+    ) -> AsyncIterator[str]:
+        """Yield content deltas as soon as the model produces them.
+
+        Deltas are forwarded without being accumulated, so memory stays flat
+        regardless of the answer length. Tool calls are assembled from their
+        deltas and executed between streamed rounds. Provider errors surface as
+        ``ChatServiceError`` subclasses, either on the first iteration or
+        mid-stream.
+        """
+        try:
+            async with aclosing(self._stream(chat_input)) as deltas:
+                async for delta in deltas:
+                    yield delta
+        except ChatServiceError as e:
+            record_error(e, chat_input.model)
+            raise
+
+    async def _stream(self, chat_input: CreateChatRequest) -> AsyncIterator[str]:
+        started: float | None = time.perf_counter()
+        metrics = model_metrics(chat_input.model)
+        messages = self._build_messages(chat_input)
+
+        for attempt in range(self.max_iterations + 1):
+            received_choices = False
+            content_parts: list[str] = []
+            tool_calls: dict[int, ChatCompletionMessageToolCallParam] = {}
+
+            with _provider_errors():
+                stream, chunks = await self._open_stream(
+                    chat_input.model,
+                    messages,
+                    stream_options={"include_usage": True},
+                    **self._completion_kwargs(final=attempt == self.max_iterations),
+                )
+                async with stream:
+                    async for chunk in chunks:
+                        if not chunk.choices:
+                            # The final chunk carries usage when it is requested.
+                            if isinstance(chunk.usage, CompletionUsage):
+                                observe_usage(chat_input.model, chunk.usage)
+                            continue
+                        received_choices = True
+                        delta = chunk.choices[0].delta
+                        if delta.content:
+                            if started is not None:
+                                metrics.time_to_first_token.observe(
+                                    time.perf_counter() - started
+                                )
+                                started = None
+                            if self.retriever is not None:
+                                content_parts.append(delta.content)
+                            yield delta.content
+                        for call_delta in delta.tool_calls or []:
+                            call = tool_calls.setdefault(
+                                call_delta.index,
+                                ChatCompletionMessageToolCallParam(
+                                    id="",
+                                    type="function",
+                                    function={"name": "", "arguments": ""},
+                                ),
+                            )
+                            if call_delta.id:
+                                call["id"] = call_delta.id
+                            if call_delta.function and call_delta.function.name:
+                                call["function"]["name"] += call_delta.function.name
+                            if call_delta.function and call_delta.function.arguments:
+                                call["function"]["arguments"] += (
+                                    call_delta.function.arguments
+                                )
+
+            if not received_choices:
+                raise EmptyResponseError(message="OpenAI returned an empty response")
+            if self.retriever is None or not tool_calls:
+                return
+            await self._append_tool_results(
+                messages,
+                "".join(content_parts) or None,
+                [tool_calls[index] for index in sorted(tool_calls)],
+            )
+
+
+async def _prepend(first: Any, rest: AsyncIterator[Any]) -> AsyncIterator[Any]:
+    if first is not None:
+        yield first
+    async for item in rest:
+        yield item
+
+
+@contextmanager
+def _provider_errors() -> Iterator[None]:
+    """Translate OpenAI client errors into ChatServiceError subclasses."""
+    try:
+        yield
+    except AuthenticationError as e:
+        raise AuthenticationFailedError(
+            message=f"OpenAI authentication failed: {e.message}"
+        ) from e
+    except RateLimitError as e:
+        raise RateLimitExceededError(
+            message=f"OpenAI rate limit exceeded: {e.message}"
+        ) from e
+    except RateLimitDeadlineExceeded as e:
+        raise RateLimitExceededError(message=f"OpenAI rate limit exceeded: {e}") from e
+    except APIConnectionError as e:
+        raise OpenAIConnectionError(message="Failed to connect to OpenAI API") from e
+    except NoHealthyBackendError as e:
+        raise OpenAIConnectionError(message=str(e)) from e
+    except NotFoundError as e:
+        raise ModelNotFoundError(message=f"Model not found: {e.message}") from e
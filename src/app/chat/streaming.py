@@ -0,0 +1,50 @@
+import json
+from collections.abc import AsyncIterator
+
+from pydantic import BaseModel
+
+from src.app.chat.exceptions import ChatServiceError
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Encode one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def stream_chat_events(
+    first_delta: str | None, deltas: AsyncIterator[str]
+) -> AsyncIterator[str]:
+    """Render content deltas as SSE, ending with a ``done`` or ``error`` event.
+
+    Wire format:
+        event: delta  data: {"content": "<text>"}
+        event: error  data: {"status_code": <int>, "detail": "<message>"}
+        event: done   data: {}
+
+    An ``error`` event is always the last event of the stream; its fields
+    mirror the HTTP status code and ``detail`` body returned by ``POST /chat``.
+    """
+    if first_delta is not None:
+        yield format_sse("delta", {"content": first_delta})
+    try:
+        async for delta in deltas:
+            yield format_sse("delta", {"content": delta})
+    except ChatServiceError as e:
+        yield format_sse("error", {"status_code": e.status_code, "detail": e.message})
+        return
+    yield format_sse("done", {})
+
+
+async def stream_ndjson(items: AsyncIterator[BaseModel]) -> AsyncIterator[str]:
+    """Render models as newline-delimited JSON, one line per item."""
+    async for item in items:
+        yield item.model_dump_json(exclude_none=True) + "\n"
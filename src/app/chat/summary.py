@@ -0,0 +1,170 @@
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from src.app.chat.schemas import ChatMessage
+from src.app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a conversation between a user and an "
+    "assistant. Update the summary with the new messages. Keep facts, names, "
+    "decisions, open questions and the user's goals; drop pleasantries. Answer "
+    "with the updated summary only."
+)
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+# Folds ``messages`` into the previous summary text, returning the new text.
+Fold = Callable[[str | None, list[ChatMessage]], Awaitable[str]]
+
+
+@dataclass(frozen=True)
+class ConversationRef:
+    """Identity of a conversation whose history is kept by the server.
+
+    ``offset`` is the number of earlier messages the store no longer holds,
+    so positions stay absolute after the oldest messages are trimmed.
+    """
+
+    key: str
+    offset: int = 0
+
+
+@dataclass
+class Summary:
+    text: str
+    # Position of the first message not folded into ``text``.
+    covered: int
+    # blake2b state over the folded messages, extended by the next fold
+    # without rehashing.
+    hasher: Any
+
+
+def _hash_messages(hasher: Any, messages: Sequence[ChatMessage]) -> Any:
+    for message in messages:
+        content = message.content.encode("utf-8")
+        hasher.update(f"{message.role}:{len(content)}:".encode())
+        hasher.update(content)
+    return hasher
+
+
+def conversation_key(model: str, messages: Sequence[ChatMessage]) -> str:
+    """Key of a stateless conversation, from its model and opening turn."""
+    return (
+        "chat:"
+        + _hash_messages(
+            hashlib.blake2b(model.encode("utf-8"), digest_size=16), messages[:2]
+        ).hexdigest()
+    )
+
+
+def render_fold_prompt(previous: str | None, messages: Sequence[ChatMessage]) -> str:
+    transcript = "\n".join(f"{m.role}: {m.content}" for m in messages)
+    return f"Current summary:\n{previous or '(empty)'}\n\nNew messages:\n{transcript}"
+
+
+class ConversationSummarizer:
+    """Rolling summaries of the messages that aged out of the history window.
+
+    Lookups never wait for the provider: messages not yet covered are folded
+    into the summary by a background task, one per conversation, and the
+    previous summary is returned meanwhile. Summaries are kept for the
+    ``max_entries`` most recently used conversations.
+    """
+
+    def __init__(self, *, max_entries: int):
+        self.max_entries = max_entries
+        self._summaries: OrderedDict[str, Summary] = OrderedDict()
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._summaries)
+
+    def summary_for(
+        self,
+        key: str,
+        aged_out: Sequence[ChatMessage],
+        *,
+        offset: int,
+        fold: Fold,
+    ) -> str | None:
+        """Summary of ``aged_out``, the messages before the history window.
+
+        ``aged_out[0]`` is message number ``offset`` of the conversation. When
+        ``offset`` is 0 the summary is only used if the messages it covers
+        are the ones in ``aged_out``, so a stateless conversation never gets
+        another's summary.
+        """
+        end = offset + len(aged_out)
+        summary = self._summaries.get(key)
+        if summary is not None:
+            if summary.covered > end:
+                # The window grew back over folded messages; keep the summary
+                # for later requests but do not repeat those messages.
+                return None
+            if (
+                offset == 0
+                and _hash_messages(
+                    hashlib.blake2b(digest_size=16), aged_out[: summary.covered]
+                ).digest()
+                != summary.hasher.digest()
+            ):
+                summary = None
+            else:
+                self._summaries.move_to_end(key)
+
+        # Messages trimmed by the store before they were folded are skipped.
+        covered = max(summary.covered, offset) if summary is not None else offset
+        if covered < end and key not in self._tasks:
+            task = asyncio.create_task(
+                self._fold(key, summary, list(aged_out[covered - offset :]), end, fold)
+            )
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        return summary.text if summary is not None else None
+
+    async def _fold(
+        self,
+        key: str,
+        previous: Summary | None,
+        messages: list[ChatMessage],
+        end: int,
+        fold: Fold,
+    ) -> None:
+        try:
+            text = await fold(previous.text if previous else None, messages)
+        except Exception:
+            logger.warning("Conversation summary update failed", exc_info=True)
+            return
+        hasher = (
+            previous.hasher.copy()
+            if previous is not None
+            else hashlib.blake2b(digest_size=16)
+        )
+        self._summaries[key] = Summary(
+            text=text, covered=end, hasher=_hash_messages(hasher, messages)
+        )
+        self._summaries.move_to_end(key)
+        while len(self._summaries) > self.max_entries:
+            self._summaries.popitem(last=False)
+
+    async def join(self) -> None:
+        """Wait for the summary updates in flight."""
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    async def close(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        await self.join()
+
+
+def create_summarizer(settings: Settings) -> ConversationSummarizer | None:
+    if not settings.SUMMARY_ENABLED:
+        return None
+    return ConversationSummarizer(max_entries=settings.SUMMARY_CACHE_MAX_ENTRIES)
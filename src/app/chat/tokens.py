@@ -0,0 +1,84 @@
+import hashlib
+import math
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from functools import lru_cache
+
+# Fixed per-message cost of the chat format (role and separators), following
+# OpenAI's token counting guide.
+MESSAGE_OVERHEAD_TOKENS = 4
+# Rough characters per token for English text when tiktoken is unavailable.
+CHARS_PER_TOKEN = 4
+
+
+def _estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+@lru_cache
+def get_encoder(model: str) -> Callable[[str], int]:
+    """Return a token counting function for ``model``.
+
+    Uses tiktoken when it is installed and falls back to a character-based
+    estimate otherwise. Encoders are loaded once per model.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return _estimate_tokens
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        encoding = tiktoken.get_encoding("o200k_base")
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+class TokenCounter:
+    """Counts message tokens, memoising results by model and content hash.
+
+    Chat history is resent with every turn, so most messages are counted
+    many times; the memo keeps only digests, not the message text.
+    """
+
+    def __init__(self, *, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._counts: OrderedDict[bytes, int] = OrderedDict()
+
+    def count(self, model: str, content: str) -> int:
+        key = hashlib.blake2b(f"{model}\0{content}".encode(), digest_size=16).digest()
+        tokens = self._counts.get(key)
+        if tokens is None:
+            tokens = get_encoder(model)(content) + MESSAGE_OVERHEAD_TOKENS
+            self._counts[key] = tokens
+            if len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+        else:
+            self._counts.move_to_end(key)
+        return tokens
+
+
+def get_token_budget(
+    model: str, default_budget: int, model_budgets: Mapping[str, int]
+) -> int:
+    """Prompt token budget for ``model``, matching the longest configured prefix.
+
+    A budget for ``gpt-4o`` also applies to dated snapshots such as
+    ``gpt-4o-2024-08-06``.
+    """
+    matches = [name for name in model_budgets if model.startswith(name)]
+    if not matches:
+        return default_budget
+    return model_budgets[max(matches, key=len)]
+
+
+def fit_history(
+    history: list[str], available_tokens: int, count: Callable[[str], int]
+) -> int:
+    """Return how many of the newest ``history`` messages fit the budget."""
+    kept = 0
+    for content in reversed(history):
+        available_tokens -= count(content)
+        if available_tokens < 0:
+            break
+        kept += 1
+    return kept
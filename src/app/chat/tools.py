@@ -0,0 +1,57 @@
+import json
+
+from openai.types.chat import ChatCompletionToolParam
+
+from src.app.retrieval.schemas import RetrievedChunk
+
+RETRIEVE_DOCUMENTS_TOOL_NAME = "retrieve_documents"
+
+RETRIEVE_DOCUMENTS_TOOL = ChatCompletionToolParam(
+    type="function",
+    function={
+        "name": RETRIEVE_DOCUMENTS_TOOL_NAME,
+        "description": (
+            "Search the project knowledge base and return the most relevant "
+            "document excerpts for a query."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "A focused search query describing the "
+                    "information needed.",
+                }
+            },
+            "required": ["query"],
+            "additionalProperties": False,
+        },
+    },
+)
+
+
+def parse_retrieve_documents_arguments(arguments: str) -> str | None:
+    """Return the query from the tool call arguments, or None if malformed."""
+    try:
+        parsed = json.loads(arguments or "{}")
+    except json.JSONDecodeError:
+        return None
+    query = parsed.get("query") if isinstance(parsed, dict) else None
+    return query if isinstance(query, str) and query.strip() else None
+
+
+def format_retrieved_chunks(chunks: list[RetrievedChunk]) -> str:
+    """Render retrieved chunks as the tool result passed back to the model."""
+    if not chunks:
+        return "No relevant documents were found."
+    return json.dumps(
+        [
+            {
+                "title": chunk.metadata.get("title", ""),
+                "source": chunk.metadata.get("source", ""),
+                "content": chunk.text,
+            }
+            for chunk in chunks
+        ],
+        ensure_ascii=False,
+    )
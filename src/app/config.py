@@ -1,7 +1,20 @@
 from functools import lru_cache
+from typing import Literal
+
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class ProviderBackend(BaseModel):
+    """An OpenAI-compatible endpoint in OPENAI_BACKENDS."""
+
+    name: str
+    base_url: str | None = None
+    api_key: str | None = None
+    # fnmatch patterns of the models served; empty serves every model.
+    models: list[str] = []
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -13,13 +26,102 @@ class Settings(BaseSettings):
 
     # Provide Configuration
     OPENAI_API_KEY: str | None = None
+    OPENAI_BASE_URL: str | None = None
+    OPENAI_MAX_CONNECTIONS: int = 100
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    OPENAI_KEEPALIVE_EXPIRY: float = 30.0
+    OPENAI_HTTP2: bool = False
+    OPENAI_TIMEOUT: float = 60.0
+    OPENAI_CONNECT_TIMEOUT: float = 5.0
+    OPENAI_PROMPT_CACHE_KEY: bool = False
+    OPENAI_BACKENDS: list[ProviderBackend] = []
+    PROVIDER_ROUTING_STRATEGY: Literal["ewma", "least_in_flight"] = "ewma"
+    PROVIDER_FAILURE_THRESHOLD: int = 5
+    PROVIDER_RECOVERY_SECONDS: float = 30.0
+    HEDGING_ENABLED: bool = False
+    HEDGING_PERCENTILE: float = 95.0
+    HEDGING_INITIAL_DELAY: float = 2.0
+    HEDGING_MAX_RATIO: float = 0.05
+    OPENAI_RATE_LIMIT_ENABLED: bool = True
+    OPENAI_REQUESTS_PER_MINUTE: int | None = None
+    OPENAI_TOKENS_PER_MINUTE: int | None = None
+    OPENAI_RETRY_DEADLINE: float = 30.0
+    OPENAI_RETRY_BASE_DELAY: float = 0.5
+    OPENAI_RETRY_MAX_DELAY: float = 8.0
 
     # Chat Settings
+    SYSTEM_PROMPT_VERSION: str = "v1"
     BASE_SYSTEM_PROMPT: str = "You are an AI assistant specialized in retrieving and synthesizing information to provide relevant answers to queries."
     CHAT_HISTORY_LIMIT: int = 20
+    CHAT_TOKEN_BUDGET: int = 8000
+    CHAT_MODEL_TOKEN_BUDGETS: dict[str, int] = {}
     MAX_CHAT_ITERATIONS: int = 5
     RETRIEVAL_TOP_K: int = 10
     MAX_MESSAGE_LENGTH: int = 10000
+    REQUEST_COALESCING_ENABLED: bool = True
+    BATCH_MAX_REQUESTS: int = 1000
+    BATCH_CONCURRENCY: int = 16
+    SUMMARY_ENABLED: bool = False
+    SUMMARY_MODEL: str | None = None
+    SUMMARY_MAX_TOKENS: int = 256
+    SUMMARY_CACHE_MAX_ENTRIES: int = 10000
+
+    # Response Cache Settings
+    RESPONSE_CACHE_ENABLED: bool = False
+    RESPONSE_CACHE_TTL_SECONDS: float = 300.0
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESPONSE_CACHE_REDIS_URL: str | None = None
+    SEMANTIC_CACHE_ENABLED: bool = False
+    SEMANTIC_CACHE_THRESHOLD: float = 0.92
+    SEMANTIC_CACHE_TTL_SECONDS: float = 3600.0
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 10000
+
+    # Tracing Settings
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATIO: float = 1.0
+    OTEL_SERVICE_NAME: str = "confluence-rag"
+    OTEL_EXPORTER_OTLP_TRACES_ENDPOINT: str | None = None
+
+    # Batch Job Settings
+    JOBS_ENABLED: bool = False
+    JOBS_PROVIDER: Literal["openai", "stub"] = "openai"
+    JOBS_DIR: str = "data/jobs"
+    JOBS_POLL_INTERVAL: float = 30.0
+    JOBS_MAX_REQUESTS: int = 50000
+
+    # Conversation Settings
+    CONVERSATIONS_ENABLED: bool = False
+    CONVERSATION_STORE: Literal["memory", "sqlite", "redis"] = "memory"
+    CONVERSATION_MAX_CONVERSATIONS: int = 10000
+    CONVERSATION_MAX_MESSAGES: int = 100
+    CONVERSATION_DB_PATH: str = "data/conversations.db"
+    CONVERSATION_REDIS_URL: str | None = None
+    CONVERSATION_TTL_SECONDS: float = 7 * 24 * 3600.0
+
+    # Retrieval Settings
+    RETRIEVAL_INDEX_PATH: str | None = None
+    EMBEDDING_BACKEND: Literal["openai", "hashing"] = "openai"
+    EMBEDDING_MODEL: str = "text-embedding-3-small"
+    EMBEDDING_DIMENSIONS: int = 512
+    RETRIEVAL_INDEX_BACKEND: Literal["flat", "ivfpq"] = "flat"
+    IVF_NLIST: int = 1024
+    IVF_NPROBE: int = 16
+    IVF_TRAIN_SAMPLE: int = 65536
+    IVF_KMEANS_ITERATIONS: int = 20
+    PQ_SUBQUANTIZERS: int = 64
+    ANN_RERANK: int = 100
+    # 0 disables the cache
+    RETRIEVAL_EMBEDDING_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    RETRIEVAL_RESULT_CACHE_MAX_BYTES: int = 4 * 1024 * 1024
+    RETRIEVAL_RESULT_CACHE_TTL_SECONDS: float = 300.0
+    # How often workers check for a new version of a segmented index; 0 disables
+    RETRIEVAL_INDEX_RELOAD_SECONDS: float = 30.0
+    RETRIEVAL_COMPACT_MAX_SEGMENTS: int = 8
+    RETRIEVAL_COMPACT_MAX_DELETED_RATIO: float = 0.25
+    # "hybrid" fuses vector search with BM25 by reciprocal rank fusion
+    RETRIEVAL_MODE: Literal["vector", "hybrid"] = "hybrid"
+    RETRIEVAL_HYBRID_CANDIDATES: int = 50
+    RETRIEVAL_RRF_K: int = 60
 
 
 @lru_cache
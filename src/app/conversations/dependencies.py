@@ -0,0 +1,26 @@
+from fastapi import HTTPException, Request
+
+from src.app.chat.service import ChatService
+from src.app.config import Settings
+from src.app.conversations.service import ConversationService
+from src.app.conversations.store import create_conversation_store
+
+
+def create_conversation_service(
+    settings: Settings, *, chat_service: ChatService | None
+) -> ConversationService | None:
+    """Build the conversation service, or None when conversations are off."""
+    if not settings.CONVERSATIONS_ENABLED or chat_service is None:
+        return None
+    return ConversationService(
+        store=create_conversation_store(settings), chat_service=chat_service
+    )
+
+
+async def get_conversation_service(request: Request) -> ConversationService:
+    service: ConversationService | None = getattr(
+        request.app.state, "conversation_service", None
+    )
+    if service is None:
+        raise HTTPException(status_code=503, detail="Conversations are not enabled")
+    return service
@@ -0,0 +1,88 @@
+import time
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import Response
+
+from src.app.chat.cache import bypasses_cache
+from src.app.chat.exceptions import ChatServiceError
+from src.app.chat.schemas import ChatResponse
+from src.app.conversations.dependencies import get_conversation_service
+from src.app.conversations.schemas import (
+    ConversationMessageRequest,
+    ConversationResponse,
+    CreateConversationRequest,
+)
+from src.app.conversations.service import ConversationService
+from src.app.observability.metrics import observe_stage, request_started
+
+router = APIRouter(
+    prefix="/conversations",
+    tags=[
+        "Conversations",
+    ],
+)
+
+
+@router.post("", status_code=201, response_model=ConversationResponse)
+async def create_conversation(
+    conversation_input: CreateConversationRequest,
+    service: Annotated[ConversationService, Depends(get_conversation_service)],
+):
+    """Start a conversation whose history is kept on the server."""
+    conversation = await service.create(conversation_input.model)
+    return ConversationResponse.model_validate(conversation, from_attributes=True)
+
+
+@router.get("/{conversation_id}", response_model=ConversationResponse)
+async def get_conversation(
+    conversation_id: str,
+    service: Annotated[ConversationService, Depends(get_conversation_service)],
+):
+    conversation = await service.get(conversation_id)
+    if conversation is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return ConversationResponse.model_validate(conversation, from_attributes=True)
+
+
+@router.delete("/{conversation_id}", status_code=204)
+async def delete_conversation(
+    conversation_id: str,
+    service: Annotated[ConversationService, Depends(get_conversation_service)],
+):
+    if not await service.delete(conversation_id):
+        raise HTTPException(status_code=404, detail="Conversation not found")
+
+
+@router.post("/{conversation_id}/messages", response_model=ChatResponse)
+async def send_message(
+    request: Request,
+    conversation_id: str,
+    message: ConversationMessageRequest,
+    service: Annotated[ConversationService, Depends(get_conversation_service)],
+    cache_control: Annotated[str | None, Header()] = None,
+):
+    """Answer one new user message in the context of the stored history.
+
+    Errors keep the status codes of ``POST /chat``; a failed turn is not
+    added to the history, so it can be retried.
+    """
+    observe_stage("validation", request_started(request.scope))
+    try:
+        response = await service.send(
+            conversation_id,
+            message.content,
+            use_cache=not bypasses_cache(cache_control),
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Conversation not found") from None
+    except ChatServiceError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message) from e
+    except ValueError as e:
+        # Catches configuration errors like missing API key
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    started = time.perf_counter()
+    body = response.model_dump_json()
+    observe_stage("serialization", started)
+    return Response(content=body, media_type="application/json")
@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Annotated
+
+from pydantic import BaseModel, Field
+
+from src.app.chat.schemas import ChatMessage
+from src.app.config import get_settings
+
+_settings = get_settings()
+
+
+class CreateConversationRequest(BaseModel):
+    model: str
+
+
+class ConversationMessageRequest(BaseModel):
+    content: Annotated[str, Field(max_length=_settings.MAX_MESSAGE_LENGTH)]
+
+
+class ConversationResponse(BaseModel):
+    id: str
+    model: str
+    created_at: datetime
+    updated_at: datetime
+    messages: list[ChatMessage]
@@ -0,0 +1,85 @@
+import asyncio
+import time
+from uuid import uuid4
+from weakref import WeakValueDictionary
+
+from src.app.chat.schemas import ChatMessage, ChatResponse, CreateChatRequest
+from src.app.chat.service import ChatService
+from src.app.chat.summary import ConversationRef
+from src.app.conversations.store import Conversation, ConversationStore
+
+
+class ConversationService:
+    """Chat turns answered against a history kept on the server.
+
+    Clients send only the new user message. The history is read from the
+    store, and the question and its answer are appended once the turn
+    succeeds; a failed turn leaves the history unchanged. Turns of one
+    conversation run one at a time within a worker so each sees the
+    previous answer.
+    """
+
+    def __init__(self, *, store: ConversationStore, chat_service: ChatService):
+        self.store = store
+        self.chat_service = chat_service
+        self._locks: WeakValueDictionary[str, asyncio.Lock] = WeakValueDictionary()
+
+    async def create(self, model: str) -> Conversation:
+        now = time.time()
+        conversation = Conversation(
+            id=f"conv_{uuid4().hex}", model=model, created_at=now, updated_at=now
+        )
+        await self.store.create(conversation)
+        return conversation
+
+    async def get(self, conversation_id: str) -> Conversation | None:
+        return await self.store.get(conversation_id)
+
+    async def delete(self, conversation_id: str) -> bool:
+        return await self.store.delete(conversation_id)
+
+    async def send(
+        self, conversation_id: str, content: str, *, use_cache: bool = True
+    ) -> ChatResponse:
+        """Answer ``content`` in the context of the conversation.
+
+        Raises KeyError when the conversation does not exist.
+        """
+        lock = self._locks.setdefault(conversation_id, asyncio.Lock())
+        async with lock:
+            conversation = await self.store.get(conversation_id)
+            if conversation is None:
+                raise KeyError(conversation_id)
+            question = ChatMessage.model_construct(role="user", content=content)
+            # Stored messages were validated when they arrived. Only the window
+            # the service reads is passed on, unless it summarises the turns
+            # before the window.
+            history = conversation.messages
+            if self.chat_service.summarizer is None:
+                window = self.chat_service.chat_history_limit - 1
+                history = history[max(0, len(history) - window) :]
+            chat_input = CreateChatRequest.model_construct(
+                model=conversation.model, messages=[*history, question]
+            )
+            response = await self.chat_service.generate_response(
+                chat_input,
+                use_cache=use_cache,
+                conversation=ConversationRef(
+                    conversation.id,
+                    offset=conversation.message_count - len(conversation.messages),
+                ),
+            )
+            turn = [question]
+            if response.message is not None:
+                turn.append(
+                    ChatMessage.model_construct(
+                        role="assistant", content=response.message
+                    )
+                )
+            if not await self.store.append(conversation_id, turn):
+                # Deleted or evicted while the answer was being generated.
+                raise KeyError(conversation_id)
+        return response
+
+    async def close(self) -> None:
+        await self.store.close()
@@ -0,0 +1,333 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Protocol
+
+from src.app.chat.schemas import ChatMessage
+from src.app.config import Settings
+
+
+@dataclass
+class Conversation:
+    id: str
+    model: str
+    created_at: float
+    updated_at: float
+    messages: list[ChatMessage] = field(default_factory=list)
+    # Messages ever added, including those trimmed from ``messages``.
+    message_count: int = 0
+
+
+class ConversationStore(Protocol):
+    """Conversation histories, keeping the latest ``max_messages`` of each."""
+
+    async def create(self, conversation: Conversation) -> None: ...
+
+    async def get(self, conversation_id: str) -> Conversation | None: ...
+
+    async def append(self, conversation_id: str, messages: list[ChatMessage]) -> bool:
+        """Add messages to a conversation; False when it does not exist."""
+        ...
+
+    async def delete(self, conversation_id: str) -> bool: ...
+
+    async def close(self) -> None: ...
+
+
+class MemoryConversationStore:
+    """In-process store evicting the least recently used conversations.
+
+    Histories are lost on restart and are not shared between workers.
+    """
+
+    def __init__(self, *, max_conversations: int, max_messages: int):
+        self.max_conversations = max_conversations
+        self.max_messages = max_messages
+        self.evictions = 0
+        self._conversations: OrderedDict[str, Conversation] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._conversations)
+
+    async def create(self, conversation: Conversation) -> None:
+        self._conversations[conversation.id] = replace(
+            conversation,
+            messages=conversation.messages[-self.max_messages :],
+            message_count=len(conversation.messages),
+        )
+        while len(self._conversations) > self.max_conversations:
+            self._conversations.popitem(last=False)
+            self.evictions += 1
+
+    async def get(self, conversation_id: str) -> Conversation | None:
+        conversation = self._conversations.get(conversation_id)
+        if conversation is None:
+            return None
+        self._conversations.move_to_end(conversation_id)
+        # Callers get a snapshot; appends never change a returned history.
+        return replace(conversation, messages=list(conversation.messages))
+
+    async def append(self, conversation_id: str, messages: list[ChatMessage]) -> bool:
+        conversation = self._conversations.get(conversation_id)
+        if conversation is None:
+            return False
+        self._conversations.move_to_end(conversation_id)
+        conversation.messages.extend(messages)
+        del conversation.messages[: -self.max_messages]
+        conversation.message_count += len(messages)
+        conversation.updated_at = time.time()
+        return True
+
+    async def delete(self, conversation_id: str) -> bool:
+        return self._conversations.pop(conversation_id, None) is not None
+
+    async def close(self) -> None:
+        self._conversations.clear()
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    message_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    conversation_id TEXT NOT NULL REFERENCES conversations (id) ON DELETE CASCADE,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_conversation ON messages (conversation_id, id);
+"""
+
+
+class SQLiteConversationStore:
+    """Conversations in a SQLite database, so they outlive the process.
+
+    Queries run in a thread, so commits never block the event loop; a lock
+    keeps the transactions of concurrent threads on the shared connection
+    apart.
+    """
+
+    def __init__(self, path: str | Path, *, max_messages: int):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_messages = max_messages
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+
+    async def create(self, conversation: Conversation) -> None:
+        await asyncio.to_thread(self._create, conversation)
+
+    def _create(self, conversation: Conversation) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO conversations "
+                "(id, model, created_at, updated_at, message_count) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    conversation.id,
+                    conversation.model,
+                    conversation.created_at,
+                    conversation.updated_at,
+                    len(conversation.messages),
+                ),
+            )
+            self._insert_messages(conversation.id, conversation.messages)
+
+    async def get(self, conversation_id: str) -> Conversation | None:
+        return await asyncio.to_thread(self._get, conversation_id)
+
+    def _get(self, conversation_id: str) -> Conversation | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM conversations WHERE id = ?", (conversation_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            rows = self._conn.execute(
+                "SELECT role, content FROM messages WHERE conversation_id = ? "
+                "ORDER BY id DESC LIMIT ?",
+                (conversation_id, self.max_messages),
+            ).fetchall()
+        messages = [
+            ChatMessage.model_construct(
+                role=message["role"], content=message["content"]
+            )
+            for message in reversed(rows)
+        ]
+        return Conversation(**row, messages=messages)
+
+    async def append(self, conversation_id: str, messages: list[ChatMessage]) -> bool:
+        return await asyncio.to_thread(self._append, conversation_id, messages)
+
+    def _append(self, conversation_id: str, messages: list[ChatMessage]) -> bool:
+        with self._lock, self._conn:
+            updated = self._conn.execute(
+                "UPDATE conversations "
+                "SET updated_at = ?, message_count = message_count + ? WHERE id = ?",
+                (time.time(), len(messages), conversation_id),
+            ).rowcount
+            if updated:
+                self._insert_messages(conversation_id, messages)
+        return bool(updated)
+
+    def _insert_messages(
+        self, conversation_id: str, messages: list[ChatMessage]
+    ) -> None:
+        self._conn.executemany(
+            "INSERT INTO messages (conversation_id, role, content) VALUES (?, ?, ?)",
+            [(conversation_id, message.role, message.content) for message in messages],
+        )
+        self._conn.execute(
+            "DELETE FROM messages WHERE conversation_id = ? AND id NOT IN "
+            "(SELECT id FROM messages WHERE conversation_id = ? "
+            "ORDER BY id DESC LIMIT ?)",
+            (conversation_id, conversation_id, self.max_messages),
+        )
+
+    async def delete(self, conversation_id: str) -> bool:
+        return await asyncio.to_thread(self._delete, conversation_id)
+
+    def _delete(self, conversation_id: str) -> bool:
+        with self._lock, self._conn:
+            deleted = self._conn.execute(
+                "DELETE FROM conversations WHERE id = ?", (conversation_id,)
+            ).rowcount
+        return bool(deleted)
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._close)
+
+    def _close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RedisConversationStore:
+    """Conversations in any Redis-protocol server, shared between workers.
+
+    Each conversation is a hash plus a capped list of JSON messages, both
+    expiring ``ttl_seconds`` after the last write. Requires the optional
+    ``redis`` package.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        max_messages: int,
+        ttl_seconds: float,
+        prefix: str = "conversation:",
+    ):
+        try:
+            from redis.asyncio import Redis
+        except ImportError as e:
+            raise ValueError(
+                "CONVERSATION_STORE=redis requires the 'redis' package"
+            ) from e
+        self.client = Redis.from_url(url)
+        self.max_messages = max_messages
+        self.ttl_ms = int(ttl_seconds * 1000)
+        self.prefix = prefix
+
+    def _keys(self, conversation_id: str) -> tuple[str, str]:
+        key = self.prefix + conversation_id
+        return key, key + ":messages"
+
+    async def create(self, conversation: Conversation) -> None:
+        key, messages_key = self._keys(conversation.id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(
+                key,
+                mapping={
+                    "model": conversation.model,
+                    "created_at": conversation.created_at,
+                    "updated_at": conversation.updated_at,
+                    "message_count": len(conversation.messages),
+                },
+            )
+            pipe.pexpire(key, self.ttl_ms)
+            if conversation.messages:
+                self._push(pipe, messages_key, conversation.messages)
+            await pipe.execute()
+
+    async def get(self, conversation_id: str) -> Conversation | None:
+        key, messages_key = self._keys(conversation_id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hgetall(key)
+            pipe.lrange(messages_key, 0, -1)
+            fields, raw_messages = await pipe.execute()
+        if not fields:
+            return None
+        return Conversation(
+            id=conversation_id,
+            model=fields[b"model"].decode(),
+            created_at=float(fields[b"created_at"]),
+            updated_at=float(fields[b"updated_at"]),
+            message_count=int(fields.get(b"message_count", 0)),
+            messages=[
+                ChatMessage.model_construct(**json.loads(message))
+                for message in raw_messages
+            ],
+        )
+
+    async def append(self, conversation_id: str, messages: list[ChatMessage]) -> bool:
+        key, messages_key = self._keys(conversation_id)
+        if not await self.client.exists(key):
+            return False
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, "updated_at", time.time())
+            pipe.hincrby(key, "message_count", len(messages))
+            pipe.pexpire(key, self.ttl_ms)
+            self._push(pipe, messages_key, messages)
+            await pipe.execute()
+        return True
+
+    def _push(self, pipe, messages_key: str, messages: list[ChatMessage]) -> None:
+        pipe.rpush(
+            messages_key,
+            *(
+                json.dumps({"role": message.role, "content": message.content})
+                for message in messages
+            ),
+        )
+        pipe.ltrim(messages_key, -self.max_messages, -1)
+        pipe.pexpire(messages_key, self.ttl_ms)
+
+    async def delete(self, conversation_id: str) -> bool:
+        return bool(await self.client.delete(*self._keys(conversation_id)))
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def create_conversation_store(settings: Settings) -> ConversationStore:
+    if settings.CONVERSATION_STORE == "sqlite":
+        return SQLiteConversationStore(
+            settings.CONVERSATION_DB_PATH,
+            max_messages=settings.CONVERSATION_MAX_MESSAGES,
+        )
+    if settings.CONVERSATION_STORE == "redis":
+        if not settings.CONVERSATION_REDIS_URL:
+            raise ValueError("CONVERSATION_STORE=redis requires CONVERSATION_REDIS_URL")
+        return RedisConversationStore(
+            settings.CONVERSATION_REDIS_URL,
+            max_messages=settings.CONVERSATION_MAX_MESSAGES,
+            ttl_seconds=settings.CONVERSATION_TTL_SECONDS,
+        )
+    return MemoryConversationStore(
+        max_conversations=settings.CONVERSATION_MAX_CONVERSATIONS,
+        max_messages=settings.CONVERSATION_MAX_MESSAGES,
+    )
@@ -0,0 +1,48 @@
+from pathlib import Path
+
+from fastapi import HTTPException, Request
+from openai import AsyncOpenAI
+
+from src.app.chat.service import ChatService
+from src.app.config import Settings
+from src.app.jobs.providers import (
+    BatchProvider,
+    OpenAIBatchProvider,
+    StubBatchProvider,
+)
+from src.app.jobs.service import JobService
+from src.app.jobs.store import JobStore
+
+
+def create_batch_provider(
+    settings: Settings, openai_client: AsyncOpenAI
+) -> BatchProvider:
+    if settings.JOBS_PROVIDER == "stub":
+        return StubBatchProvider()
+    return OpenAIBatchProvider(client=openai_client)
+
+
+def create_job_service(
+    settings: Settings,
+    *,
+    chat_service: ChatService | None,
+    openai_client: AsyncOpenAI | None,
+) -> JobService | None:
+    """Build the job service, or None when jobs are off or OpenAI is unset."""
+    if not settings.JOBS_ENABLED or chat_service is None or openai_client is None:
+        return None
+    jobs_dir = Path(settings.JOBS_DIR)
+    return JobService(
+        store=JobStore(jobs_dir / "jobs.db"),
+        provider=create_batch_provider(settings, openai_client),
+        chat_service=chat_service,
+        jobs_dir=jobs_dir,
+        poll_interval=settings.JOBS_POLL_INTERVAL,
+    )
+
+
+async def get_job_service(request: Request) -> JobService:
+    service: JobService | None = getattr(request.app.state, "job_service", None)
+    if service is None:
+        raise HTTPException(status_code=503, detail="Batch jobs are not enabled")
+    return service
@@ -0,0 +1,153 @@
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Literal, Protocol
+from uuid import uuid4
+
+from openai import AsyncOpenAI
+
+from src.app.chat.exceptions import ChatServiceError
+
+BatchStatus = Literal["in_progress", "completed", "failed", "expired", "cancelled"]
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+_OPENAI_STATUSES: dict[str, BatchStatus] = {
+    "validating": "in_progress",
+    "in_progress": "in_progress",
+    "finalizing": "in_progress",
+    "cancelling": "in_progress",
+    "completed": "completed",
+    "failed": "failed",
+    "expired": "expired",
+    "cancelled": "cancelled",
+}
+
+
+@dataclass
+class BatchState:
+    status: BatchStatus
+    error: str | None = None
+
+
+class BatchProvider(Protocol):
+    """Runs a JSONL file of chat completion requests asynchronously.
+
+    Input and output lines use the OpenAI Batch API format, keyed by
+    ``custom_id``.
+    """
+
+    async def submit(self, input_path: Path) -> str:
+        """Start a batch and return its id."""
+        ...
+
+    async def poll(self, batch_id: str) -> BatchState: ...
+
+    async def download(self, batch_id: str, destination: Path) -> None:
+        """Write the output lines of a finished batch, successes and errors."""
+        ...
+
+
+class OpenAIBatchProvider:
+    """The OpenAI Batch API: cheaper and higher-throughput, answered within 24h."""
+
+    def __init__(
+        self, *, client: AsyncOpenAI, completion_window: Literal["24h"] = "24h"
+    ):
+        self.client = client
+        self.completion_window = completion_window
+
+    async def submit(self, input_path: Path) -> str:
+        file = await self.client.files.create(file=input_path, purpose="batch")
+        batch = await self.client.batches.create(
+            input_file_id=file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=self.completion_window,
+        )
+        return batch.id
+
+    async def poll(self, batch_id: str) -> BatchState:
+        batch = await self.client.batches.retrieve(batch_id)
+        error = None
+        if batch.errors is not None and batch.errors.data:
+            error = "; ".join(e.message for e in batch.errors.data if e.message)
+        return BatchState(status=_OPENAI_STATUSES[batch.status], error=error or None)
+
+    async def download(self, batch_id: str, destination: Path) -> None:
+        batch = await self.client.batches.retrieve(batch_id)
+        with destination.open("wb") as output:
+            for file_id in (batch.output_file_id, batch.error_file_id):
+                if file_id is None:
+                    continue
+                content = (await self.client.files.content(file_id)).content
+                output.write(content)
+                if content and not content.endswith(b"\n"):
+                    output.write(b"\n")
+
+
+def _echo(body: dict[str, Any]) -> str:
+    return body["messages"][-1]["content"]
+
+
+class StubBatchProvider:
+    """Answers batches in process, for tests and local development.
+
+    A batch completes once it has been polled ``polls`` times. Each request
+    is answered by ``answer`` (by default an echo of the last message); a
+    ``ChatServiceError`` it raises becomes an error line with its status code.
+    """
+
+    def __init__(
+        self,
+        answer: Callable[[dict[str, Any]], str] = _echo,
+        *,
+        polls: int = 1,
+    ):
+        self.answer = answer
+        self.polls = polls
+        self._batches: dict[str, list[dict[str, Any]]] = {}
+        self._polled: dict[str, int] = {}
+
+    async def submit(self, input_path: Path) -> str:
+        batch_id = f"batch_{uuid4().hex}"
+        self._batches[batch_id] = [
+            json.loads(line) for line in input_path.read_text().splitlines() if line
+        ]
+        self._polled[batch_id] = 0
+        return batch_id
+
+    async def poll(self, batch_id: str) -> BatchState:
+        if batch_id not in self._batches:
+            return BatchState(status="failed", error=f"Unknown batch {batch_id}")
+        self._polled[batch_id] += 1
+        if self._polled[batch_id] < self.polls:
+            return BatchState(status="in_progress")
+        return BatchState(status="completed")
+
+    def _output_line(self, request: dict[str, Any]) -> dict[str, Any]:
+        try:
+            content = self.answer(request["body"])
+        except ChatServiceError as e:
+            response = {
+                "status_code": e.status_code,
+                "body": {"error": {"message": e.message}},
+            }
+        else:
+            response = {
+                "status_code": 200,
+                "body": {
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop",
+                        }
+                    ]
+                },
+            }
+        return {"custom_id": request["custom_id"], "response": response, "error": None}
+
+    async def download(self, batch_id: str, destination: Path) -> None:
+        lines = [json.dumps(self._output_line(r)) for r in self._batches[batch_id]]
+        destination.write_text("".join(line + "\n" for line in lines))
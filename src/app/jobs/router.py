@@ -0,0 +1,65 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+
+from src.app.chat.streaming import NDJSON_MEDIA_TYPE
+from src.app.jobs.dependencies import get_job_service
+from src.app.jobs.schemas import (
+    ACTIVE_JOB_STATUSES,
+    CreateJobRequest,
+    JobResponse,
+)
+from src.app.jobs.service import JobService
+from src.app.jobs.store import Job
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=[
+        "Jobs",
+    ],
+)
+
+
+async def _get_job_or_404(service: JobService, job_id: str) -> Job:
+    job = await service.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("", status_code=202, response_model=JobResponse)
+async def create_job(
+    job_input: CreateJobRequest,
+    service: Annotated[JobService, Depends(get_job_service)],
+):
+    """Queue chat requests for offline processing through the provider batch API."""
+    job = await service.create_job(job_input.requests)
+    return JobResponse.model_validate(job, from_attributes=True)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str, service: Annotated[JobService, Depends(get_job_service)]
+):
+    job = await _get_job_or_404(service, job_id)
+    return JobResponse.model_validate(job, from_attributes=True)
+
+
+@router.get("/{job_id}/results")
+async def get_job_results(
+    job_id: str, service: Annotated[JobService, Depends(get_job_service)]
+):
+    """Stream a finished job's results as NDJSON, one line per request in order.
+
+    Each line has the shape of a ``/chat/batch`` result. Returns 409 while
+    the job is still running or when it failed without results.
+    """
+    job = await _get_job_or_404(service, job_id)
+    if job.status in ACTIVE_JOB_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    if not service.results_path(job_id).exists():
+        raise HTTPException(
+            status_code=409, detail=job.error or f"Job {job.status} without results"
+        )
+    return StreamingResponse(service.iter_results(job_id), media_type=NDJSON_MEDIA_TYPE)
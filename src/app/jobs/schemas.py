@@ -0,0 +1,47 @@
+from datetime import datetime
+from typing import Annotated, Literal
+
+from pydantic import BaseModel, Field
+
+from src.app.chat.schemas import CreateChatRequest
+from src.app.config import get_settings
+
+_settings = get_settings()
+
+JobStatus = Literal[
+    "pending",
+    "submitting",
+    "in_progress",
+    "collating",
+    "completed",
+    "failed",
+    "expired",
+    "cancelled",
+]
+
+# Jobs the poller still has to submit or wait for. "submitting" and
+# "collating" are held by the one task uploading or collecting the batch.
+ACTIVE_JOB_STATUSES: tuple[JobStatus, ...] = (
+    "pending",
+    "submitting",
+    "in_progress",
+    "collating",
+)
+
+
+class CreateJobRequest(BaseModel):
+    requests: Annotated[
+        list[CreateChatRequest],
+        Field(min_length=1, max_length=_settings.JOBS_MAX_REQUESTS),
+    ]
+
+
+class JobResponse(BaseModel):
+    id: str
+    status: JobStatus
+    total: int
+    succeeded: int
+    failed: int
+    error: str | None = None
+    created_at: datetime
+    updated_at: datetime
@@ -0,0 +1,250 @@
+import asyncio
+import json
+import logging
+import time
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+from uuid import uuid4
+
+from src.app.chat.exceptions import EmptyResponseError
+from src.app.chat.schemas import (
+    BatchItemError,
+    BatchItemResult,
+    ChatResponse,
+    CreateChatRequest,
+)
+from src.app.chat.service import ChatService
+from src.app.jobs.providers import BATCH_ENDPOINT, BatchProvider
+from src.app.jobs.store import Job, JobStore
+
+logger = logging.getLogger(__name__)
+
+CUSTOM_ID_PREFIX = "request-"
+
+# A job held "submitting" or "collating" for longer than this is taken over,
+# assuming the process holding it died.
+CLAIM_TIMEOUT_SECONDS = 3600.0
+
+
+def parse_output_line(line: str) -> BatchItemResult:
+    """Convert one Batch API output line into the result of its request."""
+    record = json.loads(line)
+    index = int(record["custom_id"].removeprefix(CUSTOM_ID_PREFIX))
+    if record.get("error"):
+        detail = record["error"].get("message") or "Batch request failed"
+        return BatchItemResult(
+            index=index, error=BatchItemError(status_code=500, detail=detail)
+        )
+    response = record["response"]
+    body = response.get("body") or {}
+    if response["status_code"] != 200:
+        detail = (body.get("error") or {}).get("message") or "Batch request failed"
+        return BatchItemResult(
+            index=index,
+            error=BatchItemError(status_code=response["status_code"], detail=detail),
+        )
+    if not body.get("choices"):
+        empty = EmptyResponseError()
+        return BatchItemResult(
+            index=index,
+            error=BatchItemError(status_code=empty.status_code, detail=empty.message),
+        )
+    message = body["choices"][0]["message"].get("content")
+    return BatchItemResult(index=index, response=ChatResponse(message=message))
+
+
+def collate_results(
+    output_path: Path, results_path: Path, *, total: int, missing_detail: str
+) -> tuple[int, int]:
+    """Write one result per request, in request order.
+
+    Requests without an output line, e.g. because the batch expired first,
+    get an error with ``missing_detail``. Returns (succeeded, failed).
+    """
+    results: dict[int, BatchItemResult] = {}
+    with output_path.open() as output:
+        for line in output:
+            if line.strip():
+                result = parse_output_line(line)
+                results[result.index] = result
+
+    succeeded = 0
+    with results_path.open("w") as destination:
+        for index in range(total):
+            result = results.get(index) or BatchItemResult(
+                index=index,
+                error=BatchItemError(status_code=500, detail=missing_detail),
+            )
+            succeeded += result.error is None
+            destination.write(result.model_dump_json(exclude_none=True) + "\n")
+    return succeeded, total - succeeded
+
+
+class JobService:
+    """Runs chat requests offline through a provider batch.
+
+    Requests are rendered with the chat service's system prompt and history
+    rules into a JSONL input file, recorded in the store and submitted.
+    ``run`` polls active jobs and, once a batch finishes, writes its results
+    in request order next to the input. Jobs left pending or in progress by
+    a previous process are picked up again on the next poll.
+
+    Submitting and collecting a batch are claimed in the store first, so
+    with several pollers (one per worker) each batch is created and
+    collated once.
+    """
+
+    def __init__(
+        self,
+        *,
+        store: JobStore,
+        provider: BatchProvider,
+        chat_service: ChatService,
+        jobs_dir: str | Path,
+        poll_interval: float,
+    ):
+        self.store = store
+        self.provider = provider
+        self.chat_service = chat_service
+        self.jobs_dir = Path(jobs_dir)
+        self.poll_interval = poll_interval
+
+    def _input_path(self, job_id: str) -> Path:
+        return self.jobs_dir / job_id / "input.jsonl"
+
+    def _output_path(self, job_id: str) -> Path:
+        return self.jobs_dir / job_id / "output.jsonl"
+
+    def results_path(self, job_id: str) -> Path:
+        return self.jobs_dir / job_id / "results.jsonl"
+
+    async def get_job(self, job_id: str) -> Job | None:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    def iter_results(self, job_id: str) -> Iterator[str]:
+        """Lines of a finished job's results file, one JSON result per line."""
+        with self.results_path(job_id).open() as results:
+            yield from results
+
+    def _input_lines(self, requests: Sequence[CreateChatRequest]) -> list[str]:
+        # Built on the event loop: the chat service's token caches are not
+        # thread-safe.
+        return [
+            json.dumps(
+                {
+                    "custom_id": f"{CUSTOM_ID_PREFIX}{index}",
+                    "method": "POST",
+                    "url": BATCH_ENDPOINT,
+                    "body": self.chat_service.batch_request_body(request),
+                },
+                ensure_ascii=False,
+            )
+            + "\n"
+            for index, request in enumerate(requests)
+        ]
+
+    def _write_input(self, job_id: str, lines: list[str]) -> None:
+        path = self._input_path(job_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w") as input_file:
+            input_file.writelines(lines)
+
+    async def create_job(self, requests: Sequence[CreateChatRequest]) -> Job:
+        now = time.time()
+        job = Job(
+            id=f"job_{uuid4().hex}",
+            status="pending",
+            total=len(requests),
+            created_at=now,
+            updated_at=now,
+        )
+        await asyncio.to_thread(self._write_input, job.id, self._input_lines(requests))
+        await asyncio.to_thread(self.store.create, job)
+        return await self._submit(job)
+
+    async def _submit(self, job: Job, *, updated_before: float | None = None) -> Job:
+        claimed = await asyncio.to_thread(
+            self.store.claim,
+            job.id,
+            job.status,
+            "submitting",
+            updated_before=updated_before,
+        )
+        if claimed is None:
+            return await asyncio.to_thread(self.store.get, job.id) or job
+        try:
+            batch_id = await self.provider.submit(self._input_path(job.id))
+        except Exception:
+            logger.exception("Submitting job %s failed; retrying on next poll", job.id)
+            return await asyncio.to_thread(self.store.update, job.id, status="pending")
+        return await asyncio.to_thread(
+            self.store.update, job.id, status="in_progress", provider_batch_id=batch_id
+        )
+
+    async def _poll(self, job: Job, *, updated_before: float | None = None) -> Job:
+        state = await self.provider.poll(job.provider_batch_id)
+        if state.status == "in_progress":
+            return job
+        if state.status == "failed":
+            return await asyncio.to_thread(
+                self.store.update,
+                job.id,
+                status="failed",
+                error=state.error or "Provider batch failed",
+            )
+        claimed = await asyncio.to_thread(
+            self.store.claim,
+            job.id,
+            job.status,
+            "collating",
+            updated_before=updated_before,
+        )
+        if claimed is None:
+            return await asyncio.to_thread(self.store.get, job.id) or job
+        output_path = self._output_path(job.id)
+        try:
+            await self.provider.download(job.provider_batch_id, output_path)
+            succeeded, failed = await asyncio.to_thread(
+                collate_results,
+                output_path,
+                self.results_path(job.id),
+                total=job.total,
+                missing_detail=f"Batch {state.status} before this request ran",
+            )
+        except BaseException:
+            await asyncio.to_thread(self.store.update, job.id, status="in_progress")
+            raise
+        return await asyncio.to_thread(
+            self.store.update,
+            job.id,
+            status=state.status,
+            succeeded=succeeded,
+            failed=failed,
+            error=state.error,
+        )
+
+    async def poll_once(self) -> None:
+        stale = time.time() - CLAIM_TIMEOUT_SECONDS
+        for job in await asyncio.to_thread(self.store.active):
+            try:
+                if job.status == "pending":
+                    await self._submit(job)
+                elif job.status == "in_progress":
+                    await self._poll(job)
+                elif job.updated_at < stale:
+                    logger.warning("Taking over job %s left %s", job.id, job.status)
+                    if job.status == "submitting":
+                        await self._submit(job, updated_before=stale)
+                    else:
+                        await self._poll(job, updated_before=stale)
+            except Exception:
+                logger.exception("Polling job %s failed", job.id)
+
+    async def run(self) -> None:
+        """Poll active jobs every ``poll_interval`` seconds until cancelled."""
+        while True:
+            await self.poll_once()
+            await asyncio.sleep(self.poll_interval)
+
+    def close(self) -> None:
+        self.store.close()
@@ -0,0 +1,121 @@
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, fields
+from pathlib import Path
+
+from src.app.jobs.schemas import ACTIVE_JOB_STATUSES, JobStatus
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    succeeded INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    provider_batch_id TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+"""
+
+
+@dataclass
+class Job:
+    id: str
+    status: JobStatus
+    total: int
+    created_at: float
+    updated_at: float
+    succeeded: int = 0
+    failed: int = 0
+    provider_batch_id: str | None = None
+    error: str | None = None
+
+
+_COLUMNS = [field.name for field in fields(Job)]
+
+
+class JobStore:
+    """Job records in a SQLite database, so jobs outlive the process.
+
+    Methods block; async callers run them in a thread. A lock keeps the
+    transactions of concurrent threads on the shared connection apart.
+    """
+
+    def __init__(self, path: str | Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def create(self, job: Job) -> None:
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO jobs ({', '.join(_COLUMNS)}) VALUES ({placeholders})",
+                [getattr(job, column) for column in _COLUMNS],
+            )
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return Job(**row) if row is not None else None
+
+    def update(self, job_id: str, **changes) -> Job:
+        changes["updated_at"] = time.time()
+        assignments = ", ".join(f"{column} = ?" for column in changes)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ?",
+                [*changes.values(), job_id],
+            )
+        job = self.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        return job
+
+    def claim(
+        self,
+        job_id: str,
+        from_status: JobStatus,
+        to_status: JobStatus,
+        *,
+        updated_before: float | None = None,
+    ) -> Job | None:
+        """Move a job from ``from_status`` to ``to_status`` atomically.
+
+        Returns the claimed job, or None when the job is no longer in
+        ``from_status`` (or was updated since ``updated_before``) because
+        another task or process claimed it first.
+        """
+        query = "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?"
+        params: list = [to_status, time.time(), job_id, from_status]
+        if updated_before is not None:
+            query += " AND updated_at < ?"
+            params.append(updated_before)
+        with self._lock, self._conn:
+            claimed = self._conn.execute(query, params).rowcount == 1
+        return self.get(job_id) if claimed else None
+
+    def active(self) -> list[Job]:
+        """Jobs not finished yet, oldest first."""
+        placeholders = ", ".join("?" for _ in ACTIVE_JOB_STATUSES)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM jobs WHERE status IN ({placeholders}) "
+                "ORDER BY created_at",
+                ACTIVE_JOB_STATUSES,
+            ).fetchall()
+        return [Job(**row) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,24 +1,85 @@
 from dataclasses import dataclass
-from fastapi import Depends
-from openai import OpenAI
-from src.app.config import Settings, get_settings
+
+import httpx
+from fastapi import Request
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from src.app.config import Settings
+from src.app.llm_providers.rate_limit import AdaptiveRateLimiter
 
 
 @dataclass
 class OpenAIConfig:
     api_key: str
+    base_url: str | None = None
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    timeout: float = 60.0
+    connect_timeout: float = 5.0
+    # Retries done by the SDK itself; 0 when ProviderScheduler retries instead.
+    max_retries: int = 2
+
+
+def create_http_client(
+    config: OpenAIConfig, rate_limiter: AdaptiveRateLimiter | None = None
+) -> httpx.AsyncClient:
+    """Build the pooled HTTP client, feeding response headers to the limiter."""
+    event_hooks = (
+        {"response": [rate_limiter.observe_response]} if rate_limiter else None
+    )
+    return DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout),
+        http2=config.http2,
+        event_hooks=event_hooks,
+    )
 
 
-def create_openai_client(config: OpenAIConfig) -> OpenAI:
-    return OpenAI(api_key=config.api_key)
+def create_openai_client(
+    config: OpenAIConfig, rate_limiter: AdaptiveRateLimiter | None = None
+) -> AsyncOpenAI:
+    return AsyncOpenAI(
+        api_key=config.api_key,
+        base_url=config.base_url,
+        max_retries=config.max_retries,
+        http_client=create_http_client(config, rate_limiter),
+    )
 
 
 def get_openai_config(settings: Settings):
     if not settings.OPENAI_API_KEY:
         raise ValueError("OPENAI_API_KEY is not set")
-    return OpenAIConfig(api_key=settings.OPENAI_API_KEY)
+    return OpenAIConfig(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_BASE_URL,
+        max_connections=settings.OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY,
+        http2=settings.OPENAI_HTTP2,
+        timeout=settings.OPENAI_TIMEOUT,
+        connect_timeout=settings.OPENAI_CONNECT_TIMEOUT,
+        max_retries=0 if settings.OPENAI_RATE_LIMIT_ENABLED else 2,
+    )
 
 
-def get_chat_openai_client(settings: Settings = Depends(get_settings)) -> OpenAI:
-    config = get_openai_config(settings=settings)
-    return create_openai_client(config)
+def create_shared_openai_client(
+    settings: Settings, rate_limiter: AdaptiveRateLimiter | None = None
+) -> AsyncOpenAI | None:
+    """Build the process-wide client, or None when no API key is configured."""
+    if not settings.OPENAI_API_KEY:
+        return None
+    return create_openai_client(get_openai_config(settings), rate_limiter)
+
+
+async def get_chat_openai_client(request: Request) -> AsyncOpenAI:
+    """Return the client shared by all requests, created in the app lifespan."""
+    client: AsyncOpenAI | None = getattr(request.app.state, "openai_client", None)
+    if client is None:
+        raise ValueError("OPENAI_API_KEY is not set")
+    return client
@@ -0,0 +1,176 @@
+import asyncio
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.app.config import Settings
+from src.app.observability.metrics import observe_hedged_latency, observe_hedging
+
+# Latency samples kept per model to derive the hedging delay.
+LATENCY_WINDOW = 1000
+# Samples needed before the percentile replaces the initial delay.
+MIN_SAMPLES = 20
+# New samples between recomputations of a model's delay.
+DELAY_REFRESH_SAMPLES = 16
+# Hedges that may be saved up while traffic is quiet.
+BUDGET_BURST = 10.0
+
+
+class LatencyTracker:
+    """Sliding window of latency samples."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, q: float) -> float | None:
+        if not self.samples:
+            return None
+        return float(np.percentile(self.samples, q))
+
+
+@dataclass
+class HedgingStats:
+    requests: int = 0
+    hedged: int = 0
+    # Hedged requests answered by the duplicate rather than the original.
+    hedge_wins: int = 0
+    # Slow requests that were not hedged because the budget was spent.
+    budget_denied: int = 0
+
+
+class Hedger:
+    """Sends a duplicate request when the original is slower than usual.
+
+    The delay is the ``percentile`` of recent latencies for the model (or
+    ``initial_delay`` until enough samples exist). Whichever request
+    succeeds first wins and the other is cancelled, or disposed of with
+    ``discard`` if it also completed. A budget refilled by ``max_ratio`` per
+    request caps the share of requests that are hedged, so a slow provider
+    does not get twice the load.
+
+    ``latency`` tracks the latency delivered to callers, for comparison with
+    the per-model latencies of the original requests that drive the delay.
+    An original beaten by its duplicate is recorded at the time it had run,
+    a lower bound of its latency. Both ``stats`` and ``latency`` are also
+    exported to Prometheus.
+    """
+
+    def __init__(
+        self,
+        *,
+        percentile: float,
+        initial_delay: float,
+        max_ratio: float,
+    ):
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.max_ratio = max_ratio
+        self.stats = HedgingStats()
+        self.latency = LatencyTracker()
+        self._trackers: dict[str, LatencyTracker] = {}
+        self._delays: dict[str, tuple[int, float]] = {}
+        self._budget = BUDGET_BURST
+
+    def delay(self, model: str) -> float:
+        tracker = self._trackers.get(model)
+        if tracker is None or len(tracker) < MIN_SAMPLES:
+            return self.initial_delay
+        computed_at, delay = self._delays.get(model, (-DELAY_REFRESH_SAMPLES, 0.0))
+        if tracker.count - computed_at >= DELAY_REFRESH_SAMPLES:
+            delay = tracker.percentile(self.percentile)
+            self._delays[model] = (tracker.count, delay)
+        return delay
+
+    def _spend_budget(self) -> bool:
+        if self._budget < 1:
+            self.stats.budget_denied += 1
+            observe_hedging("budget_denied")
+            return False
+        self._budget -= 1
+        self.stats.hedged += 1
+        observe_hedging("hedged")
+        return True
+
+    async def run[T](
+        self,
+        model: str,
+        operation: Callable[[], Awaitable[T]],
+        *,
+        discard: Callable[[T], Awaitable[None]] | None = None,
+    ) -> T:
+        tracker = self._trackers.setdefault(model, LatencyTracker())
+        self.stats.requests += 1
+        observe_hedging("requests")
+        self._budget = min(BUDGET_BURST, self._budget + self.max_ratio)
+        started = time.perf_counter()
+
+        primary = asyncio.ensure_future(operation())
+        tasks = [primary]
+        winner: asyncio.Future[T] | None = None
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.delay(model))
+            if done or not self._spend_budget():
+                result = await primary
+                winner = primary
+            else:
+                tasks.append(asyncio.ensure_future(operation()))
+                pending = set(tasks)
+                while pending and winner is None:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    succeeded = [
+                        task
+                        for task in tasks
+                        if task in done and task.exception() is None
+                    ]
+                    if succeeded:
+                        winner = succeeded[0]
+                if winner is None:
+                    # Both failed: report the original request's error.
+                    raise primary.exception()
+                if winner is not primary:
+                    self.stats.hedge_wins += 1
+                    observe_hedging("hedge_wins")
+                result = winner.result()
+        finally:
+            for task in tasks:
+                if task is winner:
+                    continue
+                if not task.done():
+                    task.cancel()
+                elif (
+                    discard is not None
+                    and not task.cancelled()
+                    and task.exception() is None
+                ):
+                    await discard(task.result())
+
+        elapsed = time.perf_counter() - started
+        # When the duplicate wins, the original took at least this long;
+        # dropping it would bias the delay towards the fast requests.
+        tracker.record(elapsed)
+        self.latency.record(elapsed)
+        observe_hedged_latency(elapsed)
+        return result
+
+
+def create_hedger(settings: Settings) -> Hedger | None:
+    if not settings.HEDGING_ENABLED:
+        return None
+    return Hedger(
+        percentile=settings.HEDGING_PERCENTILE,
+        initial_delay=settings.HEDGING_INITIAL_DELAY,
+        max_ratio=settings.HEDGING_MAX_RATIO,
+    )
@@ -0,0 +1,329 @@
+import asyncio
+import math
+import random
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Mapping
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+import httpx
+from openai import APIConnectionError, RateLimitError
+
+from src.app.config import Settings
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+# Models whose limits are tracked; the least recently used are forgotten.
+MAX_MODELS = 100
+
+# The model of the provider call in progress, for the httpx response hook.
+_calling_model: ContextVar[str | None] = ContextVar("calling_model", default=None)
+
+
+class RateLimitDeadlineExceeded(Exception):
+    """A provider call could not be admitted or retried before its deadline."""
+
+
+def parse_duration(value: str | None) -> float | None:
+    """Parse OpenAI reset durations such as ``1s``, ``6m0s`` or ``20ms``."""
+    if not value:
+        return None
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+def _parse_int(value: str | None) -> int | None:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def retry_after_seconds(headers: Mapping[str, str]) -> float | None:
+    """Delay requested by a 429 response, if the provider sent one."""
+    if (milliseconds := headers.get("retry-after-ms")) is not None:
+        try:
+            return float(milliseconds) / 1000
+        except ValueError:
+            pass
+    return parse_duration(headers.get("retry-after"))
+
+
+class TokenBucket:
+    """A bucket refilled continuously at ``capacity`` units per minute.
+
+    An unknown limit is modelled as an infinite bucket that never waits.
+    """
+
+    def __init__(
+        self, per_minute: float | None, *, clock: Callable[[], float] = time.monotonic
+    ):
+        self.capacity = float(per_minute) if per_minute else math.inf
+        self.level = self.capacity
+        self.clock = clock
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        if math.isfinite(self.capacity):
+            self.level = min(
+                self.capacity, self.level + (now - self._updated) * self.capacity / 60
+            )
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` units are available."""
+        self._refill()
+        deficit = min(amount, self.capacity) - self.level
+        return deficit * 60 / self.capacity if deficit > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+    def observe(self, limit: int | None, remaining: int | None) -> None:
+        """Adopt the limit and remaining quota reported by the provider.
+
+        The remaining quota only ever lowers the level: the provider counts
+        calls from other workers too, while calls still in flight here are
+        not yet reflected in its numbers.
+        """
+        self._refill()
+        if limit:
+            self.capacity = float(limit)
+            self.level = min(self.level, self.capacity)
+        if remaining is not None and math.isfinite(self.capacity):
+            self.level = min(self.level, float(remaining))
+
+
+@dataclass
+class RateLimiterStats:
+    admitted: int = 0
+    # Calls that had to wait for quota, and for how long in total.
+    queued: int = 0
+    queued_seconds: float = 0.0
+    # Calls that could not be admitted before their deadline.
+    rejected: int = 0
+    # 429 responses that paused the limiter.
+    throttled: int = 0
+
+
+class ModelLimits:
+    """Request and token buckets, and the 429 pause, of one model."""
+
+    def __init__(
+        self,
+        *,
+        requests_per_minute: int | None,
+        tokens_per_minute: int | None,
+        clock: Callable[[], float],
+    ):
+        self.requests = TokenBucket(requests_per_minute, clock=clock)
+        self.tokens = TokenBucket(tokens_per_minute, clock=clock)
+        self.paused_until = 0.0
+        self.lock = asyncio.Lock()
+
+
+class AdaptiveRateLimiter:
+    """Client-side limiter for requests and tokens per minute, per model.
+
+    Providers limit each model separately, so every model has its own
+    buckets and a 429 only pauses calls to the model that got it. Limits
+    start from configuration (or unlimited) and are learnt from the
+    ``x-ratelimit-*`` headers of every provider response via
+    ``observe_response``, an httpx response hook, for the model the
+    scheduler is calling. Calls queue in FIFO order until both buckets
+    have room instead of failing with a 429.
+    """
+
+    def __init__(
+        self,
+        *,
+        requests_per_minute: int | None = None,
+        tokens_per_minute: int | None = None,
+        max_models: int = MAX_MODELS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_models = max_models
+        self.clock = clock
+        self.stats = RateLimiterStats()
+        self._models: OrderedDict[str, ModelLimits] = OrderedDict()
+
+    def limits(self, model: str) -> ModelLimits:
+        """The limits of ``model``, created from configuration on first use."""
+        limits = self._models.get(model)
+        if limits is None:
+            limits = self._models[model] = ModelLimits(
+                requests_per_minute=self.requests_per_minute,
+                tokens_per_minute=self.tokens_per_minute,
+                clock=self.clock,
+            )
+            # Model names come from clients: forget the least recently used.
+            if len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+        else:
+            self._models.move_to_end(model)
+        return limits
+
+    def _wait_time(self, limits: ModelLimits, tokens: int) -> float:
+        return max(
+            limits.paused_until - self.clock(),
+            limits.requests.wait_time(1),
+            limits.tokens.wait_time(tokens),
+        )
+
+    async def acquire(self, model: str, tokens: int, *, deadline: float) -> None:
+        """Wait until a call to ``model`` costing ``tokens`` may be sent.
+
+        Raises ``RateLimitDeadlineExceeded`` instead of waiting past
+        ``deadline`` (a ``clock`` timestamp).
+        """
+        limits = self.limits(model)
+        started = self.clock()
+        try:
+            async with asyncio.timeout(max(0.0, deadline - started)):
+                async with limits.lock:
+                    while (wait := self._wait_time(limits, tokens)) > 0:
+                        if self.clock() + wait > deadline:
+                            raise RateLimitDeadlineExceeded(
+                                f"Rate limit quota frees up in {wait:.1f}s"
+                            )
+                        await asyncio.sleep(wait)
+                    limits.requests.take(1)
+                    limits.tokens.take(tokens)
+        except TimeoutError as e:
+            self.stats.rejected += 1
+            raise RateLimitDeadlineExceeded(
+                "Timed out waiting for rate limit quota"
+            ) from e
+        except RateLimitDeadlineExceeded:
+            self.stats.rejected += 1
+            raise
+        waited = self.clock() - started
+        if waited > 0:
+            self.stats.queued += 1
+            self.stats.queued_seconds += waited
+        self.stats.admitted += 1
+
+    def pause(self, model: str, seconds: float) -> None:
+        """Hold every queued call to ``model`` for ``seconds`` after a 429."""
+        self.stats.throttled += 1
+        limits = self.limits(model)
+        limits.paused_until = max(limits.paused_until, self.clock() + seconds)
+
+    def observe(self, model: str, headers: Mapping[str, str]) -> None:
+        limits = self.limits(model)
+        limits.requests.observe(
+            _parse_int(headers.get("x-ratelimit-limit-requests")),
+            _parse_int(headers.get("x-ratelimit-remaining-requests")),
+        )
+        limits.tokens.observe(
+            _parse_int(headers.get("x-ratelimit-limit-tokens")),
+            _parse_int(headers.get("x-ratelimit-remaining-tokens")),
+        )
+
+    async def observe_response(self, response: httpx.Response) -> None:
+        # Only responses to calls made by a ProviderScheduler are attributed.
+        model = _calling_model.get()
+        if model is not None:
+            self.observe(model, response.headers)
+
+
+@dataclass
+class SchedulerStats:
+    retries: int = 0
+    # Calls that failed after exhausting their deadline.
+    gave_up: int = 0
+
+
+class ProviderScheduler:
+    """Admits provider calls through the limiter and retries transient errors.
+
+    429s and connection errors are retried with full-jitter exponential
+    backoff, never sooner than the provider's ``retry-after``, for as long
+    as the retry still starts before the per-call deadline. The last error
+    is re-raised otherwise.
+    """
+
+    def __init__(
+        self,
+        *,
+        limiter: AdaptiveRateLimiter,
+        deadline_seconds: float,
+        base_delay: float,
+        max_delay: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.limiter = limiter
+        self.deadline_seconds = deadline_seconds
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.clock = clock
+        self.stats = SchedulerStats()
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    async def run[T](
+        self, call: Callable[[], Awaitable[T]], *, model: str, tokens: int
+    ) -> T:
+        """Run ``call``, a request to ``model`` that may use ``tokens`` tokens.
+
+        ``tokens`` counts the prompt and the completion budget, as the
+        provider does when it admits a request.
+        """
+        deadline = self.clock() + self.deadline_seconds
+        attempt = 0
+        while True:
+            await self.limiter.acquire(model, tokens, deadline=deadline)
+            reset = _calling_model.set(model)
+            try:
+                return await call()
+            except (RateLimitError, APIConnectionError) as e:
+                delay = self.backoff(attempt)
+                if isinstance(e, RateLimitError):
+                    # Quota exhaustion is a billing problem, not congestion.
+                    if e.code == "insufficient_quota":
+                        raise
+                    delay = max(delay, retry_after_seconds(e.response.headers) or 0)
+                    self.limiter.pause(model, delay)
+                if self.clock() + delay >= deadline:
+                    self.stats.gave_up += 1
+                    raise
+                attempt += 1
+                self.stats.retries += 1
+                await asyncio.sleep(delay)
+            finally:
+                _calling_model.reset(reset)
+
+
+def create_rate_limiter(settings: Settings) -> AdaptiveRateLimiter | None:
+    if not settings.OPENAI_RATE_LIMIT_ENABLED:
+        return None
+    return AdaptiveRateLimiter(
+        requests_per_minute=settings.OPENAI_REQUESTS_PER_MINUTE,
+        tokens_per_minute=settings.OPENAI_TOKENS_PER_MINUTE,
+    )
+
+
+def create_provider_scheduler(
+    settings: Settings, limiter: AdaptiveRateLimiter | None
+) -> ProviderScheduler | None:
+    if limiter is None:
+        return None
+    return ProviderScheduler(
+        limiter=limiter,
+        deadline_seconds=settings.OPENAI_RETRY_DEADLINE,
+        base_delay=settings.OPENAI_RETRY_BASE_DELAY,
+        max_delay=settings.OPENAI_RETRY_MAX_DELAY,
+    )
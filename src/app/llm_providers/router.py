@@ -0,0 +1,225 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from typing import Literal
+
+from openai import APIConnectionError, AsyncOpenAI, InternalServerError
+from opentelemetry import trace
+
+from src.app.config import Settings
+from src.app.llm_providers.client import OpenAIConfig, create_openai_client
+
+RoutingStrategy = Literal["ewma", "least_in_flight"]
+
+# Weight of the newest latency sample in the moving average.
+EWMA_ALPHA = 0.2
+
+
+class NoHealthyBackendError(Exception):
+    """Every backend serving a model is ejected or has failed."""
+
+
+class CircuitBreaker:
+    """Ejects a backend after consecutive failures.
+
+    After ``failure_threshold`` failures in a row the circuit opens and the
+    backend is skipped for ``recovery_seconds``. Then a single probe call is
+    let through (half-open): success closes the circuit, failure reopens it.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int,
+        recovery_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> Literal["closed", "open", "half_open"]:
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at >= self.recovery_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def release_probe(self) -> None:
+        """Let another call probe after this one was cancelled."""
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self.opened_at = self.clock()
+        self._probing = False
+
+
+@dataclass
+class Backend:
+    """One OpenAI-compatible endpoint and its live health statistics."""
+
+    name: str
+    client: AsyncOpenAI
+    breaker: CircuitBreaker
+    # fnmatch patterns of the models served here; empty serves every model.
+    models: Sequence[str] = ()
+    ewma_latency: float | None = None
+    in_flight: int = 0
+    requests: int = 0
+    failures: int = 0
+    failovers: int = 0
+
+    def serves(self, model: str) -> bool:
+        return not self.models or any(
+            fnmatchcase(model, pattern) for pattern in self.models
+        )
+
+    def record_latency(self, seconds: float) -> None:
+        if self.ewma_latency is None:
+            self.ewma_latency = seconds
+        else:
+            self.ewma_latency += EWMA_ALPHA * (seconds - self.ewma_latency)
+
+
+class ProviderRouter:
+    """Routes each model to a pool of backends with failover.
+
+    Candidates are ordered by ``strategy``: the lowest moving-average latency
+    (backends without samples first, so new ones get traffic) or the fewest
+    requests in flight. Connection errors and 5xx responses count against a
+    backend's circuit breaker and move the call to the next candidate; other
+    errors are returned as they are.
+
+    Latency is measured until ``create`` returns, i.e. the full completion
+    for blocking calls and the response headers for streams.
+    """
+
+    def __init__(
+        self,
+        backends: Sequence[Backend],
+        *,
+        strategy: RoutingStrategy = "ewma",
+    ):
+        self.backends = list(backends)
+        self.strategy = strategy
+
+    def _load(self, backend: Backend) -> tuple[float, float]:
+        latency = backend.ewma_latency or 0.0
+        if self.strategy == "least_in_flight":
+            return backend.in_flight, latency
+        return latency, backend.in_flight
+
+    def candidates(self, model: str) -> list[Backend]:
+        """Backends serving ``model``, best first."""
+        return sorted(
+            (backend for backend in self.backends if backend.serves(model)),
+            key=self._load,
+        )
+
+    async def call[T](
+        self, model: str, operation: Callable[[AsyncOpenAI], Awaitable[T]]
+    ) -> T:
+        candidates = self.candidates(model)
+        if not candidates:
+            raise NoHealthyBackendError(f"No provider backend serves model {model!r}")
+        last_error: Exception | None = None
+        for backend in candidates:
+            if not backend.breaker.allow():
+                continue
+            if last_error is not None:
+                backend.failovers += 1
+            backend.in_flight += 1
+            backend.requests += 1
+            trace.get_current_span().set_attribute(
+                "chat.provider.backend", backend.name
+            )
+            started = time.perf_counter()
+            try:
+                result = await operation(backend.client)
+            except (APIConnectionError, InternalServerError) as e:
+                backend.failures += 1
+                backend.breaker.record_failure()
+                last_error = e
+                continue
+            except asyncio.CancelledError:
+                backend.breaker.release_probe()
+                raise
+            except Exception:
+                # The backend answered; the request itself was at fault.
+                backend.breaker.record_success()
+                raise
+            else:
+                backend.record_latency(time.perf_counter() - started)
+                backend.breaker.record_success()
+                return result
+            finally:
+                backend.in_flight -= 1
+        if last_error is not None:
+            raise last_error
+        raise NoHealthyBackendError(f"Every backend for model {model!r} is ejected")
+
+    async def close(self) -> None:
+        for backend in self.backends:
+            await backend.client.close()
+
+
+def create_provider_router(settings: Settings) -> ProviderRouter | None:
+    """Build a router over OPENAI_BACKENDS, or None when none are configured.
+
+    Every backend gets its own connection pool sized by the OPENAI_* pool
+    settings; a backend without an api_key uses OPENAI_API_KEY. Backend
+    clients do not feed the shared rate limiter, whose learnt limits are
+    those of the default OpenAI account.
+    """
+    if not settings.OPENAI_BACKENDS:
+        return None
+    backends = []
+    for backend in settings.OPENAI_BACKENDS:
+        api_key = backend.api_key or settings.OPENAI_API_KEY
+        if not api_key:
+            raise ValueError(f"Provider backend {backend.name!r} has no api_key")
+        config = OpenAIConfig(
+            api_key=api_key,
+            base_url=backend.base_url,
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY,
+            http2=settings.OPENAI_HTTP2,
+            timeout=settings.OPENAI_TIMEOUT,
+            connect_timeout=settings.OPENAI_CONNECT_TIMEOUT,
+            max_retries=0,
+        )
+        backends.append(
+            Backend(
+                name=backend.name,
+                client=create_openai_client(config),
+                models=backend.models,
+                breaker=CircuitBreaker(
+                    failure_threshold=settings.PROVIDER_FAILURE_THRESHOLD,
+                    recovery_seconds=settings.PROVIDER_RECOVERY_SECONDS,
+                ),
+            )
+        )
+    return ProviderRouter(backends, strategy=settings.PROVIDER_ROUTING_STRATEGY)
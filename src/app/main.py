@@ -1,7 +1,111 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import FastAPI, Response
+from opentelemetry import trace
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from src.app.chat.cache import create_response_cache
+from src.app.chat.dependencies import create_chat_service
 from src.app.chat.router import router as chat_router
+from src.app.chat.semantic_cache import create_semantic_cache
+from src.app.chat.summary import create_summarizer
+from src.app.config import get_settings
+from src.app.conversations.dependencies import create_conversation_service
+from src.app.conversations.router import router as conversations_router
+from src.app.jobs.dependencies import create_job_service
+from src.app.jobs.router import router as jobs_router
+from src.app.llm_providers.client import create_shared_openai_client
+from src.app.llm_providers.rate_limit import (
+    create_provider_scheduler,
+    create_rate_limiter,
+)
+from src.app.llm_providers.router import create_provider_router
+from src.app.observability.metrics import MetricsMiddleware
+from src.app.observability.tracing import TracingMiddleware, create_tracer_provider
+from src.app.retrieval.dependencies import create_retriever
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the OpenAI client, retriever, caches and services per process."""
+    settings = get_settings()
+    tracer_provider = create_tracer_provider(settings)
+    if tracer_provider is not None:
+        trace.set_tracer_provider(tracer_provider)
+    app.state.rate_limiter = create_rate_limiter(settings)
+    app.state.openai_client = create_shared_openai_client(
+        settings, app.state.rate_limiter
+    )
+    app.state.provider_router = create_provider_router(settings)
+    app.state.retriever = create_retriever(settings, app.state.openai_client)
+    app.state.response_cache = create_response_cache(settings)
+    app.state.semantic_cache = create_semantic_cache(settings, app.state.openai_client)
+    app.state.summarizer = create_summarizer(settings)
+    app.state.chat_service = (
+        create_chat_service(
+            settings,
+            openai_client=app.state.openai_client,
+            retriever=app.state.retriever,
+            response_cache=app.state.response_cache,
+            semantic_cache=app.state.semantic_cache,
+            summarizer=app.state.summarizer,
+            scheduler=create_provider_scheduler(settings, app.state.rate_limiter),
+            router=app.state.provider_router,
+        )
+        if app.state.openai_client is not None
+        else None
+    )
+    app.state.conversation_service = create_conversation_service(
+        settings, chat_service=app.state.chat_service
+    )
+    app.state.job_service = create_job_service(
+        settings,
+        chat_service=app.state.chat_service,
+        openai_client=app.state.openai_client,
+    )
+    job_poller = (
+        asyncio.create_task(app.state.job_service.run())
+        if app.state.job_service is not None
+        else None
+    )
+    index_watcher = (
+        asyncio.create_task(
+            app.state.retriever.watch_index(settings.RETRIEVAL_INDEX_RELOAD_SECONDS)
+        )
+        if app.state.retriever is not None
+        and settings.RETRIEVAL_INDEX_RELOAD_SECONDS > 0
+        else None
+    )
+    try:
+        yield
+    finally:
+        if index_watcher is not None:
+            index_watcher.cancel()
+            with suppress(asyncio.CancelledError):
+                await index_watcher
+        if job_poller is not None:
+            job_poller.cancel()
+            with suppress(asyncio.CancelledError):
+                await job_poller
+            app.state.job_service.close()
+        if app.state.conversation_service is not None:
+            await app.state.conversation_service.close()
+        if app.state.summarizer is not None:
+            await app.state.summarizer.close()
+        if app.state.response_cache is not None:
+            await app.state.response_cache.close()
+        if app.state.provider_router is not None:
+            await app.state.provider_router.close()
+        if app.state.openai_client is not None:
+            await app.state.openai_client.close()
+        if tracer_provider is not None:
+            tracer_provider.shutdown()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
 
 
 @app.get("/health")
@@ -10,4 +114,12 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics in the text exposition format."""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 app.include_router(chat_router)
+app.include_router(conversations_router)
+app.include_router(jobs_router)
@@ -0,0 +1,246 @@
+"""Prometheus metrics for the chat pipeline.
+
+Metrics are module-level, as prometheus_client expects. Stage label children
+are bound at import and per-model and per-route children are memoised, so a
+sample on the hot path costs a dict lookup and a histogram update.
+"""
+
+import time
+from typing import Literal, get_args
+
+from openai.types import CompletionUsage
+from prometheus_client import Counter, Gauge, Histogram
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.app.chat.exceptions import ChatServiceError
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+STAGE_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 60)
+TOKEN_BUCKETS = (16, 64, 256, 1024, 4096, 16384, 65536, 262144)
+
+# Distinct model label values kept; further models are reported as "other"
+# so client-supplied model names cannot grow the series without bound.
+MAX_MODEL_LABELS = 100
+OTHER_MODEL = "other"
+
+Stage = Literal[
+    "validation", "history", "prompt", "retrieval", "provider", "serialization"
+]
+RetrievalCacheName = Literal["embedding", "result"]
+# Mirror the fields of chat.cache.CacheStats and llm_providers.hedging.HedgingStats.
+ResponseCacheEvent = Literal["hits", "misses", "evictions", "expirations"]
+HedgingEvent = Literal["requests", "hedged", "hedge_wins", "budget_denied"]
+
+REQUEST_SECONDS = Histogram(
+    "chat_request_duration_seconds",
+    "Latency of API requests, until the last body byte for streams.",
+    ["route"],
+    buckets=LATENCY_BUCKETS,
+)
+PROVIDER_SECONDS = Histogram(
+    "chat_provider_duration_seconds",
+    "Latency of successful provider completion calls (headers for streams).",
+    ["model"],
+    buckets=LATENCY_BUCKETS,
+)
+TIME_TO_FIRST_TOKEN_SECONDS = Histogram(
+    "chat_time_to_first_token_seconds",
+    "Time from the start of a streamed answer to its first content delta.",
+    ["model"],
+    buckets=LATENCY_BUCKETS,
+)
+PROMPT_TOKENS = Histogram(
+    "chat_prompt_tokens",
+    "Prompt tokens per provider call, as reported by the provider.",
+    ["model"],
+    buckets=TOKEN_BUCKETS,
+)
+COMPLETION_TOKENS = Histogram(
+    "chat_completion_tokens",
+    "Completion tokens per provider call, as reported by the provider.",
+    ["model"],
+    buckets=TOKEN_BUCKETS,
+)
+STAGE_SECONDS = Histogram(
+    "chat_stage_duration_seconds",
+    "Time spent in each stage of the chat pipeline.",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+ERRORS = Counter(
+    "chat_errors_total",
+    "Chat service errors by error type and model.",
+    ["error", "model"],
+)
+
+RETRIEVAL_CACHE_LOOKUPS = Counter(
+    "retrieval_cache_lookups_total",
+    "Retrieval cache lookups by cache and outcome (hit or miss).",
+    ["cache", "result"],
+)
+RETRIEVAL_CACHE_BYTES = Gauge(
+    "retrieval_cache_bytes",
+    "Bytes held by each retrieval cache.",
+    ["cache"],
+)
+RESPONSE_CACHE_EVENTS = Counter(
+    "response_cache_events_total",
+    "Response cache hits and misses, and entries evicted from or expired in "
+    "its in-process LRU.",
+    ["event"],
+)
+SEMANTIC_CACHE_LOOKUPS = Counter(
+    "semantic_cache_lookups_total",
+    "Semantic cache lookups by outcome (hit or miss); their ratio is the hit rate.",
+    ["result"],
+)
+SEMANTIC_CACHE_LATENCY_SAVED = Counter(
+    "semantic_cache_latency_saved_seconds_total",
+    "Provider time avoided by semantic cache hits, as measured when the "
+    "answers were generated.",
+)
+HEDGING_EVENTS = Counter(
+    "provider_hedging_events_total",
+    "Hedged provider calls: requests, duplicates sent, duplicate wins and "
+    "duplicates denied by the budget.",
+    ["event"],
+)
+HEDGED_REQUEST_SECONDS = Histogram(
+    "provider_hedged_request_duration_seconds",
+    "Latency delivered to callers by provider calls run through the hedger.",
+    buckets=LATENCY_BUCKETS,
+)
+
+_STAGES = {stage: STAGE_SECONDS.labels(stage) for stage in get_args(Stage)}
+_CACHE_LOOKUPS = {
+    (cache, hit): RETRIEVAL_CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss")
+    for cache in get_args(RetrievalCacheName)
+    for hit in (True, False)
+}
+_CACHE_BYTES = {
+    cache: RETRIEVAL_CACHE_BYTES.labels(cache) for cache in get_args(RetrievalCacheName)
+}
+_RESPONSE_CACHE_EVENTS = {
+    event: RESPONSE_CACHE_EVENTS.labels(event) for event in get_args(ResponseCacheEvent)
+}
+_SEMANTIC_CACHE_LOOKUPS = {
+    hit: SEMANTIC_CACHE_LOOKUPS.labels("hit" if hit else "miss")
+    for hit in (True, False)
+}
+_HEDGING_EVENTS = {
+    event: HEDGING_EVENTS.labels(event) for event in get_args(HedgingEvent)
+}
+_ROUTES: dict[str, Histogram] = {}
+
+
+class ModelMetrics:
+    """Label children of the per-model metrics for one model."""
+
+    __slots__ = (
+        "completion_tokens",
+        "label",
+        "prompt_tokens",
+        "provider_seconds",
+        "time_to_first_token",
+    )
+
+    def __init__(self, label: str):
+        self.label = label
+        self.provider_seconds = PROVIDER_SECONDS.labels(label)
+        self.time_to_first_token = TIME_TO_FIRST_TOKEN_SECONDS.labels(label)
+        self.prompt_tokens = PROMPT_TOKENS.labels(label)
+        self.completion_tokens = COMPLETION_TOKENS.labels(label)
+
+
+_MODELS: dict[str, ModelMetrics] = {}
+
+
+def model_metrics(model: str) -> ModelMetrics:
+    metrics = _MODELS.get(model)
+    if metrics is None:
+        if len(_MODELS) >= MAX_MODEL_LABELS:
+            model = OTHER_MODEL
+        metrics = _MODELS.get(model)
+        if metrics is None:
+            metrics = _MODELS[model] = ModelMetrics(model)
+    return metrics
+
+
+def observe_stage(stage: Stage, started: float) -> float:
+    """Record the time since ``started`` (a perf_counter value) for ``stage``.
+
+    Returns the current perf_counter value, so consecutive stages can be
+    timed with one clock read each.
+    """
+    now = time.perf_counter()
+    _STAGES[stage].observe(now - started)
+    return now
+
+
+def observe_usage(model: str, usage: CompletionUsage) -> None:
+    """Record the token counts of a provider response's ``usage``."""
+    metrics = model_metrics(model)
+    metrics.prompt_tokens.observe(usage.prompt_tokens)
+    metrics.completion_tokens.observe(usage.completion_tokens)
+
+
+def observe_cache_lookup(cache: RetrievalCacheName, hit: bool) -> None:
+    _CACHE_LOOKUPS[cache, hit].inc()
+
+
+def set_cache_bytes(cache: RetrievalCacheName, size_bytes: int) -> None:
+    _CACHE_BYTES[cache].set(size_bytes)
+
+
+def observe_response_cache(event: ResponseCacheEvent) -> None:
+    _RESPONSE_CACHE_EVENTS[event].inc()
+
+
+def observe_semantic_cache_lookup(hit: bool, latency_saved: float = 0.0) -> None:
+    _SEMANTIC_CACHE_LOOKUPS[hit].inc()
+    if latency_saved:
+        SEMANTIC_CACHE_LATENCY_SAVED.inc(latency_saved)
+
+
+def observe_hedging(event: HedgingEvent) -> None:
+    _HEDGING_EVENTS[event].inc()
+
+
+def observe_hedged_latency(seconds: float) -> None:
+    HEDGED_REQUEST_SECONDS.observe(seconds)
+
+
+def record_error(error: ChatServiceError, model: str) -> None:
+    ERRORS.labels(type(error).__name__, model_metrics(model).label).inc()
+
+
+def request_started(scope: Scope) -> float:
+    """When ``MetricsMiddleware`` received the request, or now without it."""
+    return scope.get("state", {}).get("request_started") or time.perf_counter()
+
+
+class MetricsMiddleware:
+    """Records request latency per route template.
+
+    The start time is also kept in the request state so handlers can
+    attribute the time before them (body parsing and validation) to a stage.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        scope.setdefault("state", {})["request_started"] = started
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route = scope.get("route")
+            if route is not None:
+                histogram = _ROUTES.get(route.path)
+                if histogram is None:
+                    histogram = _ROUTES[route.path] = REQUEST_SECONDS.labels(route.path)
+                histogram.observe(time.perf_counter() - started)
@@ -0,0 +1,104 @@
+"""OpenTelemetry tracing for the chat pipeline.
+
+Spans are created through the global tracer provider, which is a no-op
+until ``create_tracer_provider`` is installed in the lifespan. With
+sampling off, a span is a shared non-recording object; attributes that
+cost anything to compute are only set when ``span.is_recording()``.
+"""
+
+from contextlib import AbstractContextManager, nullcontext
+
+from opentelemetry import propagate, trace
+from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.app.config import Settings
+
+tracer = trace.get_tracer("src.app")
+
+# GenAI semantic convention attribute names.
+GEN_AI_SYSTEM = "gen_ai.system"
+GEN_AI_REQUEST_MODEL = "gen_ai.request.model"
+GEN_AI_INPUT_TOKENS = "gen_ai.usage.input_tokens"
+GEN_AI_OUTPUT_TOKENS = "gen_ai.usage.output_tokens"
+
+
+def start_span(
+    name: str, *, kind: trace.SpanKind = trace.SpanKind.INTERNAL
+) -> AbstractContextManager[trace.Span]:
+    """Start a span as the current span, unless its parent was sampled out.
+
+    Under the ParentBased sampler the children of an unsampled span are
+    never recorded, so they are not created at all: the unsampled parent
+    is returned instead, and attributes set on it are dropped.
+    """
+    parent = trace.get_current_span()
+    if parent.get_span_context().is_valid and not parent.is_recording():
+        return nullcontext(parent)
+    return tracer.start_as_current_span(name, kind=kind)
+
+
+def create_tracer_provider(
+    settings: Settings, exporter: SpanExporter | None = None
+) -> TracerProvider | None:
+    """Build a provider exporting over OTLP/HTTP, or None when tracing is off.
+
+    Root spans are sampled with TRACING_SAMPLE_RATIO; child spans, including
+    those of requests carrying a ``traceparent`` header, follow their parent.
+    """
+    if not settings.TRACING_ENABLED:
+        return None
+    if exporter is None:
+        exporter = OTLPSpanExporter(
+            endpoint=settings.OTEL_EXPORTER_OTLP_TRACES_ENDPOINT
+        )
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.OTEL_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)),
+    )
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    return provider
+
+
+_PROPAGATION_HEADERS = (b"traceparent", b"tracestate", b"baggage")
+
+
+def _trace_headers(scope: Scope) -> dict[str, str]:
+    return {
+        key.decode("latin-1"): value.decode("latin-1")
+        for key, value in scope["headers"]
+        if key in _PROPAGATION_HEADERS
+    }
+
+
+class TracingMiddleware:
+    """Opens a server span per HTTP request, continuing any incoming trace.
+
+    The span is named after the route template once routing is done, e.g.
+    ``POST /chat``, and is the parent of the spans of dependencies and the
+    route handler.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with tracer.start_as_current_span(
+            scope["method"],
+            context=propagate.extract(_trace_headers(scope)),
+            kind=trace.SpanKind.SERVER,
+        ) as span:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                route = scope.get("route")
+                if route is not None and span.is_recording():
+                    span.update_name(f"{scope['method']} {route.path}")
+                    span.set_attribute("http.route", route.path)
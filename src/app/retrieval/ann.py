@@ -0,0 +1,202 @@
+"""Inverted-file index with product quantisation (IVF-PQ) in pure NumPy.
+
+Vectors are assigned to the nearest of ``nlist`` coarse k-means centroids.
+The residual (vector minus centroid) is split into ``m`` sub-vectors, each
+encoded as one byte: the id of its nearest of 256 sub-centroids. A query
+scores only the vectors in its ``nprobe`` closest lists, using a per-query
+lookup table of sub-centroid inner products, and optionally re-scores the
+best ``rerank`` candidates exactly against the stored vectors.
+
+The IVF files live next to the memory-mapped store (see ``store.py``) and
+are opened with ``np.load(mmap_mode="r")``.
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from src.app.retrieval.schemas import Chunk
+from src.app.retrieval.store import MmapVectorIndex
+
+IVF_MANIFEST_KEY = "ivfpq"
+CENTROIDS_FILE = "ivf_centroids.npy"
+CODEBOOKS_FILE = "pq_codebooks.npy"
+CODES_FILE = "ivf_codes.npy"
+IDS_FILE = "ivf_ids.npy"
+LIST_OFFSETS_FILE = "ivf_list_offsets.npy"
+
+# Rows processed at once when assigning vectors to centroids.
+ASSIGN_BLOCK_ROWS = 8192
+
+
+def assign(data: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Return the index of the nearest (L2) centroid for every row."""
+    half_norms = 0.5 * np.einsum("ij,ij->i", centroids, centroids)
+    labels = np.empty(len(data), dtype=np.int64)
+    for start in range(0, len(data), ASSIGN_BLOCK_ROWS):
+        block = np.asarray(data[start : start + ASSIGN_BLOCK_ROWS], dtype=np.float32)
+        labels[start : start + len(block)] = np.argmax(
+            block @ centroids.T - half_norms, axis=1
+        )
+    return labels
+
+
+def kmeans(
+    data: np.ndarray, k: int, *, iterations: int, rng: np.random.Generator
+) -> np.ndarray:
+    """Lloyd's k-means; empty clusters are re-seeded from random points."""
+    data = np.asarray(data, dtype=np.float32)
+    centroids = data[rng.choice(len(data), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        labels = assign(data, centroids)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, data)
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        if empty.any():
+            centroids[empty] = data[rng.choice(len(data), size=empty.sum())]
+    return centroids
+
+
+def encode_residuals(residuals: np.ndarray, codebooks: np.ndarray) -> np.ndarray:
+    m, _, sub_dim = codebooks.shape
+    codes = np.empty((len(residuals), m), dtype=np.uint8)
+    for j in range(m):
+        codes[:, j] = assign(
+            residuals[:, j * sub_dim : (j + 1) * sub_dim], codebooks[j]
+        )
+    return codes
+
+
+def build_ivfpq(
+    path: str | Path,
+    *,
+    nlist: int,
+    m: int,
+    train_size: int,
+    iterations: int,
+    seed: int = 0,
+) -> None:
+    """Train and write IVF-PQ files for the memory-mapped store at path."""
+    directory = Path(path)
+    base = MmapVectorIndex(directory)
+    count, dimension = len(base), base.dimension
+    if count == 0:
+        raise ValueError("Cannot build an IVF-PQ index over an empty store")
+    if dimension % m:
+        raise ValueError(f"PQ subquantizers ({m}) must divide dimension ({dimension})")
+    if train_size < 1:
+        raise ValueError(f"IVF training sample must be positive, got {train_size}")
+    rng = np.random.default_rng(seed)
+    # k-means picks its initial centroids from the training sample.
+    train = min(train_size, count)
+    nlist = min(nlist, train)
+    ksub = min(256, train)
+    sub_dim = dimension // m
+
+    sample_ids = np.sort(rng.choice(count, size=train, replace=False))
+    sample = base.vectors_for(sample_ids)
+    centroids = kmeans(sample, nlist, iterations=iterations, rng=rng)
+    sample_residuals = sample - centroids[assign(sample, centroids)]
+    codebooks = np.stack(
+        [
+            kmeans(
+                sample_residuals[:, j * sub_dim : (j + 1) * sub_dim],
+                ksub,
+                iterations=iterations,
+                rng=rng,
+            )
+            for j in range(m)
+        ]
+    )
+
+    labels = np.empty(count, dtype=np.int64)
+    codes = np.empty((count, m), dtype=np.uint8)
+    for start in range(0, count, ASSIGN_BLOCK_ROWS):
+        ids = np.arange(start, min(start + ASSIGN_BLOCK_ROWS, count))
+        block = base.vectors_for(ids)
+        labels[ids] = assign(block, centroids)
+        codes[ids] = encode_residuals(block - centroids[labels[ids]], codebooks)
+
+    order = np.argsort(labels, kind="stable")
+    list_offsets = np.zeros(nlist + 1, dtype=np.int64)
+    np.cumsum(np.bincount(labels, minlength=nlist), out=list_offsets[1:])
+
+    np.save(directory / CENTROIDS_FILE, centroids)
+    np.save(directory / CODEBOOKS_FILE, codebooks)
+    np.save(directory / CODES_FILE, codes[order])
+    np.save(directory / IDS_FILE, order.astype(np.int64))
+    np.save(directory / LIST_OFFSETS_FILE, list_offsets)
+    base.update_manifest({IVF_MANIFEST_KEY: {"nlist": nlist, "m": m, "ksub": ksub}})
+    base.close()
+
+
+class IVFPQIndex:
+    """Approximate search over IVF-PQ files, backed by the exact store."""
+
+    def __init__(self, path: str | Path, *, nprobe: int, rerank: int):
+        directory = Path(path)
+        self.base = MmapVectorIndex(directory)
+        if IVF_MANIFEST_KEY not in self.base.manifest:
+            raise ValueError(f"No IVF-PQ index has been built at {directory}")
+        self.manifest = self.base.manifest
+        self.nprobe = nprobe
+        self.rerank = rerank
+        self.centroids = np.load(directory / CENTROIDS_FILE, mmap_mode="r")
+        self.codebooks = np.load(directory / CODEBOOKS_FILE)
+        self.codes = np.load(directory / CODES_FILE, mmap_mode="r")
+        self.ids = np.load(directory / IDS_FILE, mmap_mode="r")
+        self.list_offsets = np.load(directory / LIST_OFFSETS_FILE)
+        m, ksub, _ = self.codebooks.shape
+        self._lut_offsets = (np.arange(m) * ksub).astype(np.intp)
+
+    def __len__(self) -> int:
+        return len(self.base)
+
+    @property
+    def dimension(self) -> int:
+        return self.base.dimension
+
+    def _lookup_table(self, query: np.ndarray) -> np.ndarray:
+        m, _, sub_dim = self.codebooks.shape
+        return np.einsum(
+            "jkd,jd->jk", self.codebooks, query.reshape(m, sub_dim)
+        ).ravel()
+
+    def search(self, query: np.ndarray, top_k: int) -> list[tuple[int, float]]:
+        """Return approximate (chunk_id, score) pairs for the top_k chunks."""
+        if len(self) == 0 or top_k <= 0:
+            return []
+        query = np.asarray(query, dtype=np.float32)
+        coarse = self.centroids @ query
+        nprobe = min(self.nprobe, len(coarse))
+        probed = np.argpartition(coarse, -nprobe)[-nprobe:]
+
+        starts, stops = self.list_offsets[probed], self.list_offsets[probed + 1]
+        slices = [slice(a, b) for a, b in zip(starts, stops, strict=True) if b > a]
+        if not slices:
+            return []
+        codes = np.concatenate([self.codes[s] for s in slices])
+        ids = np.concatenate([self.ids[s] for s in slices])
+        list_scores = np.repeat(coarse[probed], stops - starts)
+
+        lut = self._lookup_table(query)
+        scores = list_scores + lut[codes.astype(np.intp) + self._lut_offsets].sum(
+            axis=1
+        )
+
+        shortlist = max(top_k, self.rerank)
+        if len(scores) > shortlist:
+            keep = np.argpartition(scores, -shortlist)[-shortlist:]
+            ids, scores = ids[keep], scores[keep]
+        if self.rerank:
+            scores = self.base.score_ids(ids, query)
+        order = np.argsort(scores)[::-1][:top_k]
+        return [(int(ids[i]), float(scores[i])) for i in order]
+
+    def get_chunk(self, chunk_id: int) -> Chunk:
+        return self.base.get_chunk(chunk_id)
+
+    def close(self) -> None:
+        self.base.close()
@@ -0,0 +1,74 @@
+import re
+
+import numpy as np
+
+from src.app.chat.cache import LRUCache
+from src.app.observability.metrics import observe_cache_lookup, set_cache_bytes
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query, used as a cache key."""
+    return _WHITESPACE.sub(" ", query).strip().lower()
+
+
+class EmbeddingCache:
+    """Query embeddings keyed by the exact query text.
+
+    Vectors are stored as raw float32 bytes, so the byte bound of the LRU
+    counts what the cache really holds.
+    """
+
+    def __init__(self, *, max_bytes: int):
+        self.lru = LRUCache(max_bytes=max_bytes, ttl_seconds=float("inf"))
+
+    def get(self, query: str) -> np.ndarray | None:
+        value = self.lru.get(query)
+        observe_cache_lookup("embedding", value is not None)
+        if value is None:
+            return None
+        return np.frombuffer(value, dtype=np.float32)
+
+    def set(self, query: str, vector: np.ndarray) -> None:
+        self.lru.set(query, np.asarray(vector, dtype=np.float32).tobytes())
+        set_cache_bytes("embedding", self.lru.size_bytes)
+
+    def clear(self) -> None:
+        self.lru.clear()
+        set_cache_bytes("embedding", 0)
+
+
+class ResultCache:
+    """Search results keyed by normalised query and ``top_k``.
+
+    Only chunk ids and scores are stored; chunk text stays in the index and
+    is read back on a hit.
+    """
+
+    def __init__(self, *, max_bytes: int, ttl_seconds: float):
+        self.lru = LRUCache(max_bytes=max_bytes, ttl_seconds=ttl_seconds)
+
+    @staticmethod
+    def key(query: str, top_k: int) -> str:
+        return f"{top_k}:{normalize_query(query)}"
+
+    def get(self, query: str, top_k: int) -> list[tuple[int, float]] | None:
+        value = self.lru.get(self.key(query, top_k))
+        observe_cache_lookup("result", value is not None)
+        if value is None:
+            return None
+        count = len(value) // 16
+        ids = np.frombuffer(value, dtype=np.int64, count=count)
+        scores = np.frombuffer(value, dtype=np.float64, offset=8 * count)
+        return list(zip(ids.tolist(), scores.tolist(), strict=True))
+
+    def set(self, query: str, top_k: int, results: list[tuple[int, float]]) -> None:
+        ids = np.fromiter((chunk_id for chunk_id, _ in results), dtype=np.int64)
+        scores = np.fromiter((score for _, score in results), dtype=np.float64)
+        self.lru.set(self.key(query, top_k), ids.tobytes() + scores.tobytes())
+        set_cache_bytes("result", self.lru.size_bytes)
+
+    def clear(self) -> None:
+        self.lru.clear()
+        set_cache_bytes("result", 0)
@@ -0,0 +1,99 @@
+import logging
+from pathlib import Path
+
+from fastapi import Request
+from openai import AsyncOpenAI
+
+from src.app.config import Settings
+from src.app.retrieval.ann import IVFPQIndex
+from src.app.retrieval.cache import EmbeddingCache, ResultCache
+from src.app.retrieval.embeddings import Embedder, HashingEmbedder, OpenAIEmbedder
+from src.app.retrieval.retriever import HybridRetriever, Retriever, VectorRetriever
+from src.app.retrieval.segments import SegmentedIndex, is_segmented
+from src.app.retrieval.store import open_index
+
+logger = logging.getLogger(__name__)
+
+
+def create_embedder(settings: Settings, openai_client: AsyncOpenAI | None) -> Embedder:
+    if settings.EMBEDDING_BACKEND == "hashing":
+        return HashingEmbedder(dimension=settings.EMBEDDING_DIMENSIONS)
+    if openai_client is None:
+        raise ValueError("OPENAI_API_KEY is not set")
+    return OpenAIEmbedder(
+        client=openai_client,
+        model=settings.EMBEDDING_MODEL,
+        dimension=settings.EMBEDDING_DIMENSIONS,
+    )
+
+
+def create_retriever(
+    settings: Settings, openai_client: AsyncOpenAI | None
+) -> VectorRetriever | HybridRetriever | None:
+    """Load the retriever configured in settings, or None when retrieval is off.
+
+    Hybrid retrieval falls back to vector search for indexes without BM25.
+    """
+    if not settings.RETRIEVAL_INDEX_PATH:
+        return None
+    index_path = Path(settings.RETRIEVAL_INDEX_PATH)
+    if not index_path.exists():
+        raise ValueError(f"RETRIEVAL_INDEX_PATH does not exist: {index_path}")
+    ivfpq = settings.RETRIEVAL_INDEX_BACKEND == "ivfpq"
+    if is_segmented(index_path):
+        index = SegmentedIndex(
+            index_path,
+            nprobe=settings.IVF_NPROBE if ivfpq else None,
+            rerank=settings.ANN_RERANK,
+        )
+    elif ivfpq:
+        index = IVFPQIndex(
+            index_path, nprobe=settings.IVF_NPROBE, rerank=settings.ANN_RERANK
+        )
+    else:
+        index = open_index(index_path)
+    expected = {
+        "embedding_backend": settings.EMBEDDING_BACKEND,
+        "embedding_model": settings.EMBEDDING_MODEL,
+    }
+    for key, value in expected.items():
+        if index.manifest.get(key, value) != value:
+            raise ValueError(
+                f"Index at {index_path} was built with {key}="
+                f"{index.manifest[key]!r}, but settings use {value!r}"
+            )
+    vector = VectorRetriever(
+        embedder=create_embedder(settings, openai_client),
+        index=index,
+        embedding_cache=(
+            EmbeddingCache(max_bytes=settings.RETRIEVAL_EMBEDDING_CACHE_MAX_BYTES)
+            if settings.RETRIEVAL_EMBEDDING_CACHE_MAX_BYTES
+            else None
+        ),
+        result_cache=(
+            ResultCache(
+                max_bytes=settings.RETRIEVAL_RESULT_CACHE_MAX_BYTES,
+                ttl_seconds=settings.RETRIEVAL_RESULT_CACHE_TTL_SECONDS,
+            )
+            if settings.RETRIEVAL_RESULT_CACHE_MAX_BYTES
+            else None
+        ),
+    )
+    if settings.RETRIEVAL_MODE == "vector":
+        return vector
+    if not isinstance(index, SegmentedIndex) or not index.has_lexical:
+        logger.warning(
+            "Index at %s has no BM25 index; re-run ingestion for hybrid "
+            "retrieval. Using vector search only.",
+            index_path,
+        )
+        return vector
+    return HybridRetriever(
+        vector=vector,
+        candidates=settings.RETRIEVAL_HYBRID_CANDIDATES,
+        rrf_k=settings.RETRIEVAL_RRF_K,
+    )
+
+
+async def get_retriever(request: Request) -> Retriever | None:
+    return getattr(request.app.state, "retriever", None)
@@ -0,0 +1,154 @@
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from pathlib import Path
+
+from src.app.retrieval.schemas import Chunk
+
+HTML_SUFFIXES = {".html", ".htm"}
+MARKDOWN_SUFFIXES = {".md", ".markdown", ".txt"}
+
+_BLOCK_TAGS = {
+    "address", "article", "blockquote", "br", "dd", "div", "dl", "dt", "h1",
+    "h2", "h3", "h4", "h5", "h6", "hr", "li", "ol", "p", "pre", "section",
+    "table", "td", "th", "tr", "ul",
+}  # fmt: skip
+_SKIPPED_TAGS = {"head", "script", "style", "noscript", "svg"}
+_WHITESPACE = re.compile(r"[ \t\r\f\v]+")
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+
+
+@dataclass(frozen=True)
+class Document:
+    """A cleaned page from a Confluence export."""
+
+    source: str
+    title: str
+    text: str
+
+
+class _HTMLTextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: list[str] = []
+        self.title_parts: list[str] = []
+        self._skip_depth = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "title":
+            self._in_title = True
+        elif tag in _SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag in _SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title_parts.append(data)
+        elif not self._skip_depth:
+            self.parts.append(data)
+
+
+def clean_text(text: str) -> str:
+    """Collapse runs of spaces and blank lines."""
+    lines = (_WHITESPACE.sub(" ", line).strip() for line in text.splitlines())
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+
+def parse_html(html: str) -> tuple[str, str]:
+    """Return (title, text) for an exported Confluence HTML page."""
+    extractor = _HTMLTextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    title = clean_text("".join(extractor.title_parts))
+    # Confluence exports prefix page titles with the space name: "Space : Page"
+    title = title.split(" : ", 1)[-1]
+    return title, clean_text("".join(extractor.parts))
+
+
+def parse_markdown(markdown: str) -> tuple[str, str]:
+    """Return (title, text), using the first heading as the title."""
+    text = clean_text(markdown)
+    for line in text.splitlines():
+        if line.startswith("#"):
+            return line.lstrip("#").strip(), text
+    return "", text
+
+
+def load_document(path: Path, root: Path) -> Document | None:
+    """Parse one exported page, or return None for unsupported files."""
+    suffix = path.suffix.lower()
+    if suffix in HTML_SUFFIXES:
+        title, text = parse_html(path.read_text(encoding="utf-8", errors="replace"))
+    elif suffix in MARKDOWN_SUFFIXES:
+        title, text = parse_markdown(path.read_text(encoding="utf-8", errors="replace"))
+    else:
+        return None
+    if not text:
+        return None
+    source = path.relative_to(root).as_posix()
+    return Document(source=source, title=title or path.stem, text=text)
+
+
+def list_document_paths(root: str | Path) -> list[Path]:
+    """Every file below root, in a stable order."""
+    return sorted(p for p in Path(root).rglob("*") if p.is_file())
+
+
+def iter_documents(root: str | Path) -> Iterator[Document]:
+    """Yield every supported page below root, in a stable order."""
+    root = Path(root)
+    for path in list_document_paths(root):
+        document = load_document(path, root)
+        if document is not None:
+            yield document
+
+
+def split_text(text: str, *, chunk_size: int, chunk_overlap: int) -> list[str]:
+    """Split text into windows of at most chunk_size characters.
+
+    Consecutive windows share about chunk_overlap characters, and cuts are
+    moved back to the nearest whitespace so words are not split.
+    """
+    if chunk_overlap >= chunk_size:
+        raise ValueError("chunk_overlap must be smaller than chunk_size")
+    chunks: list[str] = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            cut = text.rfind(" ", start + chunk_overlap + 1, end)
+            cut = max(cut, text.rfind("\n", start + chunk_overlap + 1, end))
+            if cut > start:
+                end = cut
+        piece = text[start:end].strip()
+        if piece:
+            chunks.append(piece)
+        if end >= len(text):
+            break
+        start = max(end - chunk_overlap, start + 1)
+        while start < end and not text[start - 1].isspace():
+            start += 1
+    return chunks
+
+
+def chunk_document(
+    document: Document, *, chunk_size: int, chunk_overlap: int
+) -> list[Chunk]:
+    metadata = {"source": document.source, "title": document.title}
+    return [
+        Chunk(text=piece, metadata=metadata)
+        for piece in split_text(
+            document.text, chunk_size=chunk_size, chunk_overlap=chunk_overlap
+        )
+    ]
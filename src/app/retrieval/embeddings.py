@@ -0,0 +1,79 @@
+import hashlib
+import re
+from typing import Protocol
+
+import numpy as np
+from openai import AsyncOpenAI
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class Embedder(Protocol):
+    """Turns texts into L2-normalised float32 vectors of a fixed dimension.
+
+    ``max_batch_size`` and ``max_batch_chars`` bound the texts passed to a
+    single ``embed`` call.
+    """
+
+    dimension: int
+    max_batch_size: int
+    max_batch_chars: int
+
+    async def embed(self, texts: list[str]) -> np.ndarray: ...
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length so dot products are cosine similarities."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class OpenAIEmbedder:
+    """Embeds texts with the OpenAI embeddings endpoint."""
+
+    # The endpoint accepts 2048 inputs and 300k tokens per request; two
+    # characters per token leaves room for text that tokenises densely.
+    max_batch_size = 2048
+    max_batch_chars = 600_000
+
+    def __init__(self, *, client: AsyncOpenAI, model: str, dimension: int):
+        self.client = client
+        self.model = model
+        self.dimension = dimension
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        response = await self.client.embeddings.create(
+            model=self.model, input=texts, dimensions=self.dimension
+        )
+        ordered = sorted(response.data, key=lambda item: item.index)
+        return normalize_rows(np.array([item.embedding for item in ordered]))
+
+
+class HashingEmbedder:
+    """Deterministic local embedder based on signed feature hashing.
+
+    It needs no network access, which makes it suitable for tests, local
+    development and offline index builds. Texts sharing words get similar
+    vectors, but there is no semantic understanding beyond that.
+    """
+
+    max_batch_size = 2048
+    max_batch_chars = 600_000
+
+    def __init__(self, *, dimension: int):
+        self.dimension = dimension
+
+    def embed_sync(self, texts: list[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in _TOKEN_PATTERN.findall(text.lower()):
+                digest = hashlib.blake2b(token.encode(), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                sign = 1.0 if value & 1 else -1.0
+                vectors[row, (value >> 1) % self.dimension] += sign
+        return normalize_rows(vectors)
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        return self.embed_sync(texts)
@@ -0,0 +1,81 @@
+from pathlib import Path
+from typing import Protocol
+
+import numpy as np
+
+from src.app.retrieval.embeddings import normalize_rows
+from src.app.retrieval.schemas import Chunk
+from src.app.retrieval.store import VectorDType, write_store
+
+
+class SearchIndex(Protocol):
+    """A searchable collection of embedded chunks."""
+
+    manifest: dict
+
+    def __len__(self) -> int: ...
+
+    @property
+    def dimension(self) -> int: ...
+
+    def search(self, query: np.ndarray, top_k: int) -> list[tuple[int, float]]: ...
+
+    def get_chunk(self, chunk_id: int) -> Chunk: ...
+
+
+def top_k_scores(scores: np.ndarray, top_k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return (positions, scores) of the top_k highest scores, best first."""
+    top_k = min(top_k, len(scores))
+    if top_k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    candidates = np.argpartition(scores, -top_k)[-top_k:]
+    ranked = candidates[np.argsort(scores[candidates])[::-1]]
+    return ranked, scores[ranked]
+
+
+class VectorIndex:
+    """Exact in-memory cosine-similarity index over normalised float32 vectors.
+
+    Used while building an index; services open the persisted form with
+    ``store.open_index`` instead.
+    """
+
+    def __init__(
+        self,
+        *,
+        vectors: np.ndarray,
+        chunks: list[Chunk],
+        manifest: dict | None = None,
+    ):
+        if len(vectors) != len(chunks):
+            raise ValueError("Number of vectors and chunks must match")
+        self.vectors = np.ascontiguousarray(normalize_rows(vectors))
+        self.chunks = chunks
+        self.manifest = manifest or {}
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    @property
+    def dimension(self) -> int:
+        return self.vectors.shape[1]
+
+    def search(self, query: np.ndarray, top_k: int) -> list[tuple[int, float]]:
+        """Return (chunk_id, score) pairs for the top_k most similar chunks."""
+        if len(self) == 0 or top_k <= 0:
+            return []
+        scores = self.vectors @ np.asarray(query, dtype=np.float32)
+        ids, top_scores = top_k_scores(scores, top_k)
+        return [(int(i), float(s)) for i, s in zip(ids, top_scores, strict=True)]
+
+    def get_chunk(self, chunk_id: int) -> Chunk:
+        return self.chunks[chunk_id]
+
+    def save(self, path: str | Path, *, dtype: VectorDType = "int8") -> None:
+        write_store(
+            path,
+            vectors=self.vectors,
+            chunks=self.chunks,
+            manifest=self.manifest,
+            dtype=dtype,
+        )
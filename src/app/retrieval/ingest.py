@@ -0,0 +1,385 @@
+"""Build a retrieval index from a directory of exported Confluence pages.
+
+    uv run python -m src.app.retrieval.ingest ./confluence-export ./data/index
+
+HTML and Markdown files are parsed, cleaned and split into overlapping chunks
+in a process pool, embedded in batches of the embedder's maximum size with a
+bounded number of requests in flight, and streamed into the index directory,
+so memory stays bounded by the batches in flight rather than the corpus.
+Embeddings use the backend configured in Settings (EMBEDDING_BACKEND,
+EMBEDDING_MODEL, EMBEDDING_DIMENSIONS) unless overridden on the command line.
+
+Re-running into the same directory updates the index incrementally (see
+src/app/retrieval/segments.py): unchanged pages are skipped, only chunks
+whose text is new are embedded, and removed pages are tombstoned. Segments
+are compacted once there are more than RETRIEVAL_COMPACT_MAX_SEGMENTS or
+more than RETRIEVAL_COMPACT_MAX_DELETED_RATIO of the rows are deleted, or
+with --compact. Segments use the memory-mapped layout of
+src/app/retrieval/store.py, with int8-quantised vectors by default, and
+carry a BM25 inverted index (src/app/retrieval/lexical.py) for hybrid
+retrieval. With RETRIEVAL_INDEX_BACKEND=ivfpq an IVF-PQ index is trained for
+every segment of at least IVF_NLIST chunks using the IVF_* and PQ_* settings.
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import aclosing
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+
+from src.app.config import Settings, get_settings
+from src.app.llm_providers.client import create_shared_openai_client
+from src.app.retrieval.ann import build_ivfpq
+from src.app.retrieval.dependencies import create_embedder
+from src.app.retrieval.documents import (
+    chunk_document,
+    list_document_paths,
+    load_document,
+)
+from src.app.retrieval.embeddings import Embedder
+from src.app.retrieval.lexical import build_bm25
+from src.app.retrieval.schemas import Chunk
+from src.app.retrieval.segments import (
+    IndexUpdate,
+    SegmentHook,
+    compact_index,
+    content_hash,
+    needs_compaction,
+    read_catalog,
+)
+from src.app.retrieval.store import MmapVectorIndex, VectorDType
+
+# Pages parsed ahead of the embedding stage, per worker process.
+PARSE_AHEAD_PER_WORKER = 4
+
+
+@dataclass
+class IngestStats:
+    documents: int = 0
+    chunks: int = 0
+    # Documents that were new or changed, and deleted since the last run.
+    changed: int = 0
+    deleted: int = 0
+    embedded: int = 0
+    seconds: float = 0.0
+
+    @property
+    def documents_per_second(self) -> float:
+        return self.documents / self.seconds if self.seconds else 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+
+@dataclass(frozen=True)
+class ParsedDocument:
+    source: str
+    # Content hash of the cleaned title and text.
+    hash: str
+    chunks: list[Chunk]
+
+
+def parse_document(
+    path: Path, *, root: Path, chunk_size: int, chunk_overlap: int
+) -> ParsedDocument | None:
+    """Parse and chunk one page, or return None for unsupported files."""
+    document = load_document(path, root)
+    if document is None:
+        return None
+    return ParsedDocument(
+        source=document.source,
+        hash=content_hash(f"{document.title}\n{document.text}").hex(),
+        chunks=chunk_document(
+            document, chunk_size=chunk_size, chunk_overlap=chunk_overlap
+        ),
+    )
+
+
+async def parse_documents(
+    root: Path, *, chunk_size: int, chunk_overlap: int, workers: int | None
+) -> AsyncIterator[ParsedDocument | None]:
+    """Yield every file below root parsed and chunked, in path order.
+
+    Pages are parsed by ``workers`` processes (one per CPU when None, inline
+    when 0), at most PARSE_AHEAD_PER_WORKER per worker ahead of the consumer.
+    """
+    parse = partial(
+        parse_document, root=root, chunk_size=chunk_size, chunk_overlap=chunk_overlap
+    )
+    paths = list_document_paths(root)
+    if workers == 0:
+        for path in paths:
+            yield parse(path)
+        return
+    workers = workers or os.cpu_count() or 1
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        ahead = PARSE_AHEAD_PER_WORKER * workers
+        pending: deque[asyncio.Future] = deque()
+        try:
+            for path in paths:
+                pending.append(loop.run_in_executor(pool, parse, path))
+                if len(pending) >= ahead:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+async def embed_batch(
+    embedder: Embedder, batch: list[tuple[Chunk, np.ndarray | None]]
+) -> np.ndarray:
+    """Vectors of a batch, embedding only the chunks without a stored one."""
+    vectors = np.empty((len(batch), embedder.dimension), dtype=np.float32)
+    missing = [i for i, (_, vector) in enumerate(batch) if vector is None]
+    if missing:
+        vectors[missing] = await embedder.embed([batch[i][0].text for i in missing])
+    for i, (_, vector) in enumerate(batch):
+        if vector is not None:
+            vectors[i] = vector
+    return vectors
+
+
+async def build_index(
+    source: str | Path,
+    output: str | Path,
+    *,
+    embedder: Embedder,
+    chunk_size: int,
+    chunk_overlap: int,
+    batch_size: int | None = None,
+    concurrency: int = 4,
+    workers: int | None = None,
+    dtype: VectorDType = "int8",
+    manifest: dict | None = None,
+    on_segment: SegmentHook | None = None,
+) -> IngestStats:
+    """Build or update the index at output from every page below source.
+
+    Batches hold at most ``batch_size`` chunks (the embedder's maximum by
+    default) and ``embedder.max_batch_chars`` characters; up to
+    ``concurrency`` of them are embedded at once, and they are written in
+    order so chunk ids follow the sorted file paths. The new version becomes
+    current only once every batch is written.
+    """
+    if chunk_overlap >= chunk_size:
+        raise ValueError("chunk_overlap must be smaller than chunk_size")
+    batch_size = min(batch_size or embedder.max_batch_size, embedder.max_batch_size)
+    stats = IngestStats()
+    started = time.perf_counter()
+    update = IndexUpdate(
+        output,
+        dimension=embedder.dimension,
+        dtype=dtype,
+        manifest={
+            **(manifest or {}),
+            "chunking": {"size": chunk_size, "overlap": chunk_overlap},
+        },
+    )
+    in_flight: deque[tuple[list[Chunk], asyncio.Task]] = deque()
+
+    async def write_oldest() -> None:
+        chunks, task = in_flight.popleft()
+        update.writer.add(await task, chunks)
+
+    async def submit(batch: list[tuple[Chunk, np.ndarray | None]]) -> None:
+        if len(in_flight) >= concurrency:
+            await write_oldest()
+        task = asyncio.create_task(embed_batch(embedder, batch))
+        in_flight.append(([chunk for chunk, _ in batch], task))
+
+    try:
+        batch: list[tuple[Chunk, np.ndarray | None]] = []
+        batch_chars = 0
+        documents = parse_documents(
+            Path(source),
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            workers=workers,
+        )
+        async with aclosing(documents):
+            async for document in documents:
+                if document is None:
+                    continue
+                stats.documents += 1
+                stats.chunks += len(document.chunks)
+                vectors = update.add_document(
+                    document.source, document.hash, document.chunks
+                )
+                if vectors is None:
+                    continue
+                stats.changed += 1
+                for chunk, vector in zip(document.chunks, vectors, strict=True):
+                    chars = len(chunk.text) if vector is None else 0
+                    if batch and (
+                        len(batch) == batch_size
+                        or batch_chars + chars > embedder.max_batch_chars
+                    ):
+                        await submit(batch)
+                        batch, batch_chars = [], 0
+                    batch.append((chunk, vector))
+                    batch_chars += chars
+                    stats.embedded += vector is None
+        if batch:
+            await submit(batch)
+        while in_flight:
+            await write_oldest()
+    except BaseException:
+        for _, task in in_flight:
+            task.cancel()
+        update.abort()
+        raise
+
+    update.commit(on_segment)
+    stats.deleted = update.deleted_documents
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+def ivfpq_trainer(settings: Settings) -> SegmentHook:
+    """Trains an IVF-PQ index for segments of at least IVF_NLIST chunks.
+
+    Smaller segments, typically those of incremental updates, are searched
+    exactly until they are compacted.
+    """
+
+    def train(path: Path) -> None:
+        store = MmapVectorIndex(path)
+        count = len(store)
+        store.close()
+        if count >= settings.IVF_NLIST:
+            build_ivfpq(
+                path,
+                nlist=settings.IVF_NLIST,
+                m=settings.PQ_SUBQUANTIZERS,
+                train_size=settings.IVF_TRAIN_SAMPLE,
+                iterations=settings.IVF_KMEANS_ITERATIONS,
+            )
+
+    return train
+
+
+def segment_hook(settings: Settings) -> SegmentHook:
+    """Builds the BM25 index, and the IVF-PQ index when configured, of a segment."""
+    train = (
+        ivfpq_trainer(settings) if settings.RETRIEVAL_INDEX_BACKEND == "ivfpq" else None
+    )
+
+    def build(path: Path) -> None:
+        build_bm25(path)
+        if train is not None:
+            train(path)
+
+    return build
+
+
+async def run(args: argparse.Namespace) -> None:
+    settings = get_settings()
+    if args.embedding_backend:
+        settings = settings.model_copy(
+            update={"EMBEDDING_BACKEND": args.embedding_backend}
+        )
+    if args.index_backend:
+        settings = settings.model_copy(
+            update={"RETRIEVAL_INDEX_BACKEND": args.index_backend}
+        )
+    on_segment = segment_hook(settings)
+    openai_client = create_shared_openai_client(settings)
+    try:
+        stats = await build_index(
+            args.source,
+            args.output,
+            embedder=create_embedder(settings, openai_client),
+            chunk_size=args.chunk_size,
+            chunk_overlap=args.chunk_overlap,
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            workers=args.workers,
+            dtype=args.dtype,
+            manifest={
+                "embedding_backend": settings.EMBEDDING_BACKEND,
+                "embedding_model": settings.EMBEDDING_MODEL,
+            },
+            on_segment=on_segment,
+        )
+        print(
+            f"Indexed {stats.documents} documents ({stats.chunks} chunks) into "
+            f"{args.output} in {stats.seconds:.1f}s: "
+            f"{stats.documents_per_second:.1f} docs/s, "
+            f"{stats.chunks_per_second:.1f} chunks/s; "
+            f"{stats.changed} new or changed, {stats.deleted} deleted, "
+            f"{stats.embedded} chunks embedded"
+        )
+    finally:
+        if openai_client is not None:
+            await openai_client.close()
+
+    catalog = read_catalog(args.output)
+    if args.compact or needs_compaction(
+        catalog,
+        max_segments=settings.RETRIEVAL_COMPACT_MAX_SEGMENTS,
+        max_deleted_ratio=settings.RETRIEVAL_COMPACT_MAX_DELETED_RATIO,
+    ):
+        started = time.perf_counter()
+        catalog = compact_index(args.output, on_segment=on_segment)
+        elapsed = time.perf_counter() - started
+        print(f"Compacted into {catalog['count']} chunks in {elapsed:.1f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("source", help="Directory containing the exported pages")
+    parser.add_argument("output", help="Directory to write the index to")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        help="Chunks per embedding request (defaults to the provider maximum)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Embedding requests in flight",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Parser processes (defaults to one per CPU; 0 parses inline)",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Merge all segments into one after the update",
+    )
+    parser.add_argument("--embedding-backend", choices=["openai", "hashing"])
+    parser.add_argument(
+        "--index-backend",
+        choices=["flat", "ivfpq"],
+        help="Also train an IVF-PQ index (defaults to RETRIEVAL_INDEX_BACKEND)",
+    )
+    parser.add_argument(
+        "--dtype",
+        choices=["int8", "float16", "float32"],
+        default="int8",
+        help="Storage type of the embedding matrix",
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""BM25 over a compact memory-mapped inverted index.
+
+The index files live next to the store of a segment (see ``store.py``):
+
+    bm25_terms.bin     uint64 sorted 64-bit hashes of the vocabulary
+    bm25_offsets.bin   uint64 (terms + 1, 2) posting and byte offsets per term
+    bm25_postings.bin  chunk ids per term, delta-encoded as LEB128 varints
+    bm25_tfs.bin       uint8 term frequency per posting, saturated at 255
+    bm25_lengths.bin   uint32 token count per chunk
+
+Terms are looked up by binary search over the hash array, so opening the
+index reads nothing but the manifest and a query touches only the
+postings of its terms. Ids within a posting list ascend, so most deltas
+fit in one byte.
+"""
+
+import hashlib
+import re
+from array import array
+from collections import Counter
+from collections.abc import Iterable
+from itertools import repeat
+from pathlib import Path
+
+import numpy as np
+
+from src.app.retrieval.index import top_k_scores
+from src.app.retrieval.store import MmapVectorIndex
+
+BM25_MANIFEST_KEY = "bm25"
+TERMS_FILE = "bm25_terms.bin"
+OFFSETS_FILE = "bm25_offsets.bin"
+POSTINGS_FILE = "bm25_postings.bin"
+TFS_FILE = "bm25_tfs.bin"
+LENGTHS_FILE = "bm25_lengths.bin"
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Words joined by these characters, like PROJ-1234, ERR_CONN_RESET or
+# api.v2/users, are indexed whole as well as word by word.
+_WORD = re.compile(r"[a-z0-9_]+")
+_COMPOUND = re.compile(r"(?<![a-z0-9_])[a-z0-9_]++(?:[-./:#][a-z0-9_]+)+")
+
+
+def tokenize(text: str) -> list[str]:
+    text = text.lower()
+    return _WORD.findall(text) + _COMPOUND.findall(text)
+
+
+def term_hash(term: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+
+
+def encode_varints(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """LEB128-encode unsigned integers of up to 32 bits.
+
+    Returns the bytes and the start of each value in them.
+    """
+    values = np.asarray(values, dtype=np.uint32)
+    sizes = np.ones(len(values), dtype=np.int8)
+    for bits in (7, 14, 21, 28):
+        sizes += values >= 1 << bits
+    starts = np.zeros(len(values), dtype=np.int64)
+    np.cumsum(sizes[:-1], out=starts[1:])
+    encoded = np.empty(int(starts[-1] + sizes[-1]) if len(values) else 0, np.uint8)
+    for k in range(5):
+        rows = np.flatnonzero(sizes > k)
+        if not len(rows):
+            break
+        payload = (values[rows] >> 7 * k) & 0x7F
+        more = (sizes[rows] > k + 1).astype(np.uint32) << 7
+        encoded[starts[rows] + k] = payload | more
+    return encoded, starts
+
+
+def decode_varints(encoded: np.ndarray) -> np.ndarray:
+    """Decode a run of LEB128 varints written by ``encode_varints``."""
+    encoded = np.asarray(encoded)
+    ends = np.flatnonzero(encoded < 0x80)
+    if len(ends) == len(encoded):
+        return encoded.astype(np.uint64)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    shifts = np.arange(len(encoded)) - np.repeat(starts, ends - starts + 1)
+    payload = (encoded & 0x7F).astype(np.uint64) << (7 * shifts).astype(np.uint64)
+    return np.add.reduceat(payload, starts)
+
+
+def write_bm25(path: str | Path, texts: Iterable[str]) -> dict:
+    """Write the BM25 files for texts, in chunk id order; returns their stats.
+
+    Postings are gathered in compact arrays and sorted once, so building
+    needs about ten bytes per (term, chunk) pair.
+    """
+    directory = Path(path)
+    vocabulary: dict[str, int] = {}
+    term_ids, chunk_ids, tfs, lengths = array("I"), array("I"), array("H"), array("I")
+    for chunk_id, text in enumerate(texts):
+        tokens = tokenize(text)
+        counts = Counter(tokens)
+        lengths.append(len(tokens))
+        term_ids.extend(
+            [vocabulary.setdefault(term, len(vocabulary)) for term in counts]
+        )
+        chunk_ids.extend(repeat(chunk_id, len(counts)))
+        tfs.extend(counts.values())
+
+    hashes = np.fromiter(
+        (term_hash(term) for term in vocabulary), dtype=np.uint64, count=len(vocabulary)
+    )
+    by_hash = np.argsort(hashes, kind="stable")
+    rank = np.empty(len(vocabulary), dtype=np.int32)
+    rank[by_hash] = np.arange(len(vocabulary))
+    keys = rank[np.frombuffer(term_ids, dtype=np.uint32)]
+    del term_ids
+    # Chunks were added in id order, so a stable sort keeps each list ascending.
+    order = np.argsort(keys, kind="stable")
+    ids = np.frombuffer(chunk_ids, dtype=np.uint32)[order]
+    del chunk_ids
+
+    offsets = np.zeros((len(vocabulary) + 1, 2), dtype=np.uint64)
+    np.cumsum(np.bincount(keys, minlength=len(vocabulary)), out=offsets[1:, 0])
+    del keys
+    list_starts = offsets[:-1, 0].astype(np.int64)
+    # The deltas across list boundaries wrap around; each list restarts from
+    # its first id, and every term has at least one posting.
+    deltas = ids.copy()
+    deltas[1:] -= ids[:-1]
+    deltas[list_starts] = ids[list_starts]
+    postings, posting_starts = encode_varints(deltas)
+    del deltas
+    offsets[:-1, 1] = posting_starts[list_starts]
+    offsets[-1, 1] = len(postings)
+
+    hashes[by_hash].tofile(directory / TERMS_FILE)
+    offsets.tofile(directory / OFFSETS_FILE)
+    postings.tofile(directory / POSTINGS_FILE)
+    saturated = np.minimum(np.frombuffer(tfs, dtype=np.uint16), 255)
+    saturated.astype(np.uint8)[order].tofile(directory / TFS_FILE)
+    np.frombuffer(lengths, dtype=np.uint32).tofile(directory / LENGTHS_FILE)
+    return {
+        "count": len(lengths),
+        "terms": len(vocabulary),
+        "postings": len(ids),
+        "total_length": int(np.frombuffer(lengths, dtype=np.uint32).sum()),
+    }
+
+
+def build_bm25(path: str | Path) -> None:
+    """Write BM25 files for the memory-mapped store at path."""
+    store = MmapVectorIndex(path)
+    stats = write_bm25(path, (store.get_chunk(i).text for i in range(len(store))))
+    store.update_manifest({BM25_MANIFEST_KEY: stats})
+    store.close()
+
+
+def _map(path: Path, dtype: str, shape: tuple[int, ...]) -> np.ndarray:
+    if 0 in shape:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=shape)
+
+
+class BM25Index:
+    """Inverted index of one store, scored with collection-wide statistics.
+
+    Scores of several indexes are comparable when they are given the same
+    idf and average length; see ``bm25_idf``.
+    """
+
+    def __init__(self, path: str | Path, stats: dict):
+        directory = Path(path)
+        self.count = stats["count"]
+        self.total_length = stats["total_length"]
+        terms, postings = stats["terms"], stats["postings"]
+        self.terms = _map(directory / TERMS_FILE, "uint64", (terms,))
+        self.offsets = _map(directory / OFFSETS_FILE, "uint64", (terms + 1, 2))
+        self.postings = _map(
+            directory / POSTINGS_FILE, "uint8", (int(self.offsets[-1, 1]),)
+        )
+        self.tfs = _map(directory / TFS_FILE, "uint8", (postings,))
+        self.lengths = _map(directory / LENGTHS_FILE, "uint32", (self.count,))
+
+    def close(self) -> None:
+        # Dropping the arrays unmaps the files once no view of them is left;
+        # closing the maps under a live view would crash its next access.
+        for name in ("terms", "offsets", "postings", "tfs", "lengths"):
+            mapped = getattr(self, name)
+            setattr(self, name, np.zeros((0,) * mapped.ndim, dtype=mapped.dtype))
+
+    def _find(self, hashes: np.ndarray) -> np.ndarray:
+        """Position of every term hash, or -1 when it is not indexed."""
+        positions = np.searchsorted(self.terms, hashes)
+        found = positions < len(self.terms)
+        found[found] = self.terms[positions[found]] == hashes[found]
+        return np.where(found, positions, -1)
+
+    def document_frequencies(self, hashes: np.ndarray) -> np.ndarray:
+        positions = self._find(hashes)
+        frequencies = np.zeros(len(hashes), dtype=np.int64)
+        found = positions >= 0
+        starts = self.offsets[positions[found], 0]
+        frequencies[found] = self.offsets[positions[found] + 1, 0] - starts
+        return frequencies
+
+    def search(
+        self,
+        hashes: np.ndarray,
+        idf: np.ndarray,
+        top_k: int,
+        *,
+        average_length: float,
+        deleted: np.ndarray | None = None,
+        k1: float = BM25_K1,
+        b: float = BM25_B,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Return (chunk ids, BM25 scores) of the top_k live matching chunks.
+
+        Terms are scored rarest first into one score per chunk. Once the
+        top_k-th score found exceeds what the remaining, more common terms
+        could add together, those terms only update the chunks already
+        found (MaxScore), which keeps terms present in most chunks cheap.
+        """
+        positions = self._find(hashes)
+        order = [i for i in np.argsort(-idf, kind="stable") if positions[i] >= 0]
+        # The most a term can add to a score, and the sum from each term on.
+        bounds = idf[order] * (k1 + 1)
+        remaining = np.append(np.cumsum(bounds[::-1])[::-1], 0.0)
+        scores = np.zeros(self.count, dtype=np.float32)
+        matched: list[np.ndarray] = []
+        candidates = None
+        for step, i in enumerate(order):
+            first, last = self.offsets[positions[i]], self.offsets[positions[i] + 1]
+            ids = np.cumsum(
+                decode_varints(self.postings[int(first[1]) : int(last[1])])
+            ).astype(np.int64)
+            tf = self.tfs[int(first[0]) : int(last[0])]
+            if candidates is not None:
+                rows = np.minimum(np.searchsorted(ids, candidates), len(ids) - 1)
+                rows = rows[ids[rows] == candidates]
+                ids, tf = ids[rows], tf[rows]
+            tf = tf.astype(np.float32)
+            norm = k1 * (1 - b + b * self.lengths[ids] / average_length)
+            # Ids are unique within a posting list.
+            scores[ids] += idf[i] * tf * (k1 + 1) / (tf + norm)
+            if candidates is None:
+                matched.append(ids)
+            if candidates is None and step + 1 < len(order):
+                found = self._live(scores, matched, deleted)
+                if (
+                    len(found) >= top_k > 0
+                    and remaining[step + 1]
+                    < np.partition(scores[found], -top_k)[-top_k]
+                ):
+                    candidates = found
+        if candidates is None:
+            candidates = self._live(scores, matched, deleted)
+        ranked, top = top_k_scores(scores[candidates], top_k)
+        return candidates[ranked], top
+
+    def _live(
+        self,
+        scores: np.ndarray,
+        matched: list[np.ndarray],
+        deleted: np.ndarray | None,
+    ) -> np.ndarray:
+        """Ids of the live chunks matched so far, in ascending order."""
+        if not matched:
+            return np.empty(0, dtype=np.int64)
+        if sum(len(ids) for ids in matched) * 8 < self.count:
+            found = np.unique(np.concatenate(matched))
+        else:
+            # Cheaper than sorting many matches, as every match scores above 0.
+            found = np.flatnonzero(scores)
+        return found if deleted is None else found[~deleted[found]]
+
+
+def query_hashes(query: str) -> np.ndarray:
+    return np.array(
+        sorted({term_hash(term) for term in tokenize(query)}), dtype=np.uint64
+    )
+
+
+def bm25_idf(document_frequencies: np.ndarray, count: int) -> np.ndarray:
+    return np.log1p((count - document_frequencies + 0.5) / (document_frequencies + 0.5))
+
+
+def average_length(indexes: Iterable[BM25Index]) -> float:
+    indexes = list(indexes)
+    count = sum(index.count for index in indexes)
+    return sum(index.total_length for index in indexes) / count if count else 1.0
+
+
+def bm25_search(
+    indexes: list[BM25Index],
+    query: str,
+    top_k: int,
+    *,
+    deleted: list[np.ndarray | None] | None = None,
+) -> list[list[tuple[int, float]]]:
+    """Top (chunk id, score) pairs of each index for query.
+
+    The idf and average length are computed over all indexes, so the
+    scores of different indexes can be merged. Rows set in an index's
+    ``deleted`` mask are skipped; they still count towards the statistics
+    until the index is compacted.
+    """
+    hashes = query_hashes(query)
+    if not len(hashes) or not indexes:
+        return [[] for _ in indexes]
+    count = sum(index.count for index in indexes)
+    frequencies = sum(index.document_frequencies(hashes) for index in indexes)
+    idf = bm25_idf(frequencies, count)
+    mean_length = average_length(indexes) or 1.0
+    results = []
+    for position, index in enumerate(indexes):
+        ids, scores = index.search(
+            hashes,
+            idf,
+            top_k,
+            average_length=mean_length,
+            deleted=deleted[position] if deleted is not None else None,
+        )
+        results.append(list(zip(ids.tolist(), scores.tolist(), strict=True)))
+    return results
+
+
+def reciprocal_rank_fusion(
+    rankings: Iterable[list[tuple[int, float]]], *, k: int = 60
+) -> list[tuple[int, float]]:
+    """Fuse ranked (id, score) lists by the sum of 1 / (k + rank) per id."""
+    fused: dict[int, float] = {}
+    for ranking in rankings:
+        for rank, (chunk_id, _) in enumerate(ranking, start=1):
+            fused[chunk_id] = fused.get(chunk_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,235 @@
+import asyncio
+import logging
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Protocol
+
+import numpy as np
+
+from src.app.retrieval.cache import EmbeddingCache, ResultCache
+from src.app.retrieval.embeddings import Embedder
+from src.app.retrieval.index import SearchIndex
+from src.app.retrieval.lexical import reciprocal_rank_fusion
+from src.app.retrieval.schemas import RetrievedChunk
+from src.app.retrieval.segments import SegmentedIndex
+from src.app.retrieval.store import index_version
+
+logger = logging.getLogger(__name__)
+
+
+class Retriever(Protocol):
+    """Finds the chunks most relevant to a free-text query."""
+
+    async def retrieve(self, query: str, top_k: int) -> list[RetrievedChunk]: ...
+
+
+class VectorRetriever:
+    """Embeds the query and searches a vector index.
+
+    Query embeddings and search results are optionally cached; both caches
+    are emptied when the index version in its manifest changes. Searches run
+    in a thread against the index current when they start; an index swapped
+    out by ``reload_index`` is closed once no search uses it any more.
+    """
+
+    def __init__(
+        self,
+        *,
+        embedder: Embedder,
+        index: SearchIndex,
+        embedding_cache: EmbeddingCache | None = None,
+        result_cache: ResultCache | None = None,
+    ):
+        if embedder.dimension != index.dimension:
+            raise ValueError(
+                f"Embedding dimension {embedder.dimension} does not match "
+                f"index dimension {index.dimension}"
+            )
+        self.embedder = embedder
+        self.index = index
+        self.embedding_cache = embedding_cache
+        self.result_cache = result_cache
+        self._index_version = index_version(index.manifest)
+        # Searches running per index, and swapped-out indexes left to close.
+        self._searches: Counter[int] = Counter()
+        self._retired: list[SegmentedIndex] = []
+
+    def _check_index_version(self) -> None:
+        version = index_version(self.index.manifest)
+        if version == self._index_version:
+            return
+        self._index_version = version
+        for cache in (self.embedding_cache, self.result_cache):
+            if cache is not None:
+                cache.clear()
+
+    async def _embed(self, query: str) -> np.ndarray:
+        if self.embedding_cache is not None:
+            cached = self.embedding_cache.get(query)
+            if cached is not None:
+                return cached
+        query_vector = (await self.embedder.embed([query]))[0]
+        if self.embedding_cache is not None:
+            self.embedding_cache.set(query, query_vector)
+        return query_vector
+
+    async def _lookup(
+        self, query: str, top_k: int
+    ) -> tuple[list[tuple[int, float]] | None, np.ndarray | None]:
+        """Cached hits for the current index, or else the query embedding.
+
+        Callers must take the index with ``_using`` before their next await.
+        """
+        self._check_index_version()
+        if self.result_cache is not None:
+            hits = self.result_cache.get(query, top_k)
+            if hits is not None:
+                return hits, None
+        query_vector = await self._embed(query)
+        # The index may have been swapped while embedding.
+        self._check_index_version()
+        return None, query_vector
+
+    def _remember(
+        self, index: SearchIndex, query: str, top_k: int, hits: list[tuple[int, float]]
+    ) -> None:
+        # Hits of an index swapped out meanwhile must not be cached.
+        if self.result_cache is not None and index is self.index:
+            self.result_cache.set(query, top_k, hits)
+
+    @contextmanager
+    def _using(self) -> Iterator[SearchIndex]:
+        """The current index, kept open until the block exits."""
+        index = self.index
+        self._searches[id(index)] += 1
+        try:
+            yield index
+        finally:
+            self._searches[id(index)] -= 1
+            if not self._searches[id(index)]:
+                del self._searches[id(index)]
+            self._close_retired()
+
+    def _close_retired(self) -> None:
+        in_use = [index for index in self._retired if id(index) in self._searches]
+        for index in self._retired:
+            if id(index) not in self._searches:
+                index.close(keep=[self.index, *in_use])
+        self._retired = in_use
+
+    def reload_index(self) -> bool:
+        """Switch to the current version of a segmented index if it changed."""
+        if not isinstance(self.index, SegmentedIndex):
+            return False
+        index = self.index.reload()
+        if index is None:
+            return False
+        self._retired.append(self.index)
+        self.index = index
+        self._close_retired()
+        logger.info("Switched to retrieval index version %s", index.manifest["version"])
+        return True
+
+    async def watch_index(self, interval: float) -> None:
+        """Reload the index every ``interval`` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.reload_index()
+            except Exception:
+                logger.warning("Reloading the retrieval index failed", exc_info=True)
+
+    async def search(self, query: str, top_k: int) -> list[tuple[int, float]]:
+        hits, query_vector = await self._lookup(query, top_k)
+        if hits is None:
+            with self._using() as index:
+                hits = await asyncio.to_thread(index.search, query_vector, top_k)
+                self._remember(index, query, top_k, hits)
+        return hits
+
+    async def retrieve(self, query: str, top_k: int) -> list[RetrievedChunk]:
+        hits, query_vector = await self._lookup(query, top_k)
+        with self._using() as index:
+            hits, results = await asyncio.to_thread(
+                _search_vector, index, query_vector, hits, top_k
+            )
+            self._remember(index, query, top_k, hits)
+        return results
+
+
+def _search_vector(
+    index: SearchIndex,
+    query_vector: np.ndarray | None,
+    hits: list[tuple[int, float]] | None,
+    top_k: int,
+) -> tuple[list[tuple[int, float]], list[RetrievedChunk]]:
+    if hits is None:
+        hits = index.search(query_vector, top_k)
+    return hits, retrieved_chunks(index, hits)
+
+
+class HybridRetriever:
+    """Fuses vector search with BM25 over a segmented index.
+
+    The ``candidates`` best chunks of each ranking are fused with reciprocal
+    rank fusion; the fused score, not a similarity, is returned. BM25 finds
+    the exact identifiers, error codes and ticket keys that embeddings blur.
+    Index reloads and caches are those of the vector retriever.
+    """
+
+    def __init__(self, *, vector: VectorRetriever, candidates: int, rrf_k: int = 60):
+        if not isinstance(vector.index, SegmentedIndex):
+            raise TypeError("Hybrid retrieval needs a segmented index")
+        self.vector = vector
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+
+    def reload_index(self) -> bool:
+        return self.vector.reload_index()
+
+    async def watch_index(self, interval: float) -> None:
+        await self.vector.watch_index(interval)
+
+    async def retrieve(self, query: str, top_k: int) -> list[RetrievedChunk]:
+        candidates = max(self.candidates, top_k)
+        dense, query_vector = await self.vector._lookup(query, candidates)
+        # Both rankings search the index current now, in one thread call.
+        with self.vector._using() as index:
+            dense, results = await asyncio.to_thread(
+                self._search, index, query, query_vector, dense, candidates, top_k
+            )
+            self.vector._remember(index, query, candidates, dense)
+        return results
+
+    def _search(
+        self,
+        index: SegmentedIndex,
+        query: str,
+        query_vector: np.ndarray | None,
+        dense: list[tuple[int, float]] | None,
+        candidates: int,
+        top_k: int,
+    ) -> tuple[list[tuple[int, float]], list[RetrievedChunk]]:
+        if dense is None:
+            dense = index.search(query_vector, candidates)
+        lexical = index.lexical_search(query, candidates)
+        hits = reciprocal_rank_fusion([dense, lexical], k=self.rrf_k)
+        return dense, retrieved_chunks(index, hits[:top_k])
+
+
+def retrieved_chunks(
+    index: SearchIndex, hits: list[tuple[int, float]]
+) -> list[RetrievedChunk]:
+    results = []
+    for chunk_id, score in hits:
+        chunk = index.get_chunk(chunk_id)
+        results.append(
+            RetrievedChunk(
+                chunk_id=chunk_id,
+                text=chunk.text,
+                score=score,
+                metadata=chunk.metadata,
+            )
+        )
+    return results
@@ -0,0 +1,19 @@
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """A piece of a source document stored in the retrieval index."""
+
+    text: str
+    metadata: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class RetrievedChunk:
+    """A chunk returned by a retriever, with its similarity score."""
+
+    chunk_id: int
+    text: str
+    score: float
+    metadata: dict[str, str] = field(default_factory=dict)
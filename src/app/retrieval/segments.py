@@ -0,0 +1,535 @@
+"""Segmented retrieval indexes that are updated incrementally.
+
+A segmented index directory contains:
+
+    manifest.json      format, version, embedding and chunking settings, and
+                       the live segments with their tombstone files
+    seg-<id>/          an immutable store in the layout of ``store.py``, plus
+                       hashes.bin     16-byte content hash of each chunk text
+                       documents.json source -> [document hash, start, stop]
+                       bm25_*.bin     optional inverted index (``lexical.py``)
+                       deleted-<id>.bin  sorted uint64 rows deleted or
+                                         replaced since the segment was written
+
+A re-ingest writes the new and changed documents into one new segment and
+tombstones the rows they replace, then swaps manifest.json atomically, so a
+reader sees either the old or the new version. Compaction rewrites the live
+rows of all segments into one. Files no longer referenced by the manifest
+are removed after each swap; processes that still map them keep reading
+them until they switch. Only one process may update an index at a time.
+"""
+
+import bisect
+import hashlib
+import json
+import shutil
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from uuid import uuid4
+
+import numpy as np
+
+from src.app.retrieval.ann import IVF_MANIFEST_KEY, IVFPQIndex
+from src.app.retrieval.lexical import BM25_MANIFEST_KEY, BM25Index, bm25_search
+from src.app.retrieval.schemas import Chunk
+from src.app.retrieval.store import (
+    MANIFEST_FILE,
+    MmapVectorIndex,
+    StoreWriter,
+    VectorDType,
+    index_version,
+    write_manifest,
+)
+
+SEGMENTS_FORMAT = "segments-v1"
+HASHES_FILE = "hashes.bin"
+DOCUMENTS_FILE = "documents.json"
+HASH_BYTES = 16
+# Rows copied at a time during compaction.
+COMPACT_BLOCK_ROWS = 8192
+# Settings that must match for an index to be updated in place.
+_COMPATIBLE_KEYS = ("dimension", "dtype", "embedding_backend", "embedding_model")
+
+# Called with the directory of every new segment before it goes live.
+SegmentHook = Callable[[Path], None]
+
+
+def content_hash(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=HASH_BYTES).digest()
+
+
+def is_segmented(path: str | Path) -> bool:
+    manifest_path = Path(path) / MANIFEST_FILE
+    if not manifest_path.exists():
+        return False
+    return json.loads(manifest_path.read_text()).get("format") == SEGMENTS_FORMAT
+
+
+def read_catalog(path: str | Path) -> dict | None:
+    """The manifest of the segmented index at path, or None if there is none."""
+    manifest_path = Path(path) / MANIFEST_FILE
+    if not manifest_path.exists():
+        return None
+    manifest = json.loads(manifest_path.read_text())
+    if manifest.get("format") != SEGMENTS_FORMAT:
+        raise ValueError(
+            f"{path} holds a {manifest.get('format')!r} index, not a segmented "
+            "one; build into a new directory"
+        )
+    return manifest
+
+
+def commit_catalog(path: str | Path, manifest: dict) -> dict:
+    """Atomically make manifest the current version, then remove stale files."""
+    directory = Path(path)
+    manifest = {
+        **manifest,
+        "format": SEGMENTS_FORMAT,
+        "version": uuid4().hex,
+        "count": sum(s["count"] - s["deleted_count"] for s in manifest["segments"]),
+    }
+    write_manifest(directory, manifest)
+    _collect_garbage(directory, manifest)
+    return manifest
+
+
+def _collect_garbage(directory: Path, manifest: dict) -> None:
+    live = {segment["name"]: segment["deleted"] for segment in manifest["segments"]}
+    for child in directory.glob("seg-*"):
+        if child.name not in live:
+            shutil.rmtree(child, ignore_errors=True)
+            continue
+        for tombstones in child.glob("deleted-*.bin"):
+            if tombstones.name != live[child.name]:
+                tombstones.unlink(missing_ok=True)
+
+
+def read_documents(segment_path: Path) -> dict[str, list]:
+    return json.loads((segment_path / DOCUMENTS_FILE).read_text())
+
+
+def read_hashes(segment_path: Path, count: int) -> np.ndarray:
+    if count == 0:
+        return np.zeros((0, HASH_BYTES), dtype=np.uint8)
+    return np.memmap(
+        segment_path / HASHES_FILE, dtype=np.uint8, mode="r", shape=(count, HASH_BYTES)
+    )
+
+
+def read_deleted(segment_path: Path, entry: dict) -> np.ndarray | None:
+    """Mask of the deleted rows of a segment, or None when none are."""
+    if not entry["deleted"]:
+        return None
+    mask = np.zeros(entry["count"], dtype=bool)
+    mask[np.fromfile(segment_path / entry["deleted"], dtype=np.uint64)] = True
+    return mask
+
+
+class SegmentWriter(StoreWriter):
+    """A store writer that also records chunk hashes and document ranges.
+
+    ``documents`` maps each source to [document hash, first row, end row];
+    callers fill it in as they add a document's chunks.
+    """
+
+    def __init__(self, path: str | Path, *, dimension: int, dtype: VectorDType):
+        super().__init__(path, dimension=dimension, dtype=dtype)
+        self.documents: dict[str, list] = {}
+        self._hashes = self._files.enter_context((self.path / HASHES_FILE).open("wb"))
+
+    @classmethod
+    def create(cls, directory: Path, *, dimension: int, dtype: VectorDType):
+        return cls(directory / f"seg-{uuid4().hex}", dimension=dimension, dtype=dtype)
+
+    def add(self, vectors: np.ndarray, chunks: list[Chunk]) -> None:
+        super().add(vectors, chunks)
+        self._hashes.write(b"".join(content_hash(chunk.text) for chunk in chunks))
+
+    def close(self) -> dict:
+        self._hashes.close()
+        (self.path / DOCUMENTS_FILE).write_text(json.dumps(self.documents))
+        return super().close()
+
+    def abort(self) -> None:
+        self._close_files()
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def entry(self) -> dict:
+        return {
+            "name": self.path.name,
+            "count": self.count,
+            "deleted": None,
+            "deleted_count": 0,
+        }
+
+
+@dataclass(frozen=True)
+class DocumentLocation:
+    segment: str
+    hash: str
+    start: int
+    stop: int
+
+
+class IndexUpdate:
+    """The changes of one ingest run, committed as a new index version.
+
+    Each parsed document is passed to ``add_document``. Unchanged documents
+    are kept where they are; new and changed ones go into a new segment,
+    reusing the stored vector of every chunk whose text is unchanged, and
+    the rows they replace are tombstoned. Documents not seen by ``commit``
+    are deleted. An update of a directory without an index builds one.
+    """
+
+    def __init__(
+        self, path: str | Path, *, dimension: int, dtype: VectorDType, manifest: dict
+    ):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.manifest = {**manifest, "dimension": dimension, "dtype": dtype}
+        self.previous = read_catalog(self.path)
+        if self.previous is not None:
+            for key in _COMPATIBLE_KEYS:
+                if self.previous.get(key) != self.manifest.get(key):
+                    raise ValueError(
+                        f"Index at {self.path} was built with {key}="
+                        f"{self.previous.get(key)!r}, not {self.manifest.get(key)!r}; "
+                        "build into a new directory"
+                    )
+        self.rechunk = self.previous is not None and self.previous.get(
+            "chunking"
+        ) != self.manifest.get("chunking")
+        self.live: dict[str, DocumentLocation] = {}
+        for entry in self.previous["segments"] if self.previous else []:
+            segment_path = self.path / entry["name"]
+            deleted = read_deleted(segment_path, entry)
+            for source, (document_hash, start, stop) in read_documents(
+                segment_path
+            ).items():
+                if deleted is None or not deleted[start]:
+                    self.live[source] = DocumentLocation(
+                        entry["name"], document_hash, start, stop
+                    )
+        self.writer = SegmentWriter.create(self.path, dimension=dimension, dtype=dtype)
+        self.rows = 0
+        self.deleted_documents = 0
+        self._seen: set[str] = set()
+        self._deleted: dict[str, list[np.ndarray]] = {}
+        self._stores: dict[str, tuple[MmapVectorIndex, np.ndarray]] = {}
+
+    def _delete(self, location: DocumentLocation) -> None:
+        self._deleted.setdefault(location.segment, []).append(
+            np.arange(location.start, location.stop, dtype=np.uint64)
+        )
+
+    def _store(self, name: str) -> tuple[MmapVectorIndex, np.ndarray]:
+        """A previous segment's store and chunk hashes."""
+        if name not in self._stores:
+            store = MmapVectorIndex(self.path / name)
+            self._stores[name] = store, read_hashes(store.path, len(store))
+        return self._stores[name]
+
+    def add_document(
+        self, source: str, document_hash: str, chunks: list[Chunk]
+    ) -> list[np.ndarray | None] | None:
+        """Record a parsed document.
+
+        Returns None when the document is unchanged, and otherwise the stored
+        vector of each of its chunks, or None for chunks to embed. The chunks
+        must then be added to ``writer`` in order.
+        """
+        self._seen.add(source)
+        previous = self.live.get(source)
+        if previous is not None and previous.hash == document_hash and not self.rechunk:
+            return None
+        vectors: list[np.ndarray | None] = [None] * len(chunks)
+        if previous is not None:
+            self._delete(previous)
+            store, hashes = self._store(previous.segment)
+            rows = {
+                hashes[row].tobytes(): row
+                for row in range(previous.start, previous.stop)
+            }
+            reused = [
+                (i, rows[h])
+                for i, h in enumerate(content_hash(chunk.text) for chunk in chunks)
+                if h in rows
+            ]
+            if reused:
+                stored = store.vectors_for(np.array([row for _, row in reused]))
+                for (i, _), vector in zip(reused, stored, strict=True):
+                    vectors[i] = vector
+        self.writer.documents[source] = [
+            document_hash,
+            self.rows,
+            self.rows + len(chunks),
+        ]
+        self.rows += len(chunks)
+        return vectors
+
+    def _close_stores(self) -> None:
+        for store, _ in self._stores.values():
+            store.close()
+
+    def abort(self) -> None:
+        self._close_stores()
+        self.writer.abort()
+
+    def commit(self, on_segment: SegmentHook | None = None) -> dict:
+        """Write the new version and make it current; returns its manifest.
+
+        The current manifest is returned unchanged when nothing changed.
+        """
+        self._close_stores()
+        for source in self.live.keys() - self._seen:
+            self._delete(self.live[source])
+            self.deleted_documents += 1
+        if (
+            self.previous is not None
+            and not self.writer.documents
+            and not self._deleted
+        ):
+            self.writer.abort()
+            return self.previous
+
+        segments = []
+        for entry in self.previous["segments"] if self.previous else []:
+            if entry["name"] not in self._deleted:
+                segments.append(entry)
+                continue
+            segment_path = self.path / entry["name"]
+            rows = self._deleted[entry["name"]]
+            if entry["deleted"]:
+                rows.append(np.fromfile(segment_path / entry["deleted"], np.uint64))
+            rows = np.unique(np.concatenate(rows))
+            if len(rows) == entry["count"]:
+                continue
+            name = f"deleted-{uuid4().hex}.bin"
+            rows.tofile(segment_path / name)
+            segments.append({**entry, "deleted": name, "deleted_count": len(rows)})
+
+        if self.writer.documents:
+            self.writer.close()
+            if on_segment is not None and self.writer.count:
+                on_segment(self.writer.path)
+            segments.append(self.writer.entry())
+        else:
+            self.writer.abort()
+        return commit_catalog(self.path, {**self.manifest, "segments": segments})
+
+
+def needs_compaction(
+    manifest: dict, *, max_segments: int, max_deleted_ratio: float
+) -> bool:
+    segments = manifest["segments"]
+    total = sum(segment["count"] for segment in segments)
+    deleted = sum(segment["deleted_count"] for segment in segments)
+    return len(segments) > max_segments or (
+        total > 0 and deleted / total > max_deleted_ratio
+    )
+
+
+def compact_index(path: str | Path, *, on_segment: SegmentHook | None = None) -> dict:
+    """Rewrite the live rows of every segment into one; returns the manifest.
+
+    The previous version stays current and readable until the compacted
+    one is committed.
+    """
+    directory = Path(path)
+    catalog = read_catalog(directory)
+    if catalog is None:
+        raise ValueError(f"No segmented index at {directory}")
+    writer = SegmentWriter.create(
+        directory, dimension=catalog["dimension"], dtype=catalog["dtype"]
+    )
+    try:
+        for entry in catalog["segments"]:
+            segment_path = directory / entry["name"]
+            store = MmapVectorIndex(segment_path)
+            deleted = read_deleted(segment_path, entry)
+            documents = sorted(
+                read_documents(segment_path).items(), key=lambda item: item[1][1]
+            )
+            for source, (document_hash, start, stop) in documents:
+                if deleted is not None and deleted[start]:
+                    continue
+                writer.documents[source] = [
+                    document_hash,
+                    writer.count,
+                    writer.count + stop - start,
+                ]
+                for block in range(start, stop, COMPACT_BLOCK_ROWS):
+                    ids = np.arange(block, min(block + COMPACT_BLOCK_ROWS, stop))
+                    writer.add(
+                        store.vectors_for(ids), [store.get_chunk(int(i)) for i in ids]
+                    )
+            store.close()
+    except BaseException:
+        writer.abort()
+        raise
+    segments = []
+    if writer.count:
+        writer.close()
+        if on_segment is not None:
+            on_segment(writer.path)
+        segments.append(writer.entry())
+    else:
+        writer.abort()
+    return commit_catalog(directory, {**catalog, "segments": segments})
+
+
+class Segment:
+    """An open segment: its search index, the exact store beneath it and its
+    BM25 index when one was built."""
+
+    def __init__(self, path: Path, *, nprobe: int | None, rerank: int):
+        self.name = path.name
+        manifest = json.loads((path / MANIFEST_FILE).read_text())
+        self.index: MmapVectorIndex | IVFPQIndex = (
+            IVFPQIndex(path, nprobe=nprobe, rerank=rerank)
+            if nprobe is not None and IVF_MANIFEST_KEY in manifest
+            else MmapVectorIndex(path)
+        )
+        self.lexical = (
+            BM25Index(path, manifest[BM25_MANIFEST_KEY])
+            if BM25_MANIFEST_KEY in manifest
+            else None
+        )
+
+    def close(self) -> None:
+        self.index.close()
+        if self.lexical is not None:
+            self.lexical.close()
+
+
+class SegmentedIndex:
+    """Search over the live rows of every segment of one index version.
+
+    Chunk ids are positions in the concatenated segments, valid within a
+    version. Segments with an IVF-PQ index are searched approximately when
+    ``nprobe`` is set; the others exactly. ``reload`` opens a newer version
+    and reuses the segments both share, so no segment is mapped twice.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        nprobe: int | None = None,
+        rerank: int = 0,
+        manifest: dict | None = None,
+        opened: dict[str, Segment] | None = None,
+    ):
+        self.path = Path(path)
+        self.nprobe = nprobe
+        self.rerank = rerank
+        manifest = manifest or read_catalog(self.path)
+        if manifest is None:
+            raise ValueError(f"No segmented index at {self.path}")
+        self.manifest: dict = manifest
+        opened = opened or {}
+        self.segments: list[Segment] = []
+        self.deleted: list[np.ndarray | None] = []
+        self.deleted_counts: list[int] = []
+        self.offsets = [0]
+        for entry in manifest["segments"]:
+            segment_path = self.path / entry["name"]
+            self.segments.append(
+                opened.get(entry["name"])
+                or Segment(segment_path, nprobe=nprobe, rerank=rerank)
+            )
+            self.deleted.append(read_deleted(segment_path, entry))
+            self.deleted_counts.append(entry["deleted_count"])
+            self.offsets.append(self.offsets[-1] + entry["count"])
+
+    def __len__(self) -> int:
+        return self.manifest["count"]
+
+    @property
+    def dimension(self) -> int:
+        return self.manifest["dimension"]
+
+    def search(self, query: np.ndarray, top_k: int) -> list[tuple[int, float]]:
+        """Return (chunk_id, score) pairs for the top_k live chunks."""
+        if top_k <= 0:
+            return []
+        hits: list[tuple[int, float]] = []
+        for start, segment, deleted, deleted_count in zip(
+            self.offsets, self.segments, self.deleted, self.deleted_counts, strict=False
+        ):
+            if deleted is None:
+                rows = segment.index.search(query, top_k)
+            else:
+                # Fetch more until top_k live rows are found; at most every
+                # tombstoned row is skipped.
+                fetch, limit = top_k, top_k + deleted_count
+                while True:
+                    rows = [
+                        (row, score)
+                        for row, score in segment.index.search(query, fetch)
+                        if not deleted[row]
+                    ]
+                    if len(rows) >= top_k or fetch >= limit:
+                        break
+                    fetch = min(4 * fetch, limit)
+            hits.extend((start + row, score) for row, score in rows)
+        hits.sort(key=lambda hit: hit[1], reverse=True)
+        return hits[:top_k]
+
+    @property
+    def has_lexical(self) -> bool:
+        return all(segment.lexical is not None for segment in self.segments)
+
+    def lexical_search(self, query: str, top_k: int) -> list[tuple[int, float]]:
+        """Return (chunk_id, BM25 score) pairs for the top_k live chunks.
+
+        Term statistics span every segment with a BM25 index; segments
+        without one are not searched.
+        """
+        if top_k <= 0:
+            return []
+        searched = [
+            (start, segment.lexical, deleted)
+            for start, segment, deleted in zip(
+                self.offsets, self.segments, self.deleted, strict=False
+            )
+            if segment.lexical is not None
+        ]
+        results = bm25_search(
+            [lexical for _, lexical, _ in searched],
+            query,
+            top_k,
+            deleted=[deleted for _, _, deleted in searched],
+        )
+        hits = [
+            (start + row, score)
+            for (start, _, _), rows in zip(searched, results, strict=True)
+            for row, score in rows
+        ]
+        hits.sort(key=lambda hit: hit[1], reverse=True)
+        return hits[:top_k]
+
+    def get_chunk(self, chunk_id: int) -> Chunk:
+        segment = bisect.bisect_right(self.offsets, chunk_id) - 1
+        return self.segments[segment].index.get_chunk(chunk_id - self.offsets[segment])
+
+    def reload(self) -> "SegmentedIndex | None":
+        """Open the current version if it is newer than this one."""
+        manifest = read_catalog(self.path)
+        if manifest is None or index_version(manifest) == index_version(self.manifest):
+            return None
+        return SegmentedIndex(
+            self.path,
+            nprobe=self.nprobe,
+            rerank=self.rerank,
+            manifest=manifest,
+            opened={segment.name: segment for segment in self.segments},
+        )
+
+    def close(self, *, keep: Iterable["SegmentedIndex"] = ()) -> None:
+        """Close the segments, except those shared with an index in ``keep``."""
+        kept = {id(segment) for index in keep for segment in index.segments}
+        for segment in self.segments:
+            if id(segment) not in kept:
+                segment.close()
@@ -0,0 +1,304 @@
+"""Compact memory-mapped on-disk layout for retrieval indexes.
+
+An index directory contains:
+
+    manifest.json  format, build version, count, dimension, dtype, embedding settings
+    vectors.bin    (count, dimension) matrix, row-major, int8/float16/float32
+    scales.bin     float32 per-row dequantisation scale (int8 only)
+    offsets.bin    uint64 (count + 1) byte offsets into chunks.bin
+    chunks.bin     concatenated UTF-8 JSON records {"text": ..., "metadata": ...}
+
+Every file is opened read-only with mmap, so opening an index takes
+milliseconds, and uvicorn workers on one host share the same pages through
+the OS page cache instead of each holding a private copy.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Literal, Self
+from uuid import uuid4
+
+import numpy as np
+
+from src.app.retrieval.schemas import Chunk
+
+FORMAT_VERSION = "mmap-v1"
+MANIFEST_FILE = "manifest.json"
+VECTORS_FILE = "vectors.bin"
+SCALES_FILE = "scales.bin"
+OFFSETS_FILE = "offsets.bin"
+CHUNKS_FILE = "chunks.bin"
+
+# Rows scored before their top-k is merged; bounds score scratch per query.
+SEARCH_BLOCK_ROWS = 65536
+# Rows converted to float32 at a time; small enough to stay in CPU cache.
+DEQUANTIZE_BLOCK_ROWS = 512
+
+VectorDType = Literal["int8", "float16", "float32"]
+
+
+def quantize_int8(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row int8 quantisation: vector ~= codes * scale."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def encode_vectors(
+    vectors: np.ndarray, dtype: VectorDType
+) -> tuple[np.ndarray, np.ndarray | None]:
+    """Convert float32 vectors into the stored dtype, plus int8 scales."""
+    if dtype == "int8":
+        return quantize_int8(vectors)
+    if dtype in ("float16", "float32"):
+        return np.asarray(vectors, dtype=dtype), None
+    raise ValueError(f"Unsupported vector dtype: {dtype}")
+
+
+def encode_chunk(chunk: Chunk) -> bytes:
+    return json.dumps(
+        {"text": chunk.text, "metadata": chunk.metadata}, ensure_ascii=False
+    ).encode("utf-8")
+
+
+def write_manifest(directory: Path, manifest: dict) -> None:
+    """Atomically replace the manifest, so readers never see a partial one."""
+    temporary = directory / f"{MANIFEST_FILE}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(manifest, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, directory / MANIFEST_FILE)
+
+
+class StoreWriter:
+    """Writes an index directory incrementally, one batch at a time.
+
+    Vectors and chunk records are appended to their files as batches arrive,
+    so building an index needs memory for a batch rather than the corpus.
+    The manifest is written last, by ``close``; a build that fails midway
+    leaves a directory ``open_index`` refuses to open.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        dimension: int,
+        dtype: VectorDType,
+        manifest: dict | None = None,
+    ):
+        if dtype not in ("int8", "float16", "float32"):
+            raise ValueError(f"Unsupported vector dtype: {dtype}")
+        self.path = Path(path)
+        self.dimension = dimension
+        self.dtype = dtype
+        self.manifest = manifest or {}
+        self.count = 0
+        self.path.mkdir(parents=True, exist_ok=True)
+        (self.path / MANIFEST_FILE).unlink(missing_ok=True)
+        self._files = ExitStack()
+        self._vectors = self._files.enter_context((self.path / VECTORS_FILE).open("wb"))
+        self._scales = (
+            self._files.enter_context((self.path / SCALES_FILE).open("wb"))
+            if dtype == "int8"
+            else None
+        )
+        self._offsets = self._files.enter_context((self.path / OFFSETS_FILE).open("wb"))
+        self._chunks = self._files.enter_context((self.path / CHUNKS_FILE).open("wb"))
+        self._chunks_size = 0
+        self._offsets.write(np.zeros(1, dtype=np.uint64).tobytes())
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._close_files()
+
+    def add(self, vectors: np.ndarray, chunks: list[Chunk]) -> None:
+        if len(vectors) != len(chunks):
+            raise ValueError("Number of vectors and chunks must match")
+        if len(chunks) and np.shape(vectors)[1] != self.dimension:
+            raise ValueError(
+                f"Vector dimension {np.shape(vectors)[1]} does not match "
+                f"index dimension {self.dimension}"
+            )
+        codes, scales = encode_vectors(vectors, self.dtype)
+        self._vectors.write(codes.tobytes())
+        if self._scales is not None:
+            self._scales.write(scales.tobytes())
+        offsets = np.empty(len(chunks), dtype=np.uint64)
+        for i, chunk in enumerate(chunks):
+            record = encode_chunk(chunk)
+            self._chunks.write(record)
+            self._chunks_size += len(record)
+            offsets[i] = self._chunks_size
+        self._offsets.write(offsets.tobytes())
+        self.count += len(chunks)
+
+    def _close_files(self) -> None:
+        self._files.close()
+
+    def close(self) -> dict:
+        """Finish the files and write the manifest, which is returned."""
+        self._close_files()
+        manifest = {
+            **self.manifest,
+            "version": uuid4().hex,
+            "format": FORMAT_VERSION,
+            "count": self.count,
+            "dimension": self.dimension,
+            "dtype": self.dtype,
+        }
+        write_manifest(self.path, manifest)
+        return manifest
+
+
+def write_store(
+    path: str | Path,
+    *,
+    vectors: np.ndarray,
+    chunks: list[Chunk],
+    manifest: dict,
+    dtype: VectorDType,
+) -> None:
+    with StoreWriter(
+        path, dimension=int(vectors.shape[1]), dtype=dtype, manifest=manifest
+    ) as writer:
+        writer.add(vectors, chunks)
+
+
+def index_version(manifest: dict) -> str:
+    """Identifier of an index build; changes whenever the index is rebuilt.
+
+    Indexes written before versions were recorded are identified by a hash
+    of their manifest.
+    """
+    version = manifest.get("version")
+    if version:
+        return version
+    encoded = json.dumps(manifest, sort_keys=True).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+def _map_array(path: Path, dtype: str, shape: tuple[int, ...]) -> np.ndarray:
+    if 0 in shape:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=shape)
+
+
+class MmapVectorIndex:
+    """Exact cosine-similarity search over a memory-mapped index directory."""
+
+    def __init__(self, path: str | Path):
+        directory = Path(path)
+        self.path = directory
+        self.manifest: dict = json.loads((directory / MANIFEST_FILE).read_text())
+        if self.manifest.get("format") != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported index format at {directory}: "
+                f"{self.manifest.get('format')!r}"
+            )
+        count, dimension = self.manifest["count"], self.manifest["dimension"]
+        self.dtype: VectorDType = self.manifest["dtype"]
+        self.vectors = _map_array(
+            directory / VECTORS_FILE, self.dtype, (count, dimension)
+        )
+        self.scales = (
+            _map_array(directory / SCALES_FILE, "float32", (count,))
+            if self.dtype == "int8"
+            else None
+        )
+        self.offsets = _map_array(directory / OFFSETS_FILE, "uint64", (count + 1,))
+        # The map keeps its own reference to the file, which can be closed.
+        with open(directory / CHUNKS_FILE, "rb") as chunks_file:
+            self._chunks = (
+                mmap.mmap(chunks_file.fileno(), 0, access=mmap.ACCESS_READ)
+                if count
+                else b""
+            )
+
+    def __len__(self) -> int:
+        return self.manifest["count"]
+
+    @property
+    def dimension(self) -> int:
+        return self.manifest["dimension"]
+
+    def _block_scores(self, start: int, stop: int, query: np.ndarray) -> np.ndarray:
+        if self.dtype == "float32":
+            return self.vectors[start:stop] @ query
+        scores = np.empty(stop - start, dtype=np.float32)
+        buffer = np.empty((DEQUANTIZE_BLOCK_ROWS, self.dimension), dtype=np.float32)
+        for offset in range(start, stop, DEQUANTIZE_BLOCK_ROWS):
+            block = self.vectors[offset : min(offset + DEQUANTIZE_BLOCK_ROWS, stop)]
+            converted = buffer[: len(block)]
+            np.copyto(converted, block, casting="unsafe")
+            np.dot(
+                converted,
+                query,
+                out=scores[offset - start : offset - start + len(block)],
+            )
+        if self.scales is not None:
+            scores *= self.scales[start:stop]
+        return scores
+
+    def search(self, query: np.ndarray, top_k: int) -> list[tuple[int, float]]:
+        """Return (chunk_id, score) pairs for the top_k most similar chunks.
+
+        The matrix is scanned in blocks so scratch memory stays bounded by
+        SEARCH_BLOCK_ROWS regardless of the corpus size.
+        """
+        if len(self) == 0 or top_k <= 0:
+            return []
+        query = np.asarray(query, dtype=np.float32)
+        best_ids = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for start in range(0, len(self), SEARCH_BLOCK_ROWS):
+            stop = min(start + SEARCH_BLOCK_ROWS, len(self))
+            scores = self._block_scores(start, stop, query)
+            ids = np.arange(start, stop)
+            if len(scores) > top_k:
+                keep = np.argpartition(scores, -top_k)[-top_k:]
+                ids, scores = ids[keep], scores[keep]
+            best_ids = np.concatenate([best_ids, ids])
+            best_scores = np.concatenate([best_scores, scores])
+        order = np.argsort(best_scores)[::-1][:top_k]
+        return [(int(best_ids[i]), float(best_scores[i])) for i in order]
+
+    def vectors_for(self, ids: np.ndarray) -> np.ndarray:
+        """Return the dequantised float32 vectors for the given chunk ids."""
+        vectors = np.asarray(self.vectors[ids], dtype=np.float32)
+        if self.scales is not None:
+            vectors *= self.scales[ids][:, None]
+        return vectors
+
+    def score_ids(self, ids: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Return exact similarity scores for a subset of chunk ids."""
+        return self.vectors_for(ids) @ np.asarray(query, dtype=np.float32)
+
+    def update_manifest(self, values: dict) -> None:
+        manifest = {**self.manifest, **values}
+        write_manifest(self.path, manifest)
+        self.manifest = manifest
+
+    def get_chunk(self, chunk_id: int) -> Chunk:
+        start, end = int(self.offsets[chunk_id]), int(self.offsets[chunk_id + 1])
+        return Chunk(**json.loads(self._chunks[start:end]))
+
+    def close(self) -> None:
+        if isinstance(self._chunks, mmap.mmap):
+            self._chunks.close()
+
+
+def open_index(path: str | Path) -> MmapVectorIndex:
+    return MmapVectorIndex(path)
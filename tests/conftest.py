@@ -1,15 +1,20 @@
-from fastapi.testclient import TestClient
-from openai import OpenAI
 import pytest
+from fastapi.testclient import TestClient
+from openai import AsyncOpenAI
 from pytest_mock import MockerFixture
 
-from src.app.main import app
 from src.app.chat.dependencies import get_chat_service
 from src.app.chat.service import ChatService
+from src.app.main import app
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
 
 
 @pytest.fixture
-def mock_service(mock_openai_client: OpenAI):
+def mock_service(mock_openai_client: AsyncOpenAI):
     return ChatService(
         openai_client=mock_openai_client,
         project_name="Test",
@@ -22,10 +27,11 @@ def mock_service(mock_openai_client: OpenAI):
 
 
 @pytest.fixture
-def mock_openai_client(mocker: MockerFixture) -> OpenAI:
-    client = mocker.Mock(spec=OpenAI)
+def mock_openai_client(mocker: MockerFixture) -> AsyncOpenAI:
+    client = mocker.Mock(spec=AsyncOpenAI)
     client.chat = mocker.Mock()
     client.chat.completions = mocker.Mock()
+    client.chat.completions.create = mocker.AsyncMock()
     client.chat.completions.create.return_value = mocker.Mock(
         choices=[mocker.Mock(message=mocker.Mock(content="Hello Kitty"))]
     )
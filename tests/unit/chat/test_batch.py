@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+from pytest_mock import MockerFixture
+
+from src.app.chat.batch import run_batch
+from src.app.chat.exceptions import RateLimitExceededError
+from src.app.chat.schemas import ChatMessage, ChatResponse, CreateChatRequest
+
+
+def _request(content: str) -> CreateChatRequest:
+    return CreateChatRequest(
+        model="test-model", messages=[ChatMessage(role="user", content=content)]
+    )
+
+
+@pytest.mark.anyio
+async def test_run_batch_bounds_concurrency(mocker: MockerFixture):
+    in_flight = peak = 0
+
+    async def generate(chat_input, use_cache):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return ChatResponse(message=chat_input.messages[0].content)
+
+    service = mocker.Mock(generate_response=generate)
+    requests = [_request(str(i)) for i in range(10)]
+
+    results = [r async for r in run_batch(service, requests, concurrency=3)]
+
+    assert peak == 3
+    assert sorted(r.response.message for r in results) == [str(i) for i in range(10)]
+    assert all(r.response.message == str(r.index) for r in results)
+
+
+@pytest.mark.anyio
+async def test_run_batch_yields_in_completion_order(mocker: MockerFixture):
+    async def generate(chat_input, use_cache):
+        await asyncio.sleep(float(chat_input.messages[0].content))
+        return ChatResponse(message="ok")
+
+    service = mocker.Mock(generate_response=generate)
+    requests = [_request("0.03"), _request("0.01"), _request("0.02")]
+
+    results = [r async for r in run_batch(service, requests, concurrency=3)]
+
+    assert [r.index for r in results] == [1, 2, 0]
+
+
+@pytest.mark.anyio
+async def test_run_batch_reports_errors_per_item(mocker: MockerFixture):
+    async def generate(chat_input, use_cache):
+        match chat_input.messages[0].content:
+            case "limited":
+                raise RateLimitExceededError(message="OpenAI rate limit exceeded")
+            case "unconfigured":
+                raise ValueError("OPENAI_API_KEY is not set")
+            case "broken":
+                raise RuntimeError("boom")
+        return ChatResponse(message="ok")
+
+    service = mocker.Mock(generate_response=generate)
+    requests = [_request(c) for c in ("ok", "limited", "unconfigured", "broken")]
+
+    results = sorted(
+        [r async for r in run_batch(service, requests, concurrency=2)],
+        key=lambda r: r.index,
+    )
+
+    assert results[0].response == ChatResponse(message="ok")
+    assert results[0].error is None
+    assert [(r.error.status_code, r.error.detail) for r in results[1:]] == [
+        (429, "OpenAI rate limit exceeded"),
+        (503, "OPENAI_API_KEY is not set"),
+        (500, "Internal server error"),
+    ]
+
+
+@pytest.mark.anyio
+async def test_run_batch_cancels_outstanding_requests_when_closed(
+    mocker: MockerFixture,
+):
+    cancelled = 0
+
+    async def generate(chat_input, use_cache):
+        nonlocal cancelled
+        if chat_input.messages[0].content == "fast":
+            return ChatResponse(message="ok")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled += 1
+            raise
+
+    service = mocker.Mock(generate_response=generate)
+    requests = [_request("fast"), _request("slow"), _request("slow")]
+
+    results = run_batch(service, requests, concurrency=3)
+    first = await anext(results)
+    await results.aclose()
+    await asyncio.sleep(0)
+
+    assert first.index == 0
+    assert cancelled == 2
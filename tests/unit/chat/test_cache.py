@@ -0,0 +1,145 @@
+import pytest
+from prometheus_client import REGISTRY
+from pytest_mock import MockerFixture
+
+from src.app.chat import cache
+from src.app.chat.cache import (
+    LRUCache,
+    ResponseCache,
+    bypasses_cache,
+    create_response_cache,
+    request_cache_key,
+)
+from src.app.chat.schemas import ChatResponse
+from src.app.config import Settings
+
+MESSAGES = [
+    {"role": "system", "content": "You are a test assistant"},
+    {"role": "user", "content": "What is molasses?"},
+]
+
+
+def test_request_cache_key_is_canonical():
+    """Key order inside messages should not change the key."""
+    reordered = [{"content": m["content"], "role": m["role"]} for m in MESSAGES]
+    assert request_cache_key("gpt-4", MESSAGES) == request_cache_key("gpt-4", reordered)
+
+
+def test_request_cache_key_depends_on_model_messages_and_tools():
+    key = request_cache_key("gpt-4", MESSAGES)
+    assert key != request_cache_key("gpt-4o", MESSAGES)
+    assert key != request_cache_key("gpt-4", MESSAGES[:1])
+    assert key != request_cache_key("gpt-4", MESSAGES, ["retrieve_documents"])
+
+
+def test_lru_cache_evicts_least_recently_used_by_size():
+    lru = LRUCache(max_bytes=25, ttl_seconds=60)
+    lru.set("a", b"x" * 9)
+    lru.set("b", b"x" * 9)
+    lru.get("a")
+    lru.set("c", b"x" * 9)
+
+    assert lru.get("b") is None
+    assert lru.get("a") == b"x" * 9
+    assert lru.size_bytes <= 25
+    assert lru.stats.evictions == 1
+
+
+def test_lru_cache_expires_entries(monkeypatch: pytest.MonkeyPatch):
+    now = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    lru = LRUCache(max_bytes=1000, ttl_seconds=10)
+    lru.set("a", b"value")
+
+    now[0] += 11
+
+    assert lru.get("a") is None
+    assert lru.stats.expirations == 1
+    assert len(lru) == 0
+
+
+def test_lru_cache_skips_values_larger_than_budget():
+    lru = LRUCache(max_bytes=10, ttl_seconds=60)
+    lru.set("a", b"x" * 100)
+    assert len(lru) == 0
+
+
+@pytest.mark.anyio
+async def test_response_cache_counts_hits_and_misses():
+    response_cache = ResponseCache(local=LRUCache(max_bytes=1000, ttl_seconds=60))
+
+    assert await response_cache.get("key") is None
+    await response_cache.set("key", ChatResponse(message="cached"))
+
+    assert await response_cache.get("key") == ChatResponse(message="cached")
+    assert response_cache.stats.hits == 1
+    assert response_cache.stats.misses == 1
+
+
+@pytest.mark.anyio
+async def test_create_response_cache_exports_its_counters():
+    def sample(event: str) -> float:
+        return (
+            REGISTRY.get_sample_value("response_cache_events_total", {"event": event})
+            or 0.0
+        )
+
+    before = {event: sample(event) for event in ("hits", "misses", "evictions")}
+    response_cache = create_response_cache(
+        Settings(RESPONSE_CACHE_ENABLED=True, RESPONSE_CACHE_MAX_BYTES=200)
+    )
+
+    assert await response_cache.get("first") is None
+    await response_cache.set("first", ChatResponse(message="x" * 100))
+    assert await response_cache.get("first") is not None
+    await response_cache.set("second", ChatResponse(message="y" * 100))
+
+    assert sample("hits") == before["hits"] + 1
+    assert sample("misses") == before["misses"] + 1
+    assert sample("evictions") == before["evictions"] + 1
+
+
+@pytest.mark.anyio
+async def test_response_cache_fills_local_from_shared_backend(mocker: MockerFixture):
+    shared = mocker.Mock()
+    shared.get = mocker.AsyncMock(return_value=b'{"message": "shared"}')
+    response_cache = ResponseCache(
+        local=LRUCache(max_bytes=1000, ttl_seconds=60), shared=shared
+    )
+
+    assert await response_cache.get("key") == ChatResponse(message="shared")
+    assert await response_cache.get("key") == ChatResponse(message="shared")
+    shared.get.assert_awaited_once_with("key")
+
+
+@pytest.mark.anyio
+async def test_response_cache_treats_shared_failures_as_misses(
+    mocker: MockerFixture,
+):
+    shared = mocker.Mock()
+    shared.get = mocker.AsyncMock(side_effect=ConnectionError("down"))
+    shared.set = mocker.AsyncMock(side_effect=ConnectionError("down"))
+    response_cache = ResponseCache(
+        local=LRUCache(max_bytes=1000, ttl_seconds=60), shared=shared
+    )
+
+    assert await response_cache.get("key") is None
+    await response_cache.set("key", ChatResponse(message="local"))
+    assert await response_cache.get("key") == ChatResponse(message="local")
+
+
+def test_create_response_cache_is_disabled_by_default():
+    assert create_response_cache(Settings()) is None
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        (None, False),
+        ("max-age=0", False),
+        ("no-cache", True),
+        ("private, No-Store", True),
+    ],
+)
+def test_bypasses_cache(header, expected):
+    assert bypasses_cache(header) is expected
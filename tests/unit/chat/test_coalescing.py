@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from src.app.chat.coalescing import SingleFlight
+from src.app.chat.exceptions import RateLimitExceededError
+
+
+@pytest.mark.anyio
+async def test_single_flight_shares_one_result():
+    singleflight: SingleFlight[int] = SingleFlight()
+    calls = 0
+
+    async def operation() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return 42
+
+    results = await asyncio.gather(
+        *(singleflight.do("key", operation) for _ in range(10))
+    )
+
+    assert results == [42] * 10
+    assert calls == 1
+    assert singleflight.stats.leaders == 1
+    assert singleflight.stats.coalesced == 9
+    assert len(singleflight) == 0
+
+
+@pytest.mark.anyio
+async def test_single_flight_shares_errors():
+    singleflight: SingleFlight[int] = SingleFlight()
+
+    async def operation() -> int:
+        await asyncio.sleep(0.01)
+        raise RateLimitExceededError(message="slow down")
+
+    results = await asyncio.gather(
+        *(singleflight.do("key", operation) for _ in range(3)),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, RateLimitExceededError) for result in results)
+    assert len(singleflight) == 0
+
+
+@pytest.mark.anyio
+async def test_single_flight_runs_again_after_completion():
+    singleflight: SingleFlight[int] = SingleFlight()
+
+    async def operation() -> int:
+        return 1
+
+    await singleflight.do("key", operation)
+    await singleflight.do("key", operation)
+
+    assert singleflight.stats.leaders == 2
+
+
+@pytest.mark.anyio
+async def test_single_flight_survives_leader_cancellation():
+    singleflight: SingleFlight[str] = SingleFlight()
+    release = asyncio.Event()
+
+    async def operation() -> str:
+        await release.wait()
+        return "done"
+
+    leader = asyncio.create_task(singleflight.do("key", operation))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(singleflight.do("key", operation))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    release.set()
+
+    assert await follower == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
@@ -1,15 +1,17 @@
+from types import SimpleNamespace
 from unittest.mock import Mock
 
-from openai import OpenAI
+import pytest
+from openai import AsyncOpenAI
 
-from src.app.chat.dependencies import get_chat_service
+from src.app.chat.dependencies import create_chat_service, get_chat_service
 from src.app.chat.service import ChatService
 from src.app.config import Settings
 
 
-def test_get_chat_service_creates_service_with_settings():
-    """Verify get_chat_service wires up ChatService with correct settings."""
-    mock_openai_client = Mock(spec=OpenAI)
+def test_create_chat_service_uses_settings():
+    """Verify create_chat_service wires up ChatService with correct settings."""
+    mock_openai_client = Mock(spec=AsyncOpenAI)
     settings = Settings(
         PROJECT_NAME="Test Project",
         PROJECT_DESCRIPTION="Test Description",
@@ -19,10 +21,7 @@ def test_get_chat_service_creates_service_with_settings():
         RETRIEVAL_TOP_K=5,
     )
 
-    service = get_chat_service(
-        settings=settings,
-        openai_client=mock_openai_client,
-    )
+    service = create_chat_service(settings, openai_client=mock_openai_client)
 
     assert isinstance(service, ChatService)
     assert service.project_name == "Test Project"
@@ -32,3 +31,30 @@ def test_get_chat_service_creates_service_with_settings():
     assert service.max_iterations == 3
     assert service.retrieval_top_k == 5
     assert service.chat_client is mock_openai_client
+    assert service.retriever is None
+    assert service.system_prompt.version == "v1"
+    assert "Test Prompt" in service.system_prompt.text
+
+
+def test_create_chat_service_rejects_unknown_prompt_version():
+    with pytest.raises(ValueError, match="v999"):
+        create_chat_service(
+            Settings(SYSTEM_PROMPT_VERSION="v999"), openai_client=Mock()
+        )
+
+
+def make_request(**state) -> Mock:
+    return Mock(app=Mock(state=SimpleNamespace(**state)))
+
+
+@pytest.mark.anyio
+async def test_get_chat_service_returns_shared_service():
+    service = Mock(spec=ChatService)
+
+    assert await get_chat_service(make_request(chat_service=service)) is service
+
+
+@pytest.mark.anyio
+async def test_get_chat_service_requires_api_key():
+    with pytest.raises(ValueError, match="OPENAI_API_KEY"):
+        await get_chat_service(make_request(chat_service=None))
@@ -1,4 +1,12 @@
-from src.app.chat.prompts import get_system_prompt
+import pytest
+
+from src.app.chat.prompts import (
+    PROMPT_TEMPLATES,
+    SystemPrompt,
+    get_system_prompt,
+    register_prompt_template,
+    render_system_prompt,
+)
 
 
 def test_get_system_prompt_includes_project_name():
@@ -60,3 +68,45 @@ def test_get_system_prompt_returns_string():
 
     assert isinstance(prompt, str)
     assert len(prompt) > 0
+
+
+def render(version: str = "v1", **overrides) -> SystemPrompt:
+    kwargs = {
+        "project_name": "Test Project",
+        "project_description": "A test description",
+        "base_prompt": "You are a helpful assistant",
+        "max_attempts": 5,
+        **overrides,
+    }
+    return render_system_prompt(version, **kwargs)
+
+
+def test_render_system_prompt_uses_registered_template():
+    """Verify the v1 template is registered and rendered as-is."""
+    prompt = render()
+
+    assert prompt.version == "v1"
+    assert prompt.text == get_system_prompt(
+        project_name="Test Project",
+        project_description="A test description",
+        base_prompt="You are a helpful assistant",
+        max_attempts=5,
+    )
+
+
+def test_render_system_prompt_cache_key_tracks_text():
+    """Verify the cache key is stable and changes with the prompt."""
+    assert render().cache_key == render().cache_key
+    assert render().cache_key != render(max_attempts=3).cache_key
+
+
+def test_render_system_prompt_rejects_unknown_version():
+    with pytest.raises(ValueError, match="v1"):
+        render("missing")
+
+
+def test_register_prompt_template_rejects_duplicates(monkeypatch):
+    monkeypatch.setitem(PROMPT_TEMPLATES, "test", get_system_prompt)
+
+    with pytest.raises(ValueError, match="already registered"):
+        register_prompt_template("test")(get_system_prompt)
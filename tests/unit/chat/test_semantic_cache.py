@@ -0,0 +1,111 @@
+import pytest
+from prometheus_client import REGISTRY
+from pytest_mock import MockerFixture
+
+from src.app.chat import semantic_cache
+from src.app.chat.schemas import ChatResponse
+from src.app.chat.semantic_cache import SemanticCache, create_semantic_cache
+from src.app.config import Settings
+from src.app.retrieval.embeddings import HashingEmbedder
+
+
+@pytest.fixture
+def cache() -> SemanticCache:
+    return SemanticCache(
+        embedder=HashingEmbedder(dimension=128),
+        threshold=0.9,
+        ttl_seconds=60,
+        max_entries=2,
+    )
+
+
+@pytest.mark.anyio
+async def test_semantic_cache_matches_paraphrases(cache: SemanticCache):
+    stored = await cache.embed("How do I reset my VPN client?")
+    cache.set("gpt-4", stored, ChatResponse(message="Reboot it"), latency_seconds=2.0)
+
+    paraphrase = await cache.embed("my VPN client: how do I reset it")
+    unrelated = await cache.embed("Quarterly revenue report")
+
+    assert cache.get("gpt-4", paraphrase) == ChatResponse(message="Reboot it")
+    assert cache.get("gpt-4", unrelated) is None
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+    assert cache.stats.hit_rate == 0.5
+    assert cache.stats.latency_saved_seconds == 2.0
+    assert cache.stats.lookup_seconds > 0
+
+
+@pytest.mark.anyio
+async def test_semantic_cache_exports_lookups_and_latency_saved(cache: SemanticCache):
+    def sample(name: str, **labels: str) -> float:
+        return REGISTRY.get_sample_value(name, labels) or 0.0
+
+    hits = sample("semantic_cache_lookups_total", result="hit")
+    misses = sample("semantic_cache_lookups_total", result="miss")
+    saved = sample("semantic_cache_latency_saved_seconds_total")
+    vector = await cache.embed("reset VPN")
+    cache.set("gpt-4", vector, ChatResponse(message="Reboot it"), latency_seconds=1.5)
+
+    cache.get("gpt-4", vector)
+    cache.get("gpt-4o", vector)
+
+    assert sample("semantic_cache_lookups_total", result="hit") == hits + 1
+    assert sample("semantic_cache_lookups_total", result="miss") == misses + 1
+    assert sample("semantic_cache_latency_saved_seconds_total") == saved + 1.5
+
+
+@pytest.mark.anyio
+async def test_semantic_cache_separates_namespaces(cache: SemanticCache):
+    vector = await cache.embed("reset VPN")
+    cache.set("gpt-4", vector, ChatResponse(message="answer"), latency_seconds=1.0)
+
+    assert cache.get("gpt-4o", vector) is None
+
+
+@pytest.mark.anyio
+async def test_semantic_cache_evicts_least_recently_used(cache: SemanticCache):
+    first, second, third = [
+        await cache.embed(text) for text in ("reset VPN", "revenue report", "wiki")
+    ]
+    cache.set("m", first, ChatResponse(message="1"), latency_seconds=1.0)
+    cache.set("m", second, ChatResponse(message="2"), latency_seconds=1.0)
+    cache.get("m", first)
+    cache.set("m", third, ChatResponse(message="3"), latency_seconds=1.0)
+
+    assert cache.get("m", second) is None
+    assert cache.get("m", first) == ChatResponse(message="1")
+    assert len(cache) == 2
+    assert cache.stats.evictions == 1
+
+
+@pytest.mark.anyio
+async def test_semantic_cache_expires_entries(
+    cache: SemanticCache, monkeypatch: pytest.MonkeyPatch
+):
+    now = [100.0]
+    monkeypatch.setattr(semantic_cache.time, "monotonic", lambda: now[0])
+    vector = await cache.embed("reset VPN")
+    cache.set("m", vector, ChatResponse(message="answer"), latency_seconds=1.0)
+
+    now[0] += 61
+
+    assert cache.get("m", vector) is None
+    assert len(cache) == 0
+
+
+@pytest.mark.anyio
+async def test_semantic_cache_treats_embedding_failures_as_misses(
+    mocker: MockerFixture,
+):
+    embedder = mocker.Mock(dimension=8)
+    embedder.embed = mocker.AsyncMock(side_effect=ConnectionError("down"))
+    cache = SemanticCache(
+        embedder=embedder, threshold=0.9, ttl_seconds=60, max_entries=4
+    )
+
+    assert await cache.embed("reset VPN") is None
+
+
+def test_create_semantic_cache_is_disabled_by_default():
+    assert create_semantic_cache(Settings(), None) is None
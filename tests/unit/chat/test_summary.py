@@ -0,0 +1,120 @@
+import pytest
+
+from src.app.chat.schemas import ChatMessage
+from src.app.chat.summary import ConversationSummarizer, conversation_key
+
+
+def _messages(*contents: str) -> list[ChatMessage]:
+    return [
+        ChatMessage(role="user" if i % 2 == 0 else "assistant", content=content)
+        for i, content in enumerate(contents)
+    ]
+
+
+class RecordingFold:
+    def __init__(self):
+        self.calls: list[tuple[str | None, list[str]]] = []
+
+    async def __call__(self, previous: str | None, messages: list[ChatMessage]) -> str:
+        contents = [message.content for message in messages]
+        self.calls.append((previous, contents))
+        return " ".join(filter(None, [previous, *contents]))
+
+
+@pytest.mark.anyio
+async def test_summarizer_folds_aged_out_messages_in_the_background():
+    summarizer = ConversationSummarizer(max_entries=10)
+    fold = RecordingFold()
+
+    first = summarizer.summary_for("c", _messages("q1", "a1"), offset=0, fold=fold)
+    await summarizer.join()
+    second = summarizer.summary_for("c", _messages("q1", "a1"), offset=0, fold=fold)
+
+    assert (first, second) == (None, "q1 a1")
+    assert fold.calls == [(None, ["q1", "a1"])]
+
+
+@pytest.mark.anyio
+async def test_summarizer_folds_only_new_messages():
+    summarizer = ConversationSummarizer(max_entries=10)
+    fold = RecordingFold()
+    summarizer.summary_for("c", _messages("q1", "a1"), offset=0, fold=fold)
+    await summarizer.join()
+
+    stale = summarizer.summary_for(
+        "c", _messages("q1", "a1", "q2", "a2"), offset=0, fold=fold
+    )
+    await summarizer.join()
+
+    assert stale == "q1 a1"
+    assert fold.calls[-1] == ("q1 a1", ["q2", "a2"])
+    assert (
+        summarizer.summary_for(
+            "c", _messages("q1", "a1", "q2", "a2"), offset=0, fold=fold
+        )
+        == "q1 a1 q2 a2"
+    )
+
+
+@pytest.mark.anyio
+async def test_summarizer_ignores_summaries_of_a_different_history():
+    summarizer = ConversationSummarizer(max_entries=10)
+    fold = RecordingFold()
+    summarizer.summary_for("c", _messages("q1", "a1"), offset=0, fold=fold)
+    await summarizer.join()
+
+    assert (
+        summarizer.summary_for("c", _messages("q1", "other"), offset=0, fold=fold)
+        is None
+    )
+
+
+@pytest.mark.anyio
+async def test_summarizer_keeps_summaries_across_store_trimming():
+    """With an offset, messages the store already dropped stay summarised."""
+    summarizer = ConversationSummarizer(max_entries=10)
+    fold = RecordingFold()
+    summarizer.summary_for("conv", _messages("q1", "a1"), offset=0, fold=fold)
+    await summarizer.join()
+
+    summary = summarizer.summary_for("conv", _messages("q2", "a2"), offset=2, fold=fold)
+    await summarizer.join()
+
+    assert summary == "q1 a1"
+    assert fold.calls[-1] == ("q1 a1", ["q2", "a2"])
+
+
+@pytest.mark.anyio
+async def test_summarizer_keeps_previous_summary_when_fold_fails():
+    summarizer = ConversationSummarizer(max_entries=10)
+    summarizer.summary_for("c", _messages("q1"), offset=0, fold=RecordingFold())
+    await summarizer.join()
+
+    async def failing(previous, messages):
+        raise RuntimeError("provider down")
+
+    summarizer.summary_for("c", _messages("q1", "a1"), offset=0, fold=failing)
+    await summarizer.join()
+
+    assert summarizer.summary_for("c", _messages("q1"), offset=0, fold=failing) == "q1"
+
+
+@pytest.mark.anyio
+async def test_summarizer_evicts_least_recently_used():
+    summarizer = ConversationSummarizer(max_entries=1)
+    fold = RecordingFold()
+    summarizer.summary_for("a", _messages("q1"), offset=0, fold=fold)
+    await summarizer.join()
+    summarizer.summary_for("b", _messages("q1"), offset=0, fold=fold)
+    await summarizer.join()
+
+    assert len(summarizer) == 1
+    assert summarizer.summary_for("a", _messages("q1"), offset=0, fold=fold) is None
+
+
+def test_conversation_key_depends_on_model_and_opening_turn():
+    history = _messages("q1", "a1", "q2")
+
+    assert conversation_key("m", history) == conversation_key("m", history[:2])
+    assert conversation_key("m", history) != conversation_key("other", history)
+    assert conversation_key("m", history) != conversation_key("m", _messages("q1", "b"))
@@ -0,0 +1,56 @@
+import pytest
+from pytest_mock import MockerFixture
+
+from src.app.chat import tokens
+from src.app.chat.tokens import (
+    MESSAGE_OVERHEAD_TOKENS,
+    TokenCounter,
+    fit_history,
+    get_token_budget,
+)
+
+
+def test_estimate_tokens_rounds_up():
+    assert tokens._estimate_tokens("") == 0
+    assert tokens._estimate_tokens("abcde") == 2
+
+
+def test_token_counter_memoises_by_model_and_content(mocker: MockerFixture):
+    encoder = mocker.Mock(return_value=7)
+    mocker.patch.object(tokens, "get_encoder", return_value=encoder)
+    counter = TokenCounter()
+
+    assert counter.count("gpt-4", "hello") == 7 + MESSAGE_OVERHEAD_TOKENS
+    assert counter.count("gpt-4", "hello") == 7 + MESSAGE_OVERHEAD_TOKENS
+    counter.count("gpt-4o", "hello")
+
+    assert encoder.call_count == 2
+
+
+def test_token_counter_is_bounded(mocker: MockerFixture):
+    mocker.patch.object(tokens, "get_encoder", return_value=len)
+    counter = TokenCounter(max_entries=2)
+
+    for content in ("a", "bb", "ccc"):
+        counter.count("gpt-4", content)
+
+    assert len(counter._counts) == 2
+
+
+@pytest.mark.parametrize(
+    ("model", "expected"),
+    [
+        ("gpt-4o-2024-08-06", 100000),
+        ("gpt-4o-mini", 50000),
+        ("gpt-4", 8000),
+        ("llama", 4000),
+    ],
+)
+def test_get_token_budget_matches_longest_prefix(model, expected):
+    budgets = {"gpt-4": 8000, "gpt-4o": 100000, "gpt-4o-mini": 50000}
+    assert get_token_budget(model, 4000, budgets) == expected
+
+
+def test_fit_history_keeps_newest_messages():
+    assert fit_history(["a" * 10, "b" * 5, "c" * 5], 10, len) == 2
+    assert fit_history(["a" * 10], 5, len) == 0
@@ -0,0 +1,95 @@
+import pytest
+from openai import AsyncOpenAI
+from pytest_mock import MockerFixture
+
+from src.app.chat.exceptions import AuthenticationFailedError
+from src.app.chat.service import ChatService
+from src.app.chat.summary import SUMMARY_PREFIX, ConversationSummarizer
+from src.app.conversations.service import ConversationService
+from src.app.conversations.store import MemoryConversationStore
+
+
+@pytest.fixture
+def service(mock_service: ChatService) -> ConversationService:
+    return ConversationService(
+        store=MemoryConversationStore(max_conversations=10, max_messages=100),
+        chat_service=mock_service,
+    )
+
+
+@pytest.mark.anyio
+async def test_send_appends_question_and_answer(service: ConversationService):
+    conversation = await service.create("test-model")
+
+    response = await service.send(conversation.id, "Hi")
+
+    assert response.message == "Hello Kitty"
+    stored = await service.get(conversation.id)
+    assert [(m.role, m.content) for m in stored.messages] == [
+        ("user", "Hi"),
+        ("assistant", "Hello Kitty"),
+    ]
+
+
+@pytest.mark.anyio
+async def test_send_passes_only_the_history_window(
+    service: ConversationService, mock_openai_client: AsyncOpenAI
+):
+    conversation = await service.create("test-model")
+    for i in range(15):
+        await service.send(conversation.id, f"question {i}")
+
+    await service.send(conversation.id, "last")
+
+    messages = mock_openai_client.chat.completions.create.call_args.kwargs["messages"]
+    # System prompt, the 19 most recent history messages and the new question.
+    assert len(messages) == 21
+    assert messages[1]["content"] == "Hello Kitty"
+    assert messages[-1] == {"role": "user", "content": "last"}
+
+
+@pytest.mark.anyio
+async def test_failed_turn_is_not_stored(
+    service: ConversationService, mock_service: ChatService, mocker: MockerFixture
+):
+    conversation = await service.create("test-model")
+    mocker.patch.object(
+        mock_service,
+        "generate_response",
+        side_effect=AuthenticationFailedError(message="Invalid API key"),
+    )
+
+    with pytest.raises(AuthenticationFailedError):
+        await service.send(conversation.id, "Hi")
+
+    assert (await service.get(conversation.id)).messages == []
+
+
+@pytest.mark.anyio
+async def test_send_to_unknown_conversation_raises(service: ConversationService):
+    with pytest.raises(KeyError):
+        await service.send("conv_missing", "Hi")
+
+
+@pytest.mark.anyio
+async def test_send_summarises_turns_before_the_window(
+    service: ConversationService,
+    mock_service: ChatService,
+    mock_openai_client: AsyncOpenAI,
+):
+    mock_service.chat_history_limit = 3
+    mock_service.summarizer = ConversationSummarizer(max_entries=10)
+    conversation = await service.create("test-model")
+    for i in range(3):
+        await service.send(conversation.id, f"question {i}")
+        await mock_service.summarizer.join()
+
+    await service.send(conversation.id, "last")
+
+    messages = mock_openai_client.chat.completions.create.call_args.kwargs["messages"]
+    assert [message["content"] for message in messages[1:]] == [
+        SUMMARY_PREFIX + "Hello Kitty",
+        "question 2",
+        "Hello Kitty",
+        "last",
+    ]
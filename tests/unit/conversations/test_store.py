@@ -0,0 +1,113 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from src.app.chat.schemas import ChatMessage
+from src.app.conversations.store import (
+    Conversation,
+    MemoryConversationStore,
+    SQLiteConversationStore,
+)
+
+
+def _conversation(conversation_id: str) -> Conversation:
+    return Conversation(id=conversation_id, model="m", created_at=1.0, updated_at=1.0)
+
+
+def _messages(*contents: str) -> list[ChatMessage]:
+    return [
+        ChatMessage(role="user" if i % 2 == 0 else "assistant", content=content)
+        for i, content in enumerate(contents)
+    ]
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request: pytest.FixtureRequest, tmp_path: Path):
+    if request.param == "memory":
+        return MemoryConversationStore(max_conversations=10, max_messages=3)
+    return SQLiteConversationStore(tmp_path / "conversations.db", max_messages=3)
+
+
+@pytest.mark.anyio
+async def test_store_keeps_latest_messages(store):
+    await store.create(_conversation("conv_1"))
+
+    assert await store.append("conv_1", _messages("q1", "a1"))
+    assert await store.append("conv_1", _messages("q2", "a2"))
+
+    conversation = await store.get("conv_1")
+    assert [m.content for m in conversation.messages] == ["a1", "q2", "a2"]
+    assert conversation.updated_at > 1.0
+
+
+@pytest.mark.anyio
+async def test_store_reports_missing_conversations(store):
+    assert await store.get("missing") is None
+    assert not await store.append("missing", _messages("q1"))
+    assert not await store.delete("missing")
+
+
+@pytest.mark.anyio
+async def test_store_deletes_conversations(store):
+    await store.create(_conversation("conv_1"))
+    await store.append("conv_1", _messages("q1"))
+
+    assert await store.delete("conv_1")
+    assert await store.get("conv_1") is None
+
+
+@pytest.mark.anyio
+async def test_store_counts_concurrent_appends(store):
+    await store.create(_conversation("conv_1"))
+
+    results = await asyncio.gather(
+        *(store.append("conv_1", _messages(f"q{i}")) for i in range(20))
+    )
+
+    conversation = await store.get("conv_1")
+    assert all(results)
+    assert conversation.message_count == 20
+    assert len(conversation.messages) == 3
+
+
+@pytest.mark.anyio
+async def test_memory_store_snapshots_are_not_changed_by_appends():
+    store = MemoryConversationStore(max_conversations=10, max_messages=10)
+    await store.create(_conversation("conv_1"))
+    snapshot = await store.get("conv_1")
+
+    await store.append("conv_1", _messages("q1"))
+
+    assert snapshot.messages == []
+
+
+@pytest.mark.anyio
+async def test_memory_store_evicts_least_recently_used():
+    store = MemoryConversationStore(max_conversations=2, max_messages=10)
+    await store.create(_conversation("conv_1"))
+    await store.create(_conversation("conv_2"))
+    await store.get("conv_1")
+
+    await store.create(_conversation("conv_3"))
+
+    assert await store.get("conv_2") is None
+    assert await store.get("conv_1") is not None
+    assert (len(store), store.evictions) == (2, 1)
+
+
+@pytest.mark.anyio
+async def test_sqlite_store_survives_reopening(tmp_path: Path):
+    store = SQLiteConversationStore(tmp_path / "db" / "c.db", max_messages=10)
+    await store.create(_conversation("conv_1"))
+    await store.append("conv_1", _messages("q1", "a1"))
+    await store.close()
+
+    reopened = SQLiteConversationStore(tmp_path / "db" / "c.db", max_messages=10)
+    conversation = await reopened.get("conv_1")
+
+    assert conversation.model == "m"
+    assert [(m.role, m.content) for m in conversation.messages] == [
+        ("user", "q1"),
+        ("assistant", "a1"),
+    ]
@@ -0,0 +1,90 @@
+from pathlib import Path
+
+import pytest
+from openai import AsyncOpenAI
+from openai.types import Batch
+from pytest_mock import MockerFixture
+
+from src.app.jobs.providers import OpenAIBatchProvider
+
+
+def _batch(status: str, **fields) -> Batch:
+    return Batch(
+        id="batch_1",
+        object="batch",
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+        created_at=0,
+        input_file_id="file_in",
+        status=status,
+        **fields,
+    )
+
+
+@pytest.fixture
+def openai_client(mocker: MockerFixture) -> AsyncOpenAI:
+    client = mocker.Mock(spec=AsyncOpenAI)
+    client.files = mocker.Mock()
+    client.files.create = mocker.AsyncMock(return_value=mocker.Mock(id="file_in"))
+    client.batches = mocker.Mock()
+    client.batches.create = mocker.AsyncMock(return_value=_batch("validating"))
+    client.batches.retrieve = mocker.AsyncMock()
+    return client
+
+
+@pytest.mark.anyio
+async def test_openai_provider_uploads_and_submits(
+    openai_client: AsyncOpenAI, tmp_path: Path
+):
+    input_path = tmp_path / "input.jsonl"
+    input_path.write_text("{}\n")
+
+    batch_id = await OpenAIBatchProvider(client=openai_client).submit(input_path)
+
+    assert batch_id == "batch_1"
+    openai_client.files.create.assert_awaited_once_with(
+        file=input_path, purpose="batch"
+    )
+    openai_client.batches.create.assert_awaited_once_with(
+        input_file_id="file_in",
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    ("status", "expected"),
+    [
+        ("validating", "in_progress"),
+        ("finalizing", "in_progress"),
+        ("completed", "completed"),
+        ("expired", "expired"),
+    ],
+)
+async def test_openai_provider_maps_batch_status(
+    openai_client: AsyncOpenAI, status: str, expected: str
+):
+    openai_client.batches.retrieve.return_value = _batch(status)
+
+    state = await OpenAIBatchProvider(client=openai_client).poll("batch_1")
+
+    assert state.status == expected
+
+
+@pytest.mark.anyio
+async def test_openai_provider_downloads_output_and_error_files(
+    openai_client: AsyncOpenAI, tmp_path: Path, mocker: MockerFixture
+):
+    openai_client.batches.retrieve.return_value = _batch(
+        "completed", output_file_id="file_out", error_file_id="file_err"
+    )
+    contents = {"file_out": b'{"ok": 1}', "file_err": b'{"ok": 0}\n'}
+    openai_client.files.content = mocker.AsyncMock(
+        side_effect=lambda file_id: mocker.Mock(content=contents[file_id])
+    )
+    destination = tmp_path / "output.jsonl"
+
+    await OpenAIBatchProvider(client=openai_client).download("batch_1", destination)
+
+    assert destination.read_text() == '{"ok": 1}\n{"ok": 0}\n'
@@ -0,0 +1,292 @@
+import asyncio
+import json
+import threading
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from src.app.chat.exceptions import ModelNotFoundError
+from src.app.chat.schemas import ChatMessage, CreateChatRequest
+from src.app.chat.service import ChatService
+from src.app.jobs.providers import BatchState, StubBatchProvider
+from src.app.jobs.service import (
+    CLAIM_TIMEOUT_SECONDS,
+    JobService,
+    parse_output_line,
+)
+from src.app.jobs.store import JobStore
+
+
+def _request(content: str, model: str = "test-model") -> CreateChatRequest:
+    return CreateChatRequest(
+        model=model, messages=[ChatMessage(role="user", content=content)]
+    )
+
+
+def _answer(body: dict) -> str:
+    if body["model"] == "missing-model":
+        raise ModelNotFoundError()
+    return body["messages"][-1]["content"].upper()
+
+
+@pytest.fixture
+def job_service(tmp_path: Path, mock_service: ChatService) -> JobService:
+    return JobService(
+        store=JobStore(tmp_path / "jobs.db"),
+        provider=StubBatchProvider(_answer, polls=2),
+        chat_service=mock_service,
+        jobs_dir=tmp_path,
+        poll_interval=0.01,
+    )
+
+
+def _results(service: JobService, job_id: str) -> list[dict]:
+    return [json.loads(line) for line in service.iter_results(job_id)]
+
+
+@pytest.mark.anyio
+async def test_job_writes_batch_input(job_service: JobService, tmp_path: Path):
+    job = await job_service.create_job([_request("first"), _request("second")])
+
+    lines = [
+        json.loads(line)
+        for line in (tmp_path / job.id / "input.jsonl").read_text().splitlines()
+    ]
+    assert [line["custom_id"] for line in lines] == ["request-0", "request-1"]
+    assert lines[0]["url"] == "/v1/chat/completions"
+    assert lines[0]["body"]["model"] == "test-model"
+    assert lines[0]["body"]["messages"][0]["role"] == "system"
+    assert lines[0]["body"]["messages"][-1] == {"role": "user", "content": "first"}
+
+
+@pytest.mark.anyio
+async def test_job_builds_request_bodies_on_the_event_loop(
+    job_service: JobService, mocker: MockerFixture
+):
+    threads = []
+    build = job_service.chat_service.batch_request_body
+
+    def record_thread(request: CreateChatRequest) -> dict:
+        threads.append(threading.get_ident())
+        return build(request)
+
+    mocker.patch.object(
+        job_service.chat_service, "batch_request_body", side_effect=record_thread
+    )
+
+    await job_service.create_job([_request("first"), _request("second")])
+
+    assert threads == [threading.get_ident()] * 2
+
+
+@pytest.mark.anyio
+async def test_job_completes_with_results_in_order(job_service: JobService):
+    requests = [
+        _request("first"),
+        _request("second", model="missing-model"),
+        _request("third"),
+    ]
+    job = await job_service.create_job(requests)
+    assert job.status == "in_progress"
+
+    await job_service.poll_once()
+    assert (await job_service.get_job(job.id)).status == "in_progress"
+    await job_service.poll_once()
+
+    job = await job_service.get_job(job.id)
+    assert (job.status, job.succeeded, job.failed) == ("completed", 2, 1)
+    assert _results(job_service, job.id) == [
+        {"index": 0, "response": {"message": "FIRST"}},
+        {"index": 1, "error": {"status_code": 404, "detail": "Model not found"}},
+        {"index": 2, "response": {"message": "THIRD"}},
+    ]
+
+
+@pytest.mark.anyio
+async def test_job_reports_requests_missing_from_expired_batch(
+    job_service: JobService, mocker: MockerFixture
+):
+    job = await job_service.create_job([_request("first"), _request("second")])
+    mocker.patch.object(
+        job_service.provider, "poll", return_value=BatchState(status="expired")
+    )
+
+    async def download(batch_id: str, destination: Path) -> None:
+        line = {
+            "custom_id": "request-1",
+            "response": {
+                "status_code": 200,
+                "body": {"choices": [{"message": {"content": "late"}}]},
+            },
+            "error": None,
+        }
+        destination.write_text(json.dumps(line) + "\n")
+
+    mocker.patch.object(job_service.provider, "download", side_effect=download)
+
+    await job_service.poll_once()
+
+    job = await job_service.get_job(job.id)
+    assert (job.status, job.succeeded, job.failed) == ("expired", 1, 1)
+    assert _results(job_service, job.id) == [
+        {
+            "index": 0,
+            "error": {
+                "status_code": 500,
+                "detail": "Batch expired before this request ran",
+            },
+        },
+        {"index": 1, "response": {"message": "late"}},
+    ]
+
+
+@pytest.mark.anyio
+async def test_job_records_failed_batch(job_service: JobService, mocker: MockerFixture):
+    job = await job_service.create_job([_request("first")])
+    mocker.patch.object(
+        job_service.provider,
+        "poll",
+        return_value=BatchState(status="failed", error="Invalid input file"),
+    )
+
+    await job_service.poll_once()
+
+    job = await job_service.get_job(job.id)
+    assert (job.status, job.error) == ("failed", "Invalid input file")
+    assert await job_service.get_job(job.id) not in job_service.store.active()
+
+
+@pytest.mark.anyio
+async def test_job_submission_is_retried_after_failure(
+    job_service: JobService, mocker: MockerFixture
+):
+    submit = job_service.provider.submit
+    mocker.patch.object(
+        job_service.provider, "submit", side_effect=ConnectionError("down")
+    )
+    job = await job_service.create_job([_request("first")])
+    assert (job.status, job.provider_batch_id) == ("pending", None)
+
+    job_service.provider.submit.side_effect = submit
+    await job_service.poll_once()
+
+    assert (await job_service.get_job(job.id)).status == "in_progress"
+
+
+@pytest.mark.anyio
+async def test_job_is_submitted_once_while_the_poller_runs(
+    job_service: JobService, mocker: MockerFixture
+):
+    uploading, release = asyncio.Event(), asyncio.Event()
+    submit = job_service.provider.submit
+
+    async def slow_submit(input_path: Path) -> str:
+        uploading.set()
+        await release.wait()
+        return await submit(input_path)
+
+    mocker.patch.object(job_service.provider, "submit", side_effect=slow_submit)
+    creating = asyncio.create_task(job_service.create_job([_request("first")]))
+    await uploading.wait()
+
+    await job_service.poll_once()
+    release.set()
+    job = await creating
+
+    assert job.status == "in_progress"
+    assert job_service.provider.submit.call_count == 1
+
+
+@pytest.mark.anyio
+async def test_job_is_collated_once_by_concurrent_pollers(
+    job_service: JobService, mocker: MockerFixture
+):
+    job = await job_service.create_job([_request("first")])
+    download = job_service.provider.download
+    downloading, release = asyncio.Event(), asyncio.Event()
+
+    async def slow_download(batch_id: str, destination: Path) -> None:
+        downloading.set()
+        await release.wait()
+        await download(batch_id, destination)
+
+    mocker.patch.object(job_service.provider, "download", side_effect=slow_download)
+    mocker.patch.object(
+        job_service.provider, "poll", return_value=BatchState(status="completed")
+    )
+    first = asyncio.create_task(job_service.poll_once())
+    await downloading.wait()
+
+    await job_service.poll_once()
+    release.set()
+    await first
+
+    assert job_service.provider.download.call_count == 1
+    assert (await job_service.get_job(job.id)).status == "completed"
+
+
+@pytest.mark.anyio
+async def test_job_abandoned_while_submitting_is_taken_over(
+    job_service: JobService, mocker: MockerFixture
+):
+    job = await job_service.create_job([_request("first")])
+    job_service.store.update(job.id, status="submitting", provider_batch_id=None)
+    await job_service.poll_once()
+    assert (await job_service.get_job(job.id)).status == "submitting"
+
+    mocker.patch(
+        "src.app.jobs.service.time.time",
+        return_value=(await job_service.get_job(job.id)).updated_at
+        + CLAIM_TIMEOUT_SECONDS
+        + 1,
+    )
+    await job_service.poll_once()
+
+    assert (await job_service.get_job(job.id)).status == "in_progress"
+
+
+@pytest.mark.anyio
+async def test_job_resumes_after_restart(
+    job_service: JobService, tmp_path: Path, mock_service: ChatService
+):
+    job = await job_service.create_job([_request("first")])
+    job_service.close()
+
+    restarted = JobService(
+        store=JobStore(tmp_path / "jobs.db"),
+        provider=job_service.provider,
+        chat_service=mock_service,
+        jobs_dir=tmp_path,
+        poll_interval=0.01,
+    )
+    await restarted.poll_once()
+    await restarted.poll_once()
+
+    assert (await restarted.get_job(job.id)).status == "completed"
+    assert _results(restarted, job.id) == [
+        {"index": 0, "response": {"message": "FIRST"}}
+    ]
+
+
+def test_parse_output_line_maps_request_errors():
+    line = {
+        "custom_id": "request-7",
+        "response": None,
+        "error": {"code": "batch_expired", "message": "Request expired"},
+    }
+
+    result = parse_output_line(json.dumps(line))
+
+    assert result.index == 7
+    assert (result.error.status_code, result.error.detail) == (500, "Request expired")
+
+
+def test_chat_service_batch_request_body_omits_tools(mock_service: ChatService):
+    mock_service.retriever = object()
+    mock_service.send_prompt_cache_key = True
+
+    body = mock_service.batch_request_body(_request("Hi"))
+
+    assert set(body) == {"model", "messages", "prompt_cache_key"}
+    assert body["prompt_cache_key"] == mock_service.system_prompt.cache_key
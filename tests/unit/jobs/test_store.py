@@ -0,0 +1,59 @@
+from pathlib import Path
+
+from src.app.jobs.store import Job, JobStore
+
+
+def _job(job_id: str, created_at: float = 1.0) -> Job:
+    return Job(
+        id=job_id, status="pending", total=3, created_at=created_at, updated_at=0.0
+    )
+
+
+def test_job_store_round_trips_jobs(tmp_path: Path):
+    store = JobStore(tmp_path / "jobs.db")
+    store.create(_job("job_1"))
+
+    assert store.get("job_1") == _job("job_1")
+    assert store.get("missing") is None
+
+
+def test_job_store_updates_fields(tmp_path: Path):
+    store = JobStore(tmp_path / "jobs.db")
+    store.create(_job("job_1"))
+
+    job = store.update("job_1", status="completed", succeeded=2, failed=1)
+
+    assert (job.status, job.succeeded, job.failed) == ("completed", 2, 1)
+    assert job.updated_at > 0
+
+
+def test_job_store_lists_active_jobs_oldest_first(tmp_path: Path):
+    store = JobStore(tmp_path / "jobs.db")
+    store.create(_job("job_new", created_at=2.0))
+    store.create(_job("job_old", created_at=1.0))
+    store.create(_job("job_done"))
+    store.update("job_new", status="in_progress", provider_batch_id="batch_1")
+    store.update("job_done", status="completed")
+
+    assert [job.id for job in store.active()] == ["job_old", "job_new"]
+
+
+def test_job_store_survives_reopening(tmp_path: Path):
+    store = JobStore(tmp_path / "jobs" / "jobs.db")
+    store.create(_job("job_1"))
+    store.close()
+
+    reopened = JobStore(tmp_path / "jobs" / "jobs.db")
+
+    assert reopened.get("job_1") == _job("job_1")
+
+
+def test_job_store_claims_a_status_once(tmp_path: Path):
+    store = JobStore(tmp_path / "jobs.db")
+    store.create(_job("job_1"))
+
+    claimed = store.claim("job_1", "pending", "submitting")
+
+    assert claimed.status == "submitting"
+    assert store.claim("job_1", "pending", "submitting") is None
+    assert store.claim("job_1", "submitting", "pending", updated_before=0.0) is None
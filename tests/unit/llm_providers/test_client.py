@@ -1,19 +1,24 @@
-from openai import OpenAI
+from unittest.mock import Mock
+
 import pytest
+from openai import AsyncOpenAI
 
 from src.app.config import Settings
 from src.app.llm_providers.client import (
     OpenAIConfig,
+    create_http_client,
     create_openai_client,
-    get_openai_config,
+    create_shared_openai_client,
     get_chat_openai_client,
+    get_openai_config,
 )
+from src.app.llm_providers.rate_limit import AdaptiveRateLimiter
 
 
 def test_create_openai_client_returns_openai_instance():
     config = OpenAIConfig(api_key="test-api-key")
     client = create_openai_client(config)
-    assert isinstance(client, OpenAI)
+    assert isinstance(client, AsyncOpenAI)
 
 
 def test_get_openai_config_uses_settings_api_key():
@@ -28,8 +33,66 @@ def test_get_openai_config_raises_without_api_key():
         get_openai_config(settings)
 
 
-def test_get_chat_openai_client_returns_openai_instance():
-    """Verify get_chat_openai_client wires up config and returns OpenAI client."""
-    settings = Settings(OPENAI_API_KEY="test-api-key")
-    client = get_chat_openai_client(settings=settings)
-    assert isinstance(client, OpenAI)
+def test_get_openai_config_reads_pool_settings():
+    settings = Settings(
+        OPENAI_API_KEY="my-secret-key",
+        OPENAI_MAX_CONNECTIONS=50,
+        OPENAI_MAX_KEEPALIVE_CONNECTIONS=10,
+        OPENAI_KEEPALIVE_EXPIRY=15.0,
+        OPENAI_HTTP2=True,
+        OPENAI_TIMEOUT=30.0,
+        OPENAI_CONNECT_TIMEOUT=2.0,
+    )
+    config = get_openai_config(settings)
+    assert config.max_connections == 50
+    assert config.max_keepalive_connections == 10
+    assert config.keepalive_expiry == 15.0
+    assert config.http2 is True
+    assert config.timeout == 30.0
+    assert config.connect_timeout == 2.0
+
+
+def test_create_http_client_applies_timeouts():
+    config = OpenAIConfig(api_key="test-api-key", timeout=30.0, connect_timeout=2.0)
+    http_client = create_http_client(config)
+    assert http_client.timeout.read == 30.0
+    assert http_client.timeout.connect == 2.0
+
+
+def test_create_shared_openai_client_returns_none_without_api_key():
+    assert create_shared_openai_client(Settings(OPENAI_API_KEY=None)) is None
+
+
+@pytest.mark.anyio
+async def test_get_chat_openai_client_returns_shared_instance():
+    """Verify every request receives the client stored on app state."""
+    shared_client = create_openai_client(OpenAIConfig(api_key="test-api-key"))
+    request = Mock()
+    request.app.state.openai_client = shared_client
+
+    assert await get_chat_openai_client(request) is shared_client
+    assert await get_chat_openai_client(request) is shared_client
+
+
+@pytest.mark.anyio
+async def test_get_chat_openai_client_raises_without_shared_client():
+    request = Mock()
+    request.app.state.openai_client = None
+    with pytest.raises(ValueError, match="OPENAI_API_KEY is not set"):
+        await get_chat_openai_client(request)
+
+
+def test_create_http_client_feeds_rate_limiter():
+    limiter = AdaptiveRateLimiter()
+    http_client = create_http_client(OpenAIConfig(api_key="test-api-key"), limiter)
+    assert limiter.observe_response in http_client.event_hooks["response"]
+
+
+def test_get_openai_config_disables_sdk_retries_with_rate_limiter():
+    """The scheduler retries instead of the SDK, so attempts are not doubled."""
+    enabled = get_openai_config(Settings(OPENAI_API_KEY="key"))
+    disabled = get_openai_config(
+        Settings(OPENAI_API_KEY="key", OPENAI_RATE_LIMIT_ENABLED=False)
+    )
+    assert enabled.max_retries == 0
+    assert disabled.max_retries == 2
@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+
+from src.app.config import Settings
+from src.app.llm_providers.hedging import (
+    MIN_SAMPLES,
+    Hedger,
+    LatencyTracker,
+    create_hedger,
+)
+
+
+def make_hedger(initial_delay: float = 0.01, max_ratio: float = 1.0) -> Hedger:
+    return Hedger(percentile=95, initial_delay=initial_delay, max_ratio=max_ratio)
+
+
+class Operation:
+    """Each call sleeps for the next configured latency, then returns its index."""
+
+    def __init__(self, *latencies: float, error: Exception | None = None):
+        self.latencies = list(latencies)
+        self.error = error
+        self.calls = 0
+        self.cancelled: list[int] = []
+
+    async def __call__(self) -> int:
+        index = self.calls
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.latencies[index])
+        except asyncio.CancelledError:
+            self.cancelled.append(index)
+            raise
+        if self.error is not None:
+            raise self.error
+        return index
+
+
+def test_latency_tracker_keeps_a_window():
+    tracker = LatencyTracker(window=3)
+    for sample in (10.0, 1.0, 2.0, 3.0):
+        tracker.record(sample)
+
+    assert len(tracker) == 3
+    assert tracker.count == 4
+    assert tracker.percentile(100) == 3.0
+
+
+@pytest.mark.anyio
+async def test_hedger_does_not_hedge_fast_requests():
+    hedger = make_hedger(initial_delay=1.0)
+    operation = Operation(0.0)
+
+    assert await hedger.run("gpt-4", operation) == 0
+    assert operation.calls == 1
+    assert hedger.stats.hedged == 0
+
+
+@pytest.mark.anyio
+async def test_hedger_takes_the_faster_duplicate():
+    hedger = make_hedger()
+    operation = Operation(1.0, 0.0)
+
+    assert await hedger.run("gpt-4", operation) == 1
+    await asyncio.sleep(0)
+
+    assert operation.cancelled == [0]
+    assert hedger.stats.hedged == 1
+    assert hedger.stats.hedge_wins == 1
+
+
+@pytest.mark.anyio
+async def test_hedger_records_a_lower_bound_for_an_original_beaten_by_its_hedge():
+    hedger = make_hedger(initial_delay=0.05)
+    before = REGISTRY.get_sample_value(
+        "provider_hedging_events_total", {"event": "hedge_wins"}
+    )
+
+    assert await hedger.run("gpt-4", Operation(1.0, 0.0)) == 1
+
+    [recorded] = hedger._trackers["gpt-4"].samples
+    assert recorded >= 0.05
+    assert (
+        REGISTRY.get_sample_value(
+            "provider_hedging_events_total", {"event": "hedge_wins"}
+        )
+        == (before or 0.0) + 1
+    )
+    assert REGISTRY.get_sample_value("provider_hedged_request_duration_seconds_count")
+
+
+@pytest.mark.anyio
+async def test_hedger_keeps_original_when_it_finishes_first():
+    hedger = make_hedger()
+    operation = Operation(0.05, 1.0)
+
+    assert await hedger.run("gpt-4", operation) == 0
+    await asyncio.sleep(0)
+
+    assert operation.cancelled == [1]
+    assert hedger.stats.hedge_wins == 0
+
+
+@pytest.mark.anyio
+async def test_hedger_respects_budget():
+    hedger = make_hedger(max_ratio=0.0)
+    hedger._budget = 0.0
+    operation = Operation(0.05)
+
+    assert await hedger.run("gpt-4", operation) == 0
+    assert operation.calls == 1
+    assert hedger.stats.budget_denied == 1
+
+
+@pytest.mark.anyio
+async def test_hedger_raises_when_both_requests_fail():
+    hedger = make_hedger()
+    operation = Operation(0.05, 0.0, error=ConnectionError("down"))
+
+    with pytest.raises(ConnectionError):
+        await hedger.run("gpt-4", operation)
+
+
+def test_hedger_delay_follows_latency_percentile():
+    hedger = make_hedger(initial_delay=5.0)
+    assert hedger.delay("gpt-4") == 5.0
+
+    tracker = hedger._trackers["gpt-4"] = LatencyTracker()
+    for sample in range(1, MIN_SAMPLES + 1):
+        tracker.record(sample / 10)
+
+    assert hedger.delay("gpt-4") == pytest.approx(tracker.percentile(95))
+    assert hedger.delay("gpt-4o") == 5.0
+
+
+def test_create_hedger_is_disabled_by_default():
+    assert create_hedger(Settings()) is None
+    assert create_hedger(Settings(HEDGING_ENABLED=True)).percentile == 95.0
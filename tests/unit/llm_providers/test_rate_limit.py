@@ -0,0 +1,211 @@
+import math
+
+import httpx
+import pytest
+from openai import APIConnectionError, RateLimitError
+from pytest_mock import MockerFixture
+
+from src.app.config import Settings
+from src.app.llm_providers.rate_limit import (
+    AdaptiveRateLimiter,
+    ProviderScheduler,
+    RateLimitDeadlineExceeded,
+    TokenBucket,
+    create_rate_limiter,
+    parse_duration,
+    retry_after_seconds,
+)
+
+REQUEST = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+
+def rate_limit_error(headers=None, code="rate_limit_exceeded") -> RateLimitError:
+    return RateLimitError(
+        "Rate limit exceeded",
+        response=httpx.Response(429, headers=headers, request=REQUEST),
+        body={"code": code, "message": "Rate limit exceeded"},
+    )
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [("1s", 1.0), ("6m0s", 360.0), ("20ms", 0.02), ("1h2m", 3720.0), ("2.5", 2.5)],
+)
+def test_parse_duration(value, expected):
+    assert parse_duration(value) == pytest.approx(expected)
+
+
+def test_parse_duration_ignores_garbage():
+    assert parse_duration(None) is None
+    assert parse_duration("soon") is None
+
+
+def test_retry_after_prefers_milliseconds():
+    assert retry_after_seconds({"retry-after-ms": "250", "retry-after": "3"}) == 0.25
+    assert retry_after_seconds({"retry-after": "3"}) == 3.0
+    assert retry_after_seconds({}) is None
+
+
+def test_token_bucket_refills_over_time():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock=clock)
+    bucket.take(60)
+
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+    clock.now += 0.5
+    assert bucket.wait_time(1) == pytest.approx(0.5)
+    clock.now += 0.5
+    assert bucket.wait_time(1) == 0.0
+
+
+def test_token_bucket_without_limit_never_waits():
+    bucket = TokenBucket(None)
+    bucket.take(1_000_000)
+    assert bucket.wait_time(1_000_000) == 0.0
+
+
+def test_limiter_learns_limits_from_headers():
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(clock=clock)
+
+    limiter.observe(
+        "gpt-4",
+        {
+            "x-ratelimit-limit-requests": "600",
+            "x-ratelimit-remaining-requests": "0",
+            "x-ratelimit-limit-tokens": "60000",
+            "x-ratelimit-remaining-tokens": "59000",
+        },
+    )
+
+    limits = limiter.limits("gpt-4")
+    assert limits.requests.capacity == 600
+    assert limits.requests.wait_time(1) == pytest.approx(0.1)
+    assert limits.tokens.level == 59000
+    assert limiter.limits("gpt-4o").requests.wait_time(1) == 0
+
+
+@pytest.mark.anyio
+async def test_limiter_queues_until_quota_frees_up():
+    limiter = AdaptiveRateLimiter()
+    limiter.observe(
+        "gpt-4",
+        {"x-ratelimit-limit-requests": "6000", "x-ratelimit-remaining-requests": "0"},
+    )
+
+    await limiter.acquire("gpt-4", 1, deadline=limiter.clock() + 1)
+
+    assert limiter.stats.admitted == 1
+    assert limiter.stats.queued == 1
+    assert limiter.stats.queued_seconds > 0
+
+
+@pytest.mark.anyio
+async def test_limiter_rejects_calls_it_cannot_admit_before_deadline():
+    limiter = AdaptiveRateLimiter(requests_per_minute=1)
+    await limiter.acquire("gpt-4", 1, deadline=limiter.clock() + 1)
+
+    with pytest.raises(RateLimitDeadlineExceeded):
+        await limiter.acquire("gpt-4", 1, deadline=limiter.clock() + 1)
+    assert limiter.stats.rejected == 1
+
+
+@pytest.mark.anyio
+async def test_limiter_observes_httpx_responses_for_the_calling_model():
+    scheduler = make_scheduler()
+    response = httpx.Response(
+        200, headers={"x-ratelimit-limit-requests": "100"}, request=REQUEST
+    )
+
+    async def call() -> str:
+        await scheduler.limiter.observe_response(response)
+        return "ok"
+
+    await scheduler.run(call, model="gpt-4", tokens=10)
+    await scheduler.limiter.observe_response(response)
+
+    assert scheduler.limiter.limits("gpt-4").requests.capacity == 100
+    assert scheduler.limiter.limits("gpt-4o").requests.capacity == math.inf
+
+
+@pytest.mark.anyio
+async def test_limiter_pauses_only_the_throttled_model():
+    limiter = AdaptiveRateLimiter()
+    limiter.pause("gpt-4", 60)
+
+    await limiter.acquire("gpt-4o", 1, deadline=limiter.clock() + 1)
+
+    with pytest.raises(RateLimitDeadlineExceeded):
+        await limiter.acquire("gpt-4", 1, deadline=limiter.clock() + 1)
+
+
+def test_limiter_forgets_the_least_recently_used_models():
+    limiter = AdaptiveRateLimiter(max_models=2)
+    first = limiter.limits("a")
+    limiter.limits("b")
+    limiter.limits("a")
+    limiter.limits("c")
+
+    assert limiter.limits("a") is first
+    assert list(limiter._models) == ["c", "a"]
+
+
+def make_scheduler(deadline: float = 1.0) -> ProviderScheduler:
+    return ProviderScheduler(
+        limiter=AdaptiveRateLimiter(),
+        deadline_seconds=deadline,
+        base_delay=0.001,
+        max_delay=0.01,
+    )
+
+
+@pytest.mark.anyio
+async def test_scheduler_retries_transient_errors(mocker: MockerFixture):
+    scheduler = make_scheduler()
+    call = mocker.AsyncMock(
+        side_effect=[
+            rate_limit_error({"retry-after-ms": "10"}),
+            APIConnectionError(request=REQUEST),
+            "ok",
+        ]
+    )
+
+    assert await scheduler.run(call, model="gpt-4", tokens=10) == "ok"
+    assert call.await_count == 3
+    assert scheduler.stats.retries == 2
+    assert scheduler.limiter.stats.throttled == 1
+
+
+@pytest.mark.anyio
+async def test_scheduler_gives_up_at_deadline(mocker: MockerFixture):
+    scheduler = make_scheduler(deadline=0.5)
+    call = mocker.AsyncMock(side_effect=rate_limit_error({"retry-after": "5"}))
+
+    with pytest.raises(RateLimitError):
+        await scheduler.run(call, model="gpt-4", tokens=10)
+    call.assert_awaited_once()
+    assert scheduler.stats.gave_up == 1
+
+
+@pytest.mark.anyio
+async def test_scheduler_does_not_retry_insufficient_quota(mocker: MockerFixture):
+    scheduler = make_scheduler()
+    call = mocker.AsyncMock(side_effect=rate_limit_error(code="insufficient_quota"))
+
+    with pytest.raises(RateLimitError):
+        await scheduler.run(call, model="gpt-4", tokens=10)
+    call.assert_awaited_once()
+
+
+def test_create_rate_limiter_can_be_disabled():
+    assert create_rate_limiter(Settings(OPENAI_RATE_LIMIT_ENABLED=False)) is None
+    limiter = create_rate_limiter(Settings(OPENAI_REQUESTS_PER_MINUTE=500))
+    assert limiter.limits("gpt-4").requests.capacity == 500
@@ -0,0 +1,166 @@
+import asyncio
+
+import httpx
+import pytest
+from openai import APIConnectionError, AsyncOpenAI
+
+from benchmarks.stub_openai import create_stub_app
+from src.app.config import ProviderBackend, Settings
+from src.app.llm_providers.router import (
+    Backend,
+    CircuitBreaker,
+    NoHealthyBackendError,
+    ProviderRouter,
+    create_provider_router,
+)
+
+
+def stub_client(latency: float = 0.0) -> AsyncOpenAI:
+    """A client talking to the in-process OpenAI stub server."""
+    transport = httpx.ASGITransport(app=create_stub_app(latency=latency))
+    return AsyncOpenAI(
+        api_key="test-api-key",
+        base_url="http://stub/v1",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=transport),
+    )
+
+
+def down_client() -> AsyncOpenAI:
+    def refuse(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("connection refused", request=request)
+
+    return AsyncOpenAI(
+        api_key="test-api-key",
+        base_url="http://down/v1",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(refuse)),
+    )
+
+
+def make_backend(name, client, *, models=(), threshold=2, clock=None) -> Backend:
+    breaker = CircuitBreaker(failure_threshold=threshold, recovery_seconds=30)
+    if clock is not None:
+        breaker.clock = clock
+    return Backend(name=name, client=client, breaker=breaker, models=models)
+
+
+async def complete(router: ProviderRouter, model: str = "gpt-4") -> str:
+    completion = await router.call(
+        model,
+        lambda client: client.chat.completions.create(
+            model=model, messages=[{"role": "user", "content": "Hi"}]
+        ),
+    )
+    return completion.choices[0].message.content
+
+
+@pytest.mark.anyio
+async def test_router_fails_over_on_connection_errors():
+    down = make_backend("down", down_client())
+    healthy = make_backend("healthy", stub_client())
+    router = ProviderRouter([down, healthy])
+
+    assert await complete(router) == "stub response"
+    assert down.failures == 1
+    assert healthy.failovers == 1
+    assert down.in_flight == healthy.in_flight == 0
+
+
+@pytest.mark.anyio
+async def test_router_ejects_failing_backend():
+    down = make_backend("down", down_client(), threshold=2)
+    healthy = make_backend("healthy", stub_client())
+    router = ProviderRouter([down, healthy], strategy="least_in_flight")
+
+    for _ in range(4):
+        await complete(router)
+
+    assert down.breaker.state == "open"
+    assert down.requests == 2
+    assert healthy.requests == 4
+
+
+@pytest.mark.anyio
+async def test_router_probes_ejected_backend_after_recovery():
+    now = [0.0]
+    backend = make_backend("flaky", down_client(), threshold=1, clock=lambda: now[0])
+    router = ProviderRouter([backend])
+
+    with pytest.raises(APIConnectionError):
+        await complete(router)
+    with pytest.raises(NoHealthyBackendError):
+        await complete(router)
+
+    now[0] += 31
+    backend.client = stub_client()
+
+    assert await complete(router) == "stub response"
+    assert backend.breaker.state == "closed"
+
+
+@pytest.mark.anyio
+async def test_router_prefers_lowest_ewma_latency():
+    slow = make_backend("slow", stub_client(latency=0.05))
+    fast = make_backend("fast", stub_client())
+    router = ProviderRouter([slow, fast])
+
+    for _ in range(6):
+        await complete(router)
+
+    assert slow.requests == 1
+    assert fast.requests == 5
+    assert slow.ewma_latency > fast.ewma_latency
+
+
+@pytest.mark.anyio
+async def test_router_spreads_concurrent_calls_by_in_flight():
+    first = make_backend("first", stub_client(latency=0.02))
+    second = make_backend("second", stub_client(latency=0.02))
+    router = ProviderRouter([first, second], strategy="least_in_flight")
+
+    await asyncio.gather(*(complete(router) for _ in range(6)))
+
+    assert first.requests == second.requests == 3
+
+
+@pytest.mark.anyio
+async def test_router_matches_models_to_backends():
+    hosted = make_backend("hosted", stub_client(), models=["gpt-*"])
+    local = make_backend("local", stub_client(), models=["llama*"])
+    router = ProviderRouter([hosted, local])
+
+    await complete(router, "llama-3-8b")
+
+    assert local.requests == 1
+    assert hosted.requests == 0
+    with pytest.raises(NoHealthyBackendError, match="mistral"):
+        await complete(router, "mistral")
+
+
+def test_create_provider_router_reads_backends():
+    settings = Settings(
+        OPENAI_API_KEY="default-key",
+        OPENAI_BACKENDS=[
+            ProviderBackend(name="us", base_url="http://us.example/v1"),
+            ProviderBackend(name="local", api_key="local-key", models=["llama*"]),
+        ],
+        PROVIDER_ROUTING_STRATEGY="least_in_flight",
+    )
+
+    router = create_provider_router(settings)
+
+    assert [backend.name for backend in router.backends] == ["us", "local"]
+    assert router.backends[0].client.api_key == "default-key"
+    assert router.backends[1].client.api_key == "local-key"
+    assert router.strategy == "least_in_flight"
+
+
+def test_create_provider_router_is_disabled_without_backends():
+    assert create_provider_router(Settings()) is None
+
+
+def test_create_provider_router_requires_api_key():
+    settings = Settings(OPENAI_API_KEY=None, OPENAI_BACKENDS=[{"name": "us"}])
+    with pytest.raises(ValueError, match="us"):
+        create_provider_router(settings)
@@ -0,0 +1,157 @@
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from openai import APIConnectionError, AsyncOpenAI
+from openai.types import CompletionUsage
+from openai.types.chat import ChatCompletion, ChatCompletionChunk, ChatCompletionMessage
+from openai.types.chat.chat_completion import Choice
+from openai.types.chat.chat_completion_chunk import Choice as ChunkChoice
+from openai.types.chat.chat_completion_chunk import ChoiceDelta
+from prometheus_client import REGISTRY
+
+from src.app.chat.exceptions import OpenAIConnectionError
+from src.app.chat.schemas import ChatMessage, CreateChatRequest
+from src.app.chat.service import ChatService
+from src.app.observability import metrics
+from src.app.observability.metrics import model_metrics, observe_stage
+
+
+def sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def _request(model: str) -> CreateChatRequest:
+    return CreateChatRequest(
+        model=model, messages=[ChatMessage(role="user", content="Hi")]
+    )
+
+
+def test_observe_stage_records_elapsed_time():
+    before = sample("chat_stage_duration_seconds_count", stage="retrieval")
+
+    now = observe_stage("retrieval", 0.0)
+
+    assert now > 0
+    assert sample("chat_stage_duration_seconds_count", stage="retrieval") == before + 1
+
+
+def test_model_metrics_caps_label_values(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(metrics, "MAX_MODEL_LABELS", 2)
+    monkeypatch.setattr(metrics, "_MODELS", {})
+
+    labels = [model_metrics(f"model-{i}").label for i in range(4)]
+
+    assert labels == ["model-0", "model-1", "other", "other"]
+    assert model_metrics("model-0") is model_metrics("model-0")
+
+
+@pytest.mark.anyio
+async def test_chat_service_records_provider_latency_and_usage(
+    mock_service: ChatService, mock_openai_client: AsyncOpenAI
+):
+    mock_openai_client.chat.completions.create.return_value = ChatCompletion(
+        id="test-id",
+        choices=[
+            Choice(
+                finish_reason="stop",
+                index=0,
+                message=ChatCompletionMessage(content="ok", role="assistant"),
+            )
+        ],
+        created=0,
+        model="usage-model",
+        object="chat.completion",
+        usage=CompletionUsage(prompt_tokens=40, completion_tokens=2, total_tokens=42),
+    )
+
+    await mock_service.generate_response(_request("usage-model"))
+
+    assert sample("chat_provider_duration_seconds_count", model="usage-model") == 1
+    assert sample("chat_prompt_tokens_sum", model="usage-model") == 40
+    assert sample("chat_completion_tokens_sum", model="usage-model") == 2
+    assert sample("chat_stage_duration_seconds_count", stage="history") > 0
+
+
+@pytest.mark.anyio
+async def test_chat_service_counts_errors_by_model(
+    mock_service: ChatService, mock_openai_client: AsyncOpenAI
+):
+    mock_openai_client.chat.completions.create.side_effect = APIConnectionError(
+        request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    )
+
+    with pytest.raises(OpenAIConnectionError):
+        await mock_service.generate_response(_request("error-model"))
+
+    assert (
+        sample("chat_errors_total", error="OpenAIConnectionError", model="error-model")
+        == 1
+    )
+
+
+class _Stream:
+    def __init__(self, chunks: list[ChatCompletionChunk]):
+        self.chunks = chunks
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+@pytest.mark.anyio
+async def test_chat_service_records_time_to_first_token_and_stream_usage(
+    mock_service: ChatService, mock_openai_client: AsyncOpenAI
+):
+    def chunk(content: str | None, usage: CompletionUsage | None = None):
+        return ChatCompletionChunk(
+            id="test-id",
+            choices=[]
+            if content is None
+            else [ChunkChoice(index=0, delta=ChoiceDelta(content=content))],
+            created=0,
+            model="stream-model",
+            object="chat.completion.chunk",
+            usage=usage,
+        )
+
+    usage = CompletionUsage(prompt_tokens=10, completion_tokens=2, total_tokens=12)
+    mock_openai_client.chat.completions.create.return_value = _Stream(
+        [chunk("Hel"), chunk("lo"), chunk(None, usage)]
+    )
+
+    deltas = [d async for d in mock_service.stream_response(_request("stream-model"))]
+
+    assert deltas == ["Hel", "lo"]
+    create_kwargs = mock_openai_client.chat.completions.create.call_args.kwargs
+    assert create_kwargs["stream_options"] == {"include_usage": True}
+    assert sample("chat_time_to_first_token_seconds_count", model="stream-model") == 1
+    assert sample("chat_completion_tokens_sum", model="stream-model") == 2
+
+
+def test_metrics_endpoint_exposes_chat_metrics(client_with_mock_service: TestClient):
+    before = sample("chat_request_duration_seconds_count", route="/chat")
+    validation = sample("chat_stage_duration_seconds_count", stage="validation")
+
+    response = client_with_mock_service.post(
+        "/chat",
+        json={"model": "test-model", "messages": [{"role": "user", "content": "Hi"}]},
+    )
+    assert response.json() == {"message": "Hello Kitty"}
+
+    assert sample("chat_request_duration_seconds_count", route="/chat") == before + 1
+    assert (
+        sample("chat_stage_duration_seconds_count", stage="validation")
+        == validation + 1
+    )
+    exposition = client_with_mock_service.get("/metrics")
+    assert exposition.status_code == 200
+    assert "chat_request_duration_seconds_bucket" in exposition.text
+    assert 'chat_stage_duration_seconds_count{stage="serialization"}' in (
+        exposition.text
+    )
@@ -0,0 +1,138 @@
+import pytest
+from fastapi.testclient import TestClient
+from opentelemetry import trace
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from opentelemetry.sdk.trace.sampling import ALWAYS_OFF
+
+from src.app.chat.schemas import ChatMessage, CreateChatRequest
+from src.app.chat.service import ChatService
+from src.app.config import Settings
+from src.app.main import app
+from src.app.observability import tracing
+from src.app.observability.tracing import create_tracer_provider, start_span
+
+payload = {"model": "test-model", "messages": [{"role": "user", "content": "Hi"}]}
+
+_exporter = InMemorySpanExporter()
+
+
+@pytest.fixture
+def spans(monkeypatch: pytest.MonkeyPatch) -> InMemorySpanExporter:
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(_exporter))
+    monkeypatch.setattr(tracing, "tracer", provider.get_tracer("test"))
+    _exporter.clear()
+    yield _exporter
+    _exporter.clear()
+
+
+@pytest.fixture
+def client_with_service(mock_service: ChatService):
+    with TestClient(app) as client:
+        app.state.chat_service = mock_service
+        yield client
+
+
+def by_name(exporter: InMemorySpanExporter) -> dict[str, ReadableSpan]:
+    return {span.name: span for span in exporter.get_finished_spans()}
+
+
+def test_chat_request_produces_nested_spans(
+    spans: InMemorySpanExporter, client_with_service: TestClient
+):
+    response = client_with_service.post("/chat", json=payload)
+    assert response.status_code == 200
+
+    found = by_name(spans)
+    server = found["POST /chat"]
+    assert server.kind == trace.SpanKind.SERVER
+    assert found["get_chat_service"].parent.span_id == server.context.span_id
+    assert found["router.chat"].parent.span_id == server.context.span_id
+    generate = found["ChatService.generate_response"]
+    assert generate.parent.span_id == found["router.chat"].context.span_id
+    assert generate.attributes["gen_ai.request.model"] == "test-model"
+    assert generate.attributes["chat.cache"] == "miss"
+    iteration = found["ChatService.iteration"]
+    assert iteration.parent.span_id == generate.context.span_id
+    provider = found["provider.chat.completions"]
+    assert provider.parent.span_id == iteration.context.span_id
+    assert provider.kind == trace.SpanKind.CLIENT
+    assert provider.attributes["chat.provider.attempt"] == 1
+    assert len({span.context.trace_id for span in found.values()}) == 1
+
+
+def test_chat_request_continues_incoming_trace(
+    spans: InMemorySpanExporter, client_with_service: TestClient
+):
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    client_with_service.post(
+        "/chat",
+        json=payload,
+        headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"},
+    )
+
+    server = by_name(spans)["POST /chat"]
+    assert format(server.context.trace_id, "032x") == trace_id
+    assert format(server.parent.span_id, "016x") == "00f067aa0ba902b7"
+
+
+def test_cache_bypass_is_recorded(
+    spans: InMemorySpanExporter, client_with_service: TestClient
+):
+    client_with_service.post(
+        "/chat", json=payload, headers={"Cache-Control": "no-cache"}
+    )
+
+    generate = by_name(spans)["ChatService.generate_response"]
+    assert generate.attributes["chat.cache"] == "bypass"
+
+
+@pytest.mark.anyio
+async def test_provider_errors_are_recorded_on_spans(
+    spans: InMemorySpanExporter, mock_service: ChatService, mock_openai_client
+):
+    mock_openai_client.chat.completions.create.side_effect = RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await mock_service.generate_response(
+            CreateChatRequest(
+                model="test-model", messages=[ChatMessage(role="user", content="Hi")]
+            )
+        )
+
+    provider = by_name(spans)["provider.chat.completions"]
+    assert provider.status.status_code == trace.StatusCode.ERROR
+    assert provider.events[0].name == "exception"
+
+
+def test_start_span_skips_children_of_unsampled_spans(monkeypatch: pytest.MonkeyPatch):
+    provider = TracerProvider(sampler=ALWAYS_OFF)
+    provider.add_span_processor(SimpleSpanProcessor(_exporter))
+    monkeypatch.setattr(tracing, "tracer", provider.get_tracer("test"))
+
+    with start_span("root") as root, start_span("child") as child:
+        assert child is root
+    assert not root.is_recording()
+
+
+def test_create_tracer_provider_is_off_by_default():
+    assert create_tracer_provider(Settings()) is None
+
+
+def test_create_tracer_provider_samples_root_spans():
+    provider = create_tracer_provider(
+        Settings(
+            TRACING_ENABLED=True,
+            TRACING_SAMPLE_RATIO=0.25,
+            OTEL_SERVICE_NAME="test-service",
+        ),
+        exporter=InMemorySpanExporter(),
+    )
+
+    assert provider.resource.attributes["service.name"] == "test-service"
+    assert "0.25" in provider.sampler.get_description()
+    provider.shutdown()
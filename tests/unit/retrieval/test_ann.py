@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+from src.app.config import Settings
+from src.app.retrieval.ann import IVFPQIndex, build_ivfpq, kmeans
+from src.app.retrieval.dependencies import create_retriever
+from src.app.retrieval.index import VectorIndex
+from src.app.retrieval.schemas import Chunk
+
+
+@pytest.fixture
+def exact_index() -> VectorIndex:
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((20, 32))
+    vectors = centers[rng.integers(0, 20, 2000)] + 0.2 * rng.standard_normal((2000, 32))
+    return VectorIndex(
+        vectors=vectors,
+        chunks=[Chunk(text=f"chunk {i}") for i in range(2000)],
+        manifest={"embedding_backend": "hashing"},
+    )
+
+
+@pytest.fixture
+def index_path(exact_index: VectorIndex, tmp_path):
+    exact_index.save(tmp_path)
+    build_ivfpq(tmp_path, nlist=16, m=8, train_size=2000, iterations=10)
+    return tmp_path
+
+
+def test_kmeans_separates_clusters():
+    rng = np.random.default_rng(0)
+    data = np.concatenate(
+        [rng.normal(-5, 0.1, (50, 2)), rng.normal(5, 0.1, (50, 2))]
+    ).astype(np.float32)
+
+    centroids = kmeans(data, 2, iterations=5, rng=rng)
+
+    assert sorted(np.round(centroids[:, 0])) == [-5, 5]
+
+
+def test_ivfpq_recall_against_exact_search(exact_index: VectorIndex, index_path):
+    ann = IVFPQIndex(index_path, nprobe=4, rerank=50)
+    queries = exact_index.vectors[:50]
+
+    recall = np.mean(
+        [
+            len(
+                {i for i, _ in ann.search(q, 10)}
+                & {i for i, _ in exact_index.search(q, 10)}
+            )
+            / 10
+            for q in queries
+        ]
+    )
+
+    assert recall >= 0.8
+
+
+def test_ivfpq_probing_every_list_with_rerank_is_exact(
+    exact_index: VectorIndex, index_path
+):
+    ann = IVFPQIndex(index_path, nprobe=16, rerank=2000)
+    query = exact_index.vectors[123]
+
+    assert [i for i, _ in ann.search(query, 5)] == [
+        i for i, _ in exact_index.search(query, 5)
+    ]
+
+
+def test_ivfpq_returns_chunks_and_manifest(index_path):
+    ann = IVFPQIndex(index_path, nprobe=4, rerank=0)
+
+    assert len(ann) == 2000
+    assert ann.manifest["ivfpq"] == {"nlist": 16, "m": 8, "ksub": 256}
+    assert ann.get_chunk(7) == Chunk(text="chunk 7")
+
+
+def test_build_ivfpq_rejects_indivisible_dimension(exact_index, tmp_path):
+    exact_index.save(tmp_path)
+    with pytest.raises(ValueError, match="must divide"):
+        build_ivfpq(tmp_path, nlist=4, m=5, train_size=100, iterations=1)
+
+
+def test_build_ivfpq_limits_clusters_to_the_training_sample(exact_index, tmp_path):
+    exact_index.save(tmp_path)
+
+    build_ivfpq(tmp_path, nlist=64, m=8, train_size=40, iterations=2)
+
+    ann = IVFPQIndex(tmp_path, nprobe=40, rerank=2000)
+    assert ann.manifest["ivfpq"] == {"nlist": 40, "m": 8, "ksub": 40}
+    query = exact_index.vectors[0]
+    assert ann.search(query, 1)[0][0] == exact_index.search(query, 1)[0][0]
+
+
+def test_ivfpq_requires_built_index(exact_index, tmp_path):
+    exact_index.save(tmp_path)
+    with pytest.raises(ValueError, match="No IVF-PQ index"):
+        IVFPQIndex(tmp_path, nprobe=4, rerank=0)
+
+
+def test_create_retriever_selects_ivfpq_backend(index_path):
+    settings = Settings(
+        RETRIEVAL_INDEX_PATH=str(index_path),
+        RETRIEVAL_INDEX_BACKEND="ivfpq",
+        EMBEDDING_BACKEND="hashing",
+        EMBEDDING_DIMENSIONS=32,
+        IVF_NPROBE=3,
+        ANN_RERANK=20,
+    )
+
+    retriever = create_retriever(settings, None)
+
+    assert isinstance(retriever.index, IVFPQIndex)
+    assert retriever.index.nprobe == 3
+    assert retriever.index.rerank == 20
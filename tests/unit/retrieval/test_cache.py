@@ -0,0 +1,48 @@
+import numpy as np
+
+from src.app.retrieval.cache import EmbeddingCache, ResultCache, normalize_query
+
+
+def test_normalize_query_ignores_case_and_whitespace():
+    assert normalize_query("  Reset\tthe   VPN\n") == "reset the vpn"
+
+
+def test_embedding_cache_stores_float32_vectors():
+    cache = EmbeddingCache(max_bytes=1024)
+    cache.set("query", np.arange(4, dtype=np.float64))
+
+    vector = cache.get("query")
+
+    assert vector.dtype == np.float32
+    assert vector.tolist() == [0.0, 1.0, 2.0, 3.0]
+    assert cache.lru.size_bytes == len("query") + 16
+    assert cache.get("Query") is None
+
+
+def test_embedding_cache_evicts_least_recently_used_within_byte_bound():
+    cache = EmbeddingCache(max_bytes=2 * (1 + 32))
+    for query in "abc":
+        cache.set(query, np.zeros(8))
+
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+    assert cache.lru.stats.evictions == 1
+
+
+def test_result_cache_round_trips_ids_and_scores_by_normalised_query():
+    cache = ResultCache(max_bytes=1024, ttl_seconds=60)
+    cache.set("Reset VPN", 2, [(7, 0.91), (3, 0.5)])
+
+    assert cache.get("reset  vpn", 2) == [(7, 0.91), (3, 0.5)]
+    assert cache.get("reset vpn", 3) is None
+
+
+def test_result_cache_expires_entries(mocker):
+    cache = ResultCache(max_bytes=1024, ttl_seconds=60)
+    monotonic = mocker.patch("src.app.chat.cache.time.monotonic", return_value=0.0)
+    cache.set("query", 1, [(0, 1.0)])
+
+    monotonic.return_value = 61.0
+
+    assert cache.get("query", 1) is None
+    assert cache.lru.stats.expirations == 1
@@ -0,0 +1,69 @@
+import pytest
+
+from src.app.retrieval.documents import (
+    Document,
+    chunk_document,
+    iter_documents,
+    parse_html,
+    split_text,
+)
+
+CONFLUENCE_PAGE = """
+<html>
+  <head><title>Engineering : VPN Setup</title><style>p { color: red; }</style></head>
+  <body>
+    <div id="main-content">
+      <h1>VPN Setup</h1>
+      <p>Install the   client.</p>
+      <ul><li>Open settings</li><li>Click &quot;Reset&quot;</li></ul>
+      <script>alert("ignored")</script>
+    </div>
+  </body>
+</html>
+"""
+
+
+def test_parse_html_extracts_title_and_clean_text():
+    title, text = parse_html(CONFLUENCE_PAGE)
+
+    assert title == "VPN Setup"
+    assert "Install the client." in text
+    assert 'Click "Reset"' in text
+    assert "alert" not in text
+    assert "color" not in text
+
+
+def test_iter_documents_reads_html_and_markdown(tmp_path):
+    (tmp_path / "space").mkdir()
+    (tmp_path / "space" / "vpn.html").write_text(CONFLUENCE_PAGE)
+    (tmp_path / "notes.md").write_text("# Release Notes\n\nVersion 2 ships today.")
+    (tmp_path / "image.png").write_bytes(b"\x89PNG")
+
+    documents = list(iter_documents(tmp_path))
+
+    assert [d.source for d in documents] == ["notes.md", "space/vpn.html"]
+    assert documents[0].title == "Release Notes"
+    assert documents[1].title == "VPN Setup"
+
+
+def test_split_text_respects_size_and_overlap():
+    text = " ".join(f"word{i}" for i in range(200))
+
+    pieces = split_text(text, chunk_size=100, chunk_overlap=20)
+
+    assert all(len(piece) <= 100 for piece in pieces)
+    assert pieces[0].split()[-1] in pieces[1]
+    assert pieces[-1].endswith("word199")
+
+
+def test_split_text_rejects_overlap_larger_than_size():
+    with pytest.raises(ValueError, match="chunk_overlap"):
+        split_text("text", chunk_size=10, chunk_overlap=10)
+
+
+def test_chunk_document_attaches_source_metadata():
+    document = Document(source="space/vpn.html", title="VPN Setup", text="a b c")
+
+    chunks = chunk_document(document, chunk_size=100, chunk_overlap=10)
+
+    assert chunks[0].metadata == {"source": "space/vpn.html", "title": "VPN Setup"}
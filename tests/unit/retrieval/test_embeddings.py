@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from src.app.retrieval.embeddings import HashingEmbedder, normalize_rows
+
+
+@pytest.mark.anyio
+async def test_hashing_embedder_is_deterministic_and_normalised():
+    embedder = HashingEmbedder(dimension=64)
+    first = await embedder.embed(["reset the VPN", "quarterly report"])
+    second = await embedder.embed(["reset the VPN", "quarterly report"])
+
+    assert first.shape == (2, 64)
+    assert first.dtype == np.float32
+    np.testing.assert_array_equal(first, second)
+    np.testing.assert_allclose(np.linalg.norm(first, axis=1), 1.0, rtol=1e-6)
+
+
+@pytest.mark.anyio
+async def test_hashing_embedder_scores_shared_words_higher():
+    embedder = HashingEmbedder(dimension=256)
+    query, related, unrelated = await embedder.embed(
+        ["how to reset vpn", "vpn reset steps", "lunch menu friday"]
+    )
+    assert query @ related > query @ unrelated
+
+
+def test_normalize_rows_leaves_zero_rows_untouched():
+    vectors = normalize_rows(np.array([[3.0, 4.0], [0.0, 0.0]]))
+    np.testing.assert_allclose(vectors, [[0.6, 0.8], [0.0, 0.0]])
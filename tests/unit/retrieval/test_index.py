@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from src.app.retrieval.index import VectorIndex
+from src.app.retrieval.schemas import Chunk
+
+
+@pytest.fixture
+def index() -> VectorIndex:
+    vectors = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.7, 0.7, 0.0]])
+    chunks = [
+        Chunk(text="first", metadata={"source": "a.html"}),
+        Chunk(text="second", metadata={"source": "b.html"}),
+        Chunk(text="third", metadata={"source": "c.html"}),
+    ]
+    return VectorIndex(vectors=vectors, chunks=chunks)
+
+
+def test_search_ranks_by_cosine_similarity(index: VectorIndex):
+    results = index.search(np.array([1.0, 0.1, 0.0]), top_k=2)
+    assert [chunk_id for chunk_id, _ in results] == [0, 2]
+    assert results[0][1] > results[1][1]
+
+
+def test_search_caps_top_k_at_index_size(index: VectorIndex):
+    assert len(index.search(np.array([1.0, 0.0, 0.0]), top_k=10)) == 3
+
+
+def test_search_on_empty_index_returns_nothing():
+    index = VectorIndex(vectors=np.zeros((0, 3)), chunks=[])
+    assert index.search(np.array([1.0, 0.0, 0.0]), top_k=5) == []
+
+
+def test_index_rejects_mismatched_lengths():
+    with pytest.raises(ValueError, match="must match"):
+        VectorIndex(vectors=np.zeros((2, 3)), chunks=[Chunk(text="only one")])
+
+
+def test_get_chunk_returns_stored_chunk(index: VectorIndex):
+    assert index.get_chunk(1) == Chunk(text="second", metadata={"source": "b.html"})
@@ -0,0 +1,240 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.app.retrieval.embeddings import HashingEmbedder
+from src.app.retrieval.ingest import build_index
+from src.app.retrieval.segments import (
+    SegmentedIndex,
+    compact_index,
+    needs_compaction,
+    read_catalog,
+)
+
+
+class RecordingEmbedder(HashingEmbedder):
+    """Deterministic stub embedder recording batch sizes and overlap."""
+
+    max_batch_size = 3
+
+    def __init__(self, *, dimension: int):
+        super().__init__(dimension=dimension)
+        self.batches: list[int] = []
+        self.active = 0
+        self.max_active = 0
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        self.batches.append(len(texts))
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return self.embed_sync(texts)
+
+
+@pytest.fixture
+def export(tmp_path):
+    source = tmp_path / "export"
+    source.mkdir()
+    (source / "vpn.md").write_text("# VPN\n\n" + "Reset the VPN client. " * 20)
+    (source / "hr.md").write_text("# HR\n\nHolidays are listed on the HR page.")
+    (source / "logo.png").write_bytes(b"\x89PNG")
+    for i in range(5):
+        (source / f"page-{i}.html").write_text(
+            f"<title>Space : Page {i}</title><p>{'Release notes. ' * 10 * i}</p>"
+        )
+    return source
+
+
+@pytest.mark.anyio
+async def test_build_index_streams_every_chunk_to_disk(export, tmp_path):
+    stats = await build_index(
+        export,
+        tmp_path / "index",
+        embedder=HashingEmbedder(dimension=32),
+        chunk_size=100,
+        chunk_overlap=20,
+        workers=0,
+        manifest={"embedding_backend": "hashing"},
+    )
+
+    index = SegmentedIndex(tmp_path / "index")
+    # The image and the empty page-0 are skipped.
+    assert stats.documents == 6
+    assert stats.chunks == len(index) > stats.documents
+    assert stats.chunks_per_second > 0
+    assert index.manifest["embedding_backend"] == "hashing"
+    assert index.get_chunk(0).metadata["title"] == "HR"
+    assert {index.get_chunk(i).metadata["title"] for i in range(len(index))} >= {
+        "VPN",
+        "Page 4",
+    }
+    last = len(index) - 1
+    query = HashingEmbedder(dimension=32).embed_sync([index.get_chunk(last).text])
+    assert index.search(query[0], 1)[0][0] == last
+
+
+@pytest.mark.anyio
+async def test_build_index_bounds_batches_and_requests_in_flight(export, tmp_path):
+    embedder = RecordingEmbedder(dimension=32)
+
+    stats = await build_index(
+        export,
+        tmp_path / "index",
+        embedder=embedder,
+        chunk_size=100,
+        chunk_overlap=20,
+        batch_size=10,
+        concurrency=2,
+        workers=0,
+    )
+
+    assert sum(embedder.batches) == stats.chunks
+    assert max(embedder.batches) == 3
+    assert embedder.max_active == 2
+
+
+@pytest.mark.anyio
+async def test_build_index_parses_in_processes_like_inline(export, tmp_path):
+    kwargs = {
+        "embedder": HashingEmbedder(dimension=32),
+        "chunk_size": 100,
+        "chunk_overlap": 20,
+    }
+
+    await build_index(export, tmp_path / "inline", workers=0, **kwargs)
+    await build_index(export, tmp_path / "pool", workers=2, **kwargs)
+
+    inline = SegmentedIndex(tmp_path / "inline")
+    pool = SegmentedIndex(tmp_path / "pool")
+    assert len(pool) == len(inline)
+    assert np.array_equal(
+        pool.segments[0].index.vectors, inline.segments[0].index.vectors
+    )
+    assert [pool.get_chunk(i) for i in range(len(pool))] == [
+        inline.get_chunk(i) for i in range(len(inline))
+    ]
+
+
+@pytest.mark.anyio
+async def test_build_index_leaves_no_index_when_embedding_fails(
+    export, tmp_path, mocker
+):
+    embedder = HashingEmbedder(dimension=32)
+    mocker.patch.object(embedder, "embed", side_effect=RuntimeError("provider down"))
+
+    with pytest.raises(RuntimeError):
+        await build_index(
+            export,
+            tmp_path / "index",
+            embedder=embedder,
+            chunk_size=100,
+            chunk_overlap=20,
+            workers=0,
+        )
+
+    assert read_catalog(tmp_path / "index") is None
+    assert not list((tmp_path / "index").iterdir())
+
+
+def live_texts(index: SegmentedIndex) -> list[str]:
+    query = np.ones(index.dimension, dtype=np.float32)
+    return sorted(index.get_chunk(i).text for i, _ in index.search(query, 10_000))
+
+
+@pytest.mark.anyio
+async def test_build_index_updates_only_changed_documents(export, tmp_path):
+    kwargs = {"chunk_size": 100, "chunk_overlap": 20, "workers": 0}
+    await build_index(
+        export, tmp_path / "index", embedder=HashingEmbedder(dimension=32), **kwargs
+    )
+    (export / "vpn.md").write_text(
+        "# VPN\n\n" + "Reset the VPN client. " * 20 + "Then reconnect."
+    )
+    (export / "hr.md").unlink()
+    (export / "new.md").write_text("# New\n\nA brand new page.")
+    embedder = RecordingEmbedder(dimension=32)
+
+    stats = await build_index(export, tmp_path / "index", embedder=embedder, **kwargs)
+
+    assert (stats.changed, stats.deleted) == (2, 1)
+    # Only the last VPN chunk and the new page are embedded.
+    assert stats.embedded == sum(embedder.batches) == 2
+    catalog = read_catalog(tmp_path / "index")
+    assert len(catalog["segments"]) == 2
+    assert catalog["segments"][0]["deleted_count"] > 0
+    await build_index(
+        export, tmp_path / "fresh", embedder=HashingEmbedder(dimension=32), **kwargs
+    )
+    updated = SegmentedIndex(tmp_path / "index")
+    assert len(updated) == len(SegmentedIndex(tmp_path / "fresh"))
+    assert live_texts(updated) == live_texts(SegmentedIndex(tmp_path / "fresh"))
+    assert not any("Holidays" in text for text in live_texts(updated))
+
+
+@pytest.mark.anyio
+async def test_build_index_keeps_the_version_when_nothing_changed(export, tmp_path):
+    kwargs = {"chunk_size": 100, "chunk_overlap": 20, "workers": 0}
+    await build_index(
+        export, tmp_path / "index", embedder=HashingEmbedder(dimension=32), **kwargs
+    )
+    version = read_catalog(tmp_path / "index")["version"]
+    embedder = RecordingEmbedder(dimension=32)
+
+    stats = await build_index(export, tmp_path / "index", embedder=embedder, **kwargs)
+
+    assert (stats.changed, stats.embedded, embedder.batches) == (0, 0, [])
+    assert read_catalog(tmp_path / "index")["version"] == version
+
+
+@pytest.mark.anyio
+async def test_build_index_rejects_an_index_of_another_model(export, tmp_path):
+    kwargs = {"chunk_size": 100, "chunk_overlap": 20, "workers": 0}
+    await build_index(
+        export, tmp_path / "index", embedder=HashingEmbedder(dimension=32), **kwargs
+    )
+
+    with pytest.raises(ValueError, match="dimension"):
+        await build_index(
+            export, tmp_path / "index", embedder=HashingEmbedder(dimension=64), **kwargs
+        )
+
+
+@pytest.mark.anyio
+async def test_compact_index_merges_live_rows_into_one_segment(export, tmp_path):
+    kwargs = {
+        "embedder": HashingEmbedder(dimension=32),
+        "chunk_size": 100,
+        "chunk_overlap": 20,
+        "workers": 0,
+    }
+    await build_index(export, tmp_path / "index", **kwargs)
+    (export / "hr.md").unlink()
+    (export / "page-3.html").write_text("<title>Page 3</title><p>Rewritten.</p>")
+    await build_index(export, tmp_path / "index", **kwargs)
+    before = live_texts(SegmentedIndex(tmp_path / "index"))
+
+    catalog = compact_index(tmp_path / "index")
+
+    assert len(catalog["segments"]) == 1
+    assert catalog["segments"][0]["deleted_count"] == 0
+    assert [p.name for p in (tmp_path / "index").glob("seg-*")] == [
+        catalog["segments"][0]["name"]
+    ]
+    compacted = SegmentedIndex(tmp_path / "index")
+    assert live_texts(compacted) == before
+    assert len(compacted) == len(before)
+    # A further update finds the documents at their new rows.
+    assert (await build_index(export, tmp_path / "index", **kwargs)).changed == 0
+
+
+def test_needs_compaction_counts_segments_and_deleted_rows():
+    def entry(count, deleted_count):
+        return {"count": count, "deleted_count": deleted_count}
+
+    catalog = {"segments": [entry(100, 10), entry(10, 0)]}
+
+    assert not needs_compaction(catalog, max_segments=2, max_deleted_ratio=0.25)
+    assert needs_compaction(catalog, max_segments=1, max_deleted_ratio=0.25)
+    assert needs_compaction(catalog, max_segments=2, max_deleted_ratio=0.05)
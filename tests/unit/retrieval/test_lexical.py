@@ -0,0 +1,215 @@
+import asyncio
+import time
+import weakref
+
+import numpy as np
+import pytest
+
+from src.app.config import Settings
+from src.app.retrieval.dependencies import create_retriever
+from src.app.retrieval.embeddings import HashingEmbedder
+from src.app.retrieval.ingest import build_index
+from src.app.retrieval.lexical import (
+    BM25Index,
+    bm25_search,
+    build_bm25,
+    decode_varints,
+    encode_varints,
+    reciprocal_rank_fusion,
+    tokenize,
+    write_bm25,
+)
+from src.app.retrieval.retriever import HybridRetriever, VectorRetriever
+from src.app.retrieval.segments import SegmentedIndex
+
+TEXTS = [
+    "Reset the VPN client from the tray.",
+    "The VPN gateway rejects clients with ERR_CONN_RESET.",
+    "Release notes for PROJ-1234 and PROJ-1235.",
+    "Holidays are listed on the HR page. The HR page is updated yearly.",
+]
+
+
+@pytest.fixture
+def export(tmp_path):
+    source = tmp_path / "export"
+    source.mkdir()
+    (source / "vpn.md").write_text("# VPN\n\nReset the VPN client from the tray.")
+    (source / "hr.md").write_text("# HR\n\nHolidays are listed on the HR page.")
+    for i in range(20):
+        (source / f"release-{i}.md").write_text(
+            f"# Release {i}\n\nNotes for PROJ-{4700 + i}."
+        )
+    return source
+
+
+async def ingest(export, output, **kwargs):
+    return await build_index(
+        export,
+        output,
+        embedder=HashingEmbedder(dimension=256),
+        chunk_size=200,
+        chunk_overlap=20,
+        workers=0,
+        manifest={"embedding_backend": "hashing"},
+        **kwargs,
+    )
+
+
+def test_tokenize_keeps_identifiers_whole_and_split():
+    tokens = tokenize("See PROJ-1234 or api.v2/users, ERR_CONN_RESET.")
+
+    assert {"proj-1234", "proj", "1234", "api.v2/users", "v2"} <= set(tokens)
+    assert "err_conn_reset" in tokens
+    assert "err_conn_reset." not in tokens
+
+
+def test_varints_round_trip():
+    values = np.array([0, 1, 127, 128, 16_383, 16_384, 2**28, 2**32 - 1])
+
+    encoded, starts = encode_varints(values)
+
+    assert list(starts) == [0, 1, 2, 3, 5, 7, 10, 15]
+    assert decode_varints(encoded).tolist() == values.tolist()
+
+
+def test_bm25_ranks_exact_terms_and_rarer_terms_higher(tmp_path):
+    stats = write_bm25(tmp_path, TEXTS)
+    index = BM25Index(tmp_path, stats)
+
+    [hits] = bm25_search([index], "PROJ-1235", 10)
+    assert hits[0][0] == 2
+    # "vpn" is in two chunks, "tray" in one.
+    [hits] = bm25_search([index], "vpn tray", 10)
+    assert [chunk_id for chunk_id, _ in hits] == [0, 1]
+    [hits] = bm25_search([index], "unknown words", 10)
+    assert hits == []
+
+
+def test_bm25_search_skips_deleted_rows_and_merges_indexes(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    first = BM25Index(tmp_path / "a", write_bm25(tmp_path / "a", TEXTS[:2]))
+    second = BM25Index(tmp_path / "b", write_bm25(tmp_path / "b", TEXTS[2:]))
+
+    results = bm25_search(
+        [first, second], "vpn page", 10, deleted=[np.array([True, False]), None]
+    )
+
+    assert [chunk_id for chunk_id, _ in results[0]] == [1]
+    assert [chunk_id for chunk_id, _ in results[1]] == [1]
+
+
+def test_reciprocal_rank_fusion_prefers_chunks_in_both_rankings():
+    fused = reciprocal_rank_fusion([[(1, 0.9), (2, 0.8)], [(3, 7.0), (2, 5.0)]], k=60)
+
+    assert [chunk_id for chunk_id, _ in fused] == [2, 1, 3]
+    assert fused[0][1] == pytest.approx(1 / 62 + 1 / 62)
+
+
+@pytest.mark.anyio
+async def test_lexical_search_covers_updated_segments(export, tmp_path):
+    await ingest(export, tmp_path / "index", on_segment=build_bm25)
+    (export / "release-3.md").write_text("# Release 3\n\nNotes for PROJ-9999.")
+    await ingest(export, tmp_path / "index", on_segment=build_bm25)
+
+    index = SegmentedIndex(tmp_path / "index")
+
+    assert len(index.segments) == 2 and index.has_lexical
+    hits = index.lexical_search("PROJ-9999", 1)
+    assert index.get_chunk(hits[0][0]).metadata["title"] == "Release 3"
+    titles = [
+        index.get_chunk(i).metadata["title"]
+        for i, _ in index.lexical_search("PROJ-4703", 5)
+    ]
+    assert "Release 3" not in titles
+
+
+@pytest.mark.anyio
+async def test_closing_a_segment_unmaps_its_bm25_files(export, tmp_path):
+    await ingest(export, tmp_path / "index", on_segment=build_bm25)
+    index = SegmentedIndex(tmp_path / "index")
+    postings = weakref.ref(index.segments[0].lexical.postings)
+
+    index.close()
+
+    assert postings() is None
+
+
+@pytest.mark.anyio
+async def test_hybrid_retriever_finds_identifiers_vector_search_misses(
+    export, tmp_path, mocker
+):
+    await ingest(export, tmp_path / "index", on_segment=build_bm25)
+    index = SegmentedIndex(tmp_path / "index")
+    vector = VectorRetriever(embedder=HashingEmbedder(dimension=256), index=index)
+    titles = [index.get_chunk(i).metadata["title"] for i in range(len(index))]
+    dense = [(titles.index("VPN"), 0.5), (titles.index("HR"), 0.4)]
+    mocker.patch.object(index, "search", return_value=dense)
+    retriever = HybridRetriever(vector=vector, candidates=5)
+
+    results = await retriever.retrieve("what changed in PROJ-4711", top_k=3)
+
+    assert {result.metadata["title"] for result in results} == {
+        "Release 11",
+        "VPN",
+        "HR",
+    }
+    assert results[0].score == pytest.approx(1 / 61)
+    index.search.assert_called_once()
+    assert index.search.call_args.args[1] == 5
+
+
+@pytest.mark.anyio
+async def test_hybrid_retriever_searches_without_blocking_the_event_loop(
+    export, tmp_path, mocker
+):
+    await ingest(export, tmp_path / "index", on_segment=build_bm25)
+    index = SegmentedIndex(tmp_path / "index")
+    search = index.search
+
+    def slow_search(*args):
+        time.sleep(0.2)
+        return search(*args)
+
+    mocker.patch.object(index, "search", side_effect=slow_search)
+    vector = VectorRetriever(embedder=HashingEmbedder(dimension=256), index=index)
+    retriever = HybridRetriever(vector=vector, candidates=5)
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker = asyncio.create_task(tick())
+    results = await retriever.retrieve("what changed in PROJ-4711", top_k=1)
+    ticker.cancel()
+
+    assert results[0].metadata["title"] == "Release 11"
+    assert ticks >= 5
+
+
+@pytest.mark.anyio
+async def test_create_retriever_falls_back_to_vector_without_bm25(export, tmp_path):
+    await ingest(export, tmp_path / "bm25", on_segment=build_bm25)
+    await ingest(export, tmp_path / "plain")
+
+    def settings(path, mode="hybrid"):
+        return Settings(
+            RETRIEVAL_INDEX_PATH=str(path),
+            EMBEDDING_BACKEND="hashing",
+            EMBEDDING_DIMENSIONS=256,
+            RETRIEVAL_MODE=mode,
+        )
+
+    assert isinstance(
+        create_retriever(settings(tmp_path / "bm25"), None), HybridRetriever
+    )
+    assert isinstance(
+        create_retriever(settings(tmp_path / "plain"), None), VectorRetriever
+    )
+    assert isinstance(
+        create_retriever(settings(tmp_path / "bm25", "vector"), None), VectorRetriever
+    )
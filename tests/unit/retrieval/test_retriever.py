@@ -0,0 +1,162 @@
+import asyncio
+import time
+
+import pytest
+
+from src.app.config import Settings
+from src.app.retrieval.cache import EmbeddingCache, ResultCache
+from src.app.retrieval.dependencies import create_retriever
+from src.app.retrieval.embeddings import HashingEmbedder
+from src.app.retrieval.index import VectorIndex
+from src.app.retrieval.retriever import VectorRetriever
+from src.app.retrieval.schemas import Chunk
+
+TEXTS = [
+    "How to reset the VPN client",
+    "Quarterly revenue report for finance",
+    "Onboarding checklist for new engineers",
+]
+
+
+@pytest.fixture
+def embedder() -> HashingEmbedder:
+    return HashingEmbedder(dimension=128)
+
+
+@pytest.fixture
+def index(embedder: HashingEmbedder) -> VectorIndex:
+    return VectorIndex(
+        vectors=embedder.embed_sync(TEXTS),
+        chunks=[Chunk(text=text, metadata={"title": text}) for text in TEXTS],
+        manifest={"embedding_backend": "hashing"},
+    )
+
+
+@pytest.mark.anyio
+async def test_vector_retriever_returns_most_relevant_chunk(embedder, index):
+    retriever = VectorRetriever(embedder=embedder, index=index)
+
+    results = await retriever.retrieve("reset VPN", top_k=2)
+
+    assert len(results) == 2
+    assert results[0].text == TEXTS[0]
+    assert results[0].metadata == {"title": TEXTS[0]}
+    assert results[0].score >= results[1].score
+
+
+def test_vector_retriever_rejects_dimension_mismatch(index):
+    with pytest.raises(ValueError, match="dimension"):
+        VectorRetriever(embedder=HashingEmbedder(dimension=64), index=index)
+
+
+def test_create_retriever_is_disabled_without_index_path():
+    assert create_retriever(Settings(RETRIEVAL_INDEX_PATH=None), None) is None
+
+
+def test_create_retriever_loads_index(index, tmp_path):
+    index.save(tmp_path)
+    settings = Settings(
+        RETRIEVAL_INDEX_PATH=str(tmp_path),
+        EMBEDDING_BACKEND="hashing",
+        EMBEDDING_DIMENSIONS=128,
+    )
+
+    retriever = create_retriever(settings, None)
+
+    assert isinstance(retriever, VectorRetriever)
+    assert len(retriever.index) == 3
+
+
+def test_create_retriever_rejects_index_built_with_other_backend(index, tmp_path):
+    index.save(tmp_path)
+    settings = Settings(RETRIEVAL_INDEX_PATH=str(tmp_path), EMBEDDING_BACKEND="openai")
+
+    with pytest.raises(ValueError, match="embedding_backend"):
+        create_retriever(settings, None)
+
+
+@pytest.mark.anyio
+async def test_vector_retriever_caches_embeddings_and_results(embedder, index, mocker):
+    embed = mocker.spy(embedder, "embed")
+    search = mocker.spy(index, "search")
+    retriever = VectorRetriever(
+        embedder=embedder,
+        index=index,
+        embedding_cache=EmbeddingCache(max_bytes=1 << 20),
+        result_cache=ResultCache(max_bytes=1 << 20, ttl_seconds=60),
+    )
+
+    first = await retriever.retrieve("Reset VPN", top_k=2)
+    again = await retriever.retrieve("reset  vpn", top_k=2)
+    await retriever.retrieve("Reset VPN", top_k=3)
+
+    assert again == first
+    # The second query hits the result cache; the third misses it (other
+    # top_k) but reuses the embedding of the first.
+    assert embed.call_count == 1
+    assert search.call_count == 2
+
+
+@pytest.mark.anyio
+async def test_vector_retriever_clears_caches_when_index_version_changes(
+    embedder, index
+):
+    embedding_cache = EmbeddingCache(max_bytes=1 << 20)
+    result_cache = ResultCache(max_bytes=1 << 20, ttl_seconds=60)
+    retriever = VectorRetriever(
+        embedder=embedder,
+        index=index,
+        embedding_cache=embedding_cache,
+        result_cache=result_cache,
+    )
+    await retriever.retrieve("reset VPN", top_k=2)
+
+    index.manifest["version"] = "rebuilt"
+    await retriever.retrieve("onboarding", top_k=2)
+
+    assert len(embedding_cache.lru) == 1
+    assert len(result_cache.lru) == 1
+    assert embedding_cache.get("reset VPN") is None
+
+
+def test_create_retriever_disables_caches_with_zero_budget(index, tmp_path):
+    index.save(tmp_path)
+    settings = Settings(
+        RETRIEVAL_INDEX_PATH=str(tmp_path),
+        EMBEDDING_BACKEND="hashing",
+        EMBEDDING_DIMENSIONS=128,
+        RETRIEVAL_EMBEDDING_CACHE_MAX_BYTES=0,
+    )
+
+    retriever = create_retriever(settings, None)
+
+    assert retriever.embedding_cache is None
+    assert retriever.result_cache is not None
+
+
+@pytest.mark.anyio
+async def test_vector_retriever_searches_without_blocking_the_event_loop(
+    embedder, index, mocker
+):
+    search = index.search
+
+    def slow_search(*args):
+        time.sleep(0.2)
+        return search(*args)
+
+    mocker.patch.object(index, "search", side_effect=slow_search)
+    retriever = VectorRetriever(embedder=embedder, index=index)
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker = asyncio.create_task(tick())
+    results = await retriever.retrieve("reset VPN", top_k=1)
+    ticker.cancel()
+
+    assert results[0].text == TEXTS[0]
+    assert ticks >= 5
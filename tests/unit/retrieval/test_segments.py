@@ -0,0 +1,129 @@
+import asyncio
+import threading
+from functools import partial
+
+import pytest
+
+from src.app.config import Settings
+from src.app.retrieval.ann import IVFPQIndex, build_ivfpq
+from src.app.retrieval.cache import ResultCache
+from src.app.retrieval.dependencies import create_retriever
+from src.app.retrieval.embeddings import HashingEmbedder
+from src.app.retrieval.ingest import build_index
+from src.app.retrieval.retriever import VectorRetriever
+from src.app.retrieval.segments import SegmentedIndex, compact_index
+
+
+@pytest.fixture
+def export(tmp_path):
+    source = tmp_path / "export"
+    source.mkdir()
+    (source / "vpn.md").write_text("# VPN\n\nReset the VPN client from the tray.")
+    (source / "hr.md").write_text("# HR\n\nHolidays are listed on the HR page.")
+    for i in range(40):
+        (source / f"release-{i}.md").write_text(f"# Release {i}\n\nNotes {i}.")
+    return source
+
+
+async def ingest(export, output, **kwargs):
+    return await build_index(
+        export,
+        output,
+        embedder=HashingEmbedder(dimension=256),
+        chunk_size=200,
+        chunk_overlap=20,
+        workers=0,
+        manifest={"embedding_backend": "hashing"},
+        **kwargs,
+    )
+
+
+@pytest.mark.anyio
+async def test_retriever_switches_to_a_new_version_reusing_segments(export, tmp_path):
+    await ingest(export, tmp_path / "index")
+    index = SegmentedIndex(tmp_path / "index")
+    retriever = VectorRetriever(
+        embedder=HashingEmbedder(dimension=256),
+        index=index,
+        result_cache=ResultCache(max_bytes=1 << 20, ttl_seconds=60),
+    )
+    assert (await retriever.retrieve("holidays", top_k=1))[0].metadata["title"] == "HR"
+    assert not retriever.reload_index()
+
+    (export / "hr.md").unlink()
+    (export / "pto.md").write_text("# PTO\n\nHolidays moved to the PTO page.")
+    await ingest(export, tmp_path / "index")
+
+    assert retriever.reload_index()
+    assert retriever.index is not index
+    assert retriever.index.segments[0] is index.segments[0]
+    results = await retriever.retrieve("holidays", top_k=1)
+    assert results[0].metadata["title"] == "PTO"
+    assert len(retriever.index) == len(index)
+
+
+@pytest.mark.anyio
+async def test_retriever_closes_a_replaced_index_after_its_searches(
+    export, tmp_path, mocker
+):
+    await ingest(export, tmp_path / "index")
+    index = SegmentedIndex(tmp_path / "index")
+    retriever = VectorRetriever(embedder=HashingEmbedder(dimension=256), index=index)
+    [segment] = index.segments
+    close = mocker.spy(segment, "close")
+    search = segment.index.search
+    release = threading.Event()
+
+    def blocked_search(*args):
+        release.wait(5)
+        return search(*args)
+
+    mocker.patch.object(segment.index, "search", side_effect=blocked_search)
+    pending = asyncio.create_task(retriever.retrieve("reset vpn", top_k=1))
+    await asyncio.sleep(0.05)
+    compact_index(tmp_path / "index")
+
+    assert retriever.reload_index()
+    assert close.call_count == 0
+    release.set()
+    assert (await pending)[0].metadata["title"] == "VPN"
+    assert close.call_count == 1
+
+
+@pytest.mark.anyio
+async def test_retriever_keeps_serving_segments_deleted_by_compaction(export, tmp_path):
+    await ingest(export, tmp_path / "index")
+    retriever = VectorRetriever(
+        embedder=HashingEmbedder(dimension=256),
+        index=SegmentedIndex(tmp_path / "index"),
+    )
+
+    compact_index(tmp_path / "index")
+
+    assert (await retriever.retrieve("reset vpn", top_k=1))[0].metadata[
+        "title"
+    ] == "VPN"
+    assert retriever.reload_index()
+    assert (await retriever.retrieve("reset vpn", top_k=1))[0].metadata[
+        "title"
+    ] == "VPN"
+
+
+@pytest.mark.anyio
+async def test_create_retriever_opens_segments_with_ivfpq(export, tmp_path):
+    on_segment = partial(build_ivfpq, nlist=4, m=16, train_size=1000, iterations=5)
+    await ingest(export, tmp_path / "index", on_segment=on_segment)
+    settings = Settings(
+        RETRIEVAL_INDEX_PATH=str(tmp_path / "index"),
+        EMBEDDING_BACKEND="hashing",
+        EMBEDDING_DIMENSIONS=256,
+        RETRIEVAL_INDEX_BACKEND="ivfpq",
+        IVF_NPROBE=4,
+    )
+
+    retriever = create_retriever(settings, None)
+
+    assert isinstance(retriever.index, SegmentedIndex)
+    assert isinstance(retriever.index.segments[0].index, IVFPQIndex)
+    results = await retriever.retrieve("reset vpn", top_k=1)
+    assert results[0].metadata["title"] == "VPN"
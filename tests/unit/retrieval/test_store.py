@@ -0,0 +1,131 @@
+import numpy as np
+import pytest
+
+from src.app.retrieval import store
+from src.app.retrieval.index import VectorIndex
+from src.app.retrieval.schemas import Chunk
+from src.app.retrieval.store import (
+    MmapVectorIndex,
+    index_version,
+    open_index,
+    quantize_int8,
+)
+
+
+@pytest.fixture
+def index() -> VectorIndex:
+    rng = np.random.default_rng(0)
+    return VectorIndex(
+        vectors=rng.standard_normal((50, 16)),
+        chunks=[
+            Chunk(text=f"chunk {i} — é", metadata={"source": f"{i}.html"})
+            for i in range(50)
+        ],
+        manifest={"embedding_backend": "hashing"},
+    )
+
+
+def test_quantize_int8_round_trips_within_one_step():
+    vectors = np.array([[0.5, -1.0, 0.25], [0.0, 0.0, 0.0]], dtype=np.float32)
+
+    codes, scales = quantize_int8(vectors)
+
+    assert codes.dtype == np.int8
+    np.testing.assert_allclose(codes * scales[:, None], vectors, atol=scales[0])
+
+
+@pytest.mark.parametrize("dtype", ["int8", "float16", "float32"])
+def test_mmap_index_matches_exact_search(index: VectorIndex, tmp_path, dtype):
+    index.save(tmp_path, dtype=dtype)
+    query = index.vectors[7]
+
+    loaded = open_index(tmp_path)
+
+    assert isinstance(loaded.vectors, np.memmap)
+    assert loaded.manifest["dtype"] == dtype
+    assert loaded.manifest["embedding_backend"] == "hashing"
+    assert loaded.search(query, 5)[0][0] == 7
+    exact_ids = [chunk_id for chunk_id, _ in index.search(query, 5)]
+    assert [chunk_id for chunk_id, _ in loaded.search(query, 5)][:3] == exact_ids[:3]
+
+
+def test_mmap_index_reads_chunks_by_offset(index: VectorIndex, tmp_path):
+    index.save(tmp_path)
+
+    loaded = open_index(tmp_path)
+
+    assert len(loaded) == 50
+    assert loaded.dimension == 16
+    assert loaded.get_chunk(42) == Chunk(
+        text="chunk 42 — é", metadata={"source": "42.html"}
+    )
+
+
+def test_mmap_index_merges_top_k_across_blocks(
+    index: VectorIndex, tmp_path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(store, "SEARCH_BLOCK_ROWS", 8)
+    index.save(tmp_path, dtype="float32")
+    query = index.vectors[33]
+
+    results = open_index(tmp_path).search(query, 10)
+
+    assert results == pytest.approx(index.search(query, 10))
+
+
+def test_mmap_index_handles_empty_index(tmp_path):
+    VectorIndex(vectors=np.zeros((0, 4)), chunks=[]).save(tmp_path)
+
+    loaded = open_index(tmp_path)
+
+    assert len(loaded) == 0
+    assert loaded.search(np.ones(4), 3) == []
+
+
+def test_mmap_index_rejects_unknown_format(tmp_path):
+    (tmp_path / "manifest.json").write_text('{"format": "npy"}')
+
+    with pytest.raises(ValueError, match="Unsupported index format"):
+        MmapVectorIndex(tmp_path)
+
+
+def test_write_store_records_a_new_version_per_build(index: VectorIndex, tmp_path):
+    index.save(tmp_path / "a")
+    index.save(tmp_path / "b")
+
+    first = open_index(tmp_path / "a").manifest
+    second = open_index(tmp_path / "b").manifest
+
+    assert index_version(first) != index_version(second)
+    assert index_version(first) == first["version"]
+
+
+def test_store_writer_appends_batches(index: VectorIndex, tmp_path):
+    index.save(tmp_path / "whole")
+    with store.StoreWriter(tmp_path / "batched", dimension=16, dtype="int8") as writer:
+        for start in range(0, len(index), 20):
+            writer.add(
+                index.vectors[start : start + 20], index.chunks[start : start + 20]
+            )
+
+    whole = open_index(tmp_path / "whole")
+    batched = open_index(tmp_path / "batched")
+    assert np.array_equal(batched.vectors, whole.vectors)
+    assert np.array_equal(batched.offsets, whole.offsets)
+    assert batched.get_chunk(49) == index.chunks[49]
+
+
+def test_update_manifest_keeps_the_old_manifest_when_writing_fails(
+    index: VectorIndex, tmp_path
+):
+    index.save(tmp_path)
+    loaded = open_index(tmp_path)
+    before = (tmp_path / "manifest.json").read_text()
+
+    with pytest.raises(TypeError):
+        loaded.update_manifest({"unserialisable": object()})
+
+    assert (tmp_path / "manifest.json").read_text() == before
+    loaded.update_manifest({"extra": 1})
+    assert open_index(tmp_path).manifest["extra"] == 1
+    assert not (tmp_path / "manifest.json.tmp").exists()
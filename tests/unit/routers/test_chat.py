@@ -1,18 +1,20 @@
-from fastapi.testclient import TestClient
+import json
 from typing import Any
+from unittest.mock import AsyncMock, Mock
+
 import pytest
-from unittest.mock import Mock
+from fastapi.testclient import TestClient
 
-from src.app.main import app
 from src.app.chat.dependencies import get_chat_service
-from src.app.chat.schemas import ChatResponse
 from src.app.chat.exceptions import (
     AuthenticationFailedError,
-    RateLimitExceededError,
-    OpenAIConnectionError,
     EmptyResponseError,
     ModelNotFoundError,
+    OpenAIConnectionError,
+    RateLimitExceededError,
 )
+from src.app.chat.schemas import ChatResponse
+from src.app.main import app
 
 payload: dict[str, Any] = {
     "model": "test-model",
@@ -40,7 +42,7 @@ def test_chat_returns_chat_response(client_with_mock_service: TestClient):
 @pytest.fixture
 def mock_error_service():
     """Fixture that returns a mock service for error testing."""
-    return Mock()
+    return AsyncMock()
 
 
 @pytest.fixture
@@ -166,3 +168,143 @@ def test_chat_rejects_oversized_messages(client_with_mock_service: TestClient):
     response = client_with_mock_service.post("/chat", json=oversized_payload)
 
     assert response.status_code == 422
+
+
+def _deltas(*items: str | Exception):
+    async def generate(chat_input):
+        for item in items:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    return generate
+
+
+def test_chat_stream_sends_sse_deltas(
+    client_with_error_service: TestClient,
+    mock_error_service: Mock,
+):
+    """Verify the stream endpoint emits delta events followed by done."""
+    mock_error_service.stream_response = _deltas("Mol", "asses")
+
+    response = client_with_error_service.post("/chat/stream", json=payload)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text == (
+        'event: delta\ndata: {"content": "Mol"}\n\n'
+        'event: delta\ndata: {"content": "asses"}\n\n'
+        "event: done\ndata: {}\n\n"
+    )
+
+
+def test_chat_stream_returns_status_code_before_first_token(
+    client_with_error_service: TestClient,
+    mock_error_service: Mock,
+):
+    """Verify errors before the first delta keep their HTTP status code."""
+    mock_error_service.stream_response = _deltas(
+        RateLimitExceededError(message="OpenAI rate limit exceeded")
+    )
+
+    response = client_with_error_service.post("/chat/stream", json=payload)
+
+    assert response.status_code == 429
+    assert "rate limit" in response.json()["detail"].lower()
+
+
+def test_chat_stream_sends_error_event_mid_stream(
+    client_with_error_service: TestClient,
+    mock_error_service: Mock,
+):
+    """Verify errors after the first delta end the stream with an error event."""
+    mock_error_service.stream_response = _deltas(
+        "Mol", OpenAIConnectionError(message="Failed to connect to OpenAI API")
+    )
+
+    response = client_with_error_service.post("/chat/stream", json=payload)
+
+    assert response.status_code == 200
+    assert response.text.endswith(
+        "event: error\n"
+        'data: {"status_code": 502, "detail": "Failed to connect to OpenAI API"}\n\n'
+    )
+
+
+def test_chat_passes_cache_bypass_header(
+    client_with_error_service: TestClient,
+    mock_error_service: Mock,
+):
+    """Verify Cache-Control: no-cache disables the response cache."""
+    mock_error_service.generate_response.return_value = ChatResponse(message="ok")
+
+    client_with_error_service.post("/chat", json=payload)
+    client_with_error_service.post(
+        "/chat", json=payload, headers={"Cache-Control": "no-cache"}
+    )
+
+    first, second = mock_error_service.generate_response.await_args_list
+    assert first.kwargs == {"use_cache": True}
+    assert second.kwargs == {"use_cache": False}
+
+
+def test_chat_batch_returns_results_in_order(
+    client_with_error_service: TestClient,
+    mock_error_service: Mock,
+):
+    """Verify the batch endpoint returns one result per request, in order."""
+
+    async def generate(chat_input, use_cache):
+        if chat_input.model == "missing-model":
+            raise ModelNotFoundError(message="Model not found")
+        return ChatResponse(message=chat_input.model)
+
+    mock_error_service.generate_response.side_effect = generate
+    requests = [payload, {**payload, "model": "missing-model"}, payload]
+
+    response = client_with_error_service.post(
+        "/chat/batch", json={"requests": requests}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "results": [
+            {"index": 0, "response": {"message": "test-model"}, "error": None},
+            {
+                "index": 1,
+                "response": None,
+                "error": {"status_code": 404, "detail": "Model not found"},
+            },
+            {"index": 2, "response": {"message": "test-model"}, "error": None},
+        ]
+    }
+
+
+def test_chat_batch_streams_ndjson(
+    client_with_error_service: TestClient,
+    mock_error_service: Mock,
+):
+    """Verify Accept: application/x-ndjson streams one result per line."""
+    mock_error_service.generate_response.return_value = ChatResponse(message="ok")
+
+    response = client_with_error_service.post(
+        "/chat/batch",
+        json={"requests": [payload, payload]},
+        headers={"Accept": "application/x-ndjson", "Cache-Control": "no-cache"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["index"] for line in lines) == [0, 1]
+    assert all(line["response"] == {"message": "ok"} for line in lines)
+    assert all(
+        call.kwargs == {"use_cache": False}
+        for call in mock_error_service.generate_response.await_args_list
+    )
+
+
+def test_chat_batch_rejects_empty_batch(client_with_mock_service: TestClient):
+    """Verify an empty batch is rejected."""
+    response = client_with_mock_service.post("/chat/batch", json={"requests": []})
+    assert response.status_code == 422
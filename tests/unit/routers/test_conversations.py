@@ -0,0 +1,70 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from src.app.chat.service import ChatService
+from src.app.conversations.dependencies import get_conversation_service
+from src.app.conversations.service import ConversationService
+from src.app.conversations.store import MemoryConversationStore
+from src.app.main import app
+
+
+@pytest.fixture
+def client_with_conversation_service(mock_service: ChatService):
+    service = ConversationService(
+        store=MemoryConversationStore(max_conversations=10, max_messages=100),
+        chat_service=mock_service,
+    )
+    app.dependency_overrides[get_conversation_service] = lambda: service
+    with TestClient(app) as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+def test_conversation_round_trip(client_with_conversation_service: TestClient):
+    """Verify turns sent with only the new message build up the history."""
+    client = client_with_conversation_service
+    created = client.post("/conversations", json={"model": "test-model"})
+    assert created.status_code == 201
+    conversation_id = created.json()["id"]
+
+    response = client.post(
+        f"/conversations/{conversation_id}/messages", json={"content": "Hi"}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"message": "Hello Kitty"}
+    conversation = client.get(f"/conversations/{conversation_id}").json()
+    assert conversation["model"] == "test-model"
+    assert conversation["messages"] == [
+        {"role": "user", "content": "Hi"},
+        {"role": "assistant", "content": "Hello Kitty"},
+    ]
+
+
+def test_unknown_conversation_returns_404(
+    client_with_conversation_service: TestClient,
+):
+    client = client_with_conversation_service
+
+    assert client.get("/conversations/conv_missing").status_code == 404
+    assert client.delete("/conversations/conv_missing").status_code == 404
+    response = client.post(
+        "/conversations/conv_missing/messages", json={"content": "Hi"}
+    )
+    assert response.status_code == 404
+
+
+def test_delete_conversation(client_with_conversation_service: TestClient):
+    client = client_with_conversation_service
+    conversation_id = client.post("/conversations", json={"model": "m"}).json()["id"]
+
+    assert client.delete(f"/conversations/{conversation_id}").status_code == 204
+    assert client.get(f"/conversations/{conversation_id}").status_code == 404
+
+
+def test_conversations_return_503_when_disabled():
+    """Verify the endpoints report 503 unless CONVERSATIONS_ENABLED is set."""
+    with TestClient(app) as client:
+        response = client.post("/conversations", json={"model": "m"})
+
+    assert response.status_code == 503
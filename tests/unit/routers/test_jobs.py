@@ -0,0 +1,91 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.app.chat.service import ChatService
+from src.app.jobs.dependencies import get_job_service
+from src.app.jobs.providers import StubBatchProvider
+from src.app.jobs.service import JobService
+from src.app.jobs.store import JobStore
+from src.app.main import app
+
+payload: dict[str, Any] = {
+    "requests": [
+        {"model": "test-model", "messages": [{"role": "user", "content": "Hi"}]},
+        {"model": "test-model", "messages": [{"role": "user", "content": "Bye"}]},
+    ]
+}
+
+
+@pytest.fixture
+def job_service(tmp_path: Path, mock_service: ChatService) -> JobService:
+    return JobService(
+        store=JobStore(tmp_path / "jobs.db"),
+        provider=StubBatchProvider(),
+        chat_service=mock_service,
+        jobs_dir=tmp_path,
+        poll_interval=60,
+    )
+
+
+@pytest.fixture
+def client_with_job_service(job_service: JobService):
+    app.dependency_overrides[get_job_service] = lambda: job_service
+    with TestClient(app) as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+def test_create_job_returns_202(client_with_job_service: TestClient):
+    """Verify a job is accepted and submitted."""
+    response = client_with_job_service.post("/jobs", json=payload)
+
+    assert response.status_code == 202
+    body = response.json()
+    assert body["id"].startswith("job_")
+    assert (body["status"], body["total"]) == ("in_progress", 2)
+
+
+def test_get_job_returns_status(client_with_job_service: TestClient):
+    """Verify the job status endpoint returns the stored job."""
+    job_id = client_with_job_service.post("/jobs", json=payload).json()["id"]
+
+    response = client_with_job_service.get(f"/jobs/{job_id}")
+
+    assert response.status_code == 200
+    assert response.json()["id"] == job_id
+
+
+def test_get_job_returns_404_for_unknown_job(client_with_job_service: TestClient):
+    """Verify unknown jobs return 404."""
+    assert client_with_job_service.get("/jobs/job_missing").status_code == 404
+    assert client_with_job_service.get("/jobs/job_missing/results").status_code == 404
+
+
+def test_job_results_stream_ndjson_when_done(
+    client_with_job_service: TestClient, job_service: JobService
+):
+    """Verify results are 409 while running and NDJSON once finished."""
+    job_id = client_with_job_service.post("/jobs", json=payload).json()["id"]
+
+    assert client_with_job_service.get(f"/jobs/{job_id}/results").status_code == 409
+
+    client_with_job_service.portal.call(job_service.poll_once)
+    response = client_with_job_service.get(f"/jobs/{job_id}/results")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.text.splitlines() == [
+        '{"index":0,"response":{"message":"Hi"}}',
+        '{"index":1,"response":{"message":"Bye"}}',
+    ]
+
+
+def test_jobs_return_503_when_disabled():
+    """Verify the jobs endpoints are unavailable unless JOBS_ENABLED is set."""
+    with TestClient(app) as client:
+        response = client.post("/jobs", json=payload)
+
+    assert response.status_code == 503
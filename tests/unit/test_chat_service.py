@@ -1,33 +1,58 @@
+import asyncio
+import time
+
 import httpx
 import pytest
 from openai import (
-    AuthenticationError,
-    RateLimitError,
     APIConnectionError,
+    AsyncOpenAI,
+    AuthenticationError,
     NotFoundError,
-    OpenAI,
+    RateLimitError,
 )
 from openai.types.chat import (
     ChatCompletion,
+    ChatCompletionChunk,
     ChatCompletionMessage,
+    ChatCompletionMessageToolCall,
 )
 from openai.types.chat.chat_completion import Choice
+from openai.types.chat.chat_completion_chunk import (
+    Choice as ChunkChoice,
+)
+from openai.types.chat.chat_completion_chunk import (
+    ChoiceDelta,
+    ChoiceDeltaToolCall,
+    ChoiceDeltaToolCallFunction,
+)
+from openai.types.chat.chat_completion_message_tool_call import Function
 from pytest_mock import MockerFixture
 
+from src.app.chat.cache import LRUCache, ResponseCache
+from src.app.chat.coalescing import SingleFlight
 from src.app.chat.exceptions import (
     AuthenticationFailedError,
-    RateLimitExceededError,
-    OpenAIConnectionError,
     EmptyResponseError,
     ModelNotFoundError,
+    OpenAIConnectionError,
+    RateLimitExceededError,
 )
+from src.app.chat.schemas import ChatMessage, ChatResponse, CreateChatRequest
+from src.app.chat.semantic_cache import SemanticCache
 from src.app.chat.service import ChatService
-from src.app.chat.schemas import ChatMessage, CreateChatRequest, ChatResponse
+from src.app.chat.summary import SUMMARY_PREFIX, ConversationSummarizer
+from src.app.chat.tokens import TokenCounter
+from src.app.llm_providers.hedging import Hedger
+from src.app.llm_providers.rate_limit import AdaptiveRateLimiter, ProviderScheduler
+from src.app.llm_providers.router import ProviderRouter
+from src.app.retrieval.embeddings import HashingEmbedder
+from src.app.retrieval.schemas import RetrievedChunk
 
 
-def test_chat_service_calls_openai(
+@pytest.mark.anyio
+async def test_chat_service_calls_openai(
     mock_service: ChatService,
-    mock_openai_client: OpenAI,
+    mock_openai_client: AsyncOpenAI,
     mocker: MockerFixture,
 ) -> None:
     mock_completion = ChatCompletion(
@@ -56,13 +81,14 @@ def test_chat_service_calls_openai(
             ChatMessage(role="assistant", content="Ok"),
         ],
     )
-    mock_service.generate_response(chat_input)
+    await mock_service.generate_response(chat_input)
     mock_create_completion.assert_called_once()
 
 
-def test_chat_service_passes_messages_and_model(
+@pytest.mark.anyio
+async def test_chat_service_passes_messages_and_model(
     mock_service: ChatService,
-    mock_openai_client: OpenAI,
+    mock_openai_client: AsyncOpenAI,
     mocker: MockerFixture,
 ):
     """Service should pass model and correctly structured messages to OpenAI."""
@@ -81,7 +107,7 @@ def test_chat_service_passes_messages_and_model(
             ChatMessage(role="user", content="What is TDD?"),
         ],
     )
-    mock_service.generate_response(chat_input)
+    await mock_service.generate_response(chat_input)
 
     # Verify model is passed correctly
     call_kwargs = mock_create.call_args.kwargs
@@ -103,9 +129,10 @@ def test_chat_service_passes_messages_and_model(
     assert messages[-1]["content"] == "What is TDD?"
 
 
-def test_chat_service_returns_chat_response_object(
+@pytest.mark.anyio
+async def test_chat_service_returns_chat_response_object(
     mock_service: ChatService,
-    mock_openai_client: OpenAI,
+    mock_openai_client: AsyncOpenAI,
     mocker: MockerFixture,
 ) -> None:
     mocker.patch.object(
@@ -122,15 +149,16 @@ def test_chat_service_returns_chat_response_object(
             ChatMessage(role="assistant", content="Ok"),
         ],
     )
-    response = mock_service.generate_response(chat_input)
+    response = await mock_service.generate_response(chat_input)
     assert isinstance(response, ChatResponse)
     assert isinstance(response.message, str)
     assert response.message == "ok"
 
 
-def test_chat_service_handles_none_message(
+@pytest.mark.anyio
+async def test_chat_service_handles_none_message(
     mock_service: ChatService,
-    mock_openai_client: OpenAI,
+    mock_openai_client: AsyncOpenAI,
     mocker: MockerFixture,
 ) -> None:
     mocker.patch.object(
@@ -147,7 +175,7 @@ def test_chat_service_handles_none_message(
             ChatMessage(role="assistant", content="Hello"),
         ],
     )
-    response = mock_service.generate_response(chat_input)
+    response = await mock_service.generate_response(chat_input)
 
     assert isinstance(response, ChatResponse)
     assert response.message is None
@@ -178,9 +206,10 @@ def test_chat_message_valid():
     assert message.content == "Hi"
 
 
-def test_chat_service_handles_openai_auth_error(
+@pytest.mark.anyio
+async def test_chat_service_handles_openai_auth_error(
     mock_service: ChatService,
-    mock_openai_client: OpenAI,
+    mock_openai_client: AsyncOpenAI,
     mocker: MockerFixture,
 ):
     """Service should raise AuthenticationFailedError when OpenAI auth fails."""
@@ -211,15 +240,16 @@ def test_chat_service_handles_openai_auth_error(
     )
 
     with pytest.raises(AuthenticationFailedError) as exc_info:
-        mock_service.generate_response(chat_input)
+        await mock_service.generate_response(chat_input)
 
     assert exc_info.value.status_code == 401
     assert "authentication" in exc_info.value.message.lower()
 
 
-def test_chat_service_handles_openai_rate_limit_error(
+@pytest.mark.anyio
+async def test_chat_service_handles_openai_rate_limit_error(
     mock_service: ChatService,
-    mock_openai_client: OpenAI,
+    mock_openai_client: AsyncOpenAI,
     mocker: MockerFixture,
 ):
     """Service should raise RateLimitExceededError when OpenAI rate limit is hit."""
@@ -245,15 +275,16 @@ def test_chat_service_handles_openai_rate_limit_error(
     )
 
     with pytest.raises(RateLimitExceededError) as exc_info:
-        mock_service.generate_response(chat_input)
+        await mock_service.generate_response(chat_input)
 
     assert exc_info.value.status_code == 429
     assert "rate limit" in exc_info.value.message.lower()
 
 
-def test_chat_service_handles_openai_api_connection_error(
+@pytest.mark.anyio
+async def test_chat_service_handles_openai_api_connection_error(
     mock_service: ChatService,
-    mock_openai_client: OpenAI,
+    mock_openai_client: AsyncOpenAI,
     mocker: MockerFixture,
 ):
     """Service should raise OpenAIConnectionError when connection fails."""
@@ -273,15 +304,16 @@ def test_chat_service_handles_openai_api_connection_error(
     )
 
     with pytest.raises(OpenAIConnectionError) as exc_info:
-        mock_service.generate_response(chat_input)
+        await mock_service.generate_response(chat_input)
 
     assert exc_info.value.status_code == 502
     assert "connect" in exc_info.value.message.lower()
 
 
-def test_chat_service_handles_empty_choices(
+@pytest.mark.anyio
+async def test_chat_service_handles_empty_choices(
     mock_service: ChatService,
-    mock_openai_client: OpenAI,
+    mock_openai_client: AsyncOpenAI,
     mocker: MockerFixture,
 ):
     """Service should raise EmptyResponseError when choices array is empty."""
@@ -297,15 +329,16 @@ def test_chat_service_handles_empty_choices(
     )
 
     with pytest.raises(EmptyResponseError) as exc_info:
-        mock_service.generate_response(chat_input)
+        await mock_service.generate_response(chat_input)
 
     assert exc_info.value.status_code == 500
     assert "empty" in exc_info.value.message.lower()
 
 
-def test_chat_service_handles_model_not_found(
+@pytest.mark.anyio
+async def test_chat_service_handles_model_not_found(
     mock_service: ChatService,
-    mock_openai_client: OpenAI,
+    mock_openai_client: AsyncOpenAI,
     mocker: MockerFixture,
 ):
     """Service should raise ModelNotFoundError when model does not exist."""
@@ -337,7 +370,714 @@ def test_chat_service_handles_model_not_found(
     )
 
     with pytest.raises(ModelNotFoundError) as exc_info:
-        mock_service.generate_response(chat_input)
+        await mock_service.generate_response(chat_input)
 
     assert exc_info.value.status_code == 404
     assert "model" in exc_info.value.message.lower()
+
+
+@pytest.mark.anyio
+async def test_chat_service_does_not_block_event_loop(
+    mock_service: ChatService,
+    mock_openai_client: AsyncOpenAI,
+    mocker: MockerFixture,
+):
+    """Concurrent requests should overlap instead of running back to back."""
+
+    async def slow_create(**kwargs):
+        await asyncio.sleep(0.2)
+        return mocker.Mock(choices=[mocker.Mock(message=mocker.Mock(content="ok"))])
+
+    mocker.patch.object(
+        mock_openai_client.chat.completions, "create", side_effect=slow_create
+    )
+    chat_input = CreateChatRequest(
+        model="test-model",
+        messages=[ChatMessage(role="user", content="Hi")],
+    )
+
+    started = time.perf_counter()
+    responses = await asyncio.gather(
+        *(mock_service.generate_response(chat_input) for _ in range(10))
+    )
+    elapsed = time.perf_counter() - started
+
+    assert [r.message for r in responses] == ["ok"] * 10
+    assert elapsed < 1.0
+
+
+class FakeStream:
+    """Async stream of completion chunks mimicking openai.AsyncStream."""
+
+    def __init__(
+        self, chunks: list[ChatCompletionChunk], error: Exception | None = None
+    ):
+        self.chunks = chunks
+        self.error = error
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.closed = True
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+        if self.error is not None:
+            raise self.error
+
+
+def make_chunk(content: str | None) -> ChatCompletionChunk:
+    return ChatCompletionChunk(
+        id="test-id",
+        choices=[ChunkChoice(index=0, delta=ChoiceDelta(content=content))],
+        created=1234567890,
+        model="test-model",
+        object="chat.completion.chunk",
+    )
+
+
+@pytest.mark.anyio
+async def test_chat_service_streams_deltas(
+    mock_service: ChatService,
+    mock_openai_client: AsyncOpenAI,
+    mocker: MockerFixture,
+):
+    """Service should forward each non-empty content delta in order."""
+    stream = FakeStream([make_chunk("Hel"), make_chunk(None), make_chunk("lo")])
+    mock_create = mocker.patch.object(
+        mock_openai_client.chat.completions, "create", return_value=stream
+    )
+    chat_input = CreateChatRequest(
+        model="test-model",
+        messages=[ChatMessage(role="user", content="Hi")],
+    )
+
+    deltas = [delta async for delta in mock_service.stream_response(chat_input)]
+
+    assert deltas == ["Hel", "lo"]
+    assert mock_create.call_args.kwargs["stream"] is True
+    assert stream.closed
+
+
+@pytest.mark.anyio
+async def test_chat_service_stream_maps_mid_stream_errors(
+    mock_service: ChatService,
+    mock_openai_client: AsyncOpenAI,
+    mocker: MockerFixture,
+):
+    """Errors raised while iterating the stream should map to ChatServiceError."""
+    connection_error = APIConnectionError(
+        request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"),
+    )
+    mocker.patch.object(
+        mock_openai_client.chat.completions,
+        "create",
+        return_value=FakeStream([make_chunk("Hel")], error=connection_error),
+    )
+    chat_input = CreateChatRequest(
+        model="test-model",
+        messages=[ChatMessage(role="user", content="Hi")],
+    )
+
+    deltas = mock_service.stream_response(chat_input)
+    assert await anext(deltas) == "Hel"
+    with pytest.raises(OpenAIConnectionError):
+        await anext(deltas)
+
+
+@pytest.mark.anyio
+async def test_chat_service_stream_raises_on_empty_stream(
+    mock_service: ChatService,
+    mock_openai_client: AsyncOpenAI,
+    mocker: MockerFixture,
+):
+    """Service should raise EmptyResponseError when no choices are streamed."""
+    mocker.patch.object(
+        mock_openai_client.chat.completions, "create", return_value=FakeStream([])
+    )
+    chat_input = CreateChatRequest(
+        model="test-model",
+        messages=[ChatMessage(role="user", content="Hi")],
+    )
+
+    with pytest.raises(EmptyResponseError):
+        async for _ in mock_service.stream_response(chat_input):
+            pass
+
+
+def make_completion(
+    content: str | None = None,
+    tool_calls: list[ChatCompletionMessageToolCall] | None = None,
+) -> ChatCompletion:
+    return ChatCompletion(
+        id="test-id",
+        choices=[
+            Choice(
+                finish_reason="tool_calls" if tool_calls else "stop",
+                index=0,
+                message=ChatCompletionMessage(
+                    content=content, role="assistant", tool_calls=tool_calls
+                ),
+            )
+        ],
+        created=1234567890,
+        model="test-model",
+        object="chat.completion",
+    )
+
+
+def retrieve_call(call_id: str, query: str) -> ChatCompletionMessageToolCall:
+    return ChatCompletionMessageToolCall(
+        id=call_id,
+        type="function",
+        function=Function(
+            name="retrieve_documents", arguments=f'{{"query": "{query}"}}'
+        ),
+    )
+
+
+@pytest.fixture
+def mock_retriever(mocker: MockerFixture):
+    retriever = mocker.Mock()
+    retriever.retrieve = mocker.AsyncMock(
+        return_value=[
+            RetrievedChunk(
+                chunk_id=0,
+                text="Molasses is a syrup.",
+                score=0.9,
+                metadata={"title": "Molasses", "source": "food.html"},
+            )
+        ]
+    )
+    return retriever
+
+
+@pytest.mark.anyio
+async def test_chat_service_runs_retrieval_tool_loop(
+    mock_service: ChatService,
+    mock_openai_client: AsyncOpenAI,
+    mock_retriever,
+    mocker: MockerFixture,
+):
+    """Service should execute retrieve_documents calls and feed results back."""
+    mock_service.retriever = mock_retriever
+    mock_create = mocker.patch.object(
+        mock_openai_client.chat.completions,
+        "create",
+        side_effect=[
+            make_completion(tool_calls=[retrieve_call("call-1", "molasses")]),
+            make_completion(content="Molasses is a syrup."),
+        ],
+    )
+    chat_input = CreateChatRequest(
+        model="test-model",
+        messages=[ChatMessage(role="user", content="What is molasses?")],
+    )
+
+    response = await mock_service.generate_response(chat_input)
+
+    assert response.message == "Molasses is a syrup."
+    mock_retriever.retrieve.assert_awaited_once_with("molasses", 10)
+    first_call, second_call = mock_create.call_args_list
+    assert first_call.kwargs["tools"][0]["function"]["name"] == "retrieve_documents"
+    messages = second_call.kwargs["messages"]
+    assert messages[-2]["role"] == "assistant"
+    assert messages[-2]["tool_calls"][0]["id"] == "call-1"
+    assert messages[-1]["role"] == "tool"
+    assert messages[-1]["tool_call_id"] == "call-1"
+    assert "Molasses is a syrup." in messages[-1]["content"]
+
+
+@pytest.mark.anyio
+async def test_chat_service_forces_answer_after_max_iterations(
+    mock_service: ChatService,
+    mock_openai_client: AsyncOpenAI,
+    mock_retriever,
+    mocker: MockerFixture,
+):
+    """Service should stop offering the tool once max_iterations is reached."""
+    mock_service.retriever = mock_retriever
+    mock_service.max_iterations = 2
+    mock_create = mocker.patch.object(
+        mock_openai_client.chat.completions,
+        "create",
+        side_effect=[
+            make_completion(tool_calls=[retrieve_call("call-1", "molasses")]),
+            make_completion(tool_calls=[retrieve_call("call-2", "molasses syrup")]),
+            make_completion(content="I'm sorry, but I don't have the information."),
+        ],
+    )
+    chat_input = CreateChatRequest(
+        model="test-model",
+        messages=[ChatMessage(role="user", content="What is molasses?")],
+    )
+
+    response = await mock_service.generate_response(chat_input)
+
+    assert response.message == "I'm sorry, but I don't have the information."
+    assert mock_retriever.retrieve.await_count == 2
+    assert mock_create.call_count == 3
+    assert "tool_choice" not in mock_create.call_args_list[1].kwargs
+    assert mock_create.call_args_list[2].kwargs["tool_choice"] == "none"
+
+
+@pytest.mark.anyio
+async def test_chat_service_reports_malformed_tool_arguments(
+    mock_service: ChatService,
+    mock_openai_client: AsyncOpenAI,
+    mock_retriever,
+    mocker: MockerFixture,
+):
+    """Malformed tool arguments should be reported back instead of raising."""
+    mock_service.retriever = mock_retriever
+    bad_call = ChatCompletionMessageToolCall(
+        id="call-1",
+        type="function",
+        function=Function(name="retrieve_documents", arguments="not json"),
+    )
+    mock_create = mocker.patch.object(
+        mock_openai_client.chat.completions,
+        "create",
+        side_effect=[
+            make_completion(tool_calls=[bad_call]),
+            make_completion(content="ok"),
+        ],
+    )
+    chat_input = CreateChatRequest(
+        model="test-model",
+        messages=[ChatMessage(role="user", content="What is molasses?")],
+    )
+
+    await mock_service.generate_response(chat_input)
+
+    mock_retriever.retrieve.assert_not_awaited()
+    tool_message = mock_create.call_args_list[1].kwargs["messages"][-1]
+    assert "Invalid arguments" in tool_message["content"]
+
+
+@pytest.mark.anyio
+async def test_chat_service_streams_after_tool_calls(
+    mock_service: ChatService,
+    mock_openai_client: AsyncOpenAI,
+    mock_retriever,
+    mocker: MockerFixture,
+):
+    """Streaming should assemble tool call deltas, run them and keep streaming."""
+    mock_service.retriever = mock_retriever
+    tool_round = [
+        ChatCompletionChunk(
+            id="test-id",
+            choices=[
+                ChunkChoice(
+                    index=0,
+                    delta=ChoiceDelta(
+                        tool_calls=[
+                            ChoiceDeltaToolCall(
+                                index=0,
+                                id="call-1",
+                                function=ChoiceDeltaToolCallFunction(
+                                    name="retrieve_documents", arguments='{"query": '
+                                ),
+                            )
+                        ]
+                    ),
+                )
+            ],
+            created=1234567890,
+            model="test-model",
+            object="chat.completion.chunk",
+        ),
+        ChatCompletionChunk(
+            id="test-id",
+            choices=[
+                ChunkChoice(
+                    index=0,
+                    delta=ChoiceDelta(
+                        tool_calls=[
+                            ChoiceDeltaToolCall(
+                                index=0,
+                                function=ChoiceDeltaToolCallFunction(
+                                    arguments='"molasses"}'
+                                ),
+                            )
+                        ]
+                    ),
+                )
+            ],
+            created=1234567890,
+            model="test-model",
+            object="chat.completion.chunk",
+        ),
+    ]
+    mock_create = mocker.patch.object(
+        mock_openai_client.chat.completions,
+        "create",
+        side_effect=[
+            FakeStream(tool_round),
+            FakeStream([make_chunk("A "), make_chunk("syrup.")]),
+        ],
+    )
+    chat_input = CreateChatRequest(
+        model="test-model",
+        messages=[ChatMessage(role="user", content="What is molasses?")],
+    )
+
+    deltas = [delta async for delta in mock_service.stream_response(chat_input)]
+
+    assert deltas == ["A ", "syrup."]
+    mock_retriever.retrieve.assert_awaited_once_with("molasses", 10)
+    tool_message = mock_create.call_args_list[1].kwargs["messages"][-1]
+    assert tool_message["tool_call_id"] == "call-1"
+
+
+@pytest.mark.anyio
+async def test_chat_service_answers_repeated_requests_from_cache(
+    mock_service: ChatService,
+    mock_openai_client: AsyncOpenAI,
+):
+    """Identical requests should only reach the provider once."""
+    mock_service.response_cache = ResponseCache(
+        local=LRUCache(max_bytes=10_000, ttl_seconds=60)
+    )
+    chat_input = CreateChatRequest(
+        model="test-model",
+        messages=[ChatMessage(role="user", content="What is molasses?")],
+    )
+
+    first = await mock_service.generate_response(chat_input)
+    second = await mock_service.generate_response(chat_input)
+
+    assert first == second == ChatResponse(message="Hello Kitty")
+    mock_openai_client.chat.completions.create.assert_awaited_once()
+
+
+@pytest.mark.anyio
+async def test_chat_service_skips_cache_when_bypassed(
+    mock_service: ChatService,
+    mock_openai_client: AsyncOpenAI,
+):
+    """use_cache=False should always call the provider."""
+    mock_service.response_cache = ResponseCache(
+        local=LRUCache(max_bytes=10_000, ttl_seconds=60)
+    )
+    chat_input = CreateChatRequest(
+        model="test-model",
+        messages=[ChatMessage(role="user", content="What is molasses?")],
+    )
+
+    await mock_service.generate_response(chat_input)
+    await mock_service.generate_response(chat_input, use_cache=False)
+
+    assert mock_openai_client.chat.completions.create.await_count == 2
+
+
+@pytest.mark.anyio
+async def test_chat_service_answers_paraphrases_from_semantic_cache(
+    mock_service: ChatService,
+    mock_openai_client: AsyncOpenAI,
+):
+    """A reworded question in the same conversation should reuse the answer."""
+    mock_service.semantic_cache = SemanticCache(
+        embedder=HashingEmbedder(dimension=128),
+        threshold=0.9,
+        ttl_seconds=60,
+        max_entries=16,
+    )
+
+    def ask(content: str, model: str = "test-model") -> CreateChatRequest:
+        return CreateChatRequest(
+            model=model, messages=[ChatMessage(role="user", content=content)]
+        )
+
+    await mock_service.generate_response(ask("How do I reset my VPN?"))
+    response = await mock_service.generate_response(ask("reset my VPN: how do I"))
+    await mock_service.generate_response(ask("reset my VPN: how do I", "other"))
+
+    assert response == ChatResponse(message="Hello Kitty")
+    assert mock_openai_client.chat.completions.create.await_count == 2
+    assert mock_service.semantic_cache.stats.hits == 1
+
+
+@pytest.mark.anyio
+async def test_chat_service_drops_oldest_turns_over_token_budget(
+    mock_service: ChatService,
+    mock_openai_client: AsyncOpenAI,
+    mocker: MockerFixture,
+):
+    """History should be trimmed by whole turns until the prompt fits."""
+    mocker.patch("src.app.chat.tokens.get_encoder", return_value=len)
+    mock_service.token_budget = 10_000
+    mock_service.model_token_budgets = {"small-model": 2_000}
+    chat_input = CreateChatRequest(
+        model="small-model",
+        messages=[
+            ChatMessage(role="user", content="q" * 400),
+            ChatMessage(role="assistant", content="a" * 300),
+            ChatMessage(role="user", content="Short question"),
+            ChatMessage(role="assistant", content="Short answer"),
+            ChatMessage(role="user", content="Latest question"),
+        ],
+    )
+
+    await mock_service.generate_response(chat_input)
+
+    messages = mock_openai_client.chat.completions.create.call_args.kwargs["messages"]
+    assert [message["content"] for message in messages[1:]] == [
+        "Short question",
+        "Short answer",
+        "Latest question",
+    ]
+
+
+@pytest.mark.anyio
+async def test_chat_service_token_counts_stay_bounded_across_models(
+    mock_service: ChatService,
+):
+    """Client-chosen model names must not grow memory without bound."""
+    mock_service.token_budget = 10_000
+    mock_service.token_counter = TokenCounter(max_entries=8)
+
+    for i in range(50):
+        await mock_service.generate_response(
+            CreateChatRequest(
+                model=f"model-{i}",
+                messages=[ChatMessage(role="user", content="What is TDD?")],
+            )
+        )
+
+    assert len(mock_service.token_counter._counts) == 8
+
+
+@pytest.mark.anyio
+async def test_chat_service_reuses_rendered_system_prompt(
+    mock_service: ChatService,
+    mock_openai_client: AsyncOpenAI,
+    mocker: MockerFixture,
+):
+    """The system prompt is rendered at construction, not per request."""
+    render = mocker.patch("src.app.chat.service.render_system_prompt")
+    chat_input = CreateChatRequest(
+        model="test-model",
+        messages=[ChatMessage(role="user", content="What is TDD?")],
+    )
+
+    await mock_service.generate_response(chat_input)
+    await mock_service.generate_response(chat_input)
+
+    render.assert_not_called()
+    messages = mock_openai_client.chat.completions.create.call_args.kwargs["messages"]
+    assert messages[0]["content"] == mock_service.system_prompt.text
+
+
+@pytest.mark.anyio
+async def test_chat_service_sends_prompt_cache_key_when_enabled(
+    mock_service: ChatService,
+    mock_openai_client: AsyncOpenAI,
+):
+    mock_service.send_prompt_cache_key = True
+    chat_input = CreateChatRequest(
+        model="test-model",
+        messages=[ChatMessage(role="user", content="What is TDD?")],
+    )
+
+    await mock_service.generate_response(chat_input)
+
+    call_kwargs = mock_openai_client.chat.completions.create.call_args.kwargs
+    assert call_kwargs["prompt_cache_key"] == mock_service.system_prompt.cache_key
+
+
+@pytest.mark.anyio
+async def test_chat_service_coalesces_concurrent_identical_requests(
+    mock_service: ChatService,
+    mock_openai_client: AsyncOpenAI,
+    mocker: MockerFixture,
+):
+    """A burst of identical requests should reach the provider once."""
+
+    async def slow_completion(**kwargs):
+        await asyncio.sleep(0.01)
+        return mocker.Mock(choices=[mocker.Mock(message=mocker.Mock(content="ok"))])
+
+    mock_openai_client.chat.completions.create.side_effect = slow_completion
+    mock_service.singleflight = SingleFlight()
+    chat_input = CreateChatRequest(
+        model="test-model",
+        messages=[ChatMessage(role="user", content="What is molasses?")],
+    )
+
+    responses = await asyncio.gather(
+        *(mock_service.generate_response(chat_input) for _ in range(20))
+    )
+
+    assert responses == [ChatResponse(message="ok")] * 20
+    mock_openai_client.chat.completions.create.assert_awaited_once()
+
+
+@pytest.mark.anyio
+async def test_chat_service_maps_scheduler_deadline_to_rate_limit(
+    mock_service: ChatService,
+    mock_openai_client: AsyncOpenAI,
+):
+    """Calls the limiter cannot admit in time surface as HTTP 429."""
+    limiter = AdaptiveRateLimiter(requests_per_minute=1)
+    limiter.limits("test-model").requests.take(1)
+    mock_service.scheduler = ProviderScheduler(
+        limiter=limiter, deadline_seconds=0.5, base_delay=0.01, max_delay=0.1
+    )
+    chat_input = CreateChatRequest(
+        model="test-model",
+        messages=[ChatMessage(role="user", content="Hi")],
+    )
+
+    with pytest.raises(RateLimitExceededError) as exc_info:
+        await mock_service.generate_response(chat_input)
+
+    assert exc_info.value.status_code == 429
+    mock_openai_client.chat.completions.create.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_chat_service_reserves_the_completion_budget(
+    mock_service: ChatService, mocker: MockerFixture
+):
+    """The limiter is charged for the prompt and the completion budget."""
+    mocker.patch("src.app.chat.tokens.get_encoder", return_value=len)
+    mock_service.scheduler = ProviderScheduler(
+        limiter=AdaptiveRateLimiter(),
+        deadline_seconds=1,
+        base_delay=0.01,
+        max_delay=0.1,
+    )
+    run = mocker.spy(mock_service.scheduler, "run")
+
+    await mock_service._create(
+        "budget-model",
+        [{"role": "user", "content": "x" * 96}],
+        max_completion_tokens=200,
+    )
+
+    assert run.call_args.kwargs["model"] == "budget-model"
+    assert run.call_args.kwargs["tokens"] == 100 + 200
+
+
+@pytest.mark.anyio
+async def test_chat_service_maps_unroutable_models_to_connection_error(
+    mock_service: ChatService,
+    mock_openai_client: AsyncOpenAI,
+):
+    """A model no backend serves should surface as a 502."""
+    mock_service.router = ProviderRouter([])
+    chat_input = CreateChatRequest(
+        model="test-model",
+        messages=[ChatMessage(role="user", content="Hi")],
+    )
+
+    with pytest.raises(OpenAIConnectionError) as exc_info:
+        await mock_service.generate_response(chat_input)
+
+    assert exc_info.value.status_code == 502
+    assert "test-model" in exc_info.value.message
+    mock_openai_client.chat.completions.create.assert_not_called()
+
+
+class SlowStream(FakeStream):
+    """FakeStream whose first chunk arrives after ``delay`` seconds."""
+
+    def __init__(self, chunks: list[ChatCompletionChunk], delay: float):
+        super().__init__(chunks)
+        self.delay = delay
+
+    async def __aiter__(self):
+        await asyncio.sleep(self.delay)
+        for chunk in self.chunks:
+            yield chunk
+
+
+@pytest.mark.anyio
+async def test_chat_service_hedges_slow_first_token(
+    mock_service: ChatService,
+    mock_openai_client: AsyncOpenAI,
+):
+    """A slow stream is raced by a duplicate and closed when it loses."""
+    slow = SlowStream([make_chunk("slow")], delay=1.0)
+    fast = SlowStream([make_chunk("fast")], delay=0.0)
+    mock_openai_client.chat.completions.create.side_effect = [slow, fast]
+    mock_service.hedger = Hedger(percentile=95, initial_delay=0.01, max_ratio=1.0)
+    chat_input = CreateChatRequest(
+        model="test-model",
+        messages=[ChatMessage(role="user", content="Hi")],
+    )
+
+    deltas = [delta async for delta in mock_service.stream_response(chat_input)]
+    await asyncio.sleep(0)
+
+    assert deltas == ["fast"]
+    assert slow.closed
+    assert fast.closed
+    assert mock_service.hedger.stats.hedge_wins == 1
+
+
+@pytest.mark.anyio
+async def test_chat_service_hedges_blocking_completions(
+    mock_service: ChatService,
+    mock_openai_client: AsyncOpenAI,
+    mocker: MockerFixture,
+):
+    responses = [("slow", 1.0), ("fast", 0.0)]
+
+    async def completion(**kwargs):
+        content, delay = responses.pop(0)
+        await asyncio.sleep(delay)
+        return mocker.Mock(choices=[mocker.Mock(message=mocker.Mock(content=content))])
+
+    mock_openai_client.chat.completions.create.side_effect = completion
+    mock_service.hedger = Hedger(percentile=95, initial_delay=0.01, max_ratio=1.0)
+    chat_input = CreateChatRequest(
+        model="test-model",
+        messages=[ChatMessage(role="user", content="Hi")],
+    )
+
+    response = await mock_service.generate_response(chat_input)
+
+    assert response == ChatResponse(message="fast")
+
+
+@pytest.mark.anyio
+async def test_chat_service_replaces_aged_out_turns_with_summary(
+    mock_service: ChatService,
+    mock_openai_client: AsyncOpenAI,
+):
+    """Turns before the history window are summarised off the request path."""
+    mock_service.chat_history_limit = 3
+    mock_service.summarizer = ConversationSummarizer(max_entries=10)
+    chat_input = CreateChatRequest(
+        model="test-model",
+        messages=[
+            ChatMessage(role="user", content="My name is Ada"),
+            ChatMessage(role="assistant", content="Hi Ada"),
+            ChatMessage(role="user", content="Short question"),
+            ChatMessage(role="assistant", content="Short answer"),
+            ChatMessage(role="user", content="What is my name?"),
+        ],
+    )
+
+    await mock_service.generate_response(chat_input, use_cache=False)
+    await mock_service.summarizer.join()
+    fold_kwargs = mock_openai_client.chat.completions.create.call_args.kwargs
+    await mock_service.generate_response(chat_input, use_cache=False)
+
+    assert (
+        "user: My name is Ada\nassistant: Hi Ada"
+        in fold_kwargs["messages"][1]["content"]
+    )
+    assert fold_kwargs["max_completion_tokens"] == mock_service.summary_max_tokens
+    messages = mock_openai_client.chat.completions.create.call_args.kwargs["messages"]
+    assert [message["content"] for message in messages[1:]] == [
+        SUMMARY_PREFIX + "Hello Kitty",
+        "Short question",
+        "Short answer",
+        "What is my name?",
+    ]
@@ -1,5 +1,8 @@
+import pytest
 from fastapi.testclient import TestClient
+from openai import AsyncOpenAI
 
+from src.app.config import get_settings
 from src.app.main import app
 
 client = TestClient(app)
@@ -9,3 +12,46 @@ def test_health():
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "healthy"}
+
+
+@pytest.fixture
+def settings_with_api_key(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-api-key")
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+def test_lifespan_shares_and_closes_openai_client(settings_with_api_key):
+    """Verify the lifespan creates one pooled client and closes it on shutdown."""
+    with TestClient(app):
+        shared_client = app.state.openai_client
+        assert isinstance(shared_client, AsyncOpenAI)
+        assert not shared_client.is_closed()
+        assert app.state.chat_service.chat_client is shared_client
+
+    assert shared_client.is_closed()
+
+
+def test_lifespan_starts_and_stops_job_poller(
+    settings_with_api_key, monkeypatch: pytest.MonkeyPatch, tmp_path
+):
+    """Verify JOBS_ENABLED creates the job service and it is closed on shutdown."""
+    monkeypatch.setenv("JOBS_ENABLED", "true")
+    monkeypatch.setenv("JOBS_PROVIDER", "stub")
+    monkeypatch.setenv("JOBS_DIR", str(tmp_path))
+    get_settings.cache_clear()
+
+    with TestClient(app) as test_client:
+        response = test_client.post(
+            "/jobs",
+            json={
+                "requests": [
+                    {"model": "m", "messages": [{"role": "user", "content": "Hi"}]}
+                ]
+            },
+        )
+        assert response.status_code == 202
+
+    assert (tmp_path / "jobs.db").exists()
+    assert (tmp_path / response.json()["id"] / "input.jsonl").exists()